@@ -0,0 +1,124 @@
+import os
+import random
+import logging
+import argparse
+from typing import Any, Dict, List, NamedTuple
+
+
+class ArchiveSpec(NamedTuple):
+    """
+    Shape of a synthetic photo archive.
+
+    Every shot has one RAW file; `jpg_ratio` of the shots also have a curated JPG file.
+    Shots are numbered per camera like real cameras do, and `duplicate_ratio` of the shots
+    reuse the name of an earlier shot (counter wrap-around, two bodies with the same prefix).
+    """
+    file_cnt: int = 10_000
+    depth: int = 3
+    fan_out: int = 8
+    camera_prefixes: List[str] = ['DSC_', 'Z9A_']
+    other_prefix: str = 'IMG_'
+    other_jpg_ratio: float = 0.05
+    jpg_ratio: float = 0.3
+    duplicate_ratio: float = 0.01
+    jpg_ext: str = '.jpg'
+    raw_exts: List[str] = ['.nef', '.cr2', '.dng']
+    name_digits: int = 6
+    seed: int = 42
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self._asdict())
+
+def _leaf_dirs(root: str, depth: int, fan_out: int) -> List[str]:
+    """
+    Create a `fan_out`-ary directory tree of the given depth and return its leaf directories.
+    """
+    leaf_dirs: List[str] = [root]
+    for level in range(depth):
+        leaf_dirs = [os.path.join(parent, f"d{level}_{i:03d}") for parent in leaf_dirs for i in range(fan_out)]
+    for leaf_dir in leaf_dirs:
+        os.makedirs(leaf_dir, exist_ok=True)
+    return leaf_dirs
+
+def _touch(abs_path: str) -> None:
+    os.close(os.open(abs_path, os.O_CREAT | os.O_WRONLY, 0o644))
+
+def generate_archive(root_abs_path: str, spec: ArchiveSpec) -> Dict[str, int]:
+    """
+    Generate a synthetic archive made of a `jpg` and a `raw` directory under `root_abs_path`.
+
+    Files are empty; only names and directory layout matter to the scripts.
+
+    :param root_abs_path: Directory to create the archive in.
+    :param spec: Shape of the archive.
+    :return: A dictionary with the number of shots, JPG files and RAW files created.
+    """
+    rng = random.Random(spec.seed)
+    jpg_leaf_dirs: List[str] = _leaf_dirs(os.path.join(root_abs_path, 'jpg'), spec.depth, spec.fan_out)
+    raw_leaf_dirs: List[str] = _leaf_dirs(os.path.join(root_abs_path, 'raw'), spec.depth, spec.fan_out)
+
+    shot_cnt: int = max(1, int(spec.file_cnt / (1 + spec.jpg_ratio + spec.other_jpg_ratio)))
+    name_modulo: int = 10 ** spec.name_digits
+    counters: Dict[str, int] = {prefix: 0 for prefix in spec.camera_prefixes}
+    names: List[str] = []
+    jpg_cnt: int = 0
+    raw_cnt: int = 0
+    for _ in range(shot_cnt):
+        if names and rng.random() < spec.duplicate_ratio:
+            name: str = rng.choice(names)
+        else:
+            prefix: str = rng.choice(spec.camera_prefixes)
+            counters[prefix] += 1
+            name = f"{prefix}{counters[prefix] % name_modulo:0{spec.name_digits}d}"
+            names.append(name)
+        raw_path: str = os.path.join(rng.choice(raw_leaf_dirs), name + rng.choice(spec.raw_exts))
+        if not os.path.exists(raw_path):
+            _touch(raw_path)
+            raw_cnt += 1
+        if rng.random() < spec.jpg_ratio:
+            jpg_path: str = os.path.join(rng.choice(jpg_leaf_dirs), name + spec.jpg_ext)
+            if not os.path.exists(jpg_path):
+                _touch(jpg_path)
+                jpg_cnt += 1
+        if rng.random() < spec.other_jpg_ratio:
+            # JPG files from other devices (phones, scans) are counted but never matched
+            _touch(os.path.join(rng.choice(jpg_leaf_dirs), f"{spec.other_prefix}{rng.getrandbits(48):012x}{spec.jpg_ext}"))
+            jpg_cnt += 1
+
+    logging.info(f"Generated archive in {root_abs_path}: {shot_cnt} shots, {jpg_cnt} JPG files, {raw_cnt} RAW files.")
+    return {'shot_cnt': shot_cnt, 'jpg_cnt': jpg_cnt, 'raw_cnt': raw_cnt}
+
+def add_spec_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the `ArchiveSpec` options (except the file count) to a command line parser.
+    """
+    defaults = ArchiveSpec()
+    parser.add_argument('--depth', type=int, default=defaults.depth, help="Directory depth of both trees.")
+    parser.add_argument('--fan-out', type=int, default=defaults.fan_out, help="Subdirectories per directory.")
+    parser.add_argument('--prefixes', default=','.join(defaults.camera_prefixes), help="Comma-separated camera prefixes.")
+    parser.add_argument('--jpg-ratio', type=float, default=defaults.jpg_ratio, help="Fraction of shots with a curated JPG.")
+    parser.add_argument('--duplicate-ratio', type=float, default=defaults.duplicate_ratio, help="Fraction of shots reusing an earlier name.")
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+
+def spec_from_args(args: argparse.Namespace, file_cnt: int) -> ArchiveSpec:
+    return ArchiveSpec(
+        file_cnt=file_cnt,
+        depth=args.depth,
+        fan_out=args.fan_out,
+        camera_prefixes=[prefix.strip() for prefix in args.prefixes.split(',') if prefix.strip()],
+        jpg_ratio=args.jpg_ratio,
+        duplicate_ratio=args.duplicate_ratio,
+        seed=args.seed,
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic JPG/RAW photo archive.")
+    parser.add_argument('root', help="Directory to create the archive in.")
+    parser.add_argument('--files', type=int, default=ArchiveSpec().file_cnt, help="Approximate total number of files.")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    generate_archive(os.path.abspath(args.root), spec_from_args(args, args.files))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import platform
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.archive_generator import ArchiveSpec, generate_archive, add_spec_arguments, spec_from_args
+
+
+DEFAULT_BASELINE_FILE = "benchmarks/baseline.json"
+DEFAULT_TOLERANCE = 0.2
+
+_JPG_EXTS = ['.jpg', '.jpeg']
+
+def _measure(benchmark: str, func: Callable[[], int]) -> Dict[str, Any]:
+    """
+    Time `func`, which returns the number of files it processed, in the current (fresh) process.
+    """
+    from src.utils.metrics import get_op_counts, get_peak_rss_bytes
+    wall_start: float = time.perf_counter()
+    cpu_start: float = time.process_time()
+    items: int = func()
+    wall_sec: float = time.perf_counter() - wall_start
+    return {
+        'benchmark': benchmark,
+        'items': items,
+        'wall_sec': wall_sec,
+        'cpu_sec': time.process_time() - cpu_start,
+        'files_per_sec': items / wall_sec if wall_sec > 0 else 0.0,
+        'peak_rss_bytes': get_peak_rss_bytes(),
+        'ops': get_op_counts(),
+    }
+
+def _bench_gather(jpg_dir: str, camera_prefixes: List[str], walk_workers: int, compact_names: bool) -> Dict[str, Any]:
+    from src.utils.scripts import TOTAL_JPG_CNT, gather_camera_jpg_names
+    def run() -> int:
+        _, detailed_info = gather_camera_jpg_names(jpg_dir, camera_prefixes, _JPG_EXTS, if_logging=True, walk_workers=walk_workers, compact_names=compact_names)
+        return detailed_info[TOTAL_JPG_CNT]
+    return _measure('gather_camera_jpg_names', run)
+
+def _bench_filter(jpg_dir: str, raw_dir: str, camera_prefixes: List[str], raw_exts: List[str], walk_workers: int, compact_names: bool) -> Dict[str, Any]:
+    from src.utils.scripts import KEPT_RAW_CNT, DELETED_RAW_CNT, gather_camera_jpg_names, filter_raw_files_by_jpg_names
+    jpg_names, _ = gather_camera_jpg_names(jpg_dir, camera_prefixes, _JPG_EXTS, if_logging=False, walk_workers=walk_workers, compact_names=compact_names)
+    def run() -> int:
+        # Keep the RAW files on disk, so the archive can be reused; only the trash call is skipped
+        detailed_info: Dict[str, int] = filter_raw_files_by_jpg_names(raw_dir, raw_exts, jpg_names, walk_workers=walk_workers, delete_func=lambda path: None)
+        return detailed_info[KEPT_RAW_CNT] + detailed_info[DELETED_RAW_CNT]
+    return _measure('filter_raw_files_by_jpg_names', run)
+
+def _bench_flatten(jpg_dir: str, output_dir: str, work_dir: str, file_log_verbosity: str) -> Dict[str, Any]:
+    from src.flatten_jpgs import flatten_jpgs_main
+    config_file_path: str = os.path.join(work_dir, 'flatten_jpgs_config.yaml')
+    config: Dict[str, Any] = {
+        'input_jpg_dir_abs_path': jpg_dir,
+        'output_jpg_dir_abs_path': output_dir,
+        'jpg_exts': _JPG_EXTS,
+        'number_of_digits': 6,
+        'log_file_abs_path': os.path.join(work_dir, 'flatten_jpgs.log'),
+        'file_log_verbosity': file_log_verbosity,
+    }
+    with open(config_file_path, 'w', encoding='utf-8') as f:
+        json.dump(config, f)  # JSON is valid YAML
+    def run() -> int:
+        flatten_jpgs_main(config_file_path)
+        return len(os.listdir(output_dir))
+    return _measure('flatten_jpgs_main', run)
+
+def _run_isolated(func: Callable[..., Dict[str, Any]], *args: Any) -> Dict[str, Any]:
+    """
+    Run one benchmark in a fresh interpreter, so its peak memory and operation counts are its own.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(func, *args).result()
+
+def run_benchmarks(work_dir: str, spec: ArchiveSpec, walk_workers: int, file_log_verbosity: str, compact_names: bool = False) -> List[Dict[str, Any]]:
+    """
+    Generate an archive of `spec.file_cnt` files in `work_dir` and benchmark the scripts on it.
+
+    The flatten benchmark moves the JPG files, so it runs last.
+    """
+    archive_dir: str = os.path.join(work_dir, f"archive_{spec.file_cnt}")
+    shutil.rmtree(archive_dir, ignore_errors=True)
+    generate_start: float = time.perf_counter()
+    archive_info: Dict[str, int] = generate_archive(archive_dir, spec)
+    logging.info(f"Archive generated in {time.perf_counter() - generate_start:.1f}s.")
+    jpg_dir: str = os.path.join(archive_dir, 'jpg')
+    raw_dir: str = os.path.join(archive_dir, 'raw')
+    output_dir: str = os.path.join(archive_dir, 'flat')
+    os.makedirs(output_dir)
+
+    results: List[Dict[str, Any]] = [
+        _run_isolated(_bench_gather, jpg_dir, spec.camera_prefixes, walk_workers, compact_names),
+        _run_isolated(_bench_filter, jpg_dir, raw_dir, spec.camera_prefixes, spec.raw_exts, walk_workers, compact_names),
+        _run_isolated(_bench_flatten, jpg_dir, output_dir, archive_dir, file_log_verbosity),
+    ]
+    for result in results:
+        result.update({'file_cnt': spec.file_cnt, **archive_info})
+        logging.info(f"{result['benchmark']} @ {spec.file_cnt} files: {result['items']} files in {result['wall_sec']:.2f}s ({result['files_per_sec']:.0f} files/s), peak RSS {(result['peak_rss_bytes'] or 0) / 2**20:.1f} MiB.")
+    shutil.rmtree(archive_dir, ignore_errors=True)
+    return results
+
+def compare_to_baseline(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Compare results to a baseline run of the same benchmarks and archive sizes.
+
+    :return: Human-readable regressions: throughput lower, or peak memory higher, than the baseline by more than `tolerance`.
+    """
+    baseline_results: Dict[Tuple[str, int], Dict[str, Any]] = {(result['benchmark'], result['file_cnt']): result for result in baseline['results']}
+    regressions: List[str] = []
+    for result in results:
+        base: Optional[Dict[str, Any]] = baseline_results.get((result['benchmark'], result['file_cnt']))
+        if base is None:
+            continue
+        label: str = f"{result['benchmark']} @ {result['file_cnt']} files"
+        if result['files_per_sec'] < base['files_per_sec'] * (1 - tolerance):
+            regressions.append(f"{label}: {result['files_per_sec']:.0f} files/s, baseline {base['files_per_sec']:.0f} files/s.")
+        if result['peak_rss_bytes'] and base['peak_rss_bytes'] and result['peak_rss_bytes'] > base['peak_rss_bytes'] * (1 + tolerance):
+            regressions.append(f"{label}: peak RSS {result['peak_rss_bytes']} bytes, baseline {base['peak_rss_bytes']} bytes.")
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark photo-archiver on synthetic archives.")
+    parser.add_argument('--files', type=int, nargs='+', default=[10_000], help="Archive sizes to benchmark (approximate total number of files).")
+    add_spec_arguments(parser)
+    parser.add_argument('--walk-workers', type=int, default=8)
+    parser.add_argument('--compact-names', action='store_true', help="Store the JPG names in a CompactNameSet.")
+    parser.add_argument('--file-log-verbosity', default='summary', choices=['full', 'sampled', 'summary'], help="Per-file logging of the flatten benchmark.")
+    parser.add_argument('--work-dir', default=None, help="Directory to generate archives in (default: a temporary directory).")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_FILE, help="Baseline JSON file to compare with.")
+    parser.add_argument('--save-baseline', action='store_true', help="Save the results as the new baseline instead of comparing.")
+    parser.add_argument('--output', default=None, help="Also write the results of this run to this JSON file.")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="Allowed relative regression (default: 0.2).")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    work_dir: str = os.path.abspath(args.work_dir) if args.work_dir else tempfile.mkdtemp(prefix='photo_archiver_bench_')
+    os.makedirs(work_dir, exist_ok=True)
+    results: List[Dict[str, Any]] = []
+    for file_cnt in args.files:
+        results.extend(run_benchmarks(work_dir, spec_from_args(args, file_cnt), args.walk_workers, args.file_log_verbosity, args.compact_names))
+    if not args.work_dir:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report: Dict[str, Any] = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'spec': spec_from_args(args, 0).to_dict(),
+        'compact_names': args.compact_names,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        logging.info(f"Baseline saved to: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        logging.info(f"No baseline at {args.baseline}, run with --save-baseline to create one.")
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        regressions: List[str] = compare_to_baseline(results, json.load(f), args.tolerance)
+    for regression in regressions:
+        logging.warning(f"Regression: {regression}")
+    if not regressions:
+        logging.info(f"No regression against {args.baseline} (tolerance {args.tolerance:.0%}).")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import sys
+import argparse
+import importlib
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Subcommand: (module, main function, help). Modules are imported only when their subcommand runs,
+# so `python -m src <command>` loads nothing the command does not need.
+_COMMANDS: Dict[str, Tuple[str, str, str]] = {
+    'filter': ('src.filter_raw_by_jpg', 'filter_raw_by_jpg_main', "Delete RAW files without a corresponding JPG file."),
+    'flatten': ('src.flatten_jpgs', 'flatten_jpgs_main', "Move and rename every JPG file into the output directory."),
+    'unflatten': ('src.unflatten_jpgs', 'unflatten_jpgs_main', "Move flattened JPG files back, from the move journal of a flatten run."),
+    'dedupe': ('src.dedupe_jpgs', 'dedupe_jpgs_main', "Find identical JPG files, and optionally hardlink them."),
+    'watch': ('src.watch_raw_by_jpg', 'watch_raw_by_jpg_main', "Keep culling RAW files as the JPG directory changes."),
+    'batch': ('src.batch_jobs', 'batch_jobs_main', "Run many archive jobs from one batch configuration file."),
+    'verify': ('src.verify_archive', 'verify_archive_main', "Update the integrity manifests of the archive and verify a sample of old files (uses the filter configuration)."),
+    'restore': ('src.restore_quarantine', 'restore_quarantine_main', "Move quarantined RAW files back (uses the filter configuration)."),
+}
+
+# Subcommands accepting the options that override configuration keys
+_RESUMABLE_COMMANDS = ('filter', 'flatten')
+_PROFILED_COMMANDS = ('filter', 'flatten', 'dedupe', 'verify')
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the command line parser of `python -m src`.
+    """
+    parser = argparse.ArgumentParser(prog="python -m src", description="photo-archiver: organize and archive JPG and RAW photo files.")
+    subparsers = parser.add_subparsers(dest='command', required=True, metavar='command')
+    for command, (_, _, help_text) in _COMMANDS.items():
+        subparser = subparsers.add_parser(command, help=help_text, description=help_text)
+        subparser.add_argument('-c', '--config', help="Path to the YAML configuration file (default: the one under config/).")
+        if command in _RESUMABLE_COMMANDS:
+            subparser.add_argument('--resume', action='store_true', help="Finish an interrupted run from its checkpoint journal (sets resume: true).")
+        if command in _PROFILED_COMMANDS:
+            subparser.add_argument('--profile', metavar='PATH', help="Write a cProfile report of the run to PATH (sets profile_abs_path).")
+        if command == 'filter':
+            subparser.add_argument('--dry-run', action='store_true', help="Decide and report as usual, but delete and move nothing (sets dry_run: true).")
+            subparser.add_argument('--report', metavar='PATH', help="Write the pairing report of JPG and RAW files to PATH, .csv or .csv.gz (sets pairing_report_abs_path).")
+        if command == 'unflatten':
+            subparser.add_argument('--journal', help="Path of the move journal to replay (default: the latest one).")
+        if command == 'restore':
+            subparser.add_argument('--batch', help="Name of the quarantine batch to restore (default: the latest).")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the subcommand given on the command line.
+
+    :param argv: Command line arguments (default: `sys.argv[1:]`).
+    :return: Exit code.
+    """
+    args = build_parser().parse_args(argv)
+    module_name, main_name, _ = _COMMANDS[args.command]
+
+    config_overrides: Dict[str, Any] = {}
+    if getattr(args, 'resume', False):
+        config_overrides['resume'] = True
+    if getattr(args, 'profile', None):
+        config_overrides['profile_abs_path'] = args.profile
+    if getattr(args, 'dry_run', False):
+        config_overrides['dry_run'] = True
+    if getattr(args, 'report', None):
+        config_overrides['pairing_report_abs_path'] = args.report
+    if getattr(args, 'journal', None):
+        config_overrides['unflatten_journal_abs_path'] = args.journal
+    if getattr(args, 'batch', None):
+        config_overrides['restore_batch'] = args.batch
+
+    main_kwargs: Dict[str, Any] = {}
+    if args.config:
+        main_kwargs['config_file_path'] = args.config
+    if config_overrides:
+        main_kwargs['config_overrides'] = config_overrides
+
+    getattr(importlib.import_module(module_name), main_name)(**main_kwargs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
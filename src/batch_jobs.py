@@ -0,0 +1,116 @@
+import json
+import time
+import logging
+from typing import Dict, Any, List, Tuple
+
+from src.filter_raw_by_jpg import run_filter_raw_by_jpg
+from src.flatten_jpgs import run_flatten_jpgs
+from src.dedupe_jpgs import run_dedupe_jpgs
+from src.utils.batch import SUCCEEDED_JOB, DEFAULT_MAX_JOBS, DEFAULT_PER_DEVICE_JOBS
+from src.utils.batch import JobSpec, JobResult, load_batch_jobs, run_jobs
+from src.utils.metrics import diff_op_counts, get_op_counts, write_atomically
+from src.config.loader import load_config
+from src.config.logging_config import FULL_FILE_LOG, DEFAULT_FILE_LOG_SAMPLE_EVERY
+from src.config.logging_config import setup_logging, clear_logging_handlers
+
+
+_BATCH_JOBS_CONFIG_FILE = "config/batch_jobs_config.yaml"
+
+MOVED_JPG_CNT = 'moved_jpg_cnt'
+FAILED_MOVE_JPG_CNT = 'failed_move_jpg_cnt'
+
+JOB_SPECS: Dict[str, JobSpec] = {
+    'filter_raw_by_jpg': JobSpec(
+        run=run_filter_raw_by_jpg,
+        required_keys=('jpg_dir_abs_path', 'raw_dir_abs_path', 'jpg_exts', 'raw_exts', 'camera_prefixes'),
+        path_keys=('jpg_dir_abs_path', 'raw_dir_abs_path'),
+        summarize=lambda result: {**result[0], **result[1]},
+    ),
+    'flatten_jpgs': JobSpec(
+        run=run_flatten_jpgs,
+        required_keys=('input_jpg_dir_abs_path', 'output_jpg_dir_abs_path', 'jpg_exts', 'number_of_digits'),
+        path_keys=('input_jpg_dir_abs_path', 'output_jpg_dir_abs_path'),
+        summarize=lambda result: {MOVED_JPG_CNT: result[0], FAILED_MOVE_JPG_CNT: result[1]},
+    ),
+    'dedupe_jpgs': JobSpec(
+        run=run_dedupe_jpgs,
+        required_keys=('jpg_dir_abs_path', 'jpg_exts'),
+        path_keys=('jpg_dir_abs_path',),
+        summarize=lambda result: dict(result[1]),
+    ),
+}
+
+def run_batch_jobs(config: Dict[str, Any]) -> Tuple[List[JobResult], float, Dict[str, int]]:
+    """
+    Validate every job of a batch config, then run them concurrently.
+
+    :param config: Loaded batch configuration.
+    :return: A tuple of (result of every job, wall time of the whole batch in seconds, operation counts of the whole batch).
+    :raises ValueError: If any job is invalid, before any job runs.
+    """
+    max_jobs: int = config.get('max_jobs', DEFAULT_MAX_JOBS)
+    per_device_jobs: int = config.get('per_device_jobs', DEFAULT_PER_DEVICE_JOBS)
+
+    # 1. Validate every job up front, so a typo in the last job does not surface hours into the batch
+    jobs = load_batch_jobs(config, JOB_SPECS)
+    logging.info(f"Running {len(jobs)} jobs, {max_jobs} at a time, {per_device_jobs} per disk...")
+
+    # 2. Run the jobs
+    ops_before: Dict[str, int] = get_op_counts()
+    start_time: float = time.perf_counter()
+    results: List[JobResult] = run_jobs(jobs, JOB_SPECS, max_jobs=max_jobs, per_device_jobs=per_device_jobs)
+    return results, time.perf_counter() - start_time, diff_op_counts(ops_before, get_op_counts())
+
+def batch_jobs_main(config_file_path: str = _BATCH_JOBS_CONFIG_FILE) -> None:
+    """
+    Main function to run many archive jobs from one batch configuration file.
+    """
+    # Load configuration from YAML file
+    config: Dict[str, Any] = load_config(config_file_path)
+
+    # Configure logging
+    log_file_abs_path: str = config['log_file_abs_path']
+    setup_logging(
+        log_to_file=True,
+        log_file_abs_path=log_file_abs_path,
+        use_queue=config.get('async_logging', False),
+        file_log_verbosity=config.get('file_log_verbosity', FULL_FILE_LOG),
+        file_log_sample_every=config.get('file_log_sample_every', DEFAULT_FILE_LOG_SAMPLE_EVERY),
+    )
+
+    try:
+        results, total_wall_sec, total_ops = run_batch_jobs(config)
+        failed_results: List[JobResult] = [result for result in results if result.status != SUCCEEDED_JOB]
+
+        # 3. Print the summary of the batch
+        logging.info("==========================================================")
+        logging.info("Batch completed." if not failed_results else "Batch completed with failed jobs.")
+        logging.info("----------------------------------------------------------")
+        for result in results:
+            logging.info(f"RST: Job {result.name} ({result.job_type}): {result.status} in {result.wall_sec:.2f}s. {result.error or result.info}")
+        logging.info(f"RST: Jobs: {len(results)}, Failed: {len(failed_results)}, Wall time: {total_wall_sec:.2f}s.")
+        logging.info(f"RST: Operations: {total_ops}")
+        logging.info("----------------------------------------------------------")
+        logging.info("Exiting the script.")
+        logging.info("==========================================================")
+
+        # Write the combined summary
+        summary_json_abs_path: str = config.get('summary_json_abs_path')
+        if summary_json_abs_path:
+            summary: Dict[str, Any] = {
+                'total_wall_sec': total_wall_sec,
+                'job_cnt': len(results),
+                'failed_job_cnt': len(failed_results),
+                'ops': total_ops,
+                'jobs': [result._asdict() for result in results],
+            }
+            write_atomically(summary_json_abs_path, json.dumps(summary, indent=2))
+            logging.info(f"Batch summary written to: {summary_json_abs_path}")
+    finally:
+        # Clear logging handlers to prevent duplicate logs in future runs, even when the run fails
+        clear_logging_handlers()
+
+
+if __name__ == "__main__":
+    # Run the main function with the default config file path
+    batch_jobs_main(config_file_path=_BATCH_JOBS_CONFIG_FILE)
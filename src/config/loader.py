@@ -1,4 +1,3 @@
-import yaml
 from pathlib import Path
 from typing import Dict, Any
 
@@ -13,6 +12,9 @@ def load_config(config_path: str = "config/config.yaml") -> Dict[str, Any]:
     if not config_file.exists():
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
 
+    # Imported here, so commands that never load a config do not pay for it
+    import yaml
+
     with open(config_file, 'r', encoding='utf-8') as f:
         config: Dict[str, Any] = yaml.safe_load(f)
 
@@ -1,24 +1,124 @@
 import logging
 import os
-from typing import Any
+import queue
+import itertools
+from typing import Any, Optional
 
 
-def setup_logging(log_level: Any=logging.INFO, log_to_file: bool=False, log_file_abs_path: str = None) -> None:
-    logging.basicConfig(
-        level=log_level,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S',
-        filename=os.path.abspath(log_file_abs_path) if log_to_file and log_file_abs_path else None,
-        filemode='a',
-    )
+# Per-file log lines go through this logger, so their verbosity can be tuned apart from summary lines
+FILE_LOGGER_NAME = 'photo_archiver.files'
+
+FULL_FILE_LOG = 'full'
+SAMPLED_FILE_LOG = 'sampled'
+SUMMARY_FILE_LOG = 'summary'
+
+DEFAULT_FILE_LOG_SAMPLE_EVERY = 1000
+DEFAULT_LOG_BUFFER_CAPACITY = 1024
+
+_LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+_LOG_DATEFMT = '%Y-%m-%d %H:%M:%S'
+
+# A `logging.handlers.QueueListener`, imported only when queued logging is used
+_queue_listener: Optional[Any] = None
+
+class _SampleFilter(logging.Filter):
+    """
+    Let one per-file record out of `sample_every` through; warnings and errors always pass.
+    """
+
+    def __init__(self, sample_every: int):
+        super().__init__()
+        self._sample_every: int = max(1, sample_every)
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        return next(self._counter) % self._sample_every == 0
+
+def _make_deferred_queue_handler(log_queue: queue.SimpleQueue) -> logging.Handler:
+    """
+    Return a queue handler queueing records as they are, so message formatting happens on the listener thread.
+
+    The stock `QueueHandler.prepare` formats every record on the calling thread, which is
+    exactly the cost that queued logging is meant to move off the scan threads.
+    """
+    from logging.handlers import QueueHandler
+
+    class _DeferredQueueHandler(QueueHandler):
+        def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+            return record
+
+    return _DeferredQueueHandler(log_queue)
+
+def get_file_logger() -> logging.Logger:
+    """
+    Return the logger used for per-file log lines.
+    """
+    return logging.getLogger(FILE_LOGGER_NAME)
+
+def setup_logging(log_level: Any=logging.INFO, log_to_file: bool=False, log_file_abs_path: str = None, use_queue: bool=False, file_log_verbosity: str=FULL_FILE_LOG, file_log_sample_every: int=DEFAULT_FILE_LOG_SAMPLE_EVERY, buffer_capacity: int=DEFAULT_LOG_BUFFER_CAPACITY) -> None:
+    """
+    Configure the root logger and the per-file logger.
+
+    :param log_level: Level of the root logger.
+    :param log_to_file: Whether to log to `log_file_abs_path` instead of the console.
+    :param log_file_abs_path: Path of the log file (appended to).
+    :param use_queue: Whether to hand records to a background `QueueListener` that formats them and writes them in buffered batches.
+    :param file_log_verbosity: Per-file log lines to keep: 'full' (all), 'sampled' (one out of `file_log_sample_every`) or 'summary' (none); warnings and errors are always kept.
+    :param file_log_sample_every: Sampling period of 'sampled' verbosity.
+    :param buffer_capacity: Number of records buffered before a write when `use_queue` is set; errors are written immediately.
+    """
+    global _queue_listener
+    filename: Optional[str] = os.path.abspath(log_file_abs_path) if log_to_file and log_file_abs_path else None
+    if use_queue:
+        # Imported here, so runs logging directly do not pay for it
+        from logging.handlers import MemoryHandler, QueueListener
+        target_handler: logging.Handler = logging.FileHandler(filename, mode='a') if filename else logging.StreamHandler()
+        target_handler.setFormatter(logging.Formatter(_LOG_FORMAT, datefmt=_LOG_DATEFMT))
+        buffered_handler = MemoryHandler(buffer_capacity, flushLevel=logging.ERROR, target=target_handler)
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _queue_listener = QueueListener(log_queue, buffered_handler)
+        _queue_listener.start()
+        logging.root.addHandler(_make_deferred_queue_handler(log_queue))
+        logging.root.setLevel(log_level)
+    else:
+        logging.basicConfig(
+            level=log_level,
+            format=_LOG_FORMAT,
+            datefmt=_LOG_DATEFMT,
+            filename=filename,
+            filemode='a',
+        )
+
+    # Configure the per-file verbosity
+    file_logger: logging.Logger = get_file_logger()
+    for log_filter in file_logger.filters[:]:
+        file_logger.removeFilter(log_filter)
+    if file_log_verbosity == SUMMARY_FILE_LOG:
+        file_logger.setLevel(logging.WARNING)
+    elif file_log_verbosity == SAMPLED_FILE_LOG:
+        file_logger.setLevel(logging.NOTSET)
+        file_logger.addFilter(_SampleFilter(file_log_sample_every))
+    elif file_log_verbosity == FULL_FILE_LOG:
+        file_logger.setLevel(logging.NOTSET)
+    else:
+        raise ValueError(f"Unknown per-file log verbosity: {file_log_verbosity}")
 
 def clear_logging_handlers() -> None:
     """
     Clear all logging handlers to prevent duplicate logs.
     """
+    global _queue_listener
+    # Stop the listener first, so every queued record is written
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        for handler in _queue_listener.handlers:
+            target_handler: Optional[logging.Handler] = getattr(handler, 'target', None)
+            handler.close()
+            if target_handler is not None:
+                target_handler.close()
+        _queue_listener = None
     for handler in logging.root.handlers[:]:
         handler.close()
         logging.root.removeHandler(handler)
-
-
-
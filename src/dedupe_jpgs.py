@@ -0,0 +1,102 @@
+import logging
+from typing import Dict, List, Any, Tuple, Optional
+
+from src.utils.scripts import assert_abs_paths_exist
+from src.utils.walker import DEFAULT_WALK_WORKERS
+from src.utils.dedupe import TOTAL_JPG_CNT, TOTAL_JPG_BYTES, DUPLICATE_GROUP_CNT, DUPLICATE_JPG_CNT, RECLAIMABLE_BYTES
+from src.utils.dedupe import DEFAULT_HASH_WORKERS, find_duplicate_jpgs, hardlink_duplicates
+from src.utils.metrics import RunMetrics, profile_run, write_metrics
+from src.config.loader import load_config
+from src.config.logging_config import FULL_FILE_LOG, DEFAULT_FILE_LOG_SAMPLE_EVERY
+from src.config.logging_config import setup_logging, clear_logging_handlers
+
+
+_DEDUPE_JPGS_CONFIG_FILE = "config/dedupe_jpgs_config.yaml"
+
+def run_dedupe_jpgs(config: Dict[str, Any], metrics: RunMetrics) -> Tuple[List[List[str]], Dict[str, int]]:
+    """
+    Find identical JPG/JPEG files as configured by `config`, and replace them by hardlinks if asked to.
+
+    :param config: Loaded configuration of the script.
+    :param metrics: Run metrics receiving the 'find_duplicates' and 'link_duplicates' phases.
+    :return: A tuple of (duplicate groups, detailed information).
+    """
+    # Extract configuration parameters
+    jpg_dir_abs_path: str = config['jpg_dir_abs_path']
+    jpg_exts: List[str] = config['jpg_exts']
+    hash_workers: int = config.get('hash_workers', DEFAULT_HASH_WORKERS)
+    walk_workers: int = config.get('walk_workers', DEFAULT_WALK_WORKERS)
+    link_duplicates: bool = config.get('hardlink_duplicates', False)
+
+    # Check if the provided paths exist
+    assert_abs_paths_exist(
+        abs_paths=[jpg_dir_abs_path]
+    )
+
+    # 1. Find the groups of identical JPG files
+    logging.info("Finding identical JPG/JPEG files...")
+    with metrics.phase('find_duplicates') as phase:
+        duplicate_groups, detailed_info = find_duplicate_jpgs(
+            jpg_dir_abs_path=jpg_dir_abs_path,
+            jpg_exts=jpg_exts,
+            hash_workers=hash_workers,
+            walk_workers=walk_workers,
+        )
+        phase.items = detailed_info[TOTAL_JPG_CNT]
+
+    # 2. Replace the duplicates by hardlinks if asked to
+    if link_duplicates:
+        logging.info("Replacing duplicate JPG/JPEG files by hardlinks...")
+        with metrics.phase('link_duplicates') as phase:
+            phase.items = detailed_info[DUPLICATE_JPG_CNT]
+            linked_cnt, failed_link_cnt = hardlink_duplicates(duplicate_groups)
+        logging.info(f"RST: Linked duplicate JPG/JPEG files: {linked_cnt}, failed: {failed_link_cnt}")
+
+    return duplicate_groups, detailed_info
+
+def dedupe_jpgs_main(config_file_path: str = _DEDUPE_JPGS_CONFIG_FILE, config_overrides: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Main function to find identical JPG files based on a configuration file.
+
+    :param config_file_path: Path to the YAML configuration file.
+    :param config_overrides: Optional configuration keys overriding those of the file (e.g., from the command line).
+    """
+    # Load configuration from YAML file
+    config: Dict[str, Any] = load_config(config_file_path)
+    config.update(config_overrides or {})
+
+    # Configure logging
+    log_file_abs_path: str = config['log_file_abs_path']
+    setup_logging(
+        log_to_file=True,
+        log_file_abs_path=log_file_abs_path,
+        use_queue=config.get('async_logging', False),
+        file_log_verbosity=config.get('file_log_verbosity', FULL_FILE_LOG),
+        file_log_sample_every=config.get('file_log_sample_every', DEFAULT_FILE_LOG_SAMPLE_EVERY),
+    )
+
+    try:
+        metrics = RunMetrics('dedupe_jpgs')
+        with profile_run(config.get('profile_abs_path')):
+            _, detailed_info = run_dedupe_jpgs(config, metrics)
+
+        # 3. Print the summary of the operation
+        logging.info("==========================================================")
+        logging.info("Script completed successfully.")
+        logging.info("----------------------------------------------------------")
+        logging.info(f"RST: JPG/JPEG files: {detailed_info[TOTAL_JPG_CNT]} ({detailed_info[TOTAL_JPG_BYTES]} bytes).")
+        logging.info(f"RST: Duplicates: {detailed_info[DUPLICATE_JPG_CNT]} files in {detailed_info[DUPLICATE_GROUP_CNT]} groups, {detailed_info[RECLAIMABLE_BYTES]} bytes reclaimable.")
+        logging.info("----------------------------------------------------------")
+        logging.info("Exiting the script.")
+        logging.info("==========================================================")
+
+        # Write the per-phase metrics report
+        write_metrics(metrics, config.get('metrics_json_abs_path'), config.get('metrics_prom_abs_path'))
+    finally:
+        # Clear logging handlers to prevent duplicate logs in future runs, even when the run fails
+        clear_logging_handlers()
+
+
+if __name__ == "__main__":
+    # Run the main function with the default config file path
+    dedupe_jpgs_main(config_file_path=_DEDUPE_JPGS_CONFIG_FILE)
@@ -1,86 +1,421 @@
 import os
 import logging
-from typing import Set, Tuple, Dict, List, Any
-from pprint import pprint
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import AbstractSet, Tuple, Dict, List, Set, Any, Optional, Iterable, Callable
 
 from src.utils.scripts import TOTAL_JPG_CNT, TOTAL_CAMERA_JPG_CNT, UNIQUE_CAMERA_JPG_CNT
-from src.utils.scripts import KEPT_RAW_CNT, DELETED_RAW_CNT, FAILED_DELETE_RAW_CNT
+from src.utils.scripts import KEPT_RAW_CNT, DELETED_RAW_CNT, FAILED_DELETE_RAW_CNT, WOULD_DELETE_RAW_CNT
+from src.utils.scripts import DELETED_SIDECAR_CNT, FAILED_DELETE_SIDECAR_CNT, WOULD_DELETE_SIDECAR_CNT
+from src.utils.scripts import MOVED_RAW_CNT, FAILED_MOVE_RAW_CNT, CONFLICT_RAW_CNT
 from src.utils.scripts import assert_abs_paths_exist
-from src.utils.scripts import gather_camera_jpg_names
-from src.utils.scripts import filter_raw_files_by_jpg_names
+from src.utils.scripts import gather_camera_jpg_names, gather_camera_jpg_dirs
+from src.utils.scripts import iter_raw_files, collect_raw_files, decide_raw_files, delete_raw_files
+from src.utils.scripts import plan_raw_mirror_moves, mirror_raw_files
+from src.utils.walker import DEFAULT_WALK_WORKERS
+from src.utils.mover import DEFAULT_MOVE_WORKERS
+from src.utils.deleter import DEFAULT_DELETE_WORKERS, DEFAULT_DELETE_BATCH_SIZE
+from src.utils.jpg_index import gather_camera_jpg_names_indexed
+from src.utils.exif import UNKEYED_RAW_CNT, DEFAULT_EXIF_READ_WORKERS
+from src.utils.exif import ExifKeyCache, gather_camera_jpg_keys, decide_raw_files_by_capture_key
+from src.utils.name_matcher import NameMatcher
+from src.utils.sidecars import SidecarIndex
+from src.utils.quarantine import TRASH_DELETE_BACKEND, QUARANTINE_DELETE_BACKEND, QuarantineDeleter
+from src.utils.pairing_report import PAIRED_JPG_CNT, ORPHAN_JPG_CNT, PAIRED_RAW_CNT, ORPHAN_RAW_CNT, REPORT_ROW_CNT
+from src.utils.pairing_report import PairingReport
+from src.utils.checkpoint import DONE_OP, FINISHED_OP
+from src.utils.checkpoint import CheckpointJournal, CheckpointState, load_checkpoint, write_plan
+from src.utils.io_scheduler import DEFAULT_IO_MIN_WORKERS, DEFAULT_IO_MAX_WORKERS, DEFAULT_IO_LATENCY_TOLERANCE
+from src.utils.io_scheduler import enable_adaptive_io, disable_adaptive_io, log_io_concurrency_summary
+from src.utils.metrics import RunMetrics, profile_run, write_metrics
 
 from src.config.loader import load_config
-from src.config.logging_config import setup_logging, clear_logging_handlers
+from src.config.logging_config import FULL_FILE_LOG, DEFAULT_FILE_LOG_SAMPLE_EVERY
+from src.config.logging_config import setup_logging, clear_logging_handlers, get_file_logger
 
 
 _FILTER_RAW_BY_JPG_CONFIG_FILE = "config/filter_raw_by_jpg_config.yaml"
 
-def filter_raw_by_jpg_main(config_file_path: str = _FILTER_RAW_BY_JPG_CONFIG_FILE) -> None:
+NAME_MATCH_KEY = 'name'
+EXIF_MATCH_KEY = 'exif'
+
+_file_logger = get_file_logger()
+
+def _log_jpg_detailed_info(detailed_info: Dict[str, int]) -> None:
+    logging.info(f"RST: Found Total JPG/JPEG files: {detailed_info[TOTAL_JPG_CNT]}")
+    logging.info(f"RST: Found Total Camera JPG/JPEG files: {detailed_info[TOTAL_CAMERA_JPG_CNT]}")
+    logging.info(f"RST: Found Unique Camera JPG/JPEG files: {detailed_info[UNIQUE_CAMERA_JPG_CNT]}")
+
+def _delete_raw_files(doomed_paths: List[str], doomed_sidecar_paths: AbstractSet[str], delete_workers: int, delete_batch_size: int, journal: Optional[CheckpointJournal] = None, delete_func: Optional[Callable[[str], None]] = None) -> Dict[str, int]:
     """
-    Main function to filter raw files based on JPG names.
+    Move the RAW files without JPG/JPEG and their sidecars to the Recycle Bin (or delete them with `delete_func`), recording every completed deletion in `journal` if given.
+
+    :return: A dictionary of the deleted and failed RAW and sidecar counts (see `delete_raw_files`).
+    """
+    delete_info: Dict[str, int] = delete_raw_files(
+        doomed_paths,
+        doomed_sidecar_paths,
+        delete_workers=delete_workers,
+        delete_batch_size=delete_batch_size,
+        on_deleted=(lambda path: journal.append({'op': DONE_OP, 'src': path})) if journal is not None else None,
+        delete_func=delete_func,
+    )
+    if isinstance(delete_func, QuarantineDeleter):
+        delete_func.close()
+    if journal is not None and delete_info[FAILED_DELETE_RAW_CNT] == 0 and delete_info[FAILED_DELETE_SIDECAR_CNT] == 0:
+        journal.append({'op': FINISHED_OP})
+    return delete_info
+
+def _resume_cull_raw_files(checkpoint_state: CheckpointState, checkpoint_abs_path: str, delete_workers: int, delete_batch_size: int, metrics: RunMetrics, delete_func: Optional[Callable[[str], None]] = None) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Finish the deletions planned by an interrupted run, without scanning either directory.
+
+    :return: A tuple of (JPG/JPEG detailed information, RAW detailed information) of the whole run.
+    """
+    plan_info: Dict[str, int] = checkpoint_state.plan_info
+    # Sidecars are planned right after their RAW files, flagged as such
+    sidecar_paths: Set[str] = {item['src'] for item in checkpoint_state.planned if item.get('sidecar')}
+    remaining_paths: List[str] = [item['src'] for item in checkpoint_state.planned if item['src'] not in checkpoint_state.done]
+    # Files already gone were deleted after the last commit of the interrupted run
+    gone_paths: List[str] = [path for path in remaining_paths if not os.path.lexists(path)]
+    doomed_paths: List[str] = [path for path in remaining_paths if os.path.lexists(path)]
+    already_deleted_paths: List[str] = [*checkpoint_state.done, *gone_paths]
+    already_deleted_sidecar_cnt: int = sum(path in sidecar_paths for path in already_deleted_paths)
+    logging.info(f"Resuming from checkpoint: {len(already_deleted_paths)} RAW files and sidecars already deleted, {len(doomed_paths)} left.")
+
+    with CheckpointJournal(checkpoint_abs_path) as journal, metrics.phase('delete_raw') as phase:
+        phase.items = len(doomed_paths)
+        for path in gone_paths:
+            journal.append({'op': DONE_OP, 'src': path})
+        delete_info: Dict[str, int] = _delete_raw_files(doomed_paths, sidecar_paths.intersection(doomed_paths), delete_workers, delete_batch_size, journal, delete_func)
+
+    jpg_detailed_info: Dict[str, int] = {key: plan_info[key] for key in (TOTAL_JPG_CNT, TOTAL_CAMERA_JPG_CNT, UNIQUE_CAMERA_JPG_CNT)}
+    raw_detailed_info: Dict[str, int] = {
+        KEPT_RAW_CNT: plan_info[KEPT_RAW_CNT],
+        DELETED_RAW_CNT: len(already_deleted_paths) - already_deleted_sidecar_cnt + delete_info[DELETED_RAW_CNT],
+        FAILED_DELETE_RAW_CNT: delete_info[FAILED_DELETE_RAW_CNT],
+        DELETED_SIDECAR_CNT: already_deleted_sidecar_cnt + delete_info[DELETED_SIDECAR_CNT],
+        FAILED_DELETE_SIDECAR_CNT: delete_info[FAILED_DELETE_SIDECAR_CNT],
+    }
+    return jpg_detailed_info, raw_detailed_info
+
+def run_filter_raw_by_jpg(config: Dict[str, Any], metrics: RunMetrics) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Filter raw files based on JPG names, as configured by `config`, measuring every phase in `metrics`.
+
+    :param config: Loaded configuration of the script.
+    :param metrics: Run metrics receiving the 'scan_jpg', 'scan_match_raw' (or 'match_raw' when pipelined), 'delete_raw' and, when mirroring, 'mirror_raw' phases
+        ('report_jpg' with a pairing report; no 'delete_raw' nor 'mirror_raw' in a dry run).
+    :return: A tuple of (JPG/JPEG detailed information, RAW detailed information).
     """
-    # Load configuration from YAML file
-    config: Dict[str, Any] = load_config(config_file_path)
     # Extract configuration parameters
     jpg_dir_abs_path: str = config['jpg_dir_abs_path']
     raw_dir_abs_path: str = config['raw_dir_abs_path']
     jpg_exts: List[str] = config['jpg_exts']
     raw_exts: List[str] = config['raw_exts']
     camera_prefixes: List[str] = config['camera_prefixes']
-
-    # Configure logging
-    log_file_abs_path: str = config['log_file_abs_path']
-    setup_logging(log_to_file=True, log_file_abs_path=log_file_abs_path)
+    walk_workers: int = config.get('walk_workers', DEFAULT_WALK_WORKERS)
+    jpg_index_db_abs_path: str = config.get('jpg_index_db_abs_path')
+    rebuild_jpg_index: bool = config.get('rebuild_jpg_index', False)
+    delete_workers: int = config.get('delete_workers', DEFAULT_DELETE_WORKERS)
+    delete_batch_size: int = config.get('delete_batch_size', DEFAULT_DELETE_BATCH_SIZE)
+    pipelined: bool = config.get('pipelined', False)
+    compact_jpg_names: bool = config.get('compact_jpg_names', False)
+    mirror_jpg_structure: bool = config.get('mirror_jpg_structure', False)
+    move_workers: int = config.get('move_workers', DEFAULT_MOVE_WORKERS)
+    match_key: str = config.get('match_key', NAME_MATCH_KEY)
+    exif_cache_db_abs_path: str = config.get('exif_cache_db_abs_path')
+    exif_read_workers: int = config.get('exif_read_workers', DEFAULT_EXIF_READ_WORKERS)
+    exif_fallback_to_name: bool = config.get('exif_fallback_to_name', True)
+    checkpoint_abs_path: str = config.get('checkpoint_abs_path')
+    resume: bool = config.get('resume', False)
+    delete_backend: str = config.get('delete_backend', TRASH_DELETE_BACKEND)
+    pairing_report_abs_path: str = config.get('pairing_report_abs_path')
+    dry_run: bool = config.get('dry_run', False)
+    sidecar_exts: List[str] = config.get('sidecar_exts') or []
+    # Normalization rules of the names matched between JPG and RAW files, compiled once
+    matcher = NameMatcher(
+        case_fold=config.get('case_insensitive_names', False),
+        suffix_patterns=config.get('name_suffix_patterns') or [],
+    )
 
     # Check if the provided paths exist
     assert_abs_paths_exist(
         abs_paths=[jpg_dir_abs_path, raw_dir_abs_path]
     )
+    if match_key not in (NAME_MATCH_KEY, EXIF_MATCH_KEY):
+        raise ValueError(f"Unknown match_key: {match_key}, expected '{NAME_MATCH_KEY}' or '{EXIF_MATCH_KEY}'.")
+    if match_key == EXIF_MATCH_KEY and mirror_jpg_structure:
+        raise ValueError("mirror_jpg_structure is only supported with match_key 'name'.")
+    if delete_backend not in (TRASH_DELETE_BACKEND, QUARANTINE_DELETE_BACKEND):
+        raise ValueError(f"Unknown delete_backend: {delete_backend}, expected '{TRASH_DELETE_BACKEND}' or '{QUARANTINE_DELETE_BACKEND}'.")
+    if pairing_report_abs_path and match_key == EXIF_MATCH_KEY:
+        raise ValueError("pairing_report_abs_path is only supported with match_key 'name'.")
+    if dry_run and resume:
+        raise ValueError("resume finishes the deletions of an interrupted run, it cannot be combined with dry_run.")
+    if sidecar_exts and mirror_jpg_structure:
+        raise ValueError("sidecar_exts is not supported with mirror_jpg_structure.")
+    if resume and mirror_jpg_structure:
+        raise ValueError("resume only replays the deletions of the checkpoint journal, it cannot be combined with mirror_jpg_structure (run again without resume to finish mirroring).")
+    # The quarantine backend renames the RAW files into a dated directory at the RAW root instead of the Recycle Bin
+    delete_func: Optional[QuarantineDeleter] = QuarantineDeleter(raw_dir_abs_path) if delete_backend == QUARANTINE_DELETE_BACKEND else None
 
     # Main logic
-    # 1. Gather JPG names from the specified directory
-    logging.info("Gathering JPG file names...")
-    camera_jpg_names, detailed_info = gather_camera_jpg_names(
-        jpg_dir_abs_path=jpg_dir_abs_path,
-        camera_file_prefixs=camera_prefixes,
-        jpg_exts=jpg_exts,
-        if_logging=True,
-    )
-    logging.info(f"RST: Found Total JPG/JPEG files: {detailed_info[TOTAL_JPG_CNT]}")
-    logging.info(f"RST: Found Total Camera JPG/JPEG files: {detailed_info[TOTAL_CAMERA_JPG_CNT]}")
-    logging.info(f"RST: Found Unique Camera JPG/JPEG files: {detailed_info[UNIQUE_CAMERA_JPG_CNT]}")
+    # 0. Resume an interrupted run from its checkpoint journal if asked to
+    checkpoint_state: Optional[CheckpointState] = None
+    if checkpoint_abs_path and resume:
+        checkpoint_state = load_checkpoint(checkpoint_abs_path)
+        if checkpoint_state is None or checkpoint_state.finished:
+            logging.info("No interrupted run to resume, starting a new run.")
+            checkpoint_state = None
+
+    if checkpoint_state is not None:
+        detailed_info, raw_detailed_info = _resume_cull_raw_files(
+            checkpoint_state=checkpoint_state,
+            checkpoint_abs_path=checkpoint_abs_path,
+            delete_workers=delete_workers,
+            delete_batch_size=delete_batch_size,
+            metrics=metrics,
+            delete_func=delete_func,
+        )
+        _log_jpg_detailed_info(detailed_info)
+        return detailed_info, raw_detailed_info
+
+    # Sidecars are grouped with their RAW files from the listings of the RAW walk, no second pass
+    sidecars: Optional[SidecarIndex] = SidecarIndex(sidecar_exts) if sidecar_exts else None
+
+    # In pipelined mode, scan the RAW directory while the JPG directory is being walked
+    raw_scan_executor: Optional[ThreadPoolExecutor] = None
+    raw_files_future: Optional[Future] = None
+    raw_scan_stop: threading.Event = threading.Event()
+    if pipelined:
+        logging.info("Collecting RAW files in the background...")
+        raw_scan_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="raw-scan")
+        raw_files_future = raw_scan_executor.submit(collect_raw_files, raw_dir_abs_path, raw_exts, walk_workers, sidecars, raw_scan_stop)
 
-    total_jpg_cnt: int = detailed_info[TOTAL_JPG_CNT]
-    total_camera_jpg_cnt: int = detailed_info[TOTAL_CAMERA_JPG_CNT]
-    unique_camera_jpg_cnt: int = detailed_info[UNIQUE_CAMERA_JPG_CNT]
+    try:
+        # Capture keys are cached across runs, so unchanged files are never parsed twice
+        exif_cache: Optional[ExifKeyCache] = None
+        if match_key == EXIF_MATCH_KEY and exif_cache_db_abs_path:
+            exif_cache = ExifKeyCache(exif_cache_db_abs_path)
+
+        # 1. Gather JPG names from the specified directory
+        logging.info("Gathering JPG file names...")
+        with metrics.phase('scan_jpg') as phase:
+            if match_key == EXIF_MATCH_KEY:
+                camera_jpg_keys, camera_jpg_names, detailed_info = gather_camera_jpg_keys(
+                    jpg_dir_abs_path=jpg_dir_abs_path,
+                    camera_file_prefixs=camera_prefixes,
+                    jpg_exts=jpg_exts,
+                    cache=exif_cache,
+                    if_logging=True,
+                    walk_workers=walk_workers,
+                    read_workers=exif_read_workers,
+                    compact_names=compact_jpg_names,
+                    matcher=matcher,
+                )
+            elif mirror_jpg_structure:
+                # The folder of every JPG file is needed, which the JPG name index does not keep
+                camera_jpg_dirs, detailed_info = gather_camera_jpg_dirs(
+                    jpg_dir_abs_path=jpg_dir_abs_path,
+                    camera_file_prefixs=camera_prefixes,
+                    jpg_exts=jpg_exts,
+                    if_logging=True,
+                    walk_workers=walk_workers,
+                    matcher=matcher,
+                )
+            elif jpg_index_db_abs_path:
+                camera_jpg_names, detailed_info = gather_camera_jpg_names_indexed(
+                    jpg_dir_abs_path=jpg_dir_abs_path,
+                    camera_file_prefixs=camera_prefixes,
+                    jpg_exts=jpg_exts,
+                    index_db_abs_path=jpg_index_db_abs_path,
+                    rebuild_index=rebuild_jpg_index,
+                    if_logging=True,
+                    walk_workers=walk_workers,
+                    compact_names=compact_jpg_names,
+                    matcher=matcher,
+                )
+            else:
+                camera_jpg_names, detailed_info = gather_camera_jpg_names(
+                    jpg_dir_abs_path=jpg_dir_abs_path,
+                    camera_file_prefixs=camera_prefixes,
+                    jpg_exts=jpg_exts,
+                    if_logging=True,
+                    walk_workers=walk_workers,
+                    compact_names=compact_jpg_names,
+                    matcher=matcher,
+                )
+            phase.items = detailed_info[TOTAL_JPG_CNT]
+    except BaseException:
+        if raw_scan_executor is not None:
+            # Never leave the background RAW scan behind a failed JPG scan, stopping it at its next directory
+            raw_scan_stop.set()
+            raw_scan_executor.shutdown(cancel_futures=True)
+        raise
+    _log_jpg_detailed_info(detailed_info)
 
     # 2. Filter raw files based on the gathered JPG names
     logging.info("Filtering RAW files...")
-    detailed_info: Dict[str, int] = filter_raw_files_by_jpg_names(
-        raw_dir_abs_path=raw_dir_abs_path,
-        raw_exts=raw_exts,
-        jpg_names=camera_jpg_names,
+    # When the RAW files are scanned in the background, only the wait for the scan and the matching are measured here
+    with metrics.phase('match_raw' if pipelined else 'scan_match_raw') as phase:
+        raw_files: Iterable[Tuple[str, str]]
+        if raw_files_future is not None:
+            # The JPG names set is final, decide on the buffered RAW files
+            try:
+                raw_files = raw_files_future.result()
+            finally:
+                raw_scan_executor.shutdown()
+        else:
+            raw_files = iter_raw_files(raw_dir_abs_path, raw_exts, walk_workers, sidecars)
+        if pairing_report_abs_path:
+            # Report every RAW file as it streams to the decision, without buffering the report
+            report = PairingReport(pairing_report_abs_path, jpg_dir_abs_path, raw_dir_abs_path, compact_names=compact_jpg_names, matcher=matcher)
+            raw_files = report.tap_raw_files(raw_files, camera_jpg_dirs if mirror_jpg_structure else camera_jpg_names)
+        if match_key == EXIF_MATCH_KEY:
+            kept_raw_cnt, doomed_raw_paths, unkeyed_raw_cnt = decide_raw_files_by_capture_key(
+                raw_files, camera_jpg_keys, camera_jpg_names,
+                cache=exif_cache,
+                read_workers=exif_read_workers,
+                fallback_to_name=exif_fallback_to_name,
+                matcher=matcher,
+            )
+            if exif_cache is not None:
+                exif_cache.close()
+        elif mirror_jpg_structure:
+            kept_raw_cnt, raw_moves, doomed_raw_paths, conflict_raw_cnt = plan_raw_mirror_moves(raw_files, camera_jpg_dirs, raw_dir_abs_path, matcher)
+        else:
+            kept_raw_cnt, doomed_raw_paths = decide_raw_files(raw_files, camera_jpg_names, matcher)
+        phase.items = kept_raw_cnt + len(doomed_raw_paths)
+    doomed_paths, doomed_sidecar_paths = sidecars.expand(doomed_raw_paths) if sidecars is not None else (doomed_raw_paths, set())
+
+    pairing_info: Dict[str, int] = {}
+    if pairing_report_abs_path:
+        # The JPG files are reported last, once every RAW name is known
+        logging.info("Reporting JPG files without RAW files...")
+        with metrics.phase('report_jpg') as phase:
+            report.report_jpg_files(camera_prefixes, jpg_exts, walk_workers)
+            pairing_info = report.close()
+            phase.items = pairing_info[PAIRED_JPG_CNT] + pairing_info[ORPHAN_JPG_CNT]
+
+    if dry_run:
+        # Read-only preview: list what would be deleted, touch nothing
+        logging.info(f"Dry run: {len(doomed_raw_paths)} RAW files and {len(doomed_sidecar_paths)} sidecars would be deleted, none is.")
+        for path in doomed_paths:
+            _file_logger.info("Would delete %s file: %s", "sidecar" if path in doomed_sidecar_paths else "RAW", path)
+        delete_info: Dict[str, int] = {DELETED_RAW_CNT: 0, FAILED_DELETE_RAW_CNT: 0, DELETED_SIDECAR_CNT: 0, FAILED_DELETE_SIDECAR_CNT: 0}
+    else:
+        with metrics.phase('delete_raw') as phase:
+            phase.items = len(doomed_paths)
+            if checkpoint_abs_path:
+                with CheckpointJournal(checkpoint_abs_path, truncate=True) as journal:
+                    # Record the plan first, so an interrupted run can resume without rescanning
+                    planned: List[Dict[str, Any]] = [{'src': path, 'sidecar': True} if path in doomed_sidecar_paths else {'src': path} for path in doomed_paths]
+                    write_plan(journal, planned, {**detailed_info, KEPT_RAW_CNT: kept_raw_cnt})
+                    delete_info = _delete_raw_files(doomed_paths, doomed_sidecar_paths, delete_workers, delete_batch_size, journal, delete_func)
+            else:
+                delete_info = _delete_raw_files(doomed_paths, doomed_sidecar_paths, delete_workers, delete_batch_size, delete_func=delete_func)
+
+    raw_detailed_info: Dict[str, int] = {
+        KEPT_RAW_CNT: kept_raw_cnt,
+        **delete_info,
+        **pairing_info,
+    }
+    if dry_run:
+        raw_detailed_info[WOULD_DELETE_RAW_CNT] = len(doomed_raw_paths)
+        raw_detailed_info[WOULD_DELETE_SIDECAR_CNT] = len(doomed_sidecar_paths)
+
+    if match_key == EXIF_MATCH_KEY:
+        raw_detailed_info[UNKEYED_RAW_CNT] = unkeyed_raw_cnt
+
+    # 3. Move the kept RAW files into the JPG folder structure if asked to
+    if mirror_jpg_structure and dry_run:
+        logging.info(f"Dry run: {len(raw_moves)} RAW files would be moved into JPG folders, {conflict_raw_cnt} left in place (name taken).")
+    elif mirror_jpg_structure:
+        with metrics.phase('mirror_raw') as phase:
+            phase.items = len(raw_moves)
+            moved_raw_cnt, failed_move_raw_cnt = mirror_raw_files(raw_moves, move_workers)
+        raw_detailed_info.update({
+            MOVED_RAW_CNT: moved_raw_cnt,
+            FAILED_MOVE_RAW_CNT: failed_move_raw_cnt,
+            CONFLICT_RAW_CNT: conflict_raw_cnt,
+        })
+    return detailed_info, raw_detailed_info
+
+def filter_raw_by_jpg_main(config_file_path: str = _FILTER_RAW_BY_JPG_CONFIG_FILE, config_overrides: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Main function to filter raw files based on JPG names.
+
+    :param config_file_path: Path to the YAML configuration file.
+    :param config_overrides: Optional configuration keys overriding those of the file (e.g., from the command line).
+    """
+    # Load configuration from YAML file
+    config: Dict[str, Any] = load_config(config_file_path)
+    config.update(config_overrides or {})
+
+    # Configure logging
+    log_file_abs_path: str = config['log_file_abs_path']
+    setup_logging(
+        log_to_file=True,
+        log_file_abs_path=log_file_abs_path,
+        use_queue=config.get('async_logging', False),
+        file_log_verbosity=config.get('file_log_verbosity', FULL_FILE_LOG),
+        file_log_sample_every=config.get('file_log_sample_every', DEFAULT_FILE_LOG_SAMPLE_EVERY),
     )
-    logging.info(f"RST: Kept RAW files: {detailed_info[KEPT_RAW_CNT]}")
-    logging.info(f"RST: Deleted RAW files: {detailed_info[DELETED_RAW_CNT]}")
-    logging.info(f"RST: Failed to delete RAW files: {detailed_info[FAILED_DELETE_RAW_CNT]}")
-
-    kept_raw_cnt: int = detailed_info[KEPT_RAW_CNT]
-    deleted_raw_cnt: int = detailed_info[DELETED_RAW_CNT]
-    failed_delete_raw_cnt: int = detailed_info[FAILED_DELETE_RAW_CNT]
-
-    # 3. Print the summary of the operation
-    logging.info("==========================================================")
-    logging.info("Script completed successfully.")
-    logging.info("----------------------------------------------------------")
-    logging.info(f"RST: JPG/JPEG Final counts: Total {total_jpg_cnt}, Camera {total_camera_jpg_cnt}, Unique Camera {unique_camera_jpg_cnt}.")
-    logging.info(f"RST: RAW Final counts: Kept {kept_raw_cnt}, Deleted {deleted_raw_cnt}, Failed to delete {failed_delete_raw_cnt}.")
-    logging.info("----------------------------------------------------------")
-    logging.info("Exiting the script.")
-    logging.info("==========================================================")
-
-    # Clear logging handlers to prevent duplicate logs in future runs
-    clear_logging_handlers()
+
+    try:
+        # Adaptive I/O concurrency replaces the fixed walk, delete and move worker counts
+        if config.get('adaptive_io', False):
+            enable_adaptive_io(
+                min_workers=config.get('io_min_workers', DEFAULT_IO_MIN_WORKERS),
+                max_workers=config.get('io_max_workers', DEFAULT_IO_MAX_WORKERS),
+                latency_tolerance=config.get('io_latency_tolerance', DEFAULT_IO_LATENCY_TOLERANCE),
+            )
+
+        metrics = RunMetrics('filter_raw_by_jpg')
+        with profile_run(config.get('profile_abs_path')):
+            detailed_info, raw_detailed_info = run_filter_raw_by_jpg(config, metrics)
+
+        total_jpg_cnt: int = detailed_info[TOTAL_JPG_CNT]
+        total_camera_jpg_cnt: int = detailed_info[TOTAL_CAMERA_JPG_CNT]
+        unique_camera_jpg_cnt: int = detailed_info[UNIQUE_CAMERA_JPG_CNT]
+
+        logging.info(f"RST: Kept RAW files: {raw_detailed_info[KEPT_RAW_CNT]}")
+        logging.info(f"RST: Deleted RAW files: {raw_detailed_info[DELETED_RAW_CNT]}")
+        logging.info(f"RST: Failed to delete RAW files: {raw_detailed_info[FAILED_DELETE_RAW_CNT]}")
+        if UNKEYED_RAW_CNT in raw_detailed_info:
+            logging.info(f"RST: RAW files without capture key: {raw_detailed_info[UNKEYED_RAW_CNT]}")
+        if config.get('sidecar_exts'):
+            logging.info(f"RST: Deleted sidecars: {raw_detailed_info[DELETED_SIDECAR_CNT]}, Failed: {raw_detailed_info[FAILED_DELETE_SIDECAR_CNT]}")
+        if WOULD_DELETE_RAW_CNT in raw_detailed_info:
+            logging.info(f"RST: Dry run, RAW files that would be deleted: {raw_detailed_info[WOULD_DELETE_RAW_CNT]}, sidecars: {raw_detailed_info[WOULD_DELETE_SIDECAR_CNT]}")
+        if REPORT_ROW_CNT in raw_detailed_info:
+            logging.info(f"RST: Camera JPG/JPEG files with RAW: {raw_detailed_info[PAIRED_JPG_CNT]}, without RAW: {raw_detailed_info[ORPHAN_JPG_CNT]}")
+            logging.info(f"RST: RAW files with JPG/JPEG: {raw_detailed_info[PAIRED_RAW_CNT]}, without JPG/JPEG: {raw_detailed_info[ORPHAN_RAW_CNT]}")
+        if MOVED_RAW_CNT in raw_detailed_info:
+            logging.info(f"RST: Moved RAW files into JPG folders: {raw_detailed_info[MOVED_RAW_CNT]}, Failed: {raw_detailed_info[FAILED_MOVE_RAW_CNT]}, Left in place (name taken): {raw_detailed_info[CONFLICT_RAW_CNT]}")
+
+        kept_raw_cnt: int = raw_detailed_info[KEPT_RAW_CNT]
+        deleted_raw_cnt: int = raw_detailed_info[DELETED_RAW_CNT]
+        failed_delete_raw_cnt: int = raw_detailed_info[FAILED_DELETE_RAW_CNT]
+
+        # 3. Print the summary of the operation
+        logging.info("==========================================================")
+        logging.info("Script completed successfully.")
+        logging.info("----------------------------------------------------------")
+        logging.info(f"RST: JPG/JPEG Final counts: Total {total_jpg_cnt}, Camera {total_camera_jpg_cnt}, Unique Camera {unique_camera_jpg_cnt}.")
+        logging.info(f"RST: RAW Final counts: Kept {kept_raw_cnt}, Deleted {deleted_raw_cnt}, Failed to delete {failed_delete_raw_cnt}.")
+        log_io_concurrency_summary()
+        logging.info("----------------------------------------------------------")
+        logging.info("Exiting the script.")
+        logging.info("==========================================================")
+
+        # Write the per-phase metrics report
+        write_metrics(metrics, config.get('metrics_json_abs_path'), config.get('metrics_prom_abs_path'))
+    finally:
+        disable_adaptive_io()
+        # Clear logging handlers to prevent duplicate logs in future runs, even when the run fails
+        clear_logging_handlers()
 
 
 if __name__ == "__main__":
@@ -1,17 +1,28 @@
 import os
-import shutil
+import re
 import logging
-from typing import Dict, Any, List, Tuple
-
-import yaml
+from typing import Dict, Any, List, Set, Tuple, Optional, Callable, Iterable, Iterator
 
 from src.utils.scripts import assert_abs_paths_exist
+from src.utils.mover import DEFAULT_MOVE_WORKERS, DEFAULT_MAX_PENDING_MOVES, move_files, move_files_streaming
+from src.utils.checkpoint import DONE_OP, FINISHED_OP
+from src.utils.checkpoint import CheckpointJournal, CheckpointState, load_checkpoint, write_plan
+from src.utils.move_journal import open_move_journal, append_move
+from src.utils.io_scheduler import DEFAULT_IO_MIN_WORKERS, DEFAULT_IO_MAX_WORKERS, DEFAULT_IO_LATENCY_TOLERANCE
+from src.utils.io_scheduler import enable_adaptive_io, disable_adaptive_io, log_io_concurrency_summary
+from src.utils.metrics import SCANDIR_OP, RunMetrics, count_op, profile_run, write_metrics
 from src.config.loader import load_config
-from src.config.logging_config import setup_logging, clear_logging_handlers
+from src.config.logging_config import FULL_FILE_LOG, DEFAULT_FILE_LOG_SAMPLE_EVERY
+from src.config.logging_config import setup_logging, clear_logging_handlers, get_file_logger
 
 
 _FLATTEN_JPGS_CONFIG_FILE = "config/flatten_jpgs_config.yaml"
 
+# Flattened names are "<prefix>-<seq>" or "<seq>" (files of the input root); the prefix may itself contain hyphens
+_FLATTENED_STEM_PATTERN = re.compile(r'^(?:(?P<prefix>.*)-)?(?P<seq>\d+)$')
+
+_file_logger = get_file_logger()
+
 def _build_prefix(root_dir: str, dirpath: str) -> str:
     """
     Given the root directory and the directory of a file, build the prefix string
@@ -21,60 +32,300 @@ def _build_prefix(root_dir: str, dirpath: str) -> str:
     parts: List[str] = [] if relpath == "." else relpath.split(os.sep)
     return '-'.join(parts) if parts else ""
 
-def flatten_jpgs_main(config_file_path: str = _FLATTEN_JPGS_CONFIG_FILE) -> None:
+def _index_output_dir(output_jpg_dir_abs_path: str, jpg_exts: List[str], keep_names: bool = True) -> Tuple[Dict[str, int], Set[str]]:
     """
-    Main function to flatten JPG files based on a configuration file.
+    List the output directory once, and find the highest sequence number already used per prefix.
+
+    :param keep_names: Whether to collect the names of the entries; without it, only the counters are kept in memory.
+    :return: A tuple of (highest sequence number per prefix, lowercased names of every entry of the output directory, empty without `keep_names`).
+    """
+    counters: Dict[str, int] = {}
+    existing_names: Set[str] = set()
+    count_op(SCANDIR_OP)
+    with os.scandir(output_jpg_dir_abs_path) as entries:
+        for entry in entries:
+            if keep_names:
+                existing_names.add(entry.name.lower())
+            stem, ext = os.path.splitext(entry.name)
+            match = _FLATTENED_STEM_PATTERN.match(stem)
+            if match is None or not ext or ext.lower() not in jpg_exts:
+                continue
+            prefix: str = match.group('prefix') or ""
+            counters[prefix] = max(counters.get(prefix, 0), int(match.group('seq')))
+    return counters, existing_names
+
+class _FlattenCollisions:
+    """
+    Leave out the moves whose new name would overwrite a file, counting them.
+
+    A name collides when `is_taken` says it is already taken in the output directory, or when
+    two prefixes differ only by case (e.g., folders 'Trip' and 'trip'). Colliding files stay
+    where they are and are logged to the file log; only the prefixes seen are kept in memory.
+    """
+
+    def __init__(self, is_taken: Callable[[str], bool]):
+        self.skipped_cnt: int = 0
+        self._is_taken: Callable[[str], bool] = is_taken
+        self._prefixes_by_lowered_prefix: Dict[str, str] = {}
+
+    def filter(self, moves: Iterable[Tuple[str, str]]) -> Iterator[Tuple[str, str]]:
+        """
+        :return: Iterator over the moves that do not collide.
+        """
+        for old_path, new_path in moves:
+            name: str = os.path.basename(new_path)
+            prefix: str = os.path.splitext(name)[0].rpartition('-')[0]
+            if self._prefixes_by_lowered_prefix.setdefault(prefix.lower(), prefix) != prefix or self._is_taken(name):
+                self.skipped_cnt += 1
+                _file_logger.error("Not moving %s: %s already exists in the output directory or differs only by case.", old_path, name)
+                continue
+            yield old_path, new_path
+
+    def log_summary(self) -> None:
+        if self.skipped_cnt:
+            logging.error(f"{self.skipped_cnt} JPG files not moved, their names are already taken in the output directory. Set append to true to continue the numbering of the output directory.")
+
+def _iter_flatten_moves(input_jpg_dir_abs_path: str, output_jpg_dir_abs_path: str, jpg_exts: List[str], number_of_digits: int, jpg_rename_counters: Dict[str, int]) -> Iterator[Tuple[str, str]]:
+    """
+    Walk the input directory and yield every JPG file with its new name in the output directory, directory by directory.
+
+    Directories and file names are visited in sorted order, so the numbering only depends on
+    the content of the input directory (and on the initial `jpg_rename_counters`). Only the
+    listing of the current directory and the walk's pending directories are held in memory.
+
+    :param jpg_rename_counters: Sequence counter per prefix, updated as files are numbered (start values continue the numbering, e.g., from `_index_output_dir`).
+    :return: Iterator over (old path, new path) moves.
+    """
+    for dirpath, dirnames, filenames in os.walk(input_jpg_dir_abs_path):
+        dirnames.sort()
+        prefix = _build_prefix(input_jpg_dir_abs_path, dirpath)
+        for filename in sorted(filenames):
+            ext = os.path.splitext(filename)[1].lower()
+            if ext not in jpg_exts:
+                continue
+            old_path = os.path.join(dirpath, filename)
+            # Number JPG files per prefix, initializing the counter if needed
+            jpg_rename_counters.setdefault(prefix, 0)
+            jpg_rename_counters[prefix] += 1
+            seq = jpg_rename_counters[prefix]
+            # Format new filename with prefix and sequence number
+            new_jpg_name = f"{prefix}-{seq:0{number_of_digits}d}{ext}" if prefix else f"{seq:0{number_of_digits}d}{ext}"
+            yield old_path, os.path.join(output_jpg_dir_abs_path, new_jpg_name)
+
+def _plan_flatten_moves(input_jpg_dir_abs_path: str, output_jpg_dir_abs_path: str, jpg_exts: List[str], number_of_digits: int, start_counters: Optional[Dict[str, int]] = None) -> Tuple[List[Tuple[str, str]], Dict[str, int]]:
+    """
+    Walk the input directory and assign every JPG file its new name in the output directory.
+
+    Directories and file names are visited in sorted order, so the numbering only depends on
+    the content of the input directory (and on `start_counters`).
+
+    :param start_counters: Optional sequence number to continue from per prefix (e.g., from `_index_output_dir`).
+    :return: A tuple of (list of (old path, new path) moves, final sequence counter per prefix).
+    """
+    jpg_rename_counters: Dict[str, int] = dict(start_counters or {})
+    moves: List[Tuple[str, str]] = list(_iter_flatten_moves(input_jpg_dir_abs_path, output_jpg_dir_abs_path, jpg_exts, number_of_digits, jpg_rename_counters))
+    return moves, jpg_rename_counters
+
+def _stream_flatten_jpgs(config: Dict[str, Any], metrics: RunMetrics) -> Tuple[int, int]:
+    """
+    Flatten JPG files while the input directory is walked, in a single 'stream_move' phase.
+
+    The moves are numbered as the walk lists each directory and handed to the move workers
+    through a bounded queue, so the first file moves right away and memory does not grow with
+    the number of files. The output directory is not kept in memory either: each new name is
+    checked on disk as it is produced, and a taken name skips its file as in batch mode.
+
+    :return: A tuple of (moved count, failed count).
     """
-    # Load configuration from YAML file
-    config: Dict[str, Any] = load_config(config_file_path)
-    # Extract configuration parameters
     input_jpg_dir_abs_path: str = config["input_jpg_dir_abs_path"]
     output_jpg_dir_abs_path: str = config["output_jpg_dir_abs_path"]
     jpg_exts: List[str] = config["jpg_exts"]
     number_of_digits: int = config["number_of_digits"]
+    move_workers: int = config.get("move_workers", DEFAULT_MOVE_WORKERS)
+    append: bool = config.get("append", False)
+    move_journal_dir_abs_path: str = config.get("move_journal_dir_abs_path")
+    max_pending_moves: int = config.get("max_pending_moves", DEFAULT_MAX_PENDING_MOVES)
 
-    # Configure logging
-    log_file_abs_path: str = config["log_file_abs_path"]
-    setup_logging(log_to_file=True, log_file_abs_path=log_file_abs_path)
+    logging.info("Streaming JPG files from the input directory to the output directory...")
+    jpg_rename_counters: Dict[str, int] = {}
+    if append:
+        jpg_rename_counters, _ = _index_output_dir(output_jpg_dir_abs_path, jpg_exts, keep_names=False)
+        if jpg_rename_counters:
+            logging.info(f"Appending to the output directory: continuing the numbering of {len(jpg_rename_counters)} prefixes.")
+
+    # Every move of the run is recorded in its move journal, so `unflatten` can revert it
+    move_journal: Optional[CheckpointJournal] = None
+    on_moved: Optional[Callable[[str, str], None]] = None
+    if move_journal_dir_abs_path:
+        move_journal = open_move_journal(move_journal_dir_abs_path, input_jpg_dir_abs_path, output_jpg_dir_abs_path)
+        logging.info(f"Recording moves in: {move_journal.journal_abs_path}")
+        on_moved = lambda old_path, new_path: append_move(move_journal, input_jpg_dir_abs_path, old_path, new_path)
+    # Never overwrite a file of the output directory: the names of a run are unique, so only the files already there can collide
+    collisions = _FlattenCollisions(lambda name: os.path.lexists(os.path.join(output_jpg_dir_abs_path, name)))
+    with metrics.phase('stream_move') as phase:
+        try:
+            moves: Iterator[Tuple[str, str]] = _iter_flatten_moves(input_jpg_dir_abs_path, output_jpg_dir_abs_path, jpg_exts, number_of_digits, jpg_rename_counters)
+            moved_cnt, failed_move_cnt = move_files_streaming(
+                collisions.filter(moves),
+                max_workers=move_workers,
+                on_moved=on_moved,
+                max_pending=max_pending_moves,
+            )
+        finally:
+            if move_journal is not None:
+                move_journal.close()
+        failed_move_cnt += collisions.skipped_cnt
+        phase.items = moved_cnt + failed_move_cnt
+    collisions.log_summary()
+    return moved_cnt, failed_move_cnt
+
+def run_flatten_jpgs(config: Dict[str, Any], metrics: RunMetrics) -> Tuple[int, int]:
+    """
+    Flatten JPG files as configured by `config`, measuring the 'plan' and 'move' phases in `metrics` (a single 'stream_move' phase when streaming).
+
+    :param config: Loaded configuration of the script.
+    :param metrics: Run metrics receiving the phases.
+    :return: A tuple of (moved count, failed count).
+    """
+    # Extract configuration parameters
+    input_jpg_dir_abs_path: str = config["input_jpg_dir_abs_path"]
+    output_jpg_dir_abs_path: str = config["output_jpg_dir_abs_path"]
+    jpg_exts: List[str] = config["jpg_exts"]
+    number_of_digits: int = config["number_of_digits"]
+    checkpoint_abs_path: str = config.get("checkpoint_abs_path")
+    resume: bool = config.get("resume", False)
+    move_workers: int = config.get("move_workers", DEFAULT_MOVE_WORKERS)
+    append: bool = config.get("append", False)
+    move_journal_dir_abs_path: str = config.get("move_journal_dir_abs_path")
+    streaming: bool = config.get("streaming", False)
 
     # Check if the provided paths exist
     assert_abs_paths_exist(
         [input_jpg_dir_abs_path, output_jpg_dir_abs_path]
     )
+    if streaming and checkpoint_abs_path:
+        raise ValueError("checkpoint_abs_path records every planned move before the first one, it cannot be combined with streaming (use move_journal_dir_abs_path to revert a streamed run).")
+
+    if streaming:
+        return _stream_flatten_jpgs(config, metrics)
 
     # Main logic
-    # 1. collect JPG files from the input directory
-    logging.info("Collecting JPG files from the input directory...")
-    jpg_files: List[Tuple[Any, str]] = []
-    for dirpath, _, filenames in os.walk(input_jpg_dir_abs_path):
-        for filename in filenames:
-            ext = os.path.splitext(filename)[1].lower()
-            if ext in jpg_exts:
-                jpg_files.append((dirpath, filename))
+    # 0. Resume an interrupted run from its checkpoint journal if asked to
+    checkpoint_state: Optional[CheckpointState] = None
+    if checkpoint_abs_path and resume:
+        checkpoint_state = load_checkpoint(checkpoint_abs_path)
+        if checkpoint_state is None or checkpoint_state.finished:
+            logging.info("No interrupted run to resume, starting a new run.")
+            checkpoint_state = None
+
+    journal: Optional[CheckpointJournal] = None
+    collisions: Optional[_FlattenCollisions] = None
+    with metrics.phase('plan') as phase:
+        if checkpoint_state is not None:
+            # Reuse the numbering of the interrupted run instead of rescanning the input directory
+            moves: List[Tuple[str, str]] = [(item['src'], item['dst']) for item in checkpoint_state.planned if item['src'] not in checkpoint_state.done]
+            logging.info(f"Resuming from checkpoint: {len(checkpoint_state.done)} JPG files already moved, {len(moves)} left.")
+            journal = CheckpointJournal(checkpoint_abs_path)
+        else:
+            # 1. Collect and number JPG files from the input directory
+            logging.info("Collecting JPG files from the input directory...")
+            start_counters, existing_names = _index_output_dir(output_jpg_dir_abs_path, jpg_exts)
+            if append and start_counters:
+                logging.info(f"Appending to the output directory: continuing the numbering of {len(start_counters)} prefixes.")
+            moves, jpg_rename_counters = _plan_flatten_moves(input_jpg_dir_abs_path, output_jpg_dir_abs_path, jpg_exts, number_of_digits, start_counters if append else None)
+            # Never overwrite a file of the output directory: leave the colliding files where they are
+            collisions = _FlattenCollisions(lambda name: name.lower() in existing_names)
+            moves = list(collisions.filter(moves))
+            if checkpoint_abs_path:
+                journal = CheckpointJournal(checkpoint_abs_path, truncate=True)
+                write_plan(journal, [{'src': old_path, 'dst': new_path} for old_path, new_path in moves], {'counters': jpg_rename_counters})
+        phase.items = len(moves)
+
     # 2. Flatten JPG files into the output directory
-    jpg_rename_counters: Dict[str, int] = {}
-    for dirpath, filename in jpg_files:
-        old_path = os.path.join(dirpath, filename)
-        prefix = _build_prefix(input_jpg_dir_abs_path, dirpath)
-        # Initialize counter if needed
-        jpg_rename_counters.setdefault(prefix, 0)
-        jpg_rename_counters[prefix] += 1
-        seq = jpg_rename_counters[prefix]
-        # Format new filename with prefix and sequence number
-        ext = os.path.splitext(filename)[1].lower()
-        new_jpg_name = f"{prefix}-{seq:0{number_of_digits}d}{ext}" if prefix else f"{seq:0{number_of_digits}d}{ext}"
-        new_path = os.path.join(output_jpg_dir_abs_path, new_jpg_name)
-        # If the new path already exists, skip it
+    # Every move of the run is recorded in its move journal, so `unflatten` can revert it
+    move_journal: Optional[CheckpointJournal] = None
+    if move_journal_dir_abs_path:
+        move_journal = open_move_journal(move_journal_dir_abs_path, input_jpg_dir_abs_path, output_jpg_dir_abs_path)
+        logging.info(f"Recording moves in: {move_journal.journal_abs_path}")
+    with metrics.phase('move') as phase:
+        on_moved: Optional[Callable[[str, str], None]] = None
+        if journal is not None:
+            on_moved = lambda old_path, new_path: journal.append({'op': DONE_OP, 'src': old_path})
+            if checkpoint_state is not None:
+                remaining_moves: List[Tuple[str, str]] = []
+                for old_path, new_path in moves:
+                    if not os.path.lexists(old_path) and os.path.lexists(new_path):
+                        # Moved after the last commit of the interrupted run
+                        on_moved(old_path, new_path)
+                    else:
+                        remaining_moves.append((old_path, new_path))
+                moves = remaining_moves
+        phase.items = len(moves)
+        if move_journal is not None:
+            on_checkpointed: Optional[Callable[[str, str], None]] = on_moved
+            def on_moved(old_path: str, new_path: str) -> None:
+                append_move(move_journal, input_jpg_dir_abs_path, old_path, new_path)
+                if on_checkpointed is not None:
+                    on_checkpointed(old_path, new_path)
         try:
-            shutil.move(old_path, new_path)
-            logging.info(f"Moved: {old_path} -> {new_path}")
-        except Exception as e:
-            logging.error(f"Failed to move {old_path} to {new_path}: {e}")
+            moved_cnt, failed_move_cnt = move_files(moves, max_workers=move_workers, on_moved=on_moved)
+        finally:
+            if move_journal is not None:
+                move_journal.close()
+
+    if journal is not None:
+        if failed_move_cnt == 0:
+            journal.append({'op': FINISHED_OP})
+        journal.close()
+
+    if collisions is not None:
+        collisions.log_summary()
+        failed_move_cnt += collisions.skipped_cnt
+    return moved_cnt, failed_move_cnt
+
+def flatten_jpgs_main(config_file_path: str = _FLATTEN_JPGS_CONFIG_FILE, config_overrides: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Main function to flatten JPG files based on a configuration file.
+
+    :param config_file_path: Path to the YAML configuration file.
+    :param config_overrides: Optional configuration keys overriding those of the file (e.g., from the command line).
+    """
+    # Load configuration from YAML file
+    config: Dict[str, Any] = load_config(config_file_path)
+    config.update(config_overrides or {})
+
+    # Configure logging
+    log_file_abs_path: str = config["log_file_abs_path"]
+    setup_logging(
+        log_to_file=True,
+        log_file_abs_path=log_file_abs_path,
+        use_queue=config.get("async_logging", False),
+        file_log_verbosity=config.get("file_log_verbosity", FULL_FILE_LOG),
+        file_log_sample_every=config.get("file_log_sample_every", DEFAULT_FILE_LOG_SAMPLE_EVERY),
+    )
+
+    try:
+        # Adaptive I/O concurrency replaces the fixed move worker count
+        if config.get("adaptive_io", False):
+            enable_adaptive_io(
+                min_workers=config.get("io_min_workers", DEFAULT_IO_MIN_WORKERS),
+                max_workers=config.get("io_max_workers", DEFAULT_IO_MAX_WORKERS),
+                latency_tolerance=config.get("io_latency_tolerance", DEFAULT_IO_LATENCY_TOLERANCE),
+            )
+
+        metrics = RunMetrics('flatten_jpgs')
+        with profile_run(config.get("profile_abs_path")):
+            run_flatten_jpgs(config, metrics)
 
-    logging.info(f"All JPG files have been moved and renamed successfully.")
+        logging.info(f"All JPG files have been moved and renamed successfully.")
+        log_io_concurrency_summary()
 
-    # Clear logging handlers to prevent duplicate logs in future runs
-    clear_logging_handlers()
+        # Write the per-phase metrics report
+        write_metrics(metrics, config.get("metrics_json_abs_path"), config.get("metrics_prom_abs_path"))
+    finally:
+        disable_adaptive_io()
+        # Clear logging handlers to prevent duplicate logs in future runs, even when the run fails
+        clear_logging_handlers()
 
 if __name__ == "__main__":
     # Run the main function with the default configuration file path
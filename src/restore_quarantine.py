@@ -0,0 +1,59 @@
+import logging
+from typing import Dict, Any, Optional
+
+from src.utils.scripts import assert_abs_paths_exist
+from src.utils.quarantine import RESTORED_RAW_CNT, FAILED_RESTORE_RAW_CNT, CONFLICT_RESTORE_RAW_CNT
+from src.utils.quarantine import list_quarantine_batches, restore_quarantine
+from src.config.loader import load_config
+from src.config.logging_config import FULL_FILE_LOG, DEFAULT_FILE_LOG_SAMPLE_EVERY
+from src.config.logging_config import setup_logging, clear_logging_handlers
+
+
+# Restoring reads the RAW directory from the configuration of the filter script
+_RESTORE_QUARANTINE_CONFIG_FILE = "config/filter_raw_by_jpg_config.yaml"
+
+def restore_quarantine_main(config_file_path: str = _RESTORE_QUARANTINE_CONFIG_FILE, config_overrides: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Main function to move the RAW files of a quarantine batch back to their original places.
+
+    :param config_file_path: Path to the YAML configuration file of the filter script.
+    :param config_overrides: Optional configuration keys overriding those of the file; 'restore_batch' names the batch to restore (default: the latest).
+    """
+    # Load configuration from YAML file
+    config: Dict[str, Any] = load_config(config_file_path)
+    config.update(config_overrides or {})
+
+    # Configure logging
+    log_file_abs_path: str = config['log_file_abs_path']
+    setup_logging(
+        log_to_file=True,
+        log_file_abs_path=log_file_abs_path,
+        use_queue=config.get('async_logging', False),
+        file_log_verbosity=config.get('file_log_verbosity', FULL_FILE_LOG),
+        file_log_sample_every=config.get('file_log_sample_every', DEFAULT_FILE_LOG_SAMPLE_EVERY),
+    )
+
+    try:
+        raw_dir_abs_path: str = config['raw_dir_abs_path']
+        assert_abs_paths_exist(
+            abs_paths=[raw_dir_abs_path]
+        )
+        logging.info(f"Quarantine batches: {', '.join(list_quarantine_batches(raw_dir_abs_path)) or 'none'}")
+        detailed_info: Dict[str, int] = restore_quarantine(raw_dir_abs_path, config.get('restore_batch') or None)
+
+        # Print the summary of the operation
+        logging.info("==========================================================")
+        logging.info("Script completed successfully.")
+        logging.info("----------------------------------------------------------")
+        logging.info(f"RST: Restored RAW files: {detailed_info[RESTORED_RAW_CNT]}, Failed: {detailed_info[FAILED_RESTORE_RAW_CNT]}, Left in quarantine (path taken): {detailed_info[CONFLICT_RESTORE_RAW_CNT]}")
+        logging.info("----------------------------------------------------------")
+        logging.info("Exiting the script.")
+        logging.info("==========================================================")
+    finally:
+        # Clear logging handlers to prevent duplicate logs in future runs, even when the run fails
+        clear_logging_handlers()
+
+
+if __name__ == "__main__":
+    # Run the main function with the default config file path
+    restore_quarantine_main(config_file_path=_RESTORE_QUARANTINE_CONFIG_FILE)
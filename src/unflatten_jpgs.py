@@ -0,0 +1,58 @@
+import logging
+from typing import Dict, Any, Optional
+
+from src.utils.mover import DEFAULT_MOVE_WORKERS
+from src.utils.move_journal import UNFLATTENED_JPG_CNT, FAILED_UNFLATTEN_JPG_CNT, SKIPPED_UNFLATTEN_JPG_CNT
+from src.utils.move_journal import latest_move_journal, unflatten_jpgs
+from src.config.loader import load_config
+from src.config.logging_config import FULL_FILE_LOG, DEFAULT_FILE_LOG_SAMPLE_EVERY
+from src.config.logging_config import setup_logging, clear_logging_handlers
+
+
+# Unflattening reads the move journal directory from the configuration of the flatten script
+_UNFLATTEN_JPGS_CONFIG_FILE = "config/flatten_jpgs_config.yaml"
+
+def unflatten_jpgs_main(config_file_path: str = _UNFLATTEN_JPGS_CONFIG_FILE, config_overrides: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Main function to revert a flatten run from its move journal.
+
+    :param config_file_path: Path to the YAML configuration file of the flatten script.
+    :param config_overrides: Optional configuration keys overriding those of the file; 'unflatten_journal_abs_path' names the journal to replay (default: the latest of `move_journal_dir_abs_path`).
+    """
+    # Load configuration from YAML file
+    config: Dict[str, Any] = load_config(config_file_path)
+    config.update(config_overrides or {})
+
+    # Configure logging
+    log_file_abs_path: str = config['log_file_abs_path']
+    setup_logging(
+        log_to_file=True,
+        log_file_abs_path=log_file_abs_path,
+        use_queue=config.get('async_logging', False),
+        file_log_verbosity=config.get('file_log_verbosity', FULL_FILE_LOG),
+        file_log_sample_every=config.get('file_log_sample_every', DEFAULT_FILE_LOG_SAMPLE_EVERY),
+    )
+
+    try:
+        journal_abs_path: Optional[str] = config.get('unflatten_journal_abs_path') or latest_move_journal(config.get('move_journal_dir_abs_path') or '')
+        if not journal_abs_path:
+            raise FileNotFoundError("No move journal to unflatten: set move_journal_dir_abs_path, or give the journal path.")
+        logging.info(f"Unflattening the moves recorded in: {journal_abs_path}")
+        detailed_info: Dict[str, int] = unflatten_jpgs(journal_abs_path, config.get('move_workers', DEFAULT_MOVE_WORKERS))
+
+        # Print the summary of the operation
+        logging.info("==========================================================")
+        logging.info("Script completed successfully.")
+        logging.info("----------------------------------------------------------")
+        logging.info(f"RST: Moved back JPG files: {detailed_info[UNFLATTENED_JPG_CNT]}, Failed: {detailed_info[FAILED_UNFLATTEN_JPG_CNT]}, Skipped: {detailed_info[SKIPPED_UNFLATTEN_JPG_CNT]}")
+        logging.info("----------------------------------------------------------")
+        logging.info("Exiting the script.")
+        logging.info("==========================================================")
+    finally:
+        # Clear logging handlers to prevent duplicate logs in future runs, even when the run fails
+        clear_logging_handlers()
+
+
+if __name__ == "__main__":
+    # Run the main function with the default config file path
+    unflatten_jpgs_main(config_file_path=_UNFLATTEN_JPGS_CONFIG_FILE)
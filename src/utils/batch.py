@@ -0,0 +1,158 @@
+import os
+import time
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from src.utils.metrics import RunMetrics, write_metrics
+from src.config.loader import load_config
+
+
+DEFAULT_MAX_JOBS = 4
+DEFAULT_PER_DEVICE_JOBS = 1
+
+SUCCEEDED_JOB = 'succeeded'
+FAILED_JOB = 'failed'
+
+class JobSpec(NamedTuple):
+    """
+    What the batch runner needs to know about one kind of job.
+    """
+    run: Callable[[Dict[str, Any], RunMetrics], Any]
+    # Keys every job config must have, and the keys among them holding directories the job works on
+    required_keys: Tuple[str, ...]
+    path_keys: Tuple[str, ...]
+    # Turns the result of `run` into a flat dictionary of counts for the summary
+    summarize: Callable[[Any], Dict[str, int]]
+
+class BatchJob(NamedTuple):
+    name: str
+    job_type: str
+    config: Dict[str, Any]
+
+class JobResult(NamedTuple):
+    name: str
+    job_type: str
+    status: str
+    wall_sec: float
+    info: Dict[str, int]
+    error: Optional[str]
+    metrics: Dict[str, Any]
+
+def load_batch_jobs(batch_config: Dict[str, Any], job_specs: Dict[str, JobSpec]) -> List[BatchJob]:
+    """
+    Build and validate every job of a batch config before any of them runs.
+
+    The config of a job is made of the batch `defaults`, then the content of its optional
+    `config_file`, then its inline `config`, each overriding the previous one.
+
+    :param batch_config: Loaded batch configuration, with a `jobs` list of {name, type, config_file, config}.
+    :param job_specs: Known kinds of job, by type name.
+    :return: List of the jobs, in config order.
+    :raises ValueError: If any job is invalid; the message lists the problems of every job.
+    """
+    defaults: Dict[str, Any] = batch_config.get('defaults') or {}
+    jobs: List[BatchJob] = []
+    errors: List[str] = []
+    seen_names: Set[str] = set()
+    for index, job_entry in enumerate(batch_config.get('jobs') or []):
+        name: str = str(job_entry.get('name') or f"job{index + 1}")
+        job_type: str = job_entry.get('type')
+        if name in seen_names:
+            errors.append(f"{name}: duplicate job name.")
+        seen_names.add(name)
+        if job_type not in job_specs:
+            errors.append(f"{name}: unknown job type {job_type!r}, expected one of {sorted(job_specs)}.")
+            continue
+        config: Dict[str, Any] = dict(defaults)
+        if job_entry.get('config_file'):
+            try:
+                config.update(load_config(job_entry['config_file']) or {})
+            except (OSError, ValueError) as e:
+                errors.append(f"{name}: cannot load config file. Error: {e}")
+                continue
+        config.update(job_entry.get('config') or {})
+        spec: JobSpec = job_specs[job_type]
+        missing_keys: List[str] = [key for key in spec.required_keys if key not in config]
+        if missing_keys:
+            errors.append(f"{name}: missing config keys {missing_keys}.")
+            continue
+        for key in spec.path_keys:
+            if not os.path.exists(config[key]):
+                errors.append(f"{name}: {key} does not exist: {config[key]}")
+        jobs.append(BatchJob(name, job_type, config))
+    if not jobs and not errors:
+        errors.append("No jobs configured.")
+    if errors:
+        raise ValueError("Invalid batch config:\n" + "\n".join(errors))
+    return jobs
+
+def _job_devices(job: BatchJob, spec: JobSpec) -> Tuple[int, ...]:
+    """
+    Return the devices holding the directories of a job.
+    """
+    return tuple(sorted({os.stat(job.config[key]).st_dev for key in spec.path_keys}))
+
+def _run_job(job: BatchJob, spec: JobSpec) -> JobResult:
+    """
+    Run one job, turning any exception into a failed result so the other jobs carry on.
+
+    Operation counts cannot tell concurrent jobs apart, so they are left out of the job
+    metrics and counted once for the whole batch instead.
+    """
+    metrics = RunMetrics(f"{job.job_type}:{job.name}", count_ops=False)
+    start_time: float = time.perf_counter()
+    logging.info(f"Job {job.name} ({job.job_type}) started.")
+    try:
+        info: Dict[str, int] = spec.summarize(spec.run(job.config, metrics))
+        write_metrics(metrics, job.config.get('metrics_json_abs_path'), job.config.get('metrics_prom_abs_path'))
+        status, error = SUCCEEDED_JOB, None
+    except Exception as e:
+        logging.error(f"Job {job.name} ({job.job_type}) failed. Error: {e}\n{traceback.format_exc()}")
+        info, status, error = {}, FAILED_JOB, f"{type(e).__name__}: {e}"
+    wall_sec: float = time.perf_counter() - start_time
+    logging.info(f"Job {job.name} ({job.job_type}) {status} in {wall_sec:.2f}s.")
+    return JobResult(job.name, job.job_type, status, wall_sec, info, error, metrics.report())
+
+def run_jobs(jobs: List[BatchJob], job_specs: Dict[str, JobSpec], max_jobs: int = DEFAULT_MAX_JOBS, per_device_jobs: int = DEFAULT_PER_DEVICE_JOBS) -> List[JobResult]:
+    """
+    Run jobs concurrently on one bounded pool, with at most `per_device_jobs` jobs touching any device at once.
+
+    Jobs are started in config order, skipping over jobs whose devices are busy so that a
+    job on an idle disk never waits behind them; a job working on two devices takes a slot
+    on both.
+
+    :param jobs: Validated jobs (see `load_batch_jobs`).
+    :param job_specs: Known kinds of job, by type name.
+    :param max_jobs: Maximum number of jobs running at once.
+    :param per_device_jobs: Maximum number of running jobs working on the same device.
+    :return: The result of every job, in the order of `jobs`.
+    """
+    pending: List[Tuple[int, BatchJob, Tuple[int, ...]]] = [(index, job, _job_devices(job, job_specs[job.job_type])) for index, job in enumerate(jobs)]
+    busy_devices: Dict[int, int] = {}
+    running: Dict[Future, Tuple[int, Tuple[int, ...]]] = {}
+    results: List[Optional[JobResult]] = [None] * len(jobs)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_jobs), thread_name_prefix="batch") as executor:
+        while pending or running:
+            # Start every pending job that fits, in order
+            for item in list(pending):
+                if len(running) >= max(1, max_jobs):
+                    break
+                index, job, devices = item
+                if any(busy_devices.get(device, 0) >= max(1, per_device_jobs) for device in devices):
+                    continue
+                pending.remove(item)
+                for device in devices:
+                    busy_devices[device] = busy_devices.get(device, 0) + 1
+                running[executor.submit(_run_job, job, job_specs[job.job_type])] = (index, devices)
+            # Wait for a job to finish, freeing its devices
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, devices = running.pop(future)
+                results[index] = future.result()
+                for device in devices:
+                    busy_devices[device] -= 1
+
+    return results
@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+
+DEFAULT_GROUP_COMMIT_SIZE = 512
+DEFAULT_GROUP_COMMIT_INTERVAL_SEC = 1.0
+
+PLAN_OP = 'plan'
+PLAN_END_OP = 'plan_end'
+DONE_OP = 'done'
+FINISHED_OP = 'finished'
+
+class CheckpointJournal:
+    """
+    Append-only JSON Lines journal written with group commit.
+
+    Records are buffered and written with a single `fsync` once `group_commit_size` records are
+    pending or `group_commit_interval_sec` has elapsed since the last commit, so a crash loses at
+    most the last uncommitted group. `append` is thread-safe.
+    """
+
+    def __init__(self, journal_abs_path: str, truncate: bool = False, group_commit_size: int = DEFAULT_GROUP_COMMIT_SIZE, group_commit_interval_sec: float = DEFAULT_GROUP_COMMIT_INTERVAL_SEC):
+        """
+        :param journal_abs_path: Absolute path of the journal file (created if missing).
+        :param truncate: Whether to drop the previous content of the journal.
+        :param group_commit_size: Number of pending records that triggers a commit.
+        :param group_commit_interval_sec: Maximum time between two commits while records are appended.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(journal_abs_path)), exist_ok=True)
+        self.journal_abs_path: str = journal_abs_path
+        self._file = open(journal_abs_path, 'w' if truncate else 'a', encoding='utf-8')
+        if not truncate and self._file.tell() > 0:
+            # Terminate a torn last record left by a crash, so new records start on their own line
+            with open(journal_abs_path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self._file.write('\n')
+        self._group_commit_size: int = group_commit_size
+        self._group_commit_interval_sec: float = group_commit_interval_sec
+        self._pending: List[str] = []
+        self._last_commit_time: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """
+        Append one record, committing the pending group if it is full or old enough.
+        """
+        line: str = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._pending.append(line)
+            if len(self._pending) >= self._group_commit_size or time.monotonic() - self._last_commit_time >= self._group_commit_interval_sec:
+                self._commit_locked()
+
+    def commit(self) -> None:
+        """
+        Write and fsync every pending record.
+        """
+        with self._lock:
+            self._commit_locked()
+
+    def _commit_locked(self) -> None:
+        if self._pending:
+            self._file.write('\n'.join(self._pending) + '\n')
+            self._pending.clear()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_commit_time = time.monotonic()
+
+    def close(self) -> None:
+        """
+        Commit the pending records and close the journal.
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._commit_locked()
+                self._file.close()
+
+    def __enter__(self) -> 'CheckpointJournal':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+class CheckpointState(NamedTuple):
+    planned: List[Dict[str, Any]]
+    plan_info: Dict[str, Any]
+    done: Set[str]
+    finished: bool
+
+def read_journal(journal_abs_path: str) -> List[Dict[str, Any]]:
+    """
+    Read every record of a journal, ignoring torn records left by a crash.
+
+    :param journal_abs_path: Absolute path of the journal file.
+    :return: List of records, empty if the journal does not exist.
+    """
+    records: List[Dict[str, Any]] = []
+    if not os.path.exists(journal_abs_path):
+        return records
+    with open(journal_abs_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                logging.warning(f"Ignoring a torn record in journal: {journal_abs_path}")
+    return records
+
+def load_checkpoint(journal_abs_path: str) -> Optional[CheckpointState]:
+    """
+    Load the state of a previous run from its checkpoint journal.
+
+    A journal is resumable once its plan is complete, that is once the 'plan_end' record has
+    been committed; every planned item is identified by its 'src' path.
+
+    :param journal_abs_path: Absolute path of the journal file.
+    :return: The checkpoint state, or None if there is no complete plan to resume.
+    """
+    planned: List[Dict[str, Any]] = []
+    plan_info: Optional[Dict[str, Any]] = None
+    done: Set[str] = set()
+    finished: bool = False
+    for record in read_journal(journal_abs_path):
+        op: str = record.get('op')
+        if op == PLAN_OP:
+            planned.append(record)
+        elif op == PLAN_END_OP:
+            plan_info = record.get('info', {})
+        elif op == DONE_OP:
+            done.add(record['src'])
+        elif op == FINISHED_OP:
+            finished = True
+    if plan_info is None:
+        return None
+    return CheckpointState(planned, plan_info, done, finished)
+
+def write_plan(journal: CheckpointJournal, planned: List[Dict[str, Any]], plan_info: Dict[str, Any]) -> None:
+    """
+    Record a complete plan and commit it, making the run resumable from now on.
+
+    :param journal: Journal to write to (normally freshly truncated).
+    :param planned: Planned items, each a dictionary with at least a 'src' path.
+    :param plan_info: Extra information needed to resume (counters, counts).
+    """
+    for item in planned:
+        journal.append({'op': PLAN_OP, **item})
+    journal.append({'op': PLAN_END_OP, 'info': plan_info})
+    journal.commit()
@@ -0,0 +1,343 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from src.utils.walker import DEFAULT_WALK_WORKERS
+from src.utils.deleter import DEFAULT_DELETE_WORKERS, DEFAULT_DELETE_BATCH_SIZE, delete_files
+from src.utils.watcher import DEFAULT_POLL_INTERVAL_SEC, DirTree, create_watcher
+from src.utils.quarantine import quarantine_root
+from src.utils.name_matcher import EXACT_NAME_MATCHER, NameMatcher, PrefixTrie
+
+
+DEFAULT_DEBOUNCE_SEC = 2.0
+DEFAULT_STATUS_HOST = '127.0.0.1'
+
+class RawCullDaemon:
+    """
+    Keep the camera JPG names and the RAW inventory in memory, and cull RAW files as the trees change.
+
+    Both trees are scanned once at start. Afterwards, only the directories reported by the
+    watcher (inotify, or polling of directory mtimes) are listed again, and keep/delete
+    decisions are made for the changed names only:
+    - RAW files whose name is no longer among the camera JPG names are deleted;
+    - new RAW files without a camera JPG are deleted if `cull_new_raw_files` is set.
+    Changes are applied once the trees have been quiet for `debounce_sec`, so a JPG moved
+    between folders (removed here, added there) never looks deleted.
+    """
+
+    def __init__(self, jpg_dir_abs_path: str, raw_dir_abs_path: str, camera_file_prefixs: List[str], jpg_exts: List[str], raw_exts: List[str], use_inotify: bool = True, poll_interval_sec: float = DEFAULT_POLL_INTERVAL_SEC, debounce_sec: float = DEFAULT_DEBOUNCE_SEC, cull_on_start: bool = True, cull_new_raw_files: bool = True, walk_workers: int = DEFAULT_WALK_WORKERS, delete_workers: int = DEFAULT_DELETE_WORKERS, delete_batch_size: int = DEFAULT_DELETE_BATCH_SIZE, delete_func: Optional[Callable[[str], None]] = None, matcher: NameMatcher = EXACT_NAME_MATCHER):
+        camera_prefix_trie = PrefixTrie(camera_file_prefixs)
+        jpg_exts: Tuple[str] = tuple(ext.lower() for ext in jpg_exts)
+        raw_exts: Tuple[str] = tuple(ext.lower() for ext in raw_exts)
+        self._jpg_tree = DirTree(jpg_dir_abs_path, lambda filename: filename.lower().endswith(jpg_exts) and camera_prefix_trie.matches(filename))
+        # Files quarantined by the filter script are already culled
+        self._raw_tree = DirTree(raw_dir_abs_path, lambda filename: filename.lower().endswith(raw_exts), skip_dirs={quarantine_root(os.path.abspath(raw_dir_abs_path))})
+        self._use_inotify: bool = use_inotify
+        self._poll_interval_sec: float = poll_interval_sec
+        self._debounce_sec: float = debounce_sec
+        self._cull_on_start: bool = cull_on_start
+        self._cull_new_raw_files: bool = cull_new_raw_files
+        self._walk_workers: int = walk_workers
+        self._delete_workers: int = delete_workers
+        self._delete_batch_size: int = delete_batch_size
+        self._delete_func: Optional[Callable[[str], None]] = delete_func
+        self._matcher: NameMatcher = matcher
+
+        # Number of camera JPG files per name, and RAW file paths per name
+        self._jpg_name_counts: Counter = Counter()
+        self._raw_paths_by_name: Dict[str, Set[str]] = {}
+        self._raw_file_cnt: int = 0
+
+        self._lock = threading.Lock()
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._ready_event = threading.Event()
+        self._pending_dirs: Dict[str, DirTree] = {}
+        self._requested_paths: List[Optional[str]] = []
+        self._last_change_time: float = 0.0
+        self._apply_now: bool = False
+        self._watcher_kind: Optional[str] = None
+        self._status: Dict[str, Any] = {
+            'cycle_cnt': 0,
+            'deleted_raw_cnt': 0,
+            'failed_delete_raw_cnt': 0,
+            'last_cycle': None,
+        }
+
+    def _name_of(self, filename: str) -> str:
+        return self._matcher.key(os.path.splitext(filename)[0])
+
+    def _add_raw(self, dirpath: str, filename: str) -> str:
+        abs_path: str = os.path.join(dirpath, filename)
+        paths: Set[str] = self._raw_paths_by_name.setdefault(self._name_of(filename), set())
+        if abs_path not in paths:
+            paths.add(abs_path)
+            self._raw_file_cnt += 1
+        return abs_path
+
+    def _remove_raw(self, abs_path: str) -> None:
+        name: str = self._name_of(os.path.basename(abs_path))
+        paths: Optional[Set[str]] = self._raw_paths_by_name.get(name)
+        if paths is not None and abs_path in paths:
+            paths.remove(abs_path)
+            self._raw_file_cnt -= 1
+            if not paths:
+                del self._raw_paths_by_name[name]
+
+    def _delete_raw_files(self, doomed_raw_paths: List[str]) -> Tuple[int, int]:
+        if not doomed_raw_paths:
+            return 0, 0
+        logging.info(f"Deleting {len(doomed_raw_paths)} RAW files whose names are not in JPG/JPEG names set...")
+        deleted_paths: List[str] = []
+        deleted_raw_cnt, failed_delete_raw_cnt = delete_files(
+            doomed_raw_paths,
+            max_workers=self._delete_workers,
+            batch_size=self._delete_batch_size,
+            delete_func=self._delete_func,
+            on_deleted=deleted_paths.append,
+        )
+        for abs_path in deleted_paths:
+            self._remove_raw(abs_path)
+        return deleted_raw_cnt, failed_delete_raw_cnt
+
+    def _scan_all(self) -> List[str]:
+        """
+        Scan both trees from scratch and rebuild the inventory.
+
+        :return: Paths of the RAW files without a camera JPG.
+        """
+        logging.info("Scanning JPG and RAW directories...")
+        self._jpg_name_counts = Counter(self._name_of(filename) for _, filename in self._jpg_tree.scan(self._walk_workers))
+        self._raw_paths_by_name = {}
+        self._raw_file_cnt = 0
+        for dirpath, filename in self._raw_tree.scan(self._walk_workers):
+            self._add_raw(dirpath, filename)
+        logging.info(f"Watching {len(self._jpg_tree)} JPG and {len(self._raw_tree)} RAW directories: {len(self._jpg_name_counts)} camera JPG/JPEG names, {self._raw_file_cnt} RAW files.")
+        # Directories that could not be listed are retried with the next changes
+        with self._lock:
+            for tree in (self._jpg_tree, self._raw_tree):
+                for dirpath in tree.scan_failed_dirs:
+                    self._pending_dirs[dirpath] = tree
+        if self._jpg_tree.scan_failed_dirs:
+            # Their JPG names are unknown, so no RAW file can be called orphan yet
+            logging.warning(f"{len(self._jpg_tree.scan_failed_dirs)} JPG directories could not be listed, not culling RAW files at start.")
+            return []
+        return sorted(path for name, paths in self._raw_paths_by_name.items() if name not in self._jpg_name_counts for path in paths)
+
+    def _apply_changes(self, changed_dirs: Dict[str, DirTree]) -> Dict[str, Any]:
+        """
+        List the changed directories again, update the inventory and cull the RAW files of the changed names.
+        """
+        start_time: float = time.perf_counter()
+        lost_names: Set[str] = set()
+        new_raw_paths: List[str] = []
+        failed_dirs: Dict[str, DirTree] = {}
+        for dirpath, tree in sorted(changed_dirs.items()):
+            changes = tree.rescan(dirpath)
+            failed_dirs.update((failed_dir, tree) for failed_dir in changes.failed_dirs)
+            if tree is self._jpg_tree:
+                for _, filename in changes.added:
+                    self._jpg_name_counts[self._name_of(filename)] += 1
+                for _, filename in changes.removed:
+                    name: str = self._name_of(filename)
+                    self._jpg_name_counts[name] -= 1
+                    if self._jpg_name_counts[name] <= 0:
+                        del self._jpg_name_counts[name]
+                        lost_names.add(name)
+            else:
+                for dirpath_, filename in changes.added:
+                    new_raw_paths.append(self._add_raw(dirpath_, filename))
+                for dirpath_, filename in changes.removed:
+                    self._remove_raw(os.path.join(dirpath_, filename))
+
+        # Decide on the changed names only
+        doomed_raw_paths: Set[str] = {
+            path for name in lost_names if name not in self._jpg_name_counts for path in self._raw_paths_by_name.get(name, ())
+        }
+        if self._cull_new_raw_files:
+            doomed_raw_paths.update(path for path in new_raw_paths if self._name_of(os.path.basename(path)) not in self._jpg_name_counts)
+        deleted_raw_cnt, failed_delete_raw_cnt = self._delete_raw_files(sorted(doomed_raw_paths))
+        if failed_dirs:
+            # Unreadable directories keep their previous listing, and are rescanned on the next pass
+            with self._lock:
+                for dirpath, tree in failed_dirs.items():
+                    self._pending_dirs.setdefault(dirpath, tree)
+
+        cycle_info: Dict[str, Any] = {
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'rescanned_dir_cnt': len(changed_dirs),
+            'lost_jpg_name_cnt': len(lost_names),
+            'new_raw_cnt': len(new_raw_paths),
+            'deleted_raw_cnt': deleted_raw_cnt,
+            'failed_delete_raw_cnt': failed_delete_raw_cnt,
+            'elapsed_sec': time.perf_counter() - start_time,
+        }
+        logging.info(f"Rescanned {len(changed_dirs)} directories: {len(lost_names)} JPG/JPEG names gone, {len(new_raw_paths)} new RAW files, {deleted_raw_cnt} RAW files deleted, {failed_delete_raw_cnt} failed.")
+        return cycle_info
+
+    def _record_cycle(self, cycle_info: Dict[str, Any]) -> None:
+        with self._lock:
+            self._status['cycle_cnt'] += 1
+            self._status['deleted_raw_cnt'] += cycle_info['deleted_raw_cnt']
+            self._status['failed_delete_raw_cnt'] += cycle_info['failed_delete_raw_cnt']
+            self._status['last_cycle'] = cycle_info
+
+    def request_rescan(self, abs_path: Optional[str] = None) -> bool:
+        """
+        Queue the directories at or below a path (both whole trees if None) for a rescan.
+
+        :return: False if the path is in neither tree.
+        """
+        if abs_path is not None and not (self._jpg_tree.contains(abs_path) or self._raw_tree.contains(abs_path)):
+            return False
+        with self._lock:
+            self._requested_paths.append(abs_path)
+            self._apply_now = True
+        self._wake_event.set()
+        return True
+
+    def _queue_requested_paths(self) -> None:
+        """
+        Expand the requested rescans into pending directories; called with the lock held, on the daemon thread.
+        """
+        for abs_path in self._requested_paths:
+            for tree in (self._jpg_tree, self._raw_tree):
+                if abs_path is None:
+                    dirpaths: List[str] = tree.dirs_under(tree.root)
+                elif tree.contains(abs_path):
+                    # Unknown directories are rescanned too, they may have been missed
+                    dirpaths = tree.dirs_under(abs_path) or [abs_path]
+                else:
+                    continue
+                for dirpath in dirpaths:
+                    self._pending_dirs[dirpath] = tree
+        self._requested_paths = []
+
+    def request_cull(self) -> None:
+        """
+        Apply the pending changes now, without waiting for the trees to be quiet.
+        """
+        with self._lock:
+            self._apply_now = True
+        self._wake_event.set()
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Build a JSON-serializable snapshot of the daemon state.
+        """
+        with self._lock:
+            return {
+                'ready': self._ready_event.is_set(),
+                'watcher': self._watcher_kind,
+                'jpg_dir_cnt': len(self._jpg_tree),
+                'raw_dir_cnt': len(self._raw_tree),
+                'jpg_name_cnt': len(self._jpg_name_counts),
+                'raw_file_cnt': self._raw_file_cnt,
+                'pending_dir_cnt': len(self._pending_dirs),
+                **self._status,
+            }
+
+    def wait_until_ready(self, timeout_sec: Optional[float] = None) -> bool:
+        return self._ready_event.wait(timeout_sec)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def run(self) -> None:
+        """
+        Scan both trees, then watch them and cull RAW files until `stop` is called.
+        """
+        watcher = create_watcher([self._jpg_tree, self._raw_tree], self._use_inotify, self._poll_interval_sec)
+        try:
+            with self._lock:
+                self._watcher_kind = watcher.kind
+            doomed_raw_paths: List[str] = self._scan_all()
+            if self._cull_on_start:
+                deleted_raw_cnt, failed_delete_raw_cnt = self._delete_raw_files(doomed_raw_paths)
+                self._record_cycle({'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'rescanned_dir_cnt': len(self._jpg_tree) + len(self._raw_tree), 'lost_jpg_name_cnt': 0, 'new_raw_cnt': 0, 'deleted_raw_cnt': deleted_raw_cnt, 'failed_delete_raw_cnt': failed_delete_raw_cnt, 'elapsed_sec': 0.0})
+            self._ready_event.set()
+            logging.info(f"Watching for changes ({watcher.kind})...")
+
+            while not self._stop_event.is_set():
+                changed: List[Tuple[DirTree, str]] = watcher.wait_for_changes(min(self._poll_interval_sec, max(0.05, self._debounce_sec)), self._wake_event)
+                with self._lock:
+                    self._wake_event.clear()
+                    self._queue_requested_paths()
+                    if changed:
+                        self._last_change_time = time.monotonic()
+                        for tree, dirpath in changed:
+                            self._pending_dirs[dirpath] = tree
+                    quiet: bool = time.monotonic() - self._last_change_time >= self._debounce_sec
+                    if not self._pending_dirs:
+                        self._apply_now = False
+                        continue
+                    if not (quiet or self._apply_now):
+                        continue
+                    changed_dirs: Dict[str, DirTree] = self._pending_dirs
+                    self._pending_dirs = {}
+                    self._apply_now = False
+                self._record_cycle(self._apply_changes(changed_dirs))
+        finally:
+            watcher.close()
+            self._ready_event.set()
+
+class _StatusRequestHandler(BaseHTTPRequestHandler):
+    daemon: RawCullDaemon = None
+
+    def _send_json(self, status_code: int, payload: Dict[str, Any]) -> None:
+        body: bytes = json.dumps(payload, indent=2).encode('utf-8')
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if urlparse(self.path).path == '/status':
+            self._send_json(200, self.daemon.status())
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path == '/rescan':
+            paths: List[str] = parse_qs(url.query).get('path', [])
+            abs_path: Optional[str] = os.path.abspath(paths[0]) if paths else None
+            if self.daemon.request_rescan(abs_path):
+                self._send_json(202, {'queued': True})
+            else:
+                self._send_json(400, {'error': f'path is in neither the JPG nor the RAW directory: {abs_path}'})
+        elif url.path == '/cull':
+            self.daemon.request_cull()
+            self._send_json(202, {'queued': True})
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logging.debug(f"Status server: {format % args}")
+
+def start_status_server(daemon: RawCullDaemon, port: int, host: str = DEFAULT_STATUS_HOST) -> ThreadingHTTPServer:
+    """
+    Serve the daemon status and triggers over HTTP on a background thread.
+
+    - `GET /status`: daemon state as JSON.
+    - `POST /rescan?path=<dir>`: rescan the directories at or below a path (both trees without a path).
+    - `POST /cull`: apply the pending changes now.
+
+    :param daemon: Daemon to expose.
+    :param port: Port to listen on (0: any free port, see `server.server_address`).
+    :param host: Address to listen on; keep the default so only local clients can trigger deletions.
+    :return: The running server; call `shutdown()` to stop it.
+    """
+    handler = type('StatusRequestHandler', (_StatusRequestHandler,), {'daemon': daemon})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="status-server", daemon=True).start()
+    logging.info(f"Status server listening on http://{server.server_address[0]}:{server.server_address[1]}/status")
+    return server
@@ -0,0 +1,204 @@
+import os
+import hashlib
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.utils.scripts import TOTAL_JPG_CNT
+from src.utils.walker import DEFAULT_WALK_WORKERS, scandir_walk
+from src.utils.metrics import STAT_OP, count_op
+from src.config.logging_config import get_file_logger
+
+
+DEFAULT_HASH_WORKERS = max(1, (os.cpu_count() or 1) - 1)
+PARTIAL_HASH_BYTES = 64 * 1024
+_FULL_HASH_CHUNK_BYTES = 1024 * 1024
+
+TOTAL_JPG_BYTES = 'total_jpg_bytes'
+PARTIAL_HASHED_JPG_CNT = 'partial_hashed_jpg_cnt'
+FULL_HASHED_JPG_CNT = 'full_hashed_jpg_cnt'
+DUPLICATE_GROUP_CNT = 'duplicate_group_cnt'
+DUPLICATE_JPG_CNT = 'duplicate_jpg_cnt'
+RECLAIMABLE_BYTES = 'reclaimable_bytes'
+
+_file_logger = get_file_logger()
+
+class _JpgFile:
+    __slots__ = ('path', 'size', 'inode')
+
+    def __init__(self, path: str, size: int, inode: Tuple[int, int]):
+        self.path: str = path
+        self.size: int = size
+        self.inode: Tuple[int, int] = inode
+
+def _partial_hash(abs_path: str) -> Optional[bytes]:
+    """
+    Hash the size and the first and last `PARTIAL_HASH_BYTES` of a file; None if it cannot be read.
+
+    For files of at most twice that size, this covers the whole content.
+    """
+    try:
+        with open(abs_path, 'rb') as f:
+            size: int = os.fstat(f.fileno()).st_size
+            digest = hashlib.blake2b(size.to_bytes(8, 'little'), digest_size=16)
+            digest.update(f.read(PARTIAL_HASH_BYTES))
+            if size > 2 * PARTIAL_HASH_BYTES:
+                f.seek(-PARTIAL_HASH_BYTES, os.SEEK_END)
+                digest.update(f.read(PARTIAL_HASH_BYTES))
+            elif size > PARTIAL_HASH_BYTES:
+                digest.update(f.read())
+            return digest.digest()
+    except OSError:
+        return None
+
+def _full_hash(abs_path: str) -> Optional[bytes]:
+    """
+    Hash the whole content of a file with BLAKE2b; None if it cannot be read.
+    """
+    try:
+        digest = hashlib.blake2b()
+        with open(abs_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_FULL_HASH_CHUNK_BYTES), b''):
+                digest.update(chunk)
+        return digest.digest()
+    except OSError:
+        return None
+
+def _hash_files(hash_func: Callable[[str], Optional[bytes]], files: List[_JpgFile], executor: Optional[Executor]) -> Iterable[Tuple[_JpgFile, Optional[bytes]]]:
+    paths: List[str] = [jpg_file.path for jpg_file in files]
+    if executor is None:
+        digests: Iterable[Optional[bytes]] = map(hash_func, paths)
+    else:
+        digests = executor.map(hash_func, paths, chunksize=max(1, min(256, len(paths) // 64)))
+    return zip(files, digests)
+
+def _colliding_groups(keyed_files: Iterable[Tuple[Tuple, _JpgFile]]) -> List[List[_JpgFile]]:
+    """
+    Group files by key and keep the groups holding more than one distinct file (hardlinks count once).
+    """
+    groups: Dict[Tuple, List[_JpgFile]] = {}
+    for key, jpg_file in keyed_files:
+        groups.setdefault(key, []).append(jpg_file)
+    return [group for group in groups.values() if len({jpg_file.inode for jpg_file in group}) > 1]
+
+def find_duplicate_jpgs(jpg_dir_abs_path: str, jpg_exts: List[str], hash_workers: int=DEFAULT_HASH_WORKERS, walk_workers: int=DEFAULT_WALK_WORKERS) -> Tuple[List[List[str]], Dict[str, int]]:
+    """
+    Find JPG/JPEG files with identical content, whatever their names.
+
+    Files are compared in three rounds, each only on the files still colliding after the
+    previous one: by size, by a hash of their first and last 64 KiB, then by a full BLAKE2b
+    hash. Hashing runs in a process pool. Hardlinks to the same file are not duplicates.
+
+    :param jpg_dir_abs_path: Absolute path to the directory containing JPG files.
+    :param jpg_exts: List of file extensions to consider (e.g., ['.jpg', '.jpeg']).
+    :param hash_workers: Number of processes hashing files (1: hash in the calling process).
+    :param walk_workers: Number of threads listing directories concurrently.
+    :return: A tuple containing:
+        - A list of duplicate groups, each a sorted list of absolute paths.
+        - A dictionary containing:
+            - 'total_jpg_cnt': Total number of JPG/JPEG files found.
+            - 'total_jpg_bytes': Total size of the JPG/JPEG files found.
+            - 'partial_hashed_jpg_cnt': Number of files whose first and last 64 KiB were hashed.
+            - 'full_hashed_jpg_cnt': Number of files hashed in full.
+            - 'duplicate_group_cnt': Number of groups of identical files.
+            - 'duplicate_jpg_cnt': Number of files that could be replaced by a link to another one.
+            - 'reclaimable_bytes': Disk space freed by replacing the duplicates with links.
+    """
+    # Preprocess the input parameters
+    jpg_exts: Tuple[str] = tuple(ext.lower() for ext in jpg_exts)
+
+    # 1. Collect JPG files with their size
+    jpg_files: List[_JpgFile] = []
+    total_jpg_cnt: int = 0
+    total_jpg_bytes: int = 0
+    for _, entries in scandir_walk(jpg_dir_abs_path, max_workers=walk_workers):
+        for entry in entries:
+            if not entry.name.lower().endswith(jpg_exts):
+                continue
+            count_op(STAT_OP)
+            try:
+                stat_result = entry.stat(follow_symlinks=False)
+            except OSError as e:
+                logging.warning(f"Failed to stat file: {entry.path}. Error: {e}")
+                continue
+            total_jpg_cnt += 1
+            total_jpg_bytes += stat_result.st_size
+            jpg_files.append(_JpgFile(entry.path, stat_result.st_size, (stat_result.st_dev, stat_result.st_ino)))
+    same_size_files: List[_JpgFile] = [jpg_file for group in _colliding_groups(((jpg_file.size,), jpg_file) for jpg_file in jpg_files) for jpg_file in group]
+    logging.info(f"Found {total_jpg_cnt} JPG/JPEG files, {len(same_size_files)} of them share their size with another file.")
+
+    executor: Optional[ProcessPoolExecutor] = ProcessPoolExecutor(max_workers=hash_workers) if hash_workers > 1 and same_size_files else None
+    try:
+        # 2. Hash the head and tail of files of the same size
+        partial_groups: List[List[_JpgFile]] = _colliding_groups(
+            ((jpg_file.size, digest), jpg_file)
+            for jpg_file, digest in _hash_files(_partial_hash, same_size_files, executor) if digest is not None
+        )
+        # 3. Hash in full the files still colliding, unless the partial hash already covered them
+        duplicate_groups: List[List[_JpgFile]] = [group for group in partial_groups if group[0].size <= 2 * PARTIAL_HASH_BYTES]
+        large_files: List[_JpgFile] = [jpg_file for group in partial_groups if group[0].size > 2 * PARTIAL_HASH_BYTES for jpg_file in group]
+        duplicate_groups.extend(_colliding_groups(
+            ((jpg_file.size, digest), jpg_file)
+            for jpg_file, digest in _hash_files(_full_hash, large_files, executor) if digest is not None
+        ))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    # Build the duplicate groups and the detailed information dictionary
+    groups: List[List[str]] = sorted(sorted(jpg_file.path for jpg_file in group) for group in duplicate_groups)
+    duplicate_jpg_cnt: int = 0
+    reclaimable_bytes: int = 0
+    for group in duplicate_groups:
+        extra_copy_cnt: int = len({jpg_file.inode for jpg_file in group}) - 1
+        duplicate_jpg_cnt += extra_copy_cnt
+        reclaimable_bytes += extra_copy_cnt * group[0].size
+    for group in groups:
+        _file_logger.info("Found identical JPG/JPEG files: %s", ', '.join(group))
+    detailed_info: Dict[str, int] = {
+        TOTAL_JPG_CNT: total_jpg_cnt,
+        TOTAL_JPG_BYTES: total_jpg_bytes,
+        PARTIAL_HASHED_JPG_CNT: len(same_size_files),
+        FULL_HASHED_JPG_CNT: len(large_files),
+        DUPLICATE_GROUP_CNT: len(groups),
+        DUPLICATE_JPG_CNT: duplicate_jpg_cnt,
+        RECLAIMABLE_BYTES: reclaimable_bytes,
+    }
+    return groups, detailed_info
+
+def hardlink_duplicates(duplicate_groups: List[List[str]]) -> Tuple[int, int]:
+    """
+    Replace every file of each duplicate group by a hardlink to the first file of the group.
+
+    Each file is replaced atomically (link to a temporary name, then rename over it), so it is
+    never missing. Files on another filesystem than the first file of their group cannot be
+    linked and are counted as failed.
+
+    :param duplicate_groups: Duplicate groups, as returned by `find_duplicate_jpgs`.
+    :return: A tuple of (linked count, failed count).
+    """
+    linked_cnt: int = 0
+    failed_cnt: int = 0
+    for group in duplicate_groups:
+        kept_path: str = group[0]
+        try:
+            kept_stat = os.stat(kept_path)
+        except OSError as e:
+            failed_cnt += len(group) - 1
+            _file_logger.error("Failed to link duplicates of %s. Error: %s", kept_path, e)
+            continue
+        for duplicate_path in group[1:]:
+            tmp_path: str = f"{duplicate_path}.link-tmp"
+            try:
+                if os.path.samestat(kept_stat, os.stat(duplicate_path)):
+                    continue
+                os.link(kept_path, tmp_path)
+                os.replace(tmp_path, duplicate_path)
+                linked_cnt += 1
+                _file_logger.info("Linked duplicate JPG/JPEG file: %s -> %s", duplicate_path, kept_path)
+            except OSError as e:
+                failed_cnt += 1
+                _file_logger.error("Failed to link duplicate JPG/JPEG file: %s to %s. Error: %s", duplicate_path, kept_path, e)
+                if os.path.lexists(tmp_path):
+                    os.remove(tmp_path)
+    return linked_cnt, failed_cnt
@@ -0,0 +1,163 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Mapping, Optional, Set, Tuple
+
+from src.utils.metrics import TRASH_OP, count_op
+from src.utils.io_scheduler import DELETE_IO, AdaptiveLimiter, get_io_limiter
+from src.config.logging_config import get_file_logger
+
+
+DEFAULT_DELETE_WORKERS = 4
+DEFAULT_DELETE_BATCH_SIZE = 256
+# Where `send2trash` puts the deleted files, for the log lines
+_TRASH_DESTINATION = "Recycle Bin"
+
+_file_logger = get_file_logger()
+
+def _device_of(dirpath: str, device_cache: Dict[str, int]) -> int:
+    """
+    Return the device id of a directory, stat-ing each directory only once.
+    """
+    if dirpath not in device_cache:
+        try:
+            device_cache[dirpath] = os.stat(dirpath).st_dev
+        except OSError:
+            device_cache[dirpath] = -1
+    return device_cache[dirpath]
+
+def group_delete_batches(abs_paths: List[str], batch_size: int = DEFAULT_DELETE_BATCH_SIZE) -> List[List[str]]:
+    """
+    Split paths into deletion batches that never mix filesystems.
+
+    Paths are grouped by the device of their directory, so every batch targets a single trash
+    location. Within a device, paths sharing a file name always land in the same batch: trash
+    entries are named after the file, and deleting two files with the same name concurrently
+    could make them race for the same trash entry. Batches are keyed on the name up to its first
+    dot, so a RAW file and its sidecars ('DSC_0001.NEF', 'DSC_0001.NEF.xmp', 'DSC_0001.xmp')
+    are deleted together, in their order in `abs_paths`.
+
+    :param abs_paths: Absolute paths of the files to delete.
+    :param batch_size: Approximate number of paths per batch.
+    :return: List of batches, each a list of absolute paths.
+    """
+    device_cache: Dict[str, int] = {}
+    paths_by_device: Dict[int, List[str]] = {}
+    for abs_path in abs_paths:
+        device: int = _device_of(os.path.dirname(abs_path), device_cache)
+        paths_by_device.setdefault(device, []).append(abs_path)
+
+    batches: List[List[str]] = []
+    for device_paths in paths_by_device.values():
+        bucket_cnt: int = max(1, -(-len(device_paths) // max(1, batch_size)))
+        buckets: List[List[str]] = [[] for _ in range(bucket_cnt)]
+        for abs_path in device_paths:
+            buckets[hash(os.path.basename(abs_path).partition('.')[0]) % bucket_cnt].append(abs_path)
+        batches.extend(bucket for bucket in buckets if bucket)
+    return batches
+
+def _delete_batch(batch: List[str], delete_func: Callable[[str], None], file_label: str, on_deleted: Optional[Callable[[str], None]], limiter: Optional[AdaptiveLimiter] = None, destination: Optional[str] = None, depends_on: Optional[Mapping[str, List[str]]] = None) -> Tuple[int, int]:
+    """
+    Delete the files of one batch sequentially, each in a slot of `limiter` if given.
+
+    :param destination: Where the deleted files go (e.g., 'Recycle Bin'), used in log lines; None if they are removed.
+    :param depends_on: Optional paths that must be deleted earlier in the batch before a path is (see `delete_files`).
+    :return: A tuple of (deleted count, failed count).
+    """
+    deleted_cnt: int = 0
+    failed_cnt: int = 0
+    deleted_paths: Set[str] = set()
+    for abs_path in batch:
+        if depends_on is not None:
+            kept_path: Optional[str] = next((path for path in depends_on.get(abs_path, ()) if path not in deleted_paths), None)
+            if kept_path is not None:
+                # Keep the file with the one it belongs to, e.g., the edits of a RAW file that failed to delete
+                failed_cnt += 1
+                _file_logger.error("Not deleting %s file: %s, %s was not deleted.", file_label, abs_path, kept_path)
+                continue
+        count_op(TRASH_OP)
+        try:
+            if limiter is None:
+                delete_func(abs_path)
+            else:
+                with limiter.slot():
+                    delete_func(abs_path)
+        except Exception as e:
+            # If deleting the file fails, count it as failed
+            failed_cnt += 1
+            if destination is None:
+                _file_logger.error("Failed to delete %s file: %s. Error: %s", file_label, abs_path, e)
+            else:
+                _file_logger.error("Failed to delete %s file: %s to %s. Error: %s", file_label, abs_path, destination, e)
+            continue
+        deleted_cnt += 1
+        if depends_on is not None:
+            deleted_paths.add(abs_path)
+        if destination is None:
+            _file_logger.info("Deleted %s file: %s.", file_label, os.path.basename(abs_path))
+        else:
+            _file_logger.info("Deleted %s file: %s, moved to %s.", file_label, os.path.basename(abs_path), destination)
+        if on_deleted is not None:
+            # The file is gone whatever the callback does, so its errors do not change the counts
+            try:
+                on_deleted(abs_path)
+            except Exception as e:
+                _file_logger.error("Deleted %s file: %s, but its callback failed. Error: %s", file_label, abs_path, e)
+    return deleted_cnt, failed_cnt
+
+def delete_files(abs_paths: List[str], max_workers: int = DEFAULT_DELETE_WORKERS, batch_size: int = DEFAULT_DELETE_BATCH_SIZE, delete_func: Optional[Callable[[str], None]] = None, file_label: str = "RAW", on_deleted: Optional[Callable[[str], None]] = None, depends_on: Optional[Mapping[str, List[str]]] = None) -> Tuple[int, int]:
+    """
+    Delete files concurrently, grouped per filesystem (see `group_delete_batches`).
+
+    The first batch of every filesystem is deleted before the others are started, so the trash
+    directories it may have to create are never created by several threads at once. With
+    adaptive I/O enabled, the delete limiter replaces `max_workers`, and batches are made small
+    enough to keep its highest concurrency busy.
+
+    :param abs_paths: Absolute paths of the files to delete.
+    :param max_workers: Maximum number of batches deleted concurrently.
+    :param batch_size: Approximate number of paths per batch.
+    :param delete_func: Callable deleting one file (None: `send2trash`); its `destination` attribute, if any, names where the files go in log lines.
+    :param file_label: Kind of file, used in log lines (e.g., 'RAW').
+    :param on_deleted: Optional callback invoked with each successfully deleted path; its errors are logged, the path still counts as deleted.
+    :param depends_on: Optional paths per path that must be deleted first (e.g., the RAW files of a sidecar); they must come earlier in `abs_paths` and share the name up to its first dot, so they land in the same batch. A path whose dependencies were not deleted is kept and counted as failed.
+    :return: A tuple of (deleted count, failed count); every path is counted exactly once.
+    """
+    deleted_cnt: int = 0
+    failed_cnt: int = 0
+    if not abs_paths:
+        return deleted_cnt, failed_cnt
+    destination: Optional[str] = getattr(delete_func, 'destination', None)
+    if delete_func is None:
+        # Imported here, so runs that never delete (or delete otherwise) do not pay for it
+        from send2trash import send2trash
+        delete_func = send2trash
+        destination = _TRASH_DESTINATION
+
+    limiter: Optional[AdaptiveLimiter] = get_io_limiter(DELETE_IO)
+    if limiter is not None:
+        max_workers = limiter.max_limit
+        batch_size = min(batch_size, -(-len(abs_paths) // (4 * limiter.max_limit)))
+
+    batches: List[List[str]] = group_delete_batches(abs_paths, batch_size)
+    device_cache: Dict[str, int] = {}
+    seen_devices: set = set()
+    first_batches: List[List[str]] = []
+    other_batches: List[List[str]] = []
+    for batch in batches:
+        device: int = _device_of(os.path.dirname(batch[0]), device_cache)
+        if device in seen_devices:
+            other_batches.append(batch)
+        else:
+            seen_devices.add(device)
+            first_batches.append(batch)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="deleter") as executor:
+        for stage in (first_batches, other_batches):
+            futures = [executor.submit(_delete_batch, batch, delete_func, file_label, on_deleted, limiter, destination, depends_on) for batch in stage]
+            for future in futures:
+                batch_deleted_cnt, batch_failed_cnt = future.result()
+                deleted_cnt += batch_deleted_cnt
+                failed_cnt += batch_failed_cnt
+
+    return deleted_cnt, failed_cnt
@@ -0,0 +1,318 @@
+import os
+import mmap
+import struct
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import AbstractSet, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.utils.scripts import TOTAL_JPG_CNT, TOTAL_CAMERA_JPG_CNT, UNIQUE_CAMERA_JPG_CNT
+from src.utils.walker import DEFAULT_WALK_WORKERS, scandir_walk
+from src.utils.name_set import CompactNameSet
+from src.utils.name_matcher import EXACT_NAME_MATCHER, NameMatcher, PrefixTrie
+from src.utils.metrics import STAT_OP, count_op
+from src.config.logging_config import get_file_logger
+
+
+DEFAULT_EXIF_READ_BYTES = 256 * 1024
+DEFAULT_EXIF_READ_WORKERS = 8
+
+EXIF_CACHE_HIT_CNT = 'exif_cache_hit_cnt'
+EXIF_PARSED_CNT = 'exif_parsed_cnt'
+KEYED_JPG_CNT = 'keyed_jpg_cnt'
+UNIQUE_CAPTURE_KEY_CNT = 'unique_capture_key_cnt'
+UNKEYED_RAW_CNT = 'unkeyed_raw_cnt'
+
+# A capture key is (body serial, DateTimeOriginal, SubSecTimeOriginal); the serial falls back
+# to make and model when the camera does not record it.
+CaptureKey = Tuple[str, str, str]
+
+_TAG_MAKE = 0x010F
+_TAG_MODEL = 0x0110
+_TAG_EXIF_IFD = 0x8769
+_TAG_DATETIME_ORIGINAL = 0x9003
+_TAG_SUBSEC_TIME_ORIGINAL = 0x9291
+_TAG_BODY_SERIAL_NUMBER = 0xA431
+_TAG_CAMERA_SERIAL_NUMBER = 0xC62F  # DNG
+
+_ASCII_TYPE = 2
+_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8, 11: 4, 12: 8, 13: 4}
+
+_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS capture_keys (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    serial TEXT,
+    datetime_original TEXT,
+    subsec TEXT
+);
+"""
+
+_file_logger = get_file_logger()
+
+def _read_ifd(buf, tiff_start: int, ifd_offset: int, byte_order: str, wanted_tags: Tuple[int, ...]) -> Dict[int, object]:
+    """
+    Read the wanted tags of one IFD; ASCII values are decoded, other values are their first integer.
+    """
+    values: Dict[int, object] = {}
+    entry_cnt: int = struct.unpack_from(byte_order + 'H', buf, tiff_start + ifd_offset)[0]
+    for index in range(entry_cnt):
+        entry_start: int = tiff_start + ifd_offset + 2 + 12 * index
+        tag, value_type, value_cnt = struct.unpack_from(byte_order + 'HHI', buf, entry_start)
+        if tag not in wanted_tags:
+            continue
+        value_size: int = _TYPE_SIZES.get(value_type, 1) * value_cnt
+        value_start: int = entry_start + 8 if value_size <= 4 else tiff_start + struct.unpack_from(byte_order + 'I', buf, entry_start + 8)[0]
+        if value_start + value_size > len(buf):
+            continue
+        if value_type == _ASCII_TYPE:
+            values[tag] = bytes(buf[value_start:value_start + value_size]).split(b'\0', 1)[0].decode('ascii', 'replace').strip()
+        elif value_type == 3:
+            values[tag] = struct.unpack_from(byte_order + 'H', buf, value_start)[0]
+        else:
+            values[tag] = struct.unpack_from(byte_order + 'I', buf, value_start)[0]
+    return values
+
+def _parse_tiff(buf, tiff_start: int) -> Optional[CaptureKey]:
+    """
+    Parse a TIFF structure (TIFF-based RAW files, or the Exif segment of a JPEG) for the capture key.
+    """
+    byte_order_mark: bytes = bytes(buf[tiff_start:tiff_start + 2])
+    if byte_order_mark == b'II':
+        byte_order: str = '<'
+    elif byte_order_mark == b'MM':
+        byte_order = '>'
+    else:
+        return None
+    ifd0_offset: int = struct.unpack_from(byte_order + 'I', buf, tiff_start + 4)[0]
+    ifd0: Dict[int, object] = _read_ifd(buf, tiff_start, ifd0_offset, byte_order, (_TAG_MAKE, _TAG_MODEL, _TAG_EXIF_IFD, _TAG_CAMERA_SERIAL_NUMBER))
+    exif_ifd: Dict[int, object] = {}
+    if isinstance(ifd0.get(_TAG_EXIF_IFD), int):
+        exif_ifd = _read_ifd(buf, tiff_start, ifd0[_TAG_EXIF_IFD], byte_order, (_TAG_DATETIME_ORIGINAL, _TAG_SUBSEC_TIME_ORIGINAL, _TAG_BODY_SERIAL_NUMBER))
+    datetime_original: object = exif_ifd.get(_TAG_DATETIME_ORIGINAL)
+    if not datetime_original or not isinstance(datetime_original, str):
+        return None
+    serial: object = exif_ifd.get(_TAG_BODY_SERIAL_NUMBER) or ifd0.get(_TAG_CAMERA_SERIAL_NUMBER)
+    if not serial or not isinstance(serial, str):
+        serial = f"{ifd0.get(_TAG_MAKE, '')} {ifd0.get(_TAG_MODEL, '')}".strip()
+    subsec: object = exif_ifd.get(_TAG_SUBSEC_TIME_ORIGINAL, '')
+    return serial, datetime_original, subsec if isinstance(subsec, str) else ''
+
+def _parse_jpeg(buf) -> Optional[CaptureKey]:
+    """
+    Walk the JPEG segments up to the first APP1 Exif segment (or the image data) and parse it.
+    """
+    position: int = 2
+    while position + 4 <= len(buf):
+        if buf[position] != 0xFF:
+            return None
+        marker: int = buf[position + 1]
+        if marker == 0xFF:
+            # Fill byte
+            position += 1
+            continue
+        if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:
+            position += 2
+            continue
+        if marker in (0xD9, 0xDA):
+            # End of image, or start of the image data: no Exif segment
+            return None
+        segment_length: int = struct.unpack_from('>H', buf, position + 2)[0]
+        if marker == 0xE1 and bytes(buf[position + 4:position + 10]) == b'Exif\0\0':
+            return _parse_tiff(buf, position + 10)
+        position += 2 + segment_length
+    return None
+
+def read_capture_key(abs_path: str, max_read_bytes: int = DEFAULT_EXIF_READ_BYTES) -> Optional[CaptureKey]:
+    """
+    Read the capture key of a JPEG or TIFF-based RAW file (NEF, CR2, DNG, ARW, ORF, RW2, PEF...) from its header.
+
+    Only the first `max_read_bytes` of the file are memory-mapped; metadata beyond them is
+    treated as missing.
+
+    :param abs_path: Absolute path of the file.
+    :param max_read_bytes: Maximum number of bytes mapped from the start of the file.
+    :return: The (body serial, DateTimeOriginal, SubSecTimeOriginal) tuple, or None if the file has no readable capture time.
+    """
+    try:
+        with open(abs_path, 'rb') as f:
+            length: int = min(os.fstat(f.fileno()).st_size, max_read_bytes)
+            if length < 8:
+                return None
+            with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ) as buf:
+                if buf[0] == 0xFF and buf[1] == 0xD8:
+                    return _parse_jpeg(buf)
+                return _parse_tiff(buf, 0)
+    except (OSError, ValueError, struct.error, IndexError):
+        return None
+
+class ExifKeyCache:
+    """
+    Persistent cache of capture keys, keyed by (path, size, mtime), so unchanged files are never parsed twice.
+
+    Not thread-safe: use it from a single thread.
+    """
+
+    def __init__(self, db_abs_path: str):
+        # Imported here, so runs without cache do not pay for it
+        import sqlite3
+        os.makedirs(os.path.dirname(os.path.abspath(db_abs_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_abs_path)
+        self._conn.executescript(_CACHE_SCHEMA)
+
+    def lookup(self, abs_path: str, size: int, mtime_ns: int) -> Tuple[bool, Optional[CaptureKey]]:
+        """
+        :return: A tuple of (whether the file is cached, its capture key).
+        """
+        row = self._conn.execute("SELECT size, mtime_ns, serial, datetime_original, subsec FROM capture_keys WHERE path = ?", (abs_path,)).fetchone()
+        if row is None or row[0] != size or row[1] != mtime_ns:
+            return False, None
+        return True, (row[2], row[3], row[4]) if row[3] is not None else None
+
+    def store_many(self, rows: Iterable[Tuple[str, int, int, Optional[CaptureKey]]]) -> None:
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO capture_keys (path, size, mtime_ns, serial, datetime_original, subsec) VALUES (?, ?, ?, ?, ?, ?)",
+                [(path, size, mtime_ns, *(key if key is not None else (None, None, None))) for path, size, mtime_ns, key in rows],
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+def read_capture_keys(abs_paths: List[str], cache: Optional[ExifKeyCache] = None, read_workers: int = DEFAULT_EXIF_READ_WORKERS, max_read_bytes: int = DEFAULT_EXIF_READ_BYTES) -> Tuple[Dict[str, Optional[CaptureKey]], Dict[str, int]]:
+    """
+    Read the capture keys of many files, from the cache when their size and mtime did not change.
+
+    :param abs_paths: Absolute paths of the files.
+    :param cache: Optional capture key cache, updated with the parsed files.
+    :param read_workers: Number of threads reading headers concurrently.
+    :param max_read_bytes: Maximum number of bytes read from the start of each file.
+    :return: A tuple of (capture key per path, None for files without one; dictionary with 'exif_cache_hit_cnt' and 'exif_parsed_cnt').
+    """
+    keys: Dict[str, Optional[CaptureKey]] = {}
+    to_parse: List[Tuple[str, int, int]] = []
+    for abs_path in abs_paths:
+        count_op(STAT_OP)
+        try:
+            stat_result = os.stat(abs_path)
+        except OSError as e:
+            logging.warning(f"Failed to stat file: {abs_path}. Error: {e}")
+            keys[abs_path] = None
+            continue
+        if cache is not None:
+            hit, key = cache.lookup(abs_path, stat_result.st_size, stat_result.st_mtime_ns)
+            if hit:
+                keys[abs_path] = key
+                continue
+        to_parse.append((abs_path, stat_result.st_size, stat_result.st_mtime_ns))
+
+    with ThreadPoolExecutor(max_workers=max(1, read_workers), thread_name_prefix="exif") as executor:
+        parsed_keys: List[Optional[CaptureKey]] = list(executor.map(lambda item: read_capture_key(item[0], max_read_bytes), to_parse))
+    for (abs_path, _, _), key in zip(to_parse, parsed_keys):
+        keys[abs_path] = key
+    if cache is not None and to_parse:
+        cache.store_many((abs_path, size, mtime_ns, key) for (abs_path, size, mtime_ns), key in zip(to_parse, parsed_keys))
+
+    return keys, {EXIF_CACHE_HIT_CNT: len(abs_paths) - len(to_parse), EXIF_PARSED_CNT: len(to_parse)}
+
+def gather_camera_jpg_keys(jpg_dir_abs_path: str, camera_file_prefixs: List[str], jpg_exts: List[str], cache: Optional[ExifKeyCache] = None, if_logging: bool = True, walk_workers: int = DEFAULT_WALK_WORKERS, read_workers: int = DEFAULT_EXIF_READ_WORKERS, compact_names: bool = False, matcher: NameMatcher = EXACT_NAME_MATCHER) -> Tuple[Set[CaptureKey], AbstractSet[str], Dict[str, int]]:
+    """
+    Gather the capture keys of every JPG/JPEG file, along with the camera JPG/JPEG names.
+
+    Capture keys are read from every JPG/JPEG file whatever its name, so renamed or exported
+    files still match their RAW files; the names are gathered as in `gather_camera_jpg_names`.
+
+    :param jpg_dir_abs_path: Absolute path to the directory containing JPG files.
+    :param camera_file_prefixs: List of camera file prefixes to filter the names.
+    :param jpg_exts: List of file extensions to consider (e.g., ['.jpg', '.jpeg']).
+    :param cache: Optional capture key cache.
+    :param if_logging: Whether to log every camera JPG/JPEG file found.
+    :param walk_workers: Number of threads listing directories concurrently.
+    :param read_workers: Number of threads reading headers concurrently.
+    :param compact_names: Whether to store the names in a `CompactNameSet` instead of a `set`.
+    :param matcher: Normalization of the names into matching keys (default: names unchanged).
+    :return: A tuple containing:
+        - A set of capture keys.
+        - A set of unique camera file names (without extensions), as keys of `matcher`.
+        - A dictionary with the same counts as `gather_camera_jpg_names`, plus:
+            - 'keyed_jpg_cnt': Number of JPG/JPEG files with a capture key.
+            - 'unique_capture_key_cnt': Number of unique capture keys.
+            - 'exif_cache_hit_cnt' and 'exif_parsed_cnt': Files taken from the cache and parsed.
+    """
+    # Preprocess the input parameters
+    camera_prefix_trie = PrefixTrie(camera_file_prefixs)
+    jpg_exts: Tuple[str] = tuple(ext.lower() for ext in jpg_exts)
+
+    # Initialize variables
+    camera_jpg_names: AbstractSet[str] = CompactNameSet() if compact_names else set()
+    jpg_paths: List[str] = []
+    total_camera_jpg_cnt: int = 0
+
+    # Start to work on the directory
+    for _, entries in scandir_walk(jpg_dir_abs_path, max_workers=walk_workers):
+        for entry in entries:
+            if not entry.name.lower().endswith(jpg_exts):
+                continue
+            jpg_paths.append(entry.path)
+            file_name_without_ext = os.path.splitext(entry.name)[0]
+            if camera_prefix_trie.matches(file_name_without_ext):
+                total_camera_jpg_cnt += 1
+                camera_jpg_names.add(matcher.key(file_name_without_ext))
+                if if_logging:
+                    _file_logger.info("Found JPG/JPEG file: %s, name added to the set.", file_name_without_ext)
+
+    # Read the capture keys
+    keys_by_path, read_info = read_capture_keys(jpg_paths, cache, read_workers)
+    jpg_keys: Set[CaptureKey] = {key for key in keys_by_path.values() if key is not None}
+
+    # Build the detailed information dictionary
+    detailed_info: Dict[str, int] = {
+        TOTAL_JPG_CNT: len(jpg_paths),
+        TOTAL_CAMERA_JPG_CNT: total_camera_jpg_cnt,
+        UNIQUE_CAMERA_JPG_CNT: len(camera_jpg_names),
+        KEYED_JPG_CNT: sum(1 for key in keys_by_path.values() if key is not None),
+        UNIQUE_CAPTURE_KEY_CNT: len(jpg_keys),
+        **read_info,
+    }
+    return jpg_keys, camera_jpg_names, detailed_info
+
+def decide_raw_files_by_capture_key(raw_files: Iterable[Tuple[str, str]], jpg_keys: AbstractSet[CaptureKey], jpg_names: AbstractSet[str], cache: Optional[ExifKeyCache] = None, read_workers: int = DEFAULT_EXIF_READ_WORKERS, fallback_to_name: bool = True, matcher: NameMatcher = EXACT_NAME_MATCHER) -> Tuple[int, List[str], int]:
+    """
+    Decide which RAW files to keep by capture key, as `decide_raw_files` does by name.
+
+    A RAW file is kept when its capture key is among the JPG/JPEG capture keys or, with
+    `fallback_to_name`, when its name is among the JPG/JPEG names. Without the fallback, RAW
+    files without a readable capture key are always kept, as they cannot be matched.
+
+    :param raw_files: Iterable of (directory path, file name) tuples of RAW files.
+    :param jpg_keys: Set of JPG/JPEG capture keys.
+    :param jpg_names: Set of JPG/JPEG file names (without extensions).
+    :param cache: Optional capture key cache.
+    :param read_workers: Number of threads reading headers concurrently.
+    :param fallback_to_name: Whether to also keep RAW files whose name is among the JPG/JPEG names.
+    :param matcher: Normalization of the RAW names into the keys of `jpg_names` (default: names unchanged).
+    :return: A tuple of (number of RAW files kept, paths of the RAW files to delete, number of RAW files without a capture key).
+    """
+    raw_paths: List[str] = [os.path.join(root, filename) for root, filename in raw_files]
+    keys_by_path, _ = read_capture_keys(raw_paths, cache, read_workers)
+
+    kept_raw_cnt: int = 0
+    unkeyed_raw_cnt: int = 0
+    doomed_raw_paths: List[str] = []
+    for raw_path in raw_paths:
+        filename: str = os.path.basename(raw_path)
+        key: Optional[CaptureKey] = keys_by_path[raw_path]
+        if key is None:
+            unkeyed_raw_cnt += 1
+        if key is not None and key in jpg_keys:
+            kept_raw_cnt += 1
+            _file_logger.info("Keeping RAW file: %s, capture key found in JPG/JPEG capture keys set.", filename)
+        elif fallback_to_name and matcher.key(os.path.splitext(filename)[0]) in jpg_names:
+            kept_raw_cnt += 1
+            _file_logger.info("Keeping RAW file: %s, name found in JPG/JPEG names set.", filename)
+        elif key is None and not fallback_to_name:
+            kept_raw_cnt += 1
+            _file_logger.info("Keeping RAW file: %s, no capture key to match.", filename)
+        else:
+            doomed_raw_paths.append(raw_path)
+    return kept_raw_cnt, doomed_raw_paths, unkeyed_raw_cnt
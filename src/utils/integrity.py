@@ -0,0 +1,204 @@
+import os
+import math
+import time
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import AbstractSet, Dict, List, NamedTuple, Optional, Tuple
+
+from src.utils.walker import DEFAULT_WALK_WORKERS, scandir_walk
+from src.utils.metrics import STAT_OP, count_op
+from src.config.logging_config import get_file_logger
+
+
+DEFAULT_HASH_WORKERS = max(1, (os.cpu_count() or 1) - 1)
+DEFAULT_SAMPLE_FRACTION = 0.05
+# Large sequential reads keep disks streaming; the buffer is reused for every read
+_HASH_READ_BYTES = 8 * 1024 * 1024
+
+TOTAL_FILE_CNT = 'total_file_cnt'
+NEW_FILE_CNT = 'new_file_cnt'
+CHANGED_FILE_CNT = 'changed_file_cnt'
+REMOVED_FILE_CNT = 'removed_file_cnt'
+SAMPLED_FILE_CNT = 'sampled_file_cnt'
+HASHED_BYTES = 'hashed_bytes'
+MISMATCH_FILE_CNT = 'mismatch_file_cnt'
+
+# Kinds of mismatch
+HASH_MISMATCH = 'hash_mismatch'
+SIZE_MISMATCH = 'size_mismatch'
+UNREADABLE = 'unreadable'
+# A directory that could not be listed, or a tree found empty while its manifest is not
+UNLISTABLE_DIR = 'unlistable_dir'
+EMPTY_TREE = 'empty_tree'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    relpath TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash BLOB NOT NULL,
+    verified_at REAL NOT NULL
+);
+"""
+
+_file_logger = get_file_logger()
+
+class _ManifestRecord(NamedTuple):
+    size: int
+    mtime_ns: int
+    hash: bytes
+    verified_at: float
+
+class Mismatch(NamedTuple):
+    relpath: str
+    kind: str
+
+def hash_file(abs_path: str) -> Optional[bytes]:
+    """
+    Hash the whole content of a file with BLAKE2b in large sequential reads; None if it cannot be read.
+    """
+    try:
+        digest = hashlib.blake2b()
+        buffer = bytearray(_HASH_READ_BYTES)
+        view = memoryview(buffer)
+        with open(abs_path, 'rb', buffering=0) as f:
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            while True:
+                read_cnt: int = f.readinto(buffer)
+                if not read_cnt:
+                    break
+                digest.update(view[:read_cnt])
+        return digest.digest()
+    except OSError:
+        return None
+
+def _scan_tree(root_abs_path: str, exts: Tuple[str, ...], walk_workers: int, skip_dirs: AbstractSet[str]) -> Tuple[Dict[str, Tuple[int, int]], List[str]]:
+    """
+    Return the size and mtime of every file with one of `exts`, by path relative to the root.
+
+    :return: A tuple of (size and mtime by relative path, relative paths of the directories that could not be listed).
+    """
+    files: Dict[str, Tuple[int, int]] = {}
+    failed_dirs: List[str] = []
+    for dirpath, entries in scandir_walk(root_abs_path, max_workers=walk_workers, skip_dirs=skip_dirs, failed_dirs=failed_dirs):
+        for entry in entries:
+            if not entry.name.lower().endswith(exts):
+                continue
+            count_op(STAT_OP)
+            try:
+                stat_result = entry.stat(follow_symlinks=False)
+            except OSError as e:
+                logging.warning(f"Failed to stat file: {entry.path}. Error: {e}")
+                continue
+            files[os.path.relpath(entry.path, root_abs_path)] = (stat_result.st_size, stat_result.st_mtime_ns)
+    return files, sorted(os.path.relpath(dirpath, root_abs_path) for dirpath in failed_dirs)
+
+def _is_below(relpath: str, dir_relpaths: List[str]) -> bool:
+    return any(dir_relpath == os.curdir or relpath.startswith(dir_relpath + os.sep) for dir_relpath in dir_relpaths)
+
+def _hash_all(abs_paths: List[str], hash_workers: int) -> List[Optional[bytes]]:
+    if hash_workers <= 1 or len(abs_paths) <= 1:
+        return [hash_file(path) for path in abs_paths]
+    with ProcessPoolExecutor(max_workers=hash_workers) as executor:
+        return list(executor.map(hash_file, abs_paths, chunksize=max(1, min(64, len(abs_paths) // (4 * hash_workers)))))
+
+def update_manifest(root_abs_path: str, exts: List[str], manifest_db_abs_path: str, sample_fraction: float = 0.0, hash_workers: int = DEFAULT_HASH_WORKERS, walk_workers: int = DEFAULT_WALK_WORKERS, skip_dirs: AbstractSet[str] = frozenset()) -> Tuple[List[Mismatch], Dict[str, int]]:
+    """
+    Bring the integrity manifest of a tree up to date, and verify a rotating sample of the unchanged files.
+
+    The manifest records (relative path, size, mtime, BLAKE2b hash) for every file with one of
+    `exts`. New files and files whose mtime changed (edited on purpose) are hashed and recorded;
+    removed files are forgotten. A directory that cannot be listed is reported as a mismatch and
+    the records below it are kept, and nothing is forgotten when the tree is found empty (e.g.,
+    an unmounted disk) while the manifest is not. Among the unchanged files, the `sample_fraction` verified
+    longest ago are hashed again, so the whole tree is verified every 1 / `sample_fraction`
+    runs. A sampled file whose hash differs, or any file whose size changed while its mtime did
+    not (e.g., a truncated copy), is reported as a mismatch and keeps its recorded hash.
+
+    :param root_abs_path: Absolute path of the tree.
+    :param exts: List of file extensions to consider (e.g., ['.nef', '.cr2']).
+    :param manifest_db_abs_path: Absolute path of the SQLite manifest (created if missing).
+    :param sample_fraction: Fraction of the unchanged files verified by this run (0: only record new and changed files).
+    :param hash_workers: Number of processes hashing files (1: hash in the calling process).
+    :param walk_workers: Number of threads listing directories concurrently.
+    :param skip_dirs: Paths of directories not to descend into.
+    :return: A tuple containing:
+        - The list of mismatches (relative path, kind).
+        - A dictionary containing 'total_file_cnt', 'new_file_cnt', 'changed_file_cnt', 'removed_file_cnt', 'sampled_file_cnt', 'hashed_bytes' and 'mismatch_file_cnt'.
+    """
+    exts: Tuple[str, ...] = tuple(ext.lower() for ext in exts)
+    # Imported here, so importing the verify command does not pay for it
+    import sqlite3
+    os.makedirs(os.path.dirname(os.path.abspath(manifest_db_abs_path)), exist_ok=True)
+    conn = sqlite3.connect(manifest_db_abs_path)
+    conn.executescript(_SCHEMA)
+    records: Dict[str, _ManifestRecord] = {row[0]: _ManifestRecord(*row[1:]) for row in conn.execute("SELECT relpath, size, mtime_ns, hash, verified_at FROM files")}
+
+    # 1. Compare the tree with the manifest
+    files, failed_dir_relpaths = _scan_tree(root_abs_path, exts, walk_workers, skip_dirs)
+    mismatches: List[Mismatch] = [Mismatch(dir_relpath, UNLISTABLE_DIR) for dir_relpath in failed_dir_relpaths]
+    to_record: List[str] = []
+    unchanged: List[str] = []
+    new_file_cnt: int = 0
+    for relpath, (size, mtime_ns) in files.items():
+        record: Optional[_ManifestRecord] = records.get(relpath)
+        if record is None:
+            new_file_cnt += 1
+            to_record.append(relpath)
+        elif record.mtime_ns != mtime_ns:
+            to_record.append(relpath)
+        elif record.size != size:
+            mismatches.append(Mismatch(relpath, SIZE_MISMATCH))
+        else:
+            unchanged.append(relpath)
+    removed_relpaths: List[str] = []
+    if not files and records:
+        # An empty tree is far more likely a missing disk than a deleted archive
+        logging.error(f"No file found under {root_abs_path}, but its manifest lists {len(records)} files: keeping them.")
+        mismatches.append(Mismatch(os.curdir, EMPTY_TREE))
+    else:
+        removed_relpaths = [relpath for relpath in records if relpath not in files and not _is_below(relpath, failed_dir_relpaths)]
+
+    # 2. Pick the rotating sample: the unchanged files verified longest ago
+    sample_cnt: int = min(len(unchanged), math.ceil(len(unchanged) * sample_fraction)) if sample_fraction > 0 else 0
+    sampled: List[str] = sorted(unchanged, key=lambda relpath: records[relpath].verified_at)[:sample_cnt]
+
+    # 3. Hash the new, changed and sampled files in one pass
+    hashed_relpaths: List[str] = to_record + sampled
+    logging.info(f"Hashing {len(to_record)} new or changed files and {len(sampled)} sampled files under {root_abs_path}...")
+    digests: List[Optional[bytes]] = _hash_all([os.path.join(root_abs_path, relpath) for relpath in hashed_relpaths], hash_workers)
+    now: float = time.time()
+    upserts: List[Tuple[str, int, int, bytes, float]] = []
+    verified: List[Tuple[float, str]] = []
+    for index, (relpath, digest) in enumerate(zip(hashed_relpaths, digests)):
+        size, mtime_ns = files[relpath]
+        if digest is None:
+            mismatches.append(Mismatch(relpath, UNREADABLE))
+        elif index < len(to_record):
+            upserts.append((relpath, size, mtime_ns, digest, now))
+        elif digest != records[relpath].hash:
+            mismatches.append(Mismatch(relpath, HASH_MISMATCH))
+        else:
+            verified.append((now, relpath))
+    for mismatch in mismatches:
+        _file_logger.warning("Integrity mismatch (%s): %s", mismatch.kind, mismatch.relpath)
+
+    # 4. Persist the manifest
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO files (relpath, size, mtime_ns, hash, verified_at) VALUES (?, ?, ?, ?, ?)", upserts)
+        conn.executemany("UPDATE files SET verified_at = ? WHERE relpath = ?", verified)
+        conn.executemany("DELETE FROM files WHERE relpath = ?", [(relpath,) for relpath in removed_relpaths])
+    conn.close()
+
+    detailed_info: Dict[str, int] = {
+        TOTAL_FILE_CNT: len(files),
+        NEW_FILE_CNT: new_file_cnt,
+        CHANGED_FILE_CNT: len(to_record) - new_file_cnt,
+        REMOVED_FILE_CNT: len(removed_relpaths),
+        SAMPLED_FILE_CNT: len(sampled),
+        HASHED_BYTES: sum(files[relpath][0] for relpath in hashed_relpaths),
+        MISMATCH_FILE_CNT: len(mismatches),
+    }
+    return sorted(mismatches), detailed_info
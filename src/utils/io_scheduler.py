@@ -0,0 +1,145 @@
+import time
+import errno
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+# Kinds of I/O operation, each with its own concurrency limit
+WALK_IO = 'walk'
+DELETE_IO = 'delete'
+MOVE_IO = 'move'
+
+DEFAULT_IO_MIN_WORKERS = 1
+DEFAULT_IO_MAX_WORKERS = 32
+DEFAULT_IO_LATENCY_TOLERANCE = 2.0
+# Operations measured before each concurrency decision
+DEFAULT_IO_WINDOW_OPS = 32
+# Errors telling that the storage is saturated, unlike per-file errors (e.g., ENOENT, EACCES)
+_SATURATION_ERRNOS = {errno.EIO, errno.EAGAIN, errno.ETIMEDOUT, errno.EBUSY}
+
+def _is_saturation_error(exc: BaseException) -> bool:
+    return isinstance(exc, TimeoutError) or (isinstance(exc, OSError) and exc.errno in _SATURATION_ERRNOS)
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit of one kind of I/O operation, adjusted live from measured latency (AIMD).
+
+    Every `window_ops` operations, the mean latency of the window is compared with the lowest
+    mean latency seen so far. If it grew beyond `latency_tolerance` times that baseline, or an
+    operation timed out or failed with an I/O error (EIO, EAGAIN, ETIMEDOUT, EBUSY), the storage is saturated and the limit is halved; otherwise, if the window
+    actually used the whole limit, one more concurrent operation is allowed. The baseline drifts
+    up slowly so a storage that got slower for good is probed again. The limit stays within
+    [`min_limit`, `max_limit`]; every change is kept in `history` with its time since creation.
+    """
+
+    def __init__(self, name: str, min_limit: int = DEFAULT_IO_MIN_WORKERS, max_limit: int = DEFAULT_IO_MAX_WORKERS, latency_tolerance: float = DEFAULT_IO_LATENCY_TOLERANCE, window_ops: int = DEFAULT_IO_WINDOW_OPS):
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError(f"Invalid {name} I/O concurrency bounds: {min_limit} to {max_limit}.")
+        self.name: str = name
+        self.min_limit: int = min_limit
+        self.max_limit: int = max_limit
+        self.latency_tolerance: float = latency_tolerance
+        self.window_ops: int = window_ops
+        self.limit: int = min_limit
+        self.op_cnt: int = 0
+        self.history: List[Tuple[float, int]] = [(0.0, min_limit)]
+        self._start_time: float = time.perf_counter()
+        self._cond = threading.Condition()
+        self._in_flight: int = 0
+        self._base_latency_sec: Optional[float] = None
+        self._reset_window()
+
+    def _reset_window(self) -> None:
+        self._window_ops: int = 0
+        self._window_latency_sec: float = 0.0
+        self._window_failed: bool = False
+        self._window_peak_in_flight: int = 0
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """
+        Run the enclosed operation once fewer than `limit` operations are in flight, and measure it.
+        """
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+            self._window_peak_in_flight = max(self._window_peak_in_flight, self._in_flight)
+        start_time: float = time.perf_counter()
+        failed: bool = False
+        try:
+            yield
+        except BaseException as exc:
+            # A missing or protected file says nothing about the load of the storage
+            failed = _is_saturation_error(exc)
+            raise
+        finally:
+            self._record(time.perf_counter() - start_time, failed)
+
+    def _record(self, latency_sec: float, failed: bool) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self.op_cnt += 1
+            self._window_ops += 1
+            self._window_latency_sec += latency_sec
+            self._window_failed |= failed
+            if self._window_ops >= self.window_ops:
+                self._adjust_locked()
+            self._cond.notify_all()
+
+    def _adjust_locked(self) -> None:
+        mean_latency_sec: float = self._window_latency_sec / self._window_ops
+        if self._base_latency_sec is None:
+            self._base_latency_sec = mean_latency_sec
+        else:
+            self._base_latency_sec = min(mean_latency_sec, self._base_latency_sec * 1.1)
+        limit: int = self.limit
+        if self._window_failed or mean_latency_sec > self.latency_tolerance * self._base_latency_sec:
+            limit = max(self.min_limit, limit // 2)
+        elif self._window_peak_in_flight >= limit:
+            limit = min(self.max_limit, limit + 1)
+        if limit != self.limit:
+            self.limit = limit
+            self.history.append((time.perf_counter() - self._start_time, limit))
+        self._reset_window()
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+
+def enable_adaptive_io(min_workers: int = DEFAULT_IO_MIN_WORKERS, max_workers: int = DEFAULT_IO_MAX_WORKERS, latency_tolerance: float = DEFAULT_IO_LATENCY_TOLERANCE) -> None:
+    """
+    Let directory walks, deletions and moves pick their own concurrency within [`min_workers`, `max_workers`].
+
+    Replaces the fixed `walk_workers`, `delete_workers` and `move_workers` thread counts until
+    `disable_adaptive_io` is called; each kind of operation has its own limiter.
+    """
+    for kind in (WALK_IO, DELETE_IO, MOVE_IO):
+        _limiters[kind] = AdaptiveLimiter(kind, min_workers, max_workers, latency_tolerance)
+
+def disable_adaptive_io() -> None:
+    """
+    Go back to the fixed thread counts.
+    """
+    _limiters.clear()
+
+def get_io_limiter(kind: str) -> Optional[AdaptiveLimiter]:
+    """
+    Return the limiter of one kind of I/O operation, or None if adaptive concurrency is disabled.
+    """
+    return _limiters.get(kind)
+
+def get_io_concurrency_history() -> Dict[str, List[Tuple[float, int]]]:
+    """
+    Return the (seconds since enabled, concurrency) changes of every limiter that saw operations.
+    """
+    return {kind: list(limiter.history) for kind, limiter in _limiters.items() if limiter.op_cnt}
+
+def log_io_concurrency_summary() -> None:
+    """
+    Log the concurrency chosen over time by every limiter, as summary lines.
+    """
+    for kind, history in get_io_concurrency_history().items():
+        limits: List[int] = [limit for _, limit in history]
+        steps: str = ' -> '.join(f"{limit}@{elapsed_sec:.1f}s" for elapsed_sec, limit in history[-10:])
+        logging.info(f"RST: Adaptive {kind} concurrency: final {limits[-1]}, range {min(limits)}-{max(limits)}, {len(history) - 1} changes ({steps}).")
@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import logging
+from typing import TYPE_CHECKING, AbstractSet, Set, Tuple, Dict, List, Optional, NamedTuple
+
+from src.utils.scripts import TOTAL_JPG_CNT, TOTAL_CAMERA_JPG_CNT, UNIQUE_CAMERA_JPG_CNT
+from src.utils.walker import DEFAULT_WALK_WORKERS, scan_dir, walk_tree
+from src.utils.name_set import CompactNameSet
+from src.utils.name_matcher import EXACT_NAME_MATCHER, NameMatcher, PrefixTrie
+from src.utils.metrics import STAT_OP, count_op
+from src.config.logging_config import get_file_logger
+
+if TYPE_CHECKING:
+    import sqlite3
+
+
+REUSED_DIR_CNT = 'reused_dir_cnt'
+RESCANNED_DIR_CNT = 'rescanned_dir_cnt'
+
+# Directories modified this close to the scan may still change within the same mtime tick,
+# so their mtime is not trusted and they are rescanned on the next run.
+_RACY_MTIME_WINDOW_NS = 2 * 1_000_000_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    jpg_cnt INTEGER NOT NULL,
+    camera_names TEXT NOT NULL,
+    sub_dirs TEXT NOT NULL
+);
+"""
+
+_file_logger = get_file_logger()
+
+class _DirRecord(NamedTuple):
+    mtime_ns: Optional[int]
+    jpg_cnt: int
+    camera_names: List[str]
+    sub_dirs: List[str]
+
+def _open_index(index_db_abs_path: str, fingerprint: str, rebuild_index: bool) -> 'sqlite3.Connection':
+    """
+    Open (or create) the index database and drop its content if it must be rebuilt.
+
+    The index is dropped when `rebuild_index` is set or when it was built for another
+    directory, other prefixes or other extensions.
+    """
+    # Imported here, so runs without index do not pay for it
+    import sqlite3
+    os.makedirs(os.path.dirname(os.path.abspath(index_db_abs_path)), exist_ok=True)
+    conn = sqlite3.connect(index_db_abs_path)
+    conn.executescript(_SCHEMA)
+    row = conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+    if rebuild_index or row is None or row[0] != fingerprint:
+        logging.info(f"Rebuilding JPG name index from scratch: {index_db_abs_path}")
+        conn.execute("DELETE FROM dirs")
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)", (fingerprint,))
+        conn.commit()
+    return conn
+
+def _load_records(conn: 'sqlite3.Connection') -> Dict[str, _DirRecord]:
+    records: Dict[str, _DirRecord] = {}
+    for path, mtime_ns, jpg_cnt, camera_names, sub_dirs in conn.execute("SELECT path, mtime_ns, jpg_cnt, camera_names, sub_dirs FROM dirs"):
+        records[path] = _DirRecord(mtime_ns, jpg_cnt, json.loads(camera_names), json.loads(sub_dirs))
+    return records
+
+def gather_camera_jpg_names_indexed(jpg_dir_abs_path: str, camera_file_prefixs: List[str], jpg_exts: List[str], index_db_abs_path: str, rebuild_index: bool=False, if_logging: bool=True, walk_workers: int=DEFAULT_WALK_WORKERS, compact_names: bool=False, matcher: NameMatcher=EXACT_NAME_MATCHER) -> Tuple[AbstractSet[str], Dict[str, int]]:
+    """
+    Same as `gather_camera_jpg_names`, backed by a persistent per-directory index.
+
+    The index stores, for every directory, its mtime, the number of JPG/JPEG files, the camera
+    names found there and its subdirectories. Directories whose mtime did not change since the
+    previous run are taken from the index with a single `stat`; only changed directories are listed.
+
+    :param jpg_dir_abs_path: Absolute path to the directory containing JPG files.
+    :param camera_file_prefixs: List of camera file prefixes to filter the files.
+    :param jpg_exts: List of file extensions to consider (e.g., ['.jpg', '.jpeg']).
+    :param index_db_abs_path: Absolute path to the SQLite index file (created if missing).
+    :param rebuild_index: Whether to drop the index and rescan every directory.
+    :param if_logging: Whether to log every camera JPG/JPEG file found in rescanned directories.
+    :param walk_workers: Number of threads visiting directories concurrently.
+    :param compact_names: Whether to store the names in a `CompactNameSet` instead of a `set`.
+    :param matcher: Normalization of the names into matching keys (default: names unchanged); the index keeps the original names.
+    :return: A tuple containing:
+        - A set of unique file names (without extensions), as keys of `matcher`.
+        - A dictionary with the same counts as `gather_camera_jpg_names`, plus:
+            - 'reused_dir_cnt': Number of directories taken from the index.
+            - 'rescanned_dir_cnt': Number of directories listed again.
+    """
+    # Preprocess the input parameters
+    camera_file_prefixs: Tuple[str] = tuple(prefix.lower() for prefix in camera_file_prefixs)
+    camera_prefix_trie = PrefixTrie(camera_file_prefixs)
+    jpg_exts: Tuple[str] = tuple(ext.lower() for ext in jpg_exts)
+    fingerprint: str = json.dumps([os.path.abspath(jpg_dir_abs_path), camera_file_prefixs, jpg_exts])
+
+    conn: 'sqlite3.Connection' = _open_index(index_db_abs_path, fingerprint, rebuild_index)
+    records: Dict[str, _DirRecord] = _load_records(conn)
+    racy_mtime_ns: int = time.time_ns() - _RACY_MTIME_WINDOW_NS
+
+    def visit(dirpath: str) -> Tuple[Optional[Tuple[str, _DirRecord, bool]], List[str]]:
+        # Stat before listing, so a change made during the listing is seen on the next run
+        count_op(STAT_OP)
+        try:
+            mtime_ns: int = os.stat(dirpath).st_mtime_ns
+        except OSError as e:
+            logging.warning(f"Failed to stat directory: {dirpath}. Error: {e}")
+            return None, []
+        record: Optional[_DirRecord] = records.get(dirpath)
+        if record is not None and record.mtime_ns == mtime_ns:
+            return (dirpath, record, False), record.sub_dirs
+        # The directory changed (or is new), list it again
+        result, sub_dirs = scan_dir(dirpath)
+        if result is None:
+            return None, []
+        jpg_cnt: int = 0
+        camera_names: List[str] = []
+        for entry in result[1]:
+            if not entry.name.lower().endswith(jpg_exts):
+                continue
+            jpg_cnt += 1
+            file_name_without_ext = os.path.splitext(entry.name)[0]
+            if camera_prefix_trie.matches(file_name_without_ext):
+                camera_names.append(file_name_without_ext)
+        stored_mtime_ns: Optional[int] = mtime_ns if mtime_ns < racy_mtime_ns else None
+        return (dirpath, _DirRecord(stored_mtime_ns, jpg_cnt, camera_names, sub_dirs), True), sub_dirs
+
+    # Initialize variables
+    camera_jpg_names: AbstractSet[str] = CompactNameSet() if compact_names else set()
+    total_jpg_cnt: int = 0
+    total_camera_jpg_cnt: int = 0
+    reused_dir_cnt: int = 0
+    visited_dirs: Set[str] = set()
+    updated_records: List[Tuple[str, _DirRecord]] = []
+
+    # Start to work on the directory
+    for dirpath, record, rescanned in walk_tree(jpg_dir_abs_path, visit, max_workers=walk_workers):
+        visited_dirs.add(dirpath)
+        total_jpg_cnt += record.jpg_cnt
+        total_camera_jpg_cnt += len(record.camera_names)
+        camera_jpg_names.update(record.camera_names if matcher.is_identity else map(matcher.key, record.camera_names))
+        if rescanned:
+            updated_records.append((dirpath, record))
+            if if_logging:
+                for name in record.camera_names:
+                    _file_logger.info("Found JPG/JPEG file: %s, name added to the set.", name)
+        else:
+            reused_dir_cnt += 1
+
+    # Persist the changed directories and forget the removed ones
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO dirs (path, mtime_ns, jpg_cnt, camera_names, sub_dirs) VALUES (?, ?, ?, ?, ?)",
+            [(path, rec.mtime_ns, rec.jpg_cnt, json.dumps(rec.camera_names), json.dumps(rec.sub_dirs)) for path, rec in updated_records],
+        )
+        conn.executemany("DELETE FROM dirs WHERE path = ?", [(path,) for path in records.keys() - visited_dirs])
+    conn.close()
+    logging.info(f"JPG name index: reused {reused_dir_cnt} directories, rescanned {len(updated_records)} directories.")
+
+    # Build the detailed information dictionary
+    detailed_info: Dict[str, int] = {
+        TOTAL_JPG_CNT: total_jpg_cnt,
+        TOTAL_CAMERA_JPG_CNT: total_camera_jpg_cnt,
+        UNIQUE_CAMERA_JPG_CNT: len(camera_jpg_names),
+        REUSED_DIR_CNT: reused_dir_cnt,
+        RESCANNED_DIR_CNT: len(updated_records),
+    }
+
+    # Return the JPG/JPEG names and the detailed information dictionary
+    return camera_jpg_names, detailed_info
@@ -0,0 +1,209 @@
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.utils.io_scheduler import get_io_concurrency_history
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+SCANDIR_OP = 'scandir'
+STAT_OP = 'stat'
+TRASH_OP = 'trash'
+RENAME_OP = 'rename'
+COPY_OP = 'copy'
+
+_op_counts: Counter = Counter()
+_op_counts_lock = threading.Lock()
+
+def count_op(op: str, n: int = 1) -> None:
+    """
+    Count `n` syscall-heavy operations of one kind (e.g., 'scandir', 'stat', 'trash', 'rename').
+    """
+    with _op_counts_lock:
+        _op_counts[op] += n
+
+def get_op_counts() -> Dict[str, int]:
+    """
+    Return a snapshot of the operation counts since the process started.
+    """
+    with _op_counts_lock:
+        return dict(_op_counts)
+
+def diff_op_counts(ops_before: Dict[str, int], ops_after: Dict[str, int]) -> Dict[str, int]:
+    """
+    Return the operation counts between two snapshots of `get_op_counts`, leaving out the unchanged ones.
+    """
+    return {op: cnt - ops_before.get(op, 0) for op, cnt in ops_after.items() if cnt != ops_before.get(op, 0)}
+
+def get_peak_rss_bytes() -> Optional[int]:
+    """
+    Return the peak resident set size of the process, or None where the platform does not report it.
+    """
+    if resource is None:
+        return None
+    max_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+class PhaseRecord:
+    """
+    Measurements of one phase; set `items` to the number of files the phase processed.
+    """
+
+    def __init__(self, name: str):
+        self.name: str = name
+        self.items: int = 0
+        self.wall_sec: float = 0.0
+        self.cpu_sec: float = 0.0
+        self.ops: Dict[str, int] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'phase': self.name,
+            'items': self.items,
+            'wall_sec': self.wall_sec,
+            'cpu_sec': self.cpu_sec,
+            'items_per_sec': self.items / self.wall_sec if self.wall_sec > 0 else 0.0,
+            'ops': self.ops,
+        }
+
+class RunMetrics:
+    """
+    Collects per-phase wall/CPU time, throughput, operation counts and peak RSS for one run.
+
+    Operation counts are process-wide, so runs sharing the process with other concurrent
+    runs pass `count_ops=False` and leave them out of their phases.
+    """
+
+    def __init__(self, run_name: str, count_ops: bool = True):
+        self.run_name: str = run_name
+        self.count_ops: bool = count_ops
+        self.phases: List[PhaseRecord] = []
+        self._start_time: float = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[PhaseRecord]:
+        """
+        Measure the enclosed block as one phase.
+        """
+        record = PhaseRecord(name)
+        ops_before: Dict[str, int] = get_op_counts()
+        wall_start: float = time.perf_counter()
+        cpu_start: float = time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_sec = time.perf_counter() - wall_start
+            record.cpu_sec = time.process_time() - cpu_start
+            if self.count_ops:
+                record.ops = diff_op_counts(ops_before, get_op_counts())
+            self.phases.append(record)
+            logging.info(f"Phase {name}: {record.items} files in {record.wall_sec:.2f}s wall, {record.cpu_sec:.2f}s CPU.")
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Build the run report as a JSON-serializable dictionary.
+        """
+        return {
+            'run': self.run_name,
+            'total_wall_sec': time.perf_counter() - self._start_time,
+            'peak_rss_bytes': get_peak_rss_bytes(),
+            'phases': [phase.to_dict() for phase in self.phases],
+            # Adaptive I/O concurrency over time, per kind of operation: [[seconds since enabled, concurrency], ...]
+            'io_concurrency': {kind: [list(step) for step in history] for kind, history in get_io_concurrency_history().items()},
+        }
+
+    def write_json(self, json_abs_path: str) -> None:
+        """
+        Write the run report as JSON.
+        """
+        write_atomically(json_abs_path, json.dumps(self.report(), indent=2))
+
+    def write_prometheus(self, prom_abs_path: str) -> None:
+        """
+        Write the run report in the Prometheus textfile collector format.
+        """
+        report: Dict[str, Any] = self.report()
+        run_label: str = f'run="{report["run"]}"'
+        lines: List[str] = []
+        def add_metric(name: str, help_text: str, samples: List[str]) -> None:
+            lines.append(f"# HELP photo_archiver_{name} {help_text}")
+            lines.append(f"# TYPE photo_archiver_{name} gauge")
+            lines.extend(samples)
+        add_metric('run_wall_seconds', "Wall time of the whole run.", [f"photo_archiver_run_wall_seconds{{{run_label}}} {report['total_wall_sec']:.6f}"])
+        if report['peak_rss_bytes'] is not None:
+            add_metric('peak_rss_bytes', "Peak resident set size of the run.", [f"photo_archiver_peak_rss_bytes{{{run_label}}} {report['peak_rss_bytes']}"])
+        for key, name, help_text in (
+            ('wall_sec', 'phase_wall_seconds', "Wall time per phase."),
+            ('cpu_sec', 'phase_cpu_seconds', "CPU time per phase."),
+            ('items', 'phase_files', "Files processed per phase."),
+            ('items_per_sec', 'phase_files_per_second', "Throughput per phase."),
+        ):
+            add_metric(name, help_text, [f'photo_archiver_{name}{{{run_label},phase="{phase["phase"]}"}} {phase[key]}' for phase in report['phases']])
+        add_metric('phase_operations', "Syscall-heavy operations per phase.", [
+            f'photo_archiver_phase_operations{{{run_label},phase="{phase["phase"]}",op="{op}"}} {cnt}'
+            for phase in report['phases'] for op, cnt in sorted(phase['ops'].items())
+        ])
+        if report['io_concurrency']:
+            add_metric('io_concurrency', "Final adaptive I/O concurrency per kind of operation.", [
+                f'photo_archiver_io_concurrency{{{run_label},kind="{kind}"}} {history[-1][1]}' for kind, history in sorted(report['io_concurrency'].items())
+            ])
+        write_atomically(prom_abs_path, '\n'.join(lines) + '\n')
+
+def write_atomically(abs_path: str, content: str) -> None:
+    """
+    Write a file through a temporary file and a rename, so readers never see a partial file.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(abs_path)), exist_ok=True)
+    tmp_path: str = f"{abs_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, abs_path)
+
+@contextmanager
+def profile_run(profile_abs_path: Optional[str]) -> Iterator[None]:
+    """
+    Profile the enclosed block with cProfile when a path is given.
+
+    The raw statistics are dumped to `profile_abs_path` (readable with `pstats`), and the 50
+    most expensive functions by cumulative time to `profile_abs_path` + '.txt'. Only the
+    calling thread is profiled; worker threads show up as time spent waiting on them.
+    """
+    if not profile_abs_path:
+        yield
+        return
+    # Imported here, so unprofiled runs do not pay for them
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        os.makedirs(os.path.dirname(os.path.abspath(profile_abs_path)), exist_ok=True)
+        profiler.dump_stats(profile_abs_path)
+        with open(f"{profile_abs_path}.txt", 'w', encoding='utf-8') as f:
+            pstats.Stats(profiler, stream=f).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(50)
+        logging.info(f"Profile written to: {profile_abs_path}")
+
+def write_metrics(metrics: RunMetrics, json_abs_path: Optional[str], prom_abs_path: Optional[str]) -> None:
+    """
+    Write the run report to the configured JSON and Prometheus textfile paths, if any.
+    """
+    if json_abs_path:
+        metrics.write_json(json_abs_path)
+        logging.info(f"Metrics report written to: {json_abs_path}")
+    if prom_abs_path:
+        metrics.write_prometheus(prom_abs_path)
+        logging.info(f"Prometheus metrics written to: {prom_abs_path}")
@@ -0,0 +1,113 @@
+import os
+import time
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.utils.checkpoint import CheckpointJournal, read_journal
+from src.utils.mover import DEFAULT_MOVE_WORKERS, move_files
+from src.config.logging_config import get_file_logger
+
+
+HEADER_OP = 'header'
+MOVED_OP = 'moved'
+
+MOVE_JOURNAL_PREFIX = 'flatten-'
+MOVE_JOURNAL_EXT = '.jsonl'
+
+UNFLATTENED_JPG_CNT = 'unflattened_jpg_cnt'
+FAILED_UNFLATTEN_JPG_CNT = 'failed_unflatten_jpg_cnt'
+SKIPPED_UNFLATTEN_JPG_CNT = 'skipped_unflatten_jpg_cnt'
+
+_file_logger = get_file_logger()
+
+def open_move_journal(journal_dir_abs_path: str, input_dir_abs_path: str, output_dir_abs_path: str) -> CheckpointJournal:
+    """
+    Start the move journal of one flatten run, named after its start time.
+
+    The journal is a JSON Lines file written with group commit: a header record holding the
+    input and output directories, then one record per completed move with the source path
+    relative to the input directory and the destination name in the output directory.
+
+    :return: The journal; append moves with `append_move`, then close it.
+    """
+    os.makedirs(journal_dir_abs_path, exist_ok=True)
+    journal_name: str = f"{MOVE_JOURNAL_PREFIX}{time.strftime('%Y%m%d-%H%M%S')}"
+    journal_abs_path: str = os.path.join(journal_dir_abs_path, journal_name + MOVE_JOURNAL_EXT)
+    suffix: int = 1
+    while os.path.lexists(journal_abs_path):
+        journal_abs_path = os.path.join(journal_dir_abs_path, f"{journal_name}-{suffix}{MOVE_JOURNAL_EXT}")
+        suffix += 1
+    journal = CheckpointJournal(journal_abs_path, truncate=True)
+    journal.append({'op': HEADER_OP, 'input': os.path.abspath(input_dir_abs_path), 'output': os.path.abspath(output_dir_abs_path)})
+    journal.commit()
+    return journal
+
+def append_move(journal: CheckpointJournal, input_dir_abs_path: str, src_path: str, dst_path: str) -> None:
+    """
+    Record one completed move in a move journal.
+    """
+    journal.append({'op': MOVED_OP, 'src': os.path.relpath(src_path, input_dir_abs_path), 'dst': os.path.basename(dst_path)})
+
+def latest_move_journal(journal_dir_abs_path: str) -> Optional[str]:
+    """
+    Return the path of the most recent move journal of a directory, or None if there is none.
+    """
+    if not os.path.isdir(journal_dir_abs_path):
+        return None
+    names: List[str] = sorted(
+        (entry.name for entry in os.scandir(journal_dir_abs_path) if entry.name.startswith(MOVE_JOURNAL_PREFIX) and entry.name.endswith(MOVE_JOURNAL_EXT)),
+        # Journals started within the same second differ by a numbered suffix
+        key=lambda name: (os.stat(os.path.join(journal_dir_abs_path, name)).st_mtime_ns, len(name), name),
+    )
+    return os.path.join(journal_dir_abs_path, names[-1]) if names else None
+
+def read_move_journal(journal_abs_path: str) -> List[Tuple[str, str]]:
+    """
+    Read the completed moves of a move journal.
+
+    :return: List of (original path, flattened path) tuples, in move order.
+    :raises ValueError: If the journal has no header record.
+    """
+    records = read_journal(journal_abs_path)
+    if not records or records[0].get('op') != HEADER_OP:
+        raise ValueError(f"Not a flatten move journal: {journal_abs_path}")
+    input_dir: str = records[0]['input']
+    output_dir: str = records[0]['output']
+    return [(os.path.join(input_dir, record['src']), os.path.join(output_dir, record['dst'])) for record in records[1:] if record.get('op') == MOVED_OP]
+
+def unflatten_jpgs(journal_abs_path: str, move_workers: int = DEFAULT_MOVE_WORKERS) -> Dict[str, int]:
+    """
+    Revert a flatten run: move every flattened file back to its original path, replaying the move journal in reverse.
+
+    Every original directory is recreated up front, so the moves are plain renames done in
+    parallel. Files no longer in the output directory, and files whose original path is taken
+    again, are skipped.
+
+    :param journal_abs_path: Absolute path of the move journal of the run.
+    :param move_workers: Number of threads renaming (or, across devices, copying) files concurrently.
+    :return: A dictionary containing:
+        - 'unflattened_jpg_cnt': Number of files moved back.
+        - 'failed_unflatten_jpg_cnt': Number of files that failed to move back.
+        - 'skipped_unflatten_jpg_cnt': Number of files skipped.
+    """
+    reverse_moves: List[Tuple[str, str]] = []
+    skipped_cnt: int = 0
+    for original_path, flattened_path in reversed(read_move_journal(journal_abs_path)):
+        if not os.path.lexists(flattened_path) or os.path.lexists(original_path):
+            skipped_cnt += 1
+            _file_logger.warning("Not moving back: %s -> %s, the file is gone or its original path is taken.", flattened_path, original_path)
+            continue
+        reverse_moves.append((flattened_path, original_path))
+
+    # Recreate the original directory tree in one batch, parents first
+    original_dirs: Set[str] = {os.path.dirname(original_path) for _, original_path in reverse_moves}
+    for dirpath in sorted(original_dirs):
+        os.makedirs(dirpath, exist_ok=True)
+    logging.info(f"Moving {len(reverse_moves)} JPG files back into {len(original_dirs)} directories...")
+
+    unflattened_cnt, failed_cnt = move_files(reverse_moves, max_workers=move_workers, rename_workers=move_workers)
+    return {
+        UNFLATTENED_JPG_CNT: unflattened_cnt,
+        FAILED_UNFLATTEN_JPG_CNT: failed_cnt,
+        SKIPPED_UNFLATTEN_JPG_CNT: skipped_cnt,
+    }
@@ -0,0 +1,236 @@
+import os
+import errno
+import queue
+import shutil
+import logging
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.utils.deleter import _device_of
+from src.utils.metrics import RENAME_OP, COPY_OP, count_op
+from src.utils.io_scheduler import MOVE_IO, AdaptiveLimiter, get_io_limiter
+from src.config.logging_config import get_file_logger
+
+
+DEFAULT_MOVE_WORKERS = 4
+# Moves waiting for a worker in a streaming move, at most
+DEFAULT_MAX_PENDING_MOVES = 1024
+
+_COPY_CHUNK_SIZE = 8 * 1024 * 1024
+# Errors meaning the kernel copy fast path is not available for these files
+_FAST_COPY_UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF}
+
+_file_logger = get_file_logger()
+
+def _kernel_copy(copy_func: Callable[[int, int, int], int], src_fd: int, dst_fd: int, size: int) -> bool:
+    """
+    Copy `size` bytes between two file descriptors with a kernel copy primitive.
+
+    Some filesystems make the primitive return 0 instead of failing; before any byte was
+    copied this counts as unsupported, after some bytes as a short copy.
+
+    :return: True if the whole file was copied, False if the primitive is unsupported before any byte was copied.
+    :raises OSError: If the copy stops before `size` bytes.
+    """
+    copied: int = 0
+    while copied < size:
+        try:
+            sent: int = copy_func(src_fd, dst_fd, min(_COPY_CHUNK_SIZE, size - copied))
+        except OSError as e:
+            if copied == 0 and e.errno in _FAST_COPY_UNSUPPORTED_ERRNOS:
+                return False
+            raise
+        if sent == 0:
+            if copied == 0:
+                return False
+            raise OSError(errno.EIO, f"Short copy: {copied} of {size} bytes")
+        copied += sent
+    return True
+
+def _copy_file(src_path: str, dst_path: str) -> None:
+    """
+    Copy a file's content and metadata, using `os.copy_file_range` or `os.sendfile` where the platform has them.
+    """
+    with open(src_path, 'rb') as fsrc, open(dst_path, 'wb') as fdst:
+        size: int = os.fstat(fsrc.fileno()).st_size
+        copied: bool = False
+        if hasattr(os, 'copy_file_range'):
+            copied = _kernel_copy(os.copy_file_range, fsrc.fileno(), fdst.fileno(), size)
+        if not copied and hasattr(os, 'sendfile') and os.name == 'posix':
+            copied = _kernel_copy(lambda src_fd, dst_fd, count: os.sendfile(dst_fd, src_fd, None, count), fsrc.fileno(), fdst.fileno(), size)
+        if not copied:
+            shutil.copyfileobj(fsrc, fdst, _COPY_CHUNK_SIZE)
+    shutil.copystat(src_path, dst_path)
+
+def _move_across_devices(src_path: str, dst_path: str) -> None:
+    """
+    Move a file to another device: copy it, then remove the source once the copy has its size. A partial copy is removed on failure.
+    """
+    count_op(COPY_OP)
+    try:
+        _copy_file(src_path, dst_path)
+        src_size: int = os.stat(src_path).st_size
+        dst_size: int = os.stat(dst_path).st_size
+        if dst_size != src_size:
+            raise OSError(errno.EIO, f"Copied {dst_size} of {src_size} bytes, keeping the source", src_path)
+    except BaseException:
+        if os.path.lexists(dst_path):
+            os.remove(dst_path)
+        raise
+    os.remove(src_path)
+
+def _move_file(src_path: str, dst_path: str, same_device: bool) -> None:
+    """
+    Rename a file, or copy it then remove it when it goes to another device.
+    """
+    if same_device:
+        count_op(RENAME_OP)
+        try:
+            os.rename(src_path, dst_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            _move_across_devices(src_path, dst_path)
+    else:
+        _move_across_devices(src_path, dst_path)
+
+def _move_one(src_path: str, dst_path: str, same_device: bool, on_moved: Optional[Callable[[str, str], None]], limiter: Optional[AdaptiveLimiter] = None) -> bool:
+    """
+    Move one file, logging the outcome; the move takes a slot of `limiter` if given.
+
+    :return: Whether the file was moved.
+    """
+    try:
+        with limiter.slot() if limiter is not None else nullcontext():
+            _move_file(src_path, dst_path, same_device)
+    except Exception as e:
+        _file_logger.error("Failed to move %s to %s: %s", src_path, dst_path, e)
+        return False
+    _file_logger.info("Moved: %s -> %s", src_path, dst_path)
+    if on_moved is not None:
+        # The file is moved whatever the callback does, so its errors do not make it fail
+        try:
+            on_moved(src_path, dst_path)
+        except Exception as e:
+            _file_logger.error("Moved %s to %s, but its callback failed: %s", src_path, dst_path, e)
+    return True
+
+def _rename_chunk(moves: List[Tuple[str, str]], on_moved: Optional[Callable[[str, str], None]], limiter: Optional[AdaptiveLimiter] = None) -> Tuple[int, int]:
+    """
+    Rename the files of one chunk sequentially.
+
+    :return: A tuple of (moved count, failed count).
+    """
+    moved_cnt: int = sum(1 for src_path, dst_path in moves if _move_one(src_path, dst_path, True, on_moved, limiter))
+    return moved_cnt, len(moves) - moved_cnt
+
+def move_files(moves: List[Tuple[str, str]], max_workers: int = DEFAULT_MOVE_WORKERS, on_moved: Optional[Callable[[str, str], None]] = None, rename_workers: int = 1) -> Tuple[int, int]:
+    """
+    Move files, renaming in place when possible and copying on a thread pool otherwise.
+
+    The device of every source and destination directory is checked once. Moves within one
+    device are plain `os.rename` calls, done in order on the calling thread (or in chunks on
+    `rename_workers` threads); moves across devices are copied concurrently on up to
+    `max_workers` threads. With adaptive I/O enabled, the move limiter replaces both thread
+    counts, so renames also run concurrently.
+
+    :param moves: List of (source path, destination path) tuples; destinations are final names.
+    :param max_workers: Maximum number of cross-device copies running concurrently.
+    :param on_moved: Optional callback invoked with (source path, destination path) of each moved file; its errors are logged, the file still counts as moved.
+    :param rename_workers: Number of threads renaming files within one device (1: in order on the calling thread).
+    :return: A tuple of (moved count, failed count).
+    """
+    device_cache: Dict[str, int] = {}
+    moved_cnt: int = 0
+    failed_cnt: int = 0
+    same_device_moves: List[Tuple[str, str]] = []
+    cross_device_moves: List[Tuple[str, str]] = []
+
+    for src_path, dst_path in moves:
+        src_device: int = _device_of(os.path.dirname(src_path), device_cache)
+        dst_device: int = _device_of(os.path.dirname(dst_path), device_cache)
+        if src_device != -1 and src_device == dst_device:
+            same_device_moves.append((src_path, dst_path))
+        else:
+            cross_device_moves.append((src_path, dst_path))
+
+    limiter: Optional[AdaptiveLimiter] = get_io_limiter(MOVE_IO)
+    if limiter is not None:
+        max_workers = rename_workers = limiter.max_limit
+
+    if rename_workers > 1 and len(same_device_moves) > 1:
+        chunk_size: int = -(-len(same_device_moves) // (4 * rename_workers))
+        with ThreadPoolExecutor(max_workers=rename_workers, thread_name_prefix="renamer") as executor:
+            futures: List[Future] = [executor.submit(_rename_chunk, same_device_moves[start:start + chunk_size], on_moved, limiter) for start in range(0, len(same_device_moves), chunk_size)]
+            for future in futures:
+                chunk_moved_cnt, chunk_failed_cnt = future.result()
+                moved_cnt += chunk_moved_cnt
+                failed_cnt += chunk_failed_cnt
+    else:
+        chunk_moved_cnt, chunk_failed_cnt = _rename_chunk(same_device_moves, on_moved, limiter)
+        moved_cnt += chunk_moved_cnt
+        failed_cnt += chunk_failed_cnt
+
+    if cross_device_moves:
+        logging.info(f"Copying {len(cross_device_moves)} files across devices...")
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="mover") as executor:
+            futures: List[Future] = [executor.submit(_move_one, src_path, dst_path, False, on_moved, limiter) for src_path, dst_path in cross_device_moves]
+            for future in futures:
+                if future.result():
+                    moved_cnt += 1
+                else:
+                    failed_cnt += 1
+
+    return moved_cnt, failed_cnt
+
+def move_files_streaming(moves: Iterable[Tuple[str, str]], max_workers: int = DEFAULT_MOVE_WORKERS, on_moved: Optional[Callable[[str, str], None]] = None, max_pending: int = DEFAULT_MAX_PENDING_MOVES) -> Tuple[int, int]:
+    """
+    Move files as `moves` produces them, on `max_workers` threads fed through a bounded queue.
+
+    Unlike `move_files`, the moves are never collected: the first file is moved as soon as it
+    is produced, and a producer faster than the workers waits once `max_pending` moves are
+    queued, so memory does not grow with the number of moves. Renames and cross-device copies
+    share the same workers. With adaptive I/O enabled, the move limiter replaces `max_workers`.
+
+    :param moves: Iterable of (source path, destination path) tuples; destinations are final names.
+    :param max_workers: Number of threads moving files concurrently.
+    :param on_moved: Optional callback invoked with (source path, destination path) of each moved file.
+    :param max_pending: Maximum number of moves waiting for a worker.
+    :return: A tuple of (moved count, failed count).
+    """
+    limiter: Optional[AdaptiveLimiter] = get_io_limiter(MOVE_IO)
+    if limiter is not None:
+        max_workers = limiter.max_limit
+    pending: queue.Queue = queue.Queue(maxsize=max(1, max_pending))
+    # (moved count, failed count) of every worker
+    worker_counts: List[List[int]] = [[0, 0] for _ in range(max(1, max_workers))]
+
+    def _work(counts: List[int]) -> None:
+        while True:
+            move: Optional[Tuple[str, str, bool]] = pending.get()
+            if move is None:
+                return
+            counts[0 if _move_one(*move, on_moved, limiter) else 1] += 1
+
+    workers: List[threading.Thread] = [threading.Thread(target=_work, args=(counts,), name=f"mover-{i}", daemon=True) for i, counts in enumerate(worker_counts)]
+    for worker in workers:
+        worker.start()
+    # The moves come directory by directory: forget the devices of past directories, so the cache stays small
+    device_cache: Dict[str, int] = {}
+    try:
+        for src_path, dst_path in moves:
+            src_dir: str = os.path.dirname(src_path)
+            if src_dir not in device_cache and len(device_cache) > 64:
+                device_cache.clear()
+            src_device: int = _device_of(src_dir, device_cache)
+            dst_device: int = _device_of(os.path.dirname(dst_path), device_cache)
+            pending.put((src_path, dst_path, src_device != -1 and src_device == dst_device))
+    finally:
+        # Let the workers finish the queued moves, even if producing the moves failed
+        for _ in workers:
+            pending.put(None)
+        for worker in workers:
+            worker.join()
+    return sum(counts[0] for counts in worker_counts), sum(counts[1] for counts in worker_counts)
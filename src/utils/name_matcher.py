@@ -0,0 +1,75 @@
+import re
+from typing import Any, Dict, Iterable, Optional, Pattern
+
+
+# Marks the end of a prefix in a trie node
+_END = ''
+
+class PrefixTrie:
+    """
+    Case-insensitive prefix test against many prefixes at once.
+
+    A name is walked character by character down a trie of the lowercased prefixes, so the
+    cost of a test only depends on the length of the longest prefix, not on how many prefixes
+    there are (unlike `str.startswith` with a tuple, which tries them one by one).
+    """
+
+    def __init__(self, prefixes: Iterable[str]):
+        self._root: Dict[str, Any] = {}
+        for prefix in prefixes:
+            node: Dict[str, Any] = self._root
+            for char in prefix.lower():
+                node = node.setdefault(char, {})
+            node[_END] = True
+
+    def matches(self, name: str) -> bool:
+        """
+        Return whether `name` starts with any of the prefixes, ignoring case.
+        """
+        node: Optional[Dict[str, Any]] = self._root
+        for char in name.lower():
+            if _END in node:
+                return True
+            node = node.get(char)
+            if node is None:
+                return False
+        return _END in node
+
+class NameMatcher:
+    """
+    Normalization of file names (without extensions) into the keys JPG and RAW files are matched on.
+
+    The rules are compiled once: the suffix patterns (regular expressions matched
+    case-insensitively at the end of the name, e.g. '-Edit' or r' \\(\\d+\\)') are joined into a
+    single expression removing any run of them, then the name is case-folded if asked to. Every
+    name therefore costs one regular expression search and one `casefold`, however many rules
+    there are. The default matcher keeps names unchanged (exact, case-sensitive matching).
+    """
+
+    def __init__(self, case_fold: bool = False, suffix_patterns: Iterable[str] = ()):
+        suffix_patterns = list(suffix_patterns)
+        self.case_fold: bool = case_fold
+        self._suffix_regex: Optional[Pattern[str]] = re.compile(
+            '(?:' + '|'.join(f'(?:{pattern})' for pattern in suffix_patterns) + ')+$', re.IGNORECASE
+        ) if suffix_patterns else None
+
+    @property
+    def is_identity(self) -> bool:
+        """
+        Whether every name is its own key.
+        """
+        return not self.case_fold and self._suffix_regex is None
+
+    def key(self, name: str) -> str:
+        """
+        Return the matching key of a file name without extension (e.g., 'DSC_0001-Edit' -> 'dsc_0001').
+        """
+        if self._suffix_regex is not None:
+            match = self._suffix_regex.search(name)
+            # A name made only of suffixes is kept whole
+            if match is not None and match.start() > 0:
+                name = name[:match.start()]
+        return name.casefold() if self.case_fold else name
+
+# Matcher of the scripts when no normalization rule is configured
+EXACT_NAME_MATCHER = NameMatcher()
@@ -0,0 +1,166 @@
+from array import array
+from bisect import bisect_left
+from collections.abc import Set as AbstractSet
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
+
+
+_DIGITS = '0123456789'
+
+# Counters of at most this many digits may be stored as a bitmap of every possible value
+# (125 KB for 6 digits), once their sorted array would be larger; longer counters always stay
+# in a sorted array of integers.
+BITMAP_MAX_WIDTH = 6
+# Counters longer than this do not fit in an unsigned 64-bit integer and are kept as strings
+_MAX_WIDTH = 19
+
+def _split_name(name: str) -> Optional[Tuple[str, str]]:
+    """
+    Split a name into its prefix and its trailing counter (e.g., 'DSC_0042' -> ('DSC_', '0042')).
+
+    :return: The (prefix, counter digits) tuple, or None if the name does not end with a counter.
+    """
+    prefix: str = name.rstrip(_DIGITS)
+    digits: str = name[len(prefix):]
+    if not digits or len(digits) > _MAX_WIDTH or not digits.isascii():
+        return None
+    return prefix, digits
+
+def _bitmap_nbytes(width: int) -> int:
+    return (10 ** width + 7) // 8
+
+class _BitmapBucket:
+    """
+    Counters of one (prefix, width) key, one bit per possible value.
+    """
+    __slots__ = ('bits', 'count')
+
+    def __init__(self, width: int):
+        self.bits = bytearray(_bitmap_nbytes(width))
+        self.count: int = 0
+
+    def add(self, value: int) -> None:
+        mask: int = 1 << (value & 7)
+        if not self.bits[value >> 3] & mask:
+            self.bits[value >> 3] |= mask
+            self.count += 1
+
+    def __contains__(self, value: int) -> bool:
+        return bool(self.bits[value >> 3] & (1 << (value & 7)))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[int]:
+        for byte_index, byte in enumerate(self.bits):
+            if byte:
+                for bit in range(8):
+                    if byte & (1 << bit):
+                        yield (byte_index << 3) | bit
+
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+class _SortedBucket:
+    """
+    Counters of one (prefix, width) key, in a sorted array of unsigned 64-bit integers.
+
+    Added values are buffered and merged (sorted, deduplicated) on the next lookup; `values`
+    and `pending` together hold every value added (duplicates included until merged).
+    """
+    __slots__ = ('values', 'pending')
+
+    def __init__(self):
+        self.values = array('Q')
+        self.pending = array('Q')
+
+    def add(self, value: int) -> None:
+        self.pending.append(value)
+
+    def _merge(self) -> None:
+        if self.pending:
+            merged = sorted(set(self.values) | set(self.pending))
+            self.values = array('Q', merged)
+            self.pending = array('Q')
+
+    def __contains__(self, value: int) -> bool:
+        self._merge()
+        index: int = bisect_left(self.values, value)
+        return index < len(self.values) and self.values[index] == value
+
+    def __len__(self) -> int:
+        self._merge()
+        return len(self.values)
+
+    def __iter__(self) -> Iterator[int]:
+        self._merge()
+        return iter(self.values)
+
+    def nbytes(self) -> int:
+        return (len(self.values) + len(self.pending)) * self.values.itemsize
+
+class CompactNameSet(AbstractSet):
+    """
+    Set of file names stored compactly, for multi-million-name JPG indexes.
+
+    Camera file names are a prefix plus a zero-padded counter (e.g., 'DSC_0042'). Such names
+    are stored as an integer in a per-(prefix, counter width) bucket. Every bucket starts as a
+    sorted array (8 bytes per name), and becomes a bitmap of every possible counter once the
+    array would be larger than the bitmap, for counters of up to `BITMAP_MAX_WIDTH` digits; so
+    sparse keys, like date-stamped names with one prefix per day, never pay for a whole bitmap.
+    Other names fall back to a plain string set. Membership is exact, like a `set` of the same
+    names.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._buckets: Dict[Tuple[str, int], object] = {}
+        self._irregular_names: Set[str] = set()
+        self.update(names)
+
+    def add(self, name: str) -> None:
+        split: Optional[Tuple[str, str]] = _split_name(name)
+        if split is None:
+            self._irregular_names.add(name)
+            return
+        prefix, digits = split
+        key: Tuple[str, int] = (prefix, len(digits))
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _SortedBucket()
+            self._buckets[key] = bucket
+        bucket.add(int(digits))
+        if len(digits) <= BITMAP_MAX_WIDTH and isinstance(bucket, _SortedBucket) and bucket.nbytes() > _bitmap_nbytes(len(digits)):
+            # The array outgrew the bitmap of its key: switch to the bitmap
+            bitmap_bucket = _BitmapBucket(len(digits))
+            for values in (bucket.values, bucket.pending):
+                for value in values:
+                    bitmap_bucket.add(value)
+            self._buckets[key] = bitmap_bucket
+
+    def update(self, names: Iterable[str]) -> None:
+        for name in names:
+            self.add(name)
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        split: Optional[Tuple[str, str]] = _split_name(name)
+        if split is None:
+            return name in self._irregular_names
+        prefix, digits = split
+        bucket = self._buckets.get((prefix, len(digits)))
+        return bucket is not None and int(digits) in bucket
+
+    def __len__(self) -> int:
+        return len(self._irregular_names) + sum(len(bucket) for bucket in self._buckets.values())
+
+    def __iter__(self) -> Iterator[str]:
+        for (prefix, width), bucket in self._buckets.items():
+            for value in bucket:
+                yield f"{prefix}{value:0{width}d}"
+        yield from self._irregular_names
+
+    def nbytes(self) -> int:
+        """
+        Approximate memory held by the encoded names (bitmaps and arrays; irregular names excluded).
+        """
+        return sum(bucket.nbytes() for bucket in self._buckets.values())
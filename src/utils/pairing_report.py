@@ -0,0 +1,174 @@
+import io
+import os
+import csv
+import gzip
+import queue
+import logging
+import threading
+from typing import AbstractSet, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.utils.walker import DEFAULT_WALK_WORKERS, scandir_walk
+from src.utils.name_set import CompactNameSet
+from src.utils.name_matcher import EXACT_NAME_MATCHER, NameMatcher, PrefixTrie
+
+
+# Columns of the pairing report: one row per JPG/RAW file, and one row per folder after its files
+REPORT_COLUMNS = ('tree', 'folder', 'name', 'status', 'paired_cnt', 'orphan_cnt')
+JPG_TREE = 'jpg'
+RAW_TREE = 'raw'
+PAIRED_STATUS = 'paired'
+ORPHAN_STATUS = 'orphan'
+FOLDER_STATUS = 'folder'
+
+PAIRED_JPG_CNT = 'paired_jpg_cnt'
+ORPHAN_JPG_CNT = 'orphan_jpg_cnt'
+PAIRED_RAW_CNT = 'paired_raw_cnt'
+ORPHAN_RAW_CNT = 'orphan_raw_cnt'
+REPORT_ROW_CNT = 'report_row_cnt'
+
+DEFAULT_REPORT_BATCH_ROWS = 4096
+DEFAULT_REPORT_MAX_PENDING_BATCHES = 16
+
+class ReportWriter:
+    """
+    CSV writer running on a background thread, compressed with gzip when the path ends with '.gz'.
+
+    Rows are handed over in batches through a bounded queue, so at most about
+    `batch_rows` * (`max_pending_batches` + 1) rows are held in memory: a producer faster than
+    the disk (or the compression) waits instead of buffering the whole report. The file is
+    written under a temporary name and renamed on `close`, so readers never see a partial report.
+    """
+
+    def __init__(self, report_abs_path: str, columns: Tuple[str, ...], batch_rows: int = DEFAULT_REPORT_BATCH_ROWS, max_pending_batches: int = DEFAULT_REPORT_MAX_PENDING_BATCHES):
+        self.report_abs_path: str = report_abs_path
+        self.row_cnt: int = 0
+        self._tmp_path: str = f"{report_abs_path}.tmp"
+        self._batch_rows: int = batch_rows
+        self._batch: List[Tuple[Any, ...]] = []
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending_batches)
+        self._error: Optional[BaseException] = None
+        os.makedirs(os.path.dirname(os.path.abspath(report_abs_path)), exist_ok=True)
+        raw_file = gzip.open(self._tmp_path, 'wb') if report_abs_path.lower().endswith('.gz') else open(self._tmp_path, 'wb')
+        self._file = io.TextIOWrapper(raw_file, encoding='utf-8', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+        self._thread = threading.Thread(target=self._write_batches, name="report-writer", daemon=True)
+        self._thread.start()
+
+    def _write_batches(self) -> None:
+        while True:
+            batch: Optional[List[Tuple[Any, ...]]] = self._queue.get()
+            if batch is None:
+                return
+            if self._error is None:
+                try:
+                    self._writer.writerows(batch)
+                except BaseException as e:
+                    # Keep draining the queue, so the producer never blocks on a dead writer
+                    self._error = e
+
+    def write_row(self, row: Tuple[Any, ...]) -> None:
+        self._batch.append(row)
+        self.row_cnt += 1
+        if len(self._batch) >= self._batch_rows:
+            self._queue.put(self._batch)
+            self._batch = []
+
+    def close(self) -> None:
+        """
+        Write the remaining rows, then publish the report under its final name.
+
+        :raises OSError: If writing the report failed.
+        """
+        if self._batch:
+            self._queue.put(self._batch)
+            self._batch = []
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+        if self._error is not None:
+            raise self._error
+        os.replace(self._tmp_path, self.report_abs_path)
+
+class PairingReport:
+    """
+    Streaming report of which camera JPG and RAW files have a counterpart, with counts per folder.
+
+    RAW files are reported as they stream through `tap_raw_files`, JPG files by a second
+    streaming walk of the JPG directory in `report_jpg_files` (a JPG is paired when a RAW file
+    with its name was seen). Folders and names are relative to their directory; names are
+    compared as keys of `matcher`.
+    """
+
+    def __init__(self, report_abs_path: str, jpg_dir_abs_path: str, raw_dir_abs_path: str, compact_names: bool = False, matcher: NameMatcher = EXACT_NAME_MATCHER):
+        self.jpg_dir_abs_path: str = jpg_dir_abs_path
+        self.raw_dir_abs_path: str = raw_dir_abs_path
+        self._matcher: NameMatcher = matcher
+        self._writer = ReportWriter(report_abs_path, REPORT_COLUMNS)
+        self._raw_names: AbstractSet[str] = CompactNameSet() if compact_names else set()
+        self._counts: Dict[str, int] = {PAIRED_JPG_CNT: 0, ORPHAN_JPG_CNT: 0, PAIRED_RAW_CNT: 0, ORPHAN_RAW_CNT: 0}
+
+    def _write_folder(self, tree: str, root_abs_path: str, dirpath: str, names: List[Tuple[str, bool]]) -> None:
+        folder: str = os.path.relpath(dirpath, root_abs_path)
+        paired_cnt: int = 0
+        for name, paired in names:
+            paired_cnt += paired
+            self._writer.write_row((tree, folder, name, PAIRED_STATUS if paired else ORPHAN_STATUS, '', ''))
+        self._writer.write_row((tree, folder, '', FOLDER_STATUS, paired_cnt, len(names) - paired_cnt))
+        self._counts[PAIRED_JPG_CNT if tree == JPG_TREE else PAIRED_RAW_CNT] += paired_cnt
+        self._counts[ORPHAN_JPG_CNT if tree == JPG_TREE else ORPHAN_RAW_CNT] += len(names) - paired_cnt
+
+    def tap_raw_files(self, raw_files: Iterable[Tuple[str, str]], jpg_names: AbstractSet[str]) -> Iterator[Tuple[str, str]]:
+        """
+        Report the RAW files passing through, unchanged, to whatever decides on them.
+
+        The RAW files of one folder are expected to come together, as `iter_raw_files` yields them.
+
+        :param raw_files: Iterable of (directory path, file name) tuples of RAW files.
+        :param jpg_names: Set of camera JPG/JPEG file names (without extensions), as keys of the matcher.
+        :return: Iterator over the same tuples.
+        """
+        dirpath: Optional[str] = None
+        names: List[Tuple[str, bool]] = []
+        for root, filename in raw_files:
+            if root != dirpath:
+                if dirpath is not None:
+                    self._write_folder(RAW_TREE, self.raw_dir_abs_path, dirpath, names)
+                dirpath, names = root, []
+            name: str = self._matcher.key(os.path.splitext(filename)[0])
+            self._raw_names.add(name)
+            names.append((filename, name in jpg_names))
+            yield root, filename
+        if dirpath is not None:
+            self._write_folder(RAW_TREE, self.raw_dir_abs_path, dirpath, names)
+
+    def report_jpg_files(self, camera_file_prefixs: List[str], jpg_exts: List[str], walk_workers: int = DEFAULT_WALK_WORKERS) -> None:
+        """
+        Walk the JPG directory again and report every camera JPG/JPEG file, once every RAW file has been tapped.
+
+        :param camera_file_prefixs: List of camera file prefixes to filter the files.
+        :param jpg_exts: List of file extensions to consider (e.g., ['.jpg', '.jpeg']).
+        :param walk_workers: Number of threads listing directories concurrently.
+        """
+        camera_prefix_trie = PrefixTrie(camera_file_prefixs)
+        jpg_exts: Tuple[str] = tuple(ext.lower() for ext in jpg_exts)
+        for dirpath, entries in scandir_walk(self.jpg_dir_abs_path, max_workers=walk_workers):
+            names: List[Tuple[str, bool]] = []
+            for entry in entries:
+                if not entry.name.lower().endswith(jpg_exts):
+                    continue
+                name: str = os.path.splitext(entry.name)[0]
+                if camera_prefix_trie.matches(name):
+                    names.append((entry.name, self._matcher.key(name) in self._raw_names))
+            if names:
+                self._write_folder(JPG_TREE, self.jpg_dir_abs_path, dirpath, names)
+
+    def close(self) -> Dict[str, int]:
+        """
+        Finish writing the report.
+
+        :return: A dictionary containing 'paired_jpg_cnt', 'orphan_jpg_cnt', 'paired_raw_cnt', 'orphan_raw_cnt' and 'report_row_cnt'.
+        """
+        self._writer.close()
+        logging.info(f"Pairing report written to: {self._writer.report_abs_path}")
+        return {**self._counts, REPORT_ROW_CNT: self._writer.row_cnt}
@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from src.utils.metrics import RENAME_OP, count_op, write_atomically
+from src.config.logging_config import get_file_logger
+
+
+TRASH_DELETE_BACKEND = 'trash'
+QUARANTINE_DELETE_BACKEND = 'quarantine'
+
+# Quarantined files sit below this directory of the RAW root, one dated batch directory per run
+QUARANTINE_DIR_NAME = '.quarantine'
+QUARANTINE_MANIFEST_NAME = 'manifest.json'
+
+RESTORED_RAW_CNT = 'restored_raw_cnt'
+FAILED_RESTORE_RAW_CNT = 'failed_restore_raw_cnt'
+CONFLICT_RESTORE_RAW_CNT = 'conflict_restore_raw_cnt'
+
+_file_logger = get_file_logger()
+
+def quarantine_root(raw_dir_abs_path: str) -> str:
+    """
+    Return the quarantine directory of a RAW root, which RAW scans must skip.
+    """
+    return os.path.join(raw_dir_abs_path, QUARANTINE_DIR_NAME)
+
+class QuarantineDeleter:
+    """
+    Deletion backend renaming files into a dated quarantine directory at the RAW root.
+
+    Every deletion is a single same-volume `os.rename` keeping the path relative to the RAW
+    root, so it never copies data and can be undone with `restore_quarantine`. A file whose
+    rename would cross volumes (a mount point below the RAW root) fails instead of being
+    copied. Call it from any number of threads, then `close` once to write the manifest of
+    the whole batch.
+    """
+
+    # Where the deleted files go, for the log lines of `delete_files`
+    destination: str = "quarantine"
+
+    def __init__(self, raw_dir_abs_path: str):
+        self.raw_root: str = os.path.abspath(raw_dir_abs_path)
+        batch_name: str = time.strftime('%Y%m%d-%H%M%S')
+        batch_dir: str = os.path.join(quarantine_root(self.raw_root), batch_name)
+        suffix: int = 1
+        while os.path.lexists(batch_dir):
+            batch_dir = os.path.join(quarantine_root(self.raw_root), f"{batch_name}-{suffix}")
+            suffix += 1
+        self.batch_dir: str = batch_dir
+        self._relpaths: List[str] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, abs_path: str) -> None:
+        relpath: str = os.path.relpath(os.path.abspath(abs_path), self.raw_root)
+        if relpath.startswith(os.pardir + os.sep):
+            raise ValueError(f"Not below the RAW directory: {abs_path}")
+        quarantined_path: str = os.path.join(self.batch_dir, relpath)
+        os.makedirs(os.path.dirname(quarantined_path), exist_ok=True)
+        # os.rename would silently replace an existing file on POSIX
+        if os.path.lexists(quarantined_path):
+            raise FileExistsError(f"Already quarantined: {quarantined_path}")
+        count_op(RENAME_OP)
+        os.rename(abs_path, quarantined_path)
+        with self._lock:
+            self._relpaths.append(relpath)
+
+    def close(self) -> None:
+        """
+        Write the manifest listing every quarantined file of the batch (nothing if none was).
+        """
+        with self._lock:
+            relpaths: List[str] = sorted(self._relpaths)
+        if not relpaths:
+            return
+        manifest: Dict[str, object] = {'raw_root': self.raw_root, 'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'files': relpaths}
+        write_atomically(os.path.join(self.batch_dir, QUARANTINE_MANIFEST_NAME), json.dumps(manifest, ensure_ascii=False))
+        logging.info(f"Quarantined {len(relpaths)} files in: {self.batch_dir}")
+
+def list_quarantine_batches(raw_dir_abs_path: str) -> List[str]:
+    """
+    Return the names of the quarantine batches of a RAW root, oldest first.
+    """
+    root: str = quarantine_root(raw_dir_abs_path)
+    if not os.path.isdir(root):
+        return []
+    return sorted(entry.name for entry in os.scandir(root) if entry.is_dir(follow_symlinks=False))
+
+def _quarantined_relpaths(batch_dir: str) -> List[str]:
+    """
+    Read the manifest of a batch, or list the batch directory when an interrupted run left no manifest.
+    """
+    manifest_path: str = os.path.join(batch_dir, QUARANTINE_MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)['files']
+    logging.warning(f"No quarantine manifest in {batch_dir}, restoring every file found there.")
+    relpaths: List[str] = []
+    for dirpath, _, filenames in os.walk(batch_dir):
+        relpaths.extend(os.path.relpath(os.path.join(dirpath, filename), batch_dir) for filename in filenames)
+    return sorted(relpaths)
+
+def restore_quarantine(raw_dir_abs_path: str, batch_name: Optional[str] = None) -> Dict[str, int]:
+    """
+    Move every file of a quarantine batch back to its original place, replaying the batch manifest.
+
+    Files whose original path is taken again are left in quarantine. The batch directory is
+    removed once it is empty.
+
+    :param raw_dir_abs_path: Absolute path of the RAW root the batch was quarantined from.
+    :param batch_name: Name of the batch (None: the latest one).
+    :return: A dictionary containing:
+        - 'restored_raw_cnt': Number of files moved back.
+        - 'failed_restore_raw_cnt': Number of files that failed to move back.
+        - 'conflict_restore_raw_cnt': Number of files left in quarantine because their original path is taken.
+    :raises FileNotFoundError: If there is no such batch.
+    """
+    raw_root: str = os.path.abspath(raw_dir_abs_path)
+    batches: List[str] = list_quarantine_batches(raw_root)
+    if batch_name is None and batches:
+        batch_name = batches[-1]
+    if batch_name is None or batch_name not in batches:
+        raise FileNotFoundError(f"No quarantine batch {batch_name or ''} in: {quarantine_root(raw_root)}")
+    batch_dir: str = os.path.join(quarantine_root(raw_root), batch_name)
+
+    restored_cnt: int = 0
+    failed_cnt: int = 0
+    conflict_cnt: int = 0
+    for relpath in _quarantined_relpaths(batch_dir):
+        if relpath == QUARANTINE_MANIFEST_NAME:
+            continue
+        quarantined_path: str = os.path.join(batch_dir, relpath)
+        original_path: str = os.path.join(raw_root, relpath)
+        if not os.path.lexists(quarantined_path):
+            # Already restored by an interrupted restore
+            continue
+        if os.path.lexists(original_path):
+            conflict_cnt += 1
+            _file_logger.warning("Not restoring RAW file: %s, its original path is taken.", relpath)
+            continue
+        count_op(RENAME_OP)
+        try:
+            os.makedirs(os.path.dirname(original_path), exist_ok=True)
+            os.rename(quarantined_path, original_path)
+            restored_cnt += 1
+            _file_logger.info("Restored RAW file: %s", relpath)
+        except OSError as e:
+            failed_cnt += 1
+            _file_logger.error("Failed to restore RAW file: %s. Error: %s", relpath, e)
+
+    if failed_cnt == 0 and conflict_cnt == 0:
+        # Drop the manifest and the emptied directories of the batch
+        manifest_path: str = os.path.join(batch_dir, QUARANTINE_MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        for dirpath, _, _ in sorted(os.walk(batch_dir), key=lambda item: len(item[0]), reverse=True):
+            try:
+                os.rmdir(dirpath)
+            except OSError:
+                pass
+    logging.info(f"Restored {restored_cnt} files from quarantine batch {batch_name} ({failed_cnt} failed, {conflict_cnt} left because their path is taken).")
+
+    return {
+        RESTORED_RAW_CNT: restored_cnt,
+        FAILED_RESTORE_RAW_CNT: failed_cnt,
+        CONFLICT_RESTORE_RAW_CNT: conflict_cnt,
+    }
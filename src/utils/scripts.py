@@ -1,8 +1,16 @@
 import os
 import logging
-from typing import Set, Tuple, Dict, List
+import threading
+from typing import AbstractSet, Set, Tuple, Dict, List, Iterable, Iterator, Callable, Optional
 
-from send2trash import send2trash
+from src.utils.walker import DEFAULT_WALK_WORKERS, scandir_walk
+from src.utils.deleter import DEFAULT_DELETE_WORKERS, DEFAULT_DELETE_BATCH_SIZE, delete_files
+from src.utils.name_set import CompactNameSet
+from src.utils.name_matcher import EXACT_NAME_MATCHER, NameMatcher, PrefixTrie
+from src.utils.sidecars import SidecarIndex, sidecar_owner_paths
+from src.utils.mover import DEFAULT_MOVE_WORKERS, move_files
+from src.utils.quarantine import quarantine_root
+from src.config.logging_config import get_file_logger
 
 
 TOTAL_JPG_CNT = 'total_jpg_cnt'
@@ -12,6 +20,18 @@ UNIQUE_CAMERA_JPG_CNT = 'unique_camera_jpg_cnt'
 KEPT_RAW_CNT = 'kept_raw_cnt'
 DELETED_RAW_CNT = 'deleted_raw_cnt'
 FAILED_DELETE_RAW_CNT = 'failed_delete_raw_cnt'
+WOULD_DELETE_RAW_CNT = 'would_delete_raw_cnt'
+
+DELETED_SIDECAR_CNT = 'deleted_sidecar_cnt'
+FAILED_DELETE_SIDECAR_CNT = 'failed_delete_sidecar_cnt'
+WOULD_DELETE_SIDECAR_CNT = 'would_delete_sidecar_cnt'
+
+AMBIGUOUS_CAMERA_JPG_CNT = 'ambiguous_camera_jpg_cnt'
+MOVED_RAW_CNT = 'moved_raw_cnt'
+FAILED_MOVE_RAW_CNT = 'failed_move_raw_cnt'
+CONFLICT_RAW_CNT = 'conflict_raw_cnt'
+
+_file_logger = get_file_logger()
 
 def assert_abs_paths_exist(abs_paths: List[str]) -> None:
     """
@@ -25,33 +45,38 @@ def assert_abs_paths_exist(abs_paths: List[str]) -> None:
             logging.error(f"Path does not exist: {abs_path}")
             raise AssertionError(f"Path does not exist: {abs_path}")
 
-def gather_camera_jpg_names(jpg_dir_abs_path: str, camera_file_prefixs: List[str], jpg_exts: List[str], if_logging: bool=True) -> Tuple[Set[str], Dict[str, int]]:
+def gather_camera_jpg_names(jpg_dir_abs_path: str, camera_file_prefixs: List[str], jpg_exts: List[str], if_logging: bool=True, walk_workers: int=DEFAULT_WALK_WORKERS, compact_names: bool=False, matcher: NameMatcher=EXACT_NAME_MATCHER) -> Tuple[AbstractSet[str], Dict[str, int]]:
     """
     Recursively gather all JPG/JPEG file names (without extensions) in the specified directory.
 
     :param jpg_dir_abs_path: Absolute path to the directory containing JPG files.
     :param camera_file_prefixs: List of camera file prefixes to filter the files.
     :param jpg_exts: List of file extensions to consider (e.g., ['.jpg', '.jpeg']).
+    :param if_logging: Whether to log every camera JPG/JPEG file found.
+    :param walk_workers: Number of threads listing directories concurrently.
+    :param compact_names: Whether to store the names in a `CompactNameSet` instead of a `set`.
+    :param matcher: Normalization of the names into matching keys (default: names unchanged).
     :return: A tuple containing:
-        - A set of unique file names (without extensions).
+        - A set of unique file names (without extensions), as keys of `matcher`.
         - A dictionary containing more detailed information about the JPG directory:
             - 'total_jpg_cnt': Total number of JPG/JPEG files found (with specific extensions name).
             - 'total_camera_jpg_cnt': Total number of camera JPG/JPEG files found (with specific prefixes).
             - 'unique_camera_jpg_cnt': Number of unique camera JPG/JPEG files found.
     """
     # Preprocess the input parameters
-    camera_file_prefixs: Tuple[str] = tuple(prefix.lower() for prefix in camera_file_prefixs)
+    camera_prefix_trie = PrefixTrie(camera_file_prefixs)
     jpg_exts: Tuple[str] = tuple(ext.lower() for ext in jpg_exts)
 
     # Initialize variables
-    camera_jpg_names: Set[str] = set()
+    camera_jpg_names: AbstractSet[str] = CompactNameSet() if compact_names else set()
     total_jpg_cnt: int = 0
     total_camera_jpg_cnt: int = 0
     unique_camera_jpg_cnt: int = 0
 
     # Start to work on the directory
-    for _1, _2, files in os.walk(jpg_dir_abs_path):
-        for filename in files:
+    for _, entries in scandir_walk(jpg_dir_abs_path, max_workers=walk_workers):
+        for entry in entries:
+            filename: str = entry.name
             # Check the file extension
             if not filename.lower().endswith(jpg_exts):
                 continue
@@ -59,11 +84,11 @@ def gather_camera_jpg_names(jpg_dir_abs_path: str, camera_file_prefixs: List[str
             # Get the file name without extension
             file_name_without_ext = os.path.splitext(filename)[0]
             # Add the file name to the set if it starts with any of the camera prefixes
-            if file_name_without_ext.lower().startswith(camera_file_prefixs):
+            if camera_prefix_trie.matches(file_name_without_ext):
                 total_camera_jpg_cnt += 1
-                camera_jpg_names.add(file_name_without_ext)
+                camera_jpg_names.add(matcher.key(file_name_without_ext))
                 if if_logging:
-                    logging.info(f"Found JPG/JPEG file: {file_name_without_ext}, name added to the set.")
+                    _file_logger.info("Found JPG/JPEG file: %s, name added to the set.", file_name_without_ext)
 
     # Build the detailed information dictionary
     unique_camera_jpg_cnt = len(camera_jpg_names)
@@ -76,59 +101,311 @@ def gather_camera_jpg_names(jpg_dir_abs_path: str, camera_file_prefixs: List[str
     # Return the JPG/JPEG names and the detailed information dictionary
     return camera_jpg_names, detailed_info
 
-def filter_raw_files_by_jpg_names(raw_dir_abs_path: str, raw_exts: List[str], jpg_names: Set[str]) -> Dict[str, int]:
+def gather_camera_jpg_dirs(jpg_dir_abs_path: str, camera_file_prefixs: List[str], jpg_exts: List[str], if_logging: bool=True, walk_workers: int=DEFAULT_WALK_WORKERS, matcher: NameMatcher=EXACT_NAME_MATCHER) -> Tuple[Dict[str, str], Dict[str, int]]:
     """
-    Recursively filter out RAW files in the specified directory that do not have corresponding JPG/JPEG files.
+    Same as `gather_camera_jpg_names`, also recording the folder of every camera JPG/JPEG file.
+
+    When a name is found in several folders, the first folder in sorted order is recorded.
+
+    :param jpg_dir_abs_path: Absolute path to the directory containing JPG files.
+    :param camera_file_prefixs: List of camera file prefixes to filter the files.
+    :param jpg_exts: List of file extensions to consider (e.g., ['.jpg', '.jpeg']).
+    :param if_logging: Whether to log every camera JPG/JPEG file found.
+    :param walk_workers: Number of threads listing directories concurrently.
+    :param matcher: Normalization of the names into matching keys (default: names unchanged).
+    :return: A tuple containing:
+        - A dictionary mapping each unique file name (without extension, as a key of `matcher`) to its folder, relative to `jpg_dir_abs_path`.
+        - A dictionary with the same counts as `gather_camera_jpg_names`, plus:
+            - 'ambiguous_camera_jpg_cnt': Number of names found in more than one folder.
+    """
+    # Preprocess the input parameters
+    camera_prefix_trie = PrefixTrie(camera_file_prefixs)
+    jpg_exts: Tuple[str] = tuple(ext.lower() for ext in jpg_exts)
+
+    # Initialize variables
+    camera_jpg_dirs: Dict[str, str] = {}
+    ambiguous_names: Set[str] = set()
+    total_jpg_cnt: int = 0
+    total_camera_jpg_cnt: int = 0
+
+    # Start to work on the directory
+    for root, entries in scandir_walk(jpg_dir_abs_path, max_workers=walk_workers):
+        relative_dir: str = os.path.relpath(root, jpg_dir_abs_path)
+        for entry in entries:
+            filename: str = entry.name
+            # Check the file extension
+            if not filename.lower().endswith(jpg_exts):
+                continue
+            total_jpg_cnt += 1
+            # Record the folder of the file if it starts with any of the camera prefixes
+            file_name_without_ext = os.path.splitext(filename)[0]
+            if not camera_prefix_trie.matches(file_name_without_ext):
+                continue
+            total_camera_jpg_cnt += 1
+            file_name_without_ext = matcher.key(file_name_without_ext)
+            known_dir: Optional[str] = camera_jpg_dirs.get(file_name_without_ext)
+            if known_dir is None or relative_dir < known_dir:
+                camera_jpg_dirs[file_name_without_ext] = relative_dir
+            if known_dir is not None and known_dir != relative_dir:
+                ambiguous_names.add(file_name_without_ext)
+            if if_logging:
+                _file_logger.info("Found JPG/JPEG file: %s, in folder: %s.", file_name_without_ext, relative_dir)
+
+    for name in sorted(ambiguous_names):
+        _file_logger.warning("Found JPG/JPEG file: %s in several folders, its RAW files go to: %s.", name, camera_jpg_dirs[name])
+
+    # Build the detailed information dictionary
+    detailed_info: Dict[str, int] = {
+        TOTAL_JPG_CNT: total_jpg_cnt,
+        TOTAL_CAMERA_JPG_CNT: total_camera_jpg_cnt,
+        UNIQUE_CAMERA_JPG_CNT: len(camera_jpg_dirs),
+        AMBIGUOUS_CAMERA_JPG_CNT: len(ambiguous_names),
+    }
+
+    # Return the JPG/JPEG folders and the detailed information dictionary
+    return camera_jpg_dirs, detailed_info
+
+def iter_raw_files(raw_dir_abs_path: str, raw_exts: List[str], walk_workers: int=DEFAULT_WALK_WORKERS, sidecars: Optional[SidecarIndex]=None, stop_event: Optional[threading.Event]=None) -> Iterator[Tuple[str, str]]:
+    """
+    Recursively iterate over the RAW files in the specified directory, outside its quarantine directory.
 
     :param raw_dir_abs_path: Path to the directory containing RAW files.
     :param raw_exts: List of file extensions to consider for RAW files (e.g., ['.cr2', '.nef']).
-    :param jpg_names: Set of JPG/JPEG file names (without extensions) to check against.
-    :return: A dictionary containing:
-        - 'kept_raw_cnt': Number of RAW files kept (not deleted).
-        - 'deleted_raw_cnt': Number of RAW files deleted (moved to Recycle Bin).
-        - 'failed_delete_raw_cnt': Number of RAW files that failed to delete.
+    :param walk_workers: Number of threads listing directories concurrently.
+    :param sidecars: Optional sidecar index receiving the sidecars of every folder, from the same listing.
+    :param stop_event: Optional event, checked between directories, that stops the walk once set.
+    :return: Iterator over (directory path, file name) tuples of RAW files.
     """
     # Preprocess the input parameters
     raw_exts: Tuple[str] = tuple(ext.lower() for ext in raw_exts)
 
-    # Initialize variables
+    # Recursively walk through the directory
+    for root, entries in scandir_walk(raw_dir_abs_path, max_workers=walk_workers, skip_dirs={quarantine_root(raw_dir_abs_path)}):
+        # Closing the walk cancels the directory listings that have not started yet
+        if stop_event is not None and stop_event.is_set():
+            return
+        # Check if the file is a RAW file based on its extension
+        raw_filenames: List[str] = [entry.name for entry in entries if entry.name.lower().endswith(raw_exts)]
+        if sidecars is not None:
+            sidecars.add_directory(root, raw_filenames, (entry.name for entry in entries))
+        for filename in raw_filenames:
+            yield root, filename
+
+def collect_raw_files(raw_dir_abs_path: str, raw_exts: List[str], walk_workers: int=DEFAULT_WALK_WORKERS, sidecars: Optional[SidecarIndex]=None, stop_event: Optional[threading.Event]=None) -> List[Tuple[str, str]]:
+    """
+    Recursively collect the RAW files in the specified directory, to decide on them later.
+
+    :param raw_dir_abs_path: Path to the directory containing RAW files.
+    :param raw_exts: List of file extensions to consider for RAW files (e.g., ['.cr2', '.nef']).
+    :param walk_workers: Number of threads listing directories concurrently.
+    :param sidecars: Optional sidecar index receiving the sidecars of every folder, from the same listing.
+    :param stop_event: Optional event, checked between directories, that stops the walk once set.
+    :return: List of (directory path, file name) tuples of RAW files, only partial if stopped.
+    """
+    raw_files: List[Tuple[str, str]] = list(iter_raw_files(raw_dir_abs_path, raw_exts, walk_workers, sidecars, stop_event))
+    if stop_event is not None and stop_event.is_set():
+        logging.info(f"Stopped collecting RAW files from {raw_dir_abs_path} after {len(raw_files)} files.")
+        return raw_files
+    logging.info(f"Collected {len(raw_files)} RAW files from {raw_dir_abs_path}.")
+    return raw_files
+
+def decide_raw_files(raw_files: Iterable[Tuple[str, str]], jpg_names: AbstractSet[str], matcher: NameMatcher=EXACT_NAME_MATCHER) -> Tuple[int, List[str]]:
+    """
+    Decide which RAW files to keep (those that have corresponding JPG/JPEG files) and which to delete.
+
+    :param raw_files: Iterable of (directory path, file name) tuples of RAW files.
+    :param jpg_names: Set of JPG/JPEG file names (without extensions) to check against (a `set` or a `CompactNameSet`).
+    :param matcher: Normalization of the RAW names into the keys of `jpg_names` (default: names unchanged).
+    :return: A tuple of (number of RAW files kept, paths of the RAW files to delete).
+    """
     kept_raw_cnt: int = 0
-    deleted_raw_cnt: int = 0
-    failed_delete_raw_cnt: int = 0
+    doomed_raw_paths: List[str] = []
+    for root, filename in raw_files:
+        # Get the matching key of the file name without the extension
+        name: str = matcher.key(os.path.splitext(filename)[0])
+        # Check if the file name is in the set of JPG names
+        if name in jpg_names:
+            kept_raw_cnt += 1
+            _file_logger.info("Keeping RAW file: %s, name found in JPG/JPEG names set.", filename)
+        else:
+            doomed_raw_paths.append(os.path.join(root, filename))
+    return kept_raw_cnt, doomed_raw_paths
 
-    # Recursively walk through the directory
-    for root, _2, files in os.walk(raw_dir_abs_path):
-        for filename in files:
-            # Check if the file is a RAW file based on its extension
-            if not filename.lower().endswith(raw_exts):
-                continue
-            # Get the file name without the extension
-            name: str = os.path.splitext(filename)[0]
-            # Check if the file name is in the set of JPG names
-            if name in jpg_names:
-                kept_raw_cnt += 1
-                logging.info(f"Keeping RAW file: {filename}, name found in JPG/JPEG names set.")
-            else:
-                try:
-                    # Move the RAW file to the Recycle Bin
-                    send2trash(os.path.join(root, filename))
-                    deleted_raw_cnt += 1
-                    logging.info(f"Deleted RAW file: {filename}, name not found in JPG/JPEG names set.")
-                except Exception as e:
-                    # If moving the file to the Recycle Bin fails, increment the failed count
-                    failed_delete_raw_cnt += 1
-                    logging.error(f"Failed to delete RAW file: {os.path.join(root, filename)} to Recycle Bin. Error: {e}")
+def plan_raw_mirror_moves(raw_files: Iterable[Tuple[str, str]], jpg_dirs: Dict[str, str], raw_dir_abs_path: str, matcher: NameMatcher=EXACT_NAME_MATCHER) -> Tuple[int, List[Tuple[str, str]], List[str], int]:
+    """
+    Decide which RAW files to keep, where to move them to mirror the JPG/JPEG folders, and which to delete.
+
+    A kept RAW file goes to the folder of its JPG/JPEG file, relative to `raw_dir_abs_path`.
+    RAW files already in place are not moved; a RAW file whose destination is already taken
+    (by an existing file or another RAW file with the same file name) stays where it is.
+
+    :param raw_files: Iterable of (directory path, file name) tuples of RAW files.
+    :param jpg_dirs: Dictionary mapping JPG/JPEG file names (without extensions) to their relative folder.
+    :param raw_dir_abs_path: Path to the directory containing RAW files.
+    :param matcher: Normalization of the RAW names into the keys of `jpg_dirs` (default: names unchanged).
+    :return: A tuple of (number of RAW files kept, list of (old path, new path) moves, paths of the RAW files to delete, number of RAW files left in place because of a conflict).
+    """
+    raw_files: List[Tuple[str, str]] = sorted(raw_files)
+    existing_raw_paths: Set[str] = {os.path.join(root, filename) for root, filename in raw_files}
+    taken_raw_paths: Set[str] = set()
+    kept_raw_cnt: int = 0
+    conflict_raw_cnt: int = 0
+    moves: List[Tuple[str, str]] = []
+    doomed_raw_paths: List[str] = []
+    for root, filename in raw_files:
+        raw_path: str = os.path.join(root, filename)
+        relative_dir: Optional[str] = jpg_dirs.get(matcher.key(os.path.splitext(filename)[0]))
+        if relative_dir is None:
+            doomed_raw_paths.append(raw_path)
+            continue
+        kept_raw_cnt += 1
+        new_raw_path: str = os.path.normpath(os.path.join(raw_dir_abs_path, relative_dir, filename))
+        if new_raw_path == os.path.normpath(raw_path):
+            _file_logger.info("Keeping RAW file: %s, already in folder: %s.", filename, relative_dir)
+        elif new_raw_path in existing_raw_paths or new_raw_path in taken_raw_paths:
+            conflict_raw_cnt += 1
+            _file_logger.warning("Keeping RAW file: %s in place, %s is already taken.", raw_path, new_raw_path)
+        else:
+            taken_raw_paths.add(new_raw_path)
+            moves.append((raw_path, new_raw_path))
+    return kept_raw_cnt, moves, doomed_raw_paths, conflict_raw_cnt
+
+def mirror_raw_files(moves: List[Tuple[str, str]], move_workers: int=DEFAULT_MOVE_WORKERS) -> Tuple[int, int]:
+    """
+    Move kept RAW files into their mirrored folders, creating each folder once.
+
+    :param moves: List of (old path, new path) moves, as planned by `plan_raw_mirror_moves`.
+    :param move_workers: Number of threads copying RAW files moved to another device.
+    :return: A tuple of (moved count, failed count).
+    """
+    for new_dir in sorted({os.path.dirname(new_path) for _, new_path in moves}):
+        os.makedirs(new_dir, exist_ok=True)
+    logging.info(f"Moving {len(moves)} RAW files into the JPG/JPEG folder structure...")
+    return move_files(moves, max_workers=move_workers)
+
+def delete_raw_files(doomed_paths: List[str], doomed_sidecar_paths: AbstractSet[str]=frozenset(), delete_workers: int=DEFAULT_DELETE_WORKERS, delete_batch_size: int=DEFAULT_DELETE_BATCH_SIZE, on_deleted: Optional[Callable[[str], None]]=None, delete_func: Optional[Callable[[str], None]]=None) -> Dict[str, int]:
+    """
+    Delete RAW files together with their sidecars, counting both apart.
+
+    A RAW file and its sidecars land in the same deletion batch (see `group_delete_batches`),
+    so they are deleted one after the other by the same worker. A sidecar is only deleted once
+    its RAW files were: when a RAW file fails to delete, its sidecars are kept and counted as failed.
+
+    :param doomed_paths: Paths of the RAW files and sidecars to delete (see `SidecarIndex.expand`).
+    :param doomed_sidecar_paths: Paths of the sidecars among `doomed_paths`.
+    :param delete_workers: Number of threads deleting files concurrently.
+    :param delete_batch_size: Approximate number of files per deletion batch.
+    :param on_deleted: Optional callback invoked with each successfully deleted path.
+    :param delete_func: Callable deleting one file (None: move it to the Recycle Bin).
+    :return: A dictionary containing 'deleted_raw_cnt', 'failed_delete_raw_cnt', 'deleted_sidecar_cnt' and 'failed_delete_sidecar_cnt'.
+    """
+    deleted_sidecar_paths: List[str] = []
+
+    def _on_deleted(path: str) -> None:
+        if path in doomed_sidecar_paths:
+            deleted_sidecar_paths.append(path)
+        if on_deleted is not None:
+            on_deleted(path)
+
+    if doomed_sidecar_paths:
+        logging.info(f"Deleting {len(doomed_paths) - len(doomed_sidecar_paths)} RAW files whose names are not in JPG/JPEG names set, and {len(doomed_sidecar_paths)} sidecars...")
+    else:
+        logging.info(f"Deleting {len(doomed_paths)} RAW files whose names are not in JPG/JPEG names set...")
+    deleted_cnt, failed_delete_cnt = delete_files(
+        doomed_paths,
+        max_workers=delete_workers,
+        batch_size=delete_batch_size,
+        on_deleted=_on_deleted,
+        delete_func=delete_func,
+        depends_on=sidecar_owner_paths(doomed_paths, doomed_sidecar_paths) if doomed_sidecar_paths else None,
+    )
+    failed_delete_sidecar_cnt: int = len(doomed_sidecar_paths) - len(deleted_sidecar_paths)
+    return {
+        DELETED_RAW_CNT: deleted_cnt - len(deleted_sidecar_paths),
+        FAILED_DELETE_RAW_CNT: failed_delete_cnt - failed_delete_sidecar_cnt,
+        DELETED_SIDECAR_CNT: len(deleted_sidecar_paths),
+        FAILED_DELETE_SIDECAR_CNT: failed_delete_sidecar_cnt,
+    }
+
+def cull_raw_files(raw_files: Iterable[Tuple[str, str]], jpg_names: AbstractSet[str], delete_workers: int=DEFAULT_DELETE_WORKERS, delete_batch_size: int=DEFAULT_DELETE_BATCH_SIZE, on_deleted: Optional[Callable[[str], None]]=None, delete_func: Optional[Callable[[str], None]]=None, matcher: NameMatcher=EXACT_NAME_MATCHER, sidecars: Optional[SidecarIndex]=None) -> Dict[str, int]:
+    """
+    Keep the RAW files that have corresponding JPG/JPEG files and delete the others, with their sidecars.
+
+    The RAW files to delete are handed to the deletion executor, which moves them to the
+    Recycle Bin concurrently once every RAW file has been decided on.
+
+    :param raw_files: Iterable of (directory path, file name) tuples of RAW files.
+    :param jpg_names: Set of JPG/JPEG file names (without extensions) to check against (a `set` or a `CompactNameSet`).
+    :param delete_workers: Number of threads deleting RAW files concurrently.
+    :param delete_batch_size: Approximate number of RAW files per deletion batch.
+    :param on_deleted: Optional callback invoked with each successfully deleted path.
+    :param delete_func: Callable deleting one RAW file (None: move it to the Recycle Bin).
+    :param matcher: Normalization of the RAW names into the keys of `jpg_names` (default: names unchanged).
+    :param sidecars: Optional sidecar index filled by the walk producing `raw_files`; the sidecars of deleted RAW files are deleted too.
+    :return: A dictionary containing:
+        - 'kept_raw_cnt': Number of RAW files kept (not deleted).
+        - 'deleted_raw_cnt': Number of RAW files deleted (moved to Recycle Bin).
+        - 'failed_delete_raw_cnt': Number of RAW files that failed to delete.
+        - 'deleted_sidecar_cnt': Number of sidecars deleted with their RAW files.
+        - 'failed_delete_sidecar_cnt': Number of sidecars that failed to delete.
+    """
+    kept_raw_cnt, doomed_raw_paths = decide_raw_files(raw_files, jpg_names, matcher)
+    doomed_paths, doomed_sidecar_paths = sidecars.expand(doomed_raw_paths) if sidecars is not None else (doomed_raw_paths, set())
+
+    # Move the RAW files without JPG/JPEG, and their sidecars, to the Recycle Bin
+    delete_info: Dict[str, int] = delete_raw_files(
+        doomed_paths,
+        doomed_sidecar_paths,
+        delete_workers=delete_workers,
+        delete_batch_size=delete_batch_size,
+        on_deleted=on_deleted,
+        delete_func=delete_func,
+    )
 
     # Build the detailed information dictionary
     detailed_info: Dict[str, int] = {
         KEPT_RAW_CNT: kept_raw_cnt,
-        DELETED_RAW_CNT: deleted_raw_cnt,
-        FAILED_DELETE_RAW_CNT: failed_delete_raw_cnt,
+        **delete_info,
     }
 
     # Return the detailed information dictionary
     return detailed_info
 
+def filter_raw_files_by_jpg_names(raw_dir_abs_path: str, raw_exts: List[str], jpg_names: AbstractSet[str], walk_workers: int=DEFAULT_WALK_WORKERS, delete_workers: int=DEFAULT_DELETE_WORKERS, delete_batch_size: int=DEFAULT_DELETE_BATCH_SIZE, delete_func: Optional[Callable[[str], None]]=None, matcher: NameMatcher=EXACT_NAME_MATCHER, sidecar_exts: List[str]=()) -> Dict[str, int]:
+    """
+    Recursively filter out RAW files in the specified directory that do not have corresponding JPG/JPEG files.
+
+    The directory is scanned first; the RAW files to delete are then handed to the deletion
+    executor, which moves them to the Recycle Bin concurrently. Sidecars with one of
+    `sidecar_exts` are found in the same directory listings and deleted with their RAW files.
+
+    :param raw_dir_abs_path: Path to the directory containing RAW files.
+    :param raw_exts: List of file extensions to consider for RAW files (e.g., ['.cr2', '.nef']).
+    :param jpg_names: Set of JPG/JPEG file names (without extensions) to check against (a `set` or a `CompactNameSet`).
+    :param walk_workers: Number of threads listing directories concurrently.
+    :param delete_workers: Number of threads deleting RAW files concurrently.
+    :param delete_batch_size: Approximate number of RAW files per deletion batch.
+    :param delete_func: Callable deleting one RAW file (None: move it to the Recycle Bin).
+    :param matcher: Normalization of the RAW names into the keys of `jpg_names` (default: names unchanged).
+    :param sidecar_exts: List of sidecar file extensions (e.g., ['.xmp', '.pp3', '.dop']; default: none).
+    :return: A dictionary containing:
+        - 'kept_raw_cnt': Number of RAW files kept (not deleted).
+        - 'deleted_raw_cnt': Number of RAW files deleted (moved to Recycle Bin).
+        - 'failed_delete_raw_cnt': Number of RAW files that failed to delete.
+        - 'deleted_sidecar_cnt': Number of sidecars deleted with their RAW files.
+        - 'failed_delete_sidecar_cnt': Number of sidecars that failed to delete.
+    """
+    sidecars: Optional[SidecarIndex] = SidecarIndex(sidecar_exts) if sidecar_exts else None
+    return cull_raw_files(
+        iter_raw_files(raw_dir_abs_path, raw_exts, walk_workers, sidecars),
+        jpg_names=jpg_names,
+        delete_workers=delete_workers,
+        delete_batch_size=delete_batch_size,
+        delete_func=delete_func,
+        matcher=matcher,
+        sidecars=sidecars,
+    )
+
 
 
 
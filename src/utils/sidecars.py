@@ -0,0 +1,105 @@
+import os
+from typing import AbstractSet, Dict, Iterable, List, Set, Tuple
+
+
+class SidecarIndex:
+    """
+    Sidecar files (e.g., '.xmp', '.pp3', '.dop') of the RAW files, grouped from the directory listings of the RAW walk.
+
+    A sidecar belongs to the RAW file it is named after, either with the RAW extension kept
+    ('DSC_0001.NEF.xmp') or replaced ('DSC_0001.xmp'); names are compared ignoring case. A
+    sidecar of the second form is shared by every RAW file with that stem in its folder, and is
+    only deleted with the last of them. Sidecars without RAW file are left alone.
+    """
+
+    def __init__(self, sidecar_exts: Iterable[str]):
+        self.sidecar_exts: Tuple[str, ...] = tuple(ext.lower() for ext in sidecar_exts)
+        self.sidecar_cnt: int = 0
+        # Sidecar paths of each RAW path, and the number of RAW files of the shared sidecars
+        self._sidecar_paths: Dict[str, List[str]] = {}
+        self._owner_cnts: Dict[str, int] = {}
+
+    def add_directory(self, dirpath: str, raw_filenames: List[str], filenames: Iterable[str]) -> None:
+        """
+        Attach the sidecars of one folder to its RAW files, from the listing already walked.
+
+        :param dirpath: Path of the folder.
+        :param raw_filenames: File names of the RAW files of the folder.
+        :param filenames: File names of every entry of the folder.
+        """
+        if not raw_filenames or not self.sidecar_exts:
+            return
+        raw_filenames_by_name: Dict[str, str] = {}
+        raw_filenames_by_stem: Dict[str, List[str]] = {}
+        for raw_filename in raw_filenames:
+            raw_filenames_by_name[raw_filename.lower()] = raw_filename
+            raw_filenames_by_stem.setdefault(os.path.splitext(raw_filename)[0].lower(), []).append(raw_filename)
+        for filename in filenames:
+            lowered_filename: str = filename.lower()
+            if not lowered_filename.endswith(self.sidecar_exts):
+                continue
+            base: str = os.path.splitext(lowered_filename)[0]
+            owners: List[str]
+            if base in raw_filenames_by_name:
+                owners = [raw_filenames_by_name[base]]
+            else:
+                owners = raw_filenames_by_stem.get(base, [])
+            if not owners:
+                continue
+            sidecar_path: str = os.path.join(dirpath, filename)
+            for owner in owners:
+                self._sidecar_paths.setdefault(os.path.join(dirpath, owner), []).append(sidecar_path)
+            if len(owners) > 1:
+                self._owner_cnts[sidecar_path] = len(owners)
+            self.sidecar_cnt += 1
+
+    def expand(self, doomed_raw_paths: List[str]) -> Tuple[List[str], Set[str]]:
+        """
+        Add the sidecars of the RAW files to delete, each right after its (last) RAW file.
+
+        :param doomed_raw_paths: Paths of the RAW files to delete.
+        :return: A tuple of (paths of the RAW files and sidecars to delete, paths of the sidecars among them).
+        """
+        doomed_paths: List[str] = []
+        doomed_sidecar_paths: Set[str] = set()
+        doomed_owner_cnts: Dict[str, int] = {}
+        for raw_path in doomed_raw_paths:
+            doomed_paths.append(raw_path)
+            for sidecar_path in self._sidecar_paths.get(raw_path, ()):
+                owner_cnt: int = self._owner_cnts.get(sidecar_path, 1)
+                if owner_cnt > 1:
+                    doomed_owner_cnts[sidecar_path] = doomed_owner_cnts.get(sidecar_path, 0) + 1
+                    if doomed_owner_cnts[sidecar_path] < owner_cnt:
+                        continue
+                doomed_paths.append(sidecar_path)
+                doomed_sidecar_paths.add(sidecar_path)
+        return doomed_paths, doomed_sidecar_paths
+
+def sidecar_owner_paths(doomed_paths: Iterable[str], doomed_sidecar_paths: AbstractSet[str]) -> Dict[str, List[str]]:
+    """
+    Find, by name, the RAW files each sidecar to delete belongs to among the files to delete.
+
+    Follows the naming rules of `SidecarIndex`, so the owners are found again from a checkpoint
+    plan, which only flags the sidecars. A sidecar whose RAW files were already deleted (e.g., by
+    an interrupted run) has no owner left.
+
+    :param doomed_paths: Paths of the RAW files and sidecars to delete.
+    :param doomed_sidecar_paths: Paths of the sidecars among `doomed_paths`.
+    :return: Paths of the RAW files to delete per sidecar path, for the sidecars that have some.
+    """
+    raw_paths_by_name: Dict[Tuple[str, str], List[str]] = {}
+    raw_paths_by_stem: Dict[Tuple[str, str], List[str]] = {}
+    for path in doomed_paths:
+        if path in doomed_sidecar_paths:
+            continue
+        dirpath, filename = os.path.split(path)
+        raw_paths_by_name.setdefault((dirpath, filename.lower()), []).append(path)
+        raw_paths_by_stem.setdefault((dirpath, os.path.splitext(filename)[0].lower()), []).append(path)
+    owner_paths: Dict[str, List[str]] = {}
+    for sidecar_path in doomed_sidecar_paths:
+        dirpath, filename = os.path.split(sidecar_path)
+        base: str = os.path.splitext(filename.lower())[0]
+        owners: List[str] = raw_paths_by_name.get((dirpath, base)) or raw_paths_by_stem.get((dirpath, base), [])
+        if owners:
+            owner_paths[sidecar_path] = owners
+    return owner_paths
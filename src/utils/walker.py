@@ -0,0 +1,123 @@
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import AbstractSet, Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from src.utils.metrics import SCANDIR_OP, count_op
+from src.utils.io_scheduler import WALK_IO, AdaptiveLimiter, get_io_limiter
+
+
+DEFAULT_WALK_WORKERS = 8
+
+WALKED_DIR_CNT = 'walked_dir_cnt'
+WALK_ELAPSED_SEC = 'walk_elapsed_sec'
+WALK_DIRS_PER_SEC = 'walk_dirs_per_sec'
+
+def scan_dir(dirpath: str) -> Tuple[Optional[Tuple[str, List[os.DirEntry]]], List[str]]:
+    """
+    List one directory and split its entries into files and subdirectories to descend into.
+
+    Mirrors `os.walk` semantics: symlinks to directories count as directories but are not
+    followed, and directories that cannot be listed are skipped.
+
+    :param dirpath: Path of the directory to list.
+    :return: A tuple of ((dirpath, file entries), subdirectory paths to visit next); the first item is None if listing failed.
+    """
+    count_op(SCANDIR_OP)
+    try:
+        with os.scandir(dirpath) as it:
+            entries: List[os.DirEntry] = list(it)
+    except OSError as e:
+        logging.warning(f"Failed to list directory: {dirpath}. Error: {e}")
+        return None, []
+
+    file_entries: List[os.DirEntry] = []
+    sub_dirs: List[str] = []
+    for entry in entries:
+        try:
+            is_dir: bool = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if not is_dir:
+            file_entries.append(entry)
+        elif not entry.is_symlink():
+            sub_dirs.append(entry.path)
+    return (dirpath, file_entries), sub_dirs
+
+def walk_tree(root_abs_path: str, visit: Callable[[str], Tuple[Any, List[str]]], max_workers: int = DEFAULT_WALK_WORKERS, stats: Optional[Dict[str, float]] = None) -> Iterator[Any]:
+    """
+    Visit every directory below a root on a bounded thread pool, yielding each visit result as it completes.
+
+    `visit` is called once per directory and returns its result plus the subdirectories to
+    visit next, so directory latency is overlapped across up to `max_workers` threads.
+    Results are yielded in completion order, not in `os.walk` order; None results are skipped.
+    With adaptive I/O enabled, the walk limiter replaces `max_workers`.
+
+    :param root_abs_path: Absolute path of the root directory.
+    :param visit: Callable taking a directory path and returning (result, subdirectory paths).
+    :param max_workers: Maximum number of directories being visited concurrently.
+    :param stats: Optional dictionary filled with 'walked_dir_cnt', 'walk_elapsed_sec' and 'walk_dirs_per_sec' once the walk ends.
+    :return: Iterator over the visit results.
+    """
+    start_time: float = time.perf_counter()
+    walked_dir_cnt: int = 0
+
+    limiter: Optional[AdaptiveLimiter] = get_io_limiter(WALK_IO)
+    if limiter is not None:
+        max_workers = limiter.max_limit
+        unlimited_visit = visit
+        def visit(dirpath: str) -> Tuple[Any, List[str]]:
+            with limiter.slot():
+                return unlimited_visit(dirpath)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="walker")
+    pending: Set[Future] = {executor.submit(visit, root_abs_path)}
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result, sub_dirs = future.result()
+                walked_dir_cnt += 1
+                for sub_dir in sub_dirs:
+                    pending.add(executor.submit(visit, sub_dir))
+                if result is not None:
+                    yield result
+    finally:
+        # Cancel outstanding work if the consumer stopped early
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+        elapsed_sec: float = time.perf_counter() - start_time
+        dirs_per_sec: float = walked_dir_cnt / elapsed_sec if elapsed_sec > 0 else 0.0
+        logging.info(f"Walked {walked_dir_cnt} directories under {root_abs_path} in {elapsed_sec:.2f}s ({dirs_per_sec:.1f} dirs/sec).")
+        if stats is not None:
+            stats[WALKED_DIR_CNT] = walked_dir_cnt
+            stats[WALK_ELAPSED_SEC] = elapsed_sec
+            stats[WALK_DIRS_PER_SEC] = dirs_per_sec
+
+def scandir_walk(root_abs_path: str, max_workers: int = DEFAULT_WALK_WORKERS, stats: Optional[Dict[str, float]] = None, skip_dirs: AbstractSet[str] = frozenset(), failed_dirs: Optional[List[str]] = None) -> Iterator[Tuple[str, List[os.DirEntry]]]:
+    """
+    Recursively list a directory tree with `os.scandir` on a bounded thread pool.
+
+    Drop-in replacement for the `os.walk` loops in this package: yields one batch of file
+    `DirEntry` objects per directory, covering the same files `os.walk` would report.
+
+    :param root_abs_path: Absolute path of the root directory.
+    :param max_workers: Maximum number of directories being listed concurrently.
+    :param stats: Optional dictionary filled with walk statistics (see `walk_tree`).
+    :param skip_dirs: Paths of directories not to descend into (as joined below `root_abs_path`).
+    :param failed_dirs: Optional list receiving the paths of the directories that could not be listed (skipped otherwise).
+    :return: Iterator over (directory path, list of file entries) batches.
+    """
+    if not skip_dirs and failed_dirs is None:
+        return walk_tree(root_abs_path, scan_dir, max_workers=max_workers, stats=stats)
+
+    def visit(dirpath: str) -> Tuple[Optional[Tuple[str, List[os.DirEntry]]], List[str]]:
+        result, sub_dirs = scan_dir(dirpath)
+        if result is None and failed_dirs is not None:
+            failed_dirs.append(dirpath)
+        return result, [sub_dir for sub_dir in sub_dirs if sub_dir not in skip_dirs]
+
+    return walk_tree(root_abs_path, visit, max_workers=max_workers, stats=stats)
@@ -0,0 +1,378 @@
+import os
+import sys
+import stat
+import time
+import errno
+import select
+import struct
+import logging
+import itertools
+import threading
+import ctypes
+import ctypes.util
+from typing import AbstractSet, Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from src.utils.walker import DEFAULT_WALK_WORKERS, scan_dir, walk_tree
+from src.utils.metrics import STAT_OP, count_op
+
+
+POLLING_WATCHER = 'polling'
+INOTIFY_WATCHER = 'inotify'
+
+DEFAULT_POLL_INTERVAL_SEC = 5.0
+
+# Directories modified this close to their scan may still change within the same mtime tick,
+# so the polling watcher rescans them once more when their mtime is old enough to be trusted.
+_RACY_MTIME_WINDOW_NS = 2 * 1_000_000_000
+# Errors meaning a directory is gone; any other error (EIO, EACCES, ESTALE...) may be transient
+_GONE_ERRNOS = {errno.ENOENT, errno.ENOTDIR}
+
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_NONBLOCK = 0x00000800
+_IN_CLOEXEC = 0x00080000
+_IN_WATCH_MASK = _IN_CREATE | _IN_DELETE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_ONLYDIR
+_INOTIFY_EVENT_HEADER = struct.Struct('iIII')
+
+class _DirSnapshot:
+    __slots__ = ('scan_id', 'mtime_ns', 'racy', 'files', 'sub_dirs')
+
+    def __init__(self, scan_id: int, mtime_ns: int, racy: bool, files: Set[str], sub_dirs: Set[str]):
+        self.scan_id: int = scan_id
+        self.mtime_ns: int = mtime_ns
+        self.racy: bool = racy
+        self.files: Set[str] = files
+        self.sub_dirs: Set[str] = sub_dirs
+
+def _dir_is_gone(dirpath: str) -> bool:
+    """
+    Whether a directory no longer exists (or is no longer a directory), as opposed to being unreadable.
+    """
+    try:
+        return not stat.S_ISDIR(os.lstat(dirpath).st_mode)
+    except OSError as e:
+        return e.errno in _GONE_ERRNOS
+
+class TreeChanges(NamedTuple):
+    """
+    Files added to and removed from a directory tree, as (directory path, file name) tuples,
+    and the directories that could not be listed (to rescan later).
+    """
+    added: List[Tuple[str, str]]
+    removed: List[Tuple[str, str]]
+    failed_dirs: List[str]
+
+class DirTree:
+    """
+    In-memory snapshot of the files of a directory tree, kept up to date one directory at a time.
+
+    Only the files accepted by `file_filter` are remembered. `rescan` lists a single directory
+    again and reports what changed in it; new subdirectories are scanned in full (after
+    `on_new_dir` is called for them, so a watch can be set before they are listed) and removed
+    subdirectories are forgotten with all their files. A directory that exists but cannot be
+    listed (e.g., a transient NAS error) keeps its previous snapshot and is reported as failed,
+    never as removed.
+    """
+
+    def __init__(self, root_abs_path: str, file_filter: Callable[[str], bool], on_new_dir: Optional[Callable[[str], None]] = None, skip_dirs: AbstractSet[str] = frozenset()):
+        self.root: str = os.path.abspath(root_abs_path)
+        self._file_filter: Callable[[str], bool] = file_filter
+        # Directories never listed nor watched, with everything below them
+        self._skip_dirs: AbstractSet[str] = frozenset(os.path.abspath(path) for path in skip_dirs)
+        self.on_new_dir: Optional[Callable[[str], None]] = on_new_dir
+        self._dirs: Dict[str, _DirSnapshot] = {}
+        self._scan_ids = itertools.count()
+        # Directories the last full scan could not list
+        self.scan_failed_dirs: List[str] = []
+
+    def _list_dir(self, dirpath: str) -> Optional[_DirSnapshot]:
+        """
+        List one directory.
+
+        :return: The snapshot of the directory, or None if it is gone.
+        :raises OSError: If the directory still exists but cannot be listed.
+        """
+        count_op(STAT_OP)
+        try:
+            mtime_ns: int = os.stat(dirpath).st_mtime_ns
+        except OSError as e:
+            if e.errno in _GONE_ERRNOS:
+                return None
+            raise
+        result, sub_dirs = scan_dir(dirpath)
+        if result is None:
+            if _dir_is_gone(dirpath):
+                return None
+            raise OSError(errno.EIO, "Failed to list directory", dirpath)
+        files: Set[str] = {entry.name for entry in result[1] if self._file_filter(entry.name)}
+        return _DirSnapshot(next(self._scan_ids), mtime_ns, mtime_ns >= time.time_ns() - _RACY_MTIME_WINDOW_NS, files, set(sub_dirs) - self._skip_dirs)
+
+    def scan(self, walk_workers: int = DEFAULT_WALK_WORKERS) -> List[Tuple[str, str]]:
+        """
+        Scan the whole tree from scratch.
+
+        :return: Every file of the tree, as (directory path, file name) tuples.
+        """
+        failed_dirs: List[str] = []
+
+        def visit(dirpath: str) -> Tuple[Optional[Tuple[str, _DirSnapshot]], List[str]]:
+            if self.on_new_dir is not None:
+                self.on_new_dir(dirpath)
+            try:
+                snapshot: Optional[_DirSnapshot] = self._list_dir(dirpath)
+            except OSError as e:
+                logging.warning(f"Failed to list directory: {dirpath}. Error: {e}")
+                failed_dirs.append(dirpath)
+                return None, []
+            if snapshot is None:
+                return None, []
+            return (dirpath, snapshot), list(snapshot.sub_dirs)
+
+        self._dirs = dict(walk_tree(self.root, visit, max_workers=walk_workers))
+        self.scan_failed_dirs = failed_dirs
+        return [(dirpath, filename) for dirpath, snapshot in self._dirs.items() for filename in snapshot.files]
+
+    def _forget(self, dirpath: str, removed: List[Tuple[str, str]]) -> None:
+        snapshot: Optional[_DirSnapshot] = self._dirs.pop(dirpath, None)
+        if snapshot is None:
+            return
+        removed.extend((dirpath, filename) for filename in snapshot.files)
+        for sub_dir in snapshot.sub_dirs:
+            self._forget(sub_dir, removed)
+
+    def _add(self, dirpath: str, added: List[Tuple[str, str]], failed_dirs: List[str]) -> None:
+        if self.on_new_dir is not None:
+            self.on_new_dir(dirpath)
+        try:
+            snapshot: Optional[_DirSnapshot] = self._list_dir(dirpath)
+        except OSError as e:
+            logging.warning(f"Failed to list directory: {dirpath}, it will be rescanned. Error: {e}")
+            failed_dirs.append(dirpath)
+            return
+        if snapshot is None:
+            return
+        self._dirs[dirpath] = snapshot
+        added.extend((dirpath, filename) for filename in snapshot.files)
+        for sub_dir in snapshot.sub_dirs:
+            self._add(sub_dir, added, failed_dirs)
+
+    def rescan(self, dirpath: str) -> TreeChanges:
+        """
+        List one directory again and update the snapshot.
+
+        :param dirpath: Absolute path of a directory of the tree (known or new).
+        :return: The files added and removed since the previous scan, and the directories that could not be listed.
+        """
+        added: List[Tuple[str, str]] = []
+        removed: List[Tuple[str, str]] = []
+        failed_dirs: List[str] = []
+        old_snapshot: Optional[_DirSnapshot] = self._dirs.get(dirpath)
+        if old_snapshot is None:
+            if self.contains(dirpath) and os.path.isdir(dirpath):
+                self._add(dirpath, added, failed_dirs)
+            return TreeChanges(added, removed, failed_dirs)
+        try:
+            new_snapshot: Optional[_DirSnapshot] = self._list_dir(dirpath)
+        except OSError as e:
+            # Keep what was known: an unreadable directory must not look like removed files
+            logging.warning(f"Failed to list directory: {dirpath}, keeping its previous listing until it is rescanned. Error: {e}")
+            return TreeChanges(added, removed, [dirpath])
+        if new_snapshot is None:
+            # The directory is gone, and so is everything below it
+            self._forget(dirpath, removed)
+            return TreeChanges(added, removed, failed_dirs)
+        added.extend((dirpath, filename) for filename in new_snapshot.files - old_snapshot.files)
+        removed.extend((dirpath, filename) for filename in old_snapshot.files - new_snapshot.files)
+        self._dirs[dirpath] = new_snapshot
+        for sub_dir in old_snapshot.sub_dirs - new_snapshot.sub_dirs:
+            self._forget(sub_dir, removed)
+        for sub_dir in new_snapshot.sub_dirs - old_snapshot.sub_dirs:
+            if sub_dir not in self._dirs:
+                self._add(sub_dir, added, failed_dirs)
+        return TreeChanges(added, removed, failed_dirs)
+
+    def contains(self, abs_path: str) -> bool:
+        """
+        Whether a path is the root of the tree or below it.
+        """
+        return abs_path == self.root or abs_path.startswith(self.root.rstrip(os.sep) + os.sep)
+
+    def dirs_under(self, abs_path: str) -> List[str]:
+        """
+        Known directories at or below a path.
+        """
+        prefix: str = abs_path.rstrip(os.sep) + os.sep
+        return [dirpath for dirpath in self._dirs if dirpath == abs_path or dirpath.startswith(prefix)]
+
+    def changed_dirs(self) -> Iterator[Tuple[str, Tuple[int, Optional[int]]]]:
+        """
+        Stat every known directory and yield those whose mtime changed since they were listed.
+
+        Directories listed within the same mtime tick as a change are yielded once more, when
+        their mtime becomes old enough to be trusted. A directory is yielded on every call until
+        it is rescanned, with a key identifying the change (the same change yields the same key).
+        A directory that cannot be stat-ed but still exists is not a change; it is checked again
+        on the next call.
+
+        :return: Iterator over (directory path, change key) tuples.
+        """
+        racy_mtime_ns: int = time.time_ns() - _RACY_MTIME_WINDOW_NS
+        for dirpath, snapshot in list(self._dirs.items()):
+            count_op(STAT_OP)
+            try:
+                mtime_ns: Optional[int] = os.stat(dirpath).st_mtime_ns
+            except OSError as e:
+                if e.errno not in _GONE_ERRNOS:
+                    continue
+                mtime_ns = None
+            if mtime_ns != snapshot.mtime_ns or (snapshot.racy and mtime_ns < racy_mtime_ns):
+                yield dirpath, (snapshot.scan_id, mtime_ns)
+
+    def __len__(self) -> int:
+        return len(self._dirs)
+
+class PollingWatcher:
+    """
+    Detect changed directories by comparing directory mtimes every `poll_interval_sec`.
+
+    A poll costs one `stat` per known directory; only changed directories are listed again.
+    Each change is reported once, even if the directory is not rescanned before the next poll.
+    """
+    kind: str = POLLING_WATCHER
+
+    def __init__(self, trees: List[DirTree], poll_interval_sec: float = DEFAULT_POLL_INTERVAL_SEC):
+        self._trees: List[DirTree] = trees
+        self._reported_changes: Dict[str, Tuple[int, Optional[int]]] = {}
+        self._poll_interval_sec: float = poll_interval_sec
+        self._next_poll_time: float = time.monotonic() + poll_interval_sec
+
+    def watch_dir(self, dirpath: str) -> None:
+        pass
+
+    def wait_for_changes(self, timeout_sec: float, wake_event: Optional[threading.Event] = None) -> List[Tuple[DirTree, str]]:
+        """
+        Wait up to `timeout_sec` (or until `wake_event` is set) and return the changed (tree, directory) pairs.
+        """
+        delay: float = min(timeout_sec, max(0.0, self._next_poll_time - time.monotonic()))
+        if wake_event is not None:
+            wake_event.wait(delay)
+        else:
+            time.sleep(delay)
+        if time.monotonic() < self._next_poll_time:
+            return []
+        self._next_poll_time = time.monotonic() + self._poll_interval_sec
+        changed: List[Tuple[DirTree, str]] = []
+        for tree in self._trees:
+            for dirpath, change_key in tree.changed_dirs():
+                if self._reported_changes.get(dirpath) != change_key:
+                    self._reported_changes[dirpath] = change_key
+                    changed.append((tree, dirpath))
+        return changed
+
+    def close(self) -> None:
+        pass
+
+class InotifyWatcher:
+    """
+    Detect changed directories with Linux inotify (one watch per directory), through `ctypes`.
+
+    If the kernel event queue overflows, every directory is reported as changed.
+    """
+    kind: str = INOTIFY_WATCHER
+
+    def __init__(self, trees: List[DirTree]):
+        libc_name: Optional[str] = ctypes.util.find_library('c')
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._fd: int = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            err: int = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._trees: List[DirTree] = trees
+        self._dirs_by_wd: Dict[int, Tuple[DirTree, str]] = {}
+        self._watch_limit_warned: bool = False
+
+    def watch_dir(self, dirpath: str) -> None:
+        """
+        Start watching a directory (watching it twice is harmless).
+        """
+        tree: Optional[DirTree] = next((tree for tree in self._trees if tree.contains(dirpath)), None)
+        if tree is None:
+            return
+        wd: int = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), _IN_WATCH_MASK)
+        if wd < 0:
+            err: int = ctypes.get_errno()
+            if err == errno.ENOSPC and not self._watch_limit_warned:
+                self._watch_limit_warned = True
+                logging.warning("Reached the inotify watch limit (fs.inotify.max_user_watches); changes in new directories may be missed.")
+            elif err != errno.ENOENT:
+                logging.warning(f"Failed to watch directory: {dirpath}. Error: {os.strerror(err)}")
+            return
+        self._dirs_by_wd[wd] = (tree, dirpath)
+
+    def wait_for_changes(self, timeout_sec: float, wake_event: Optional[threading.Event] = None) -> List[Tuple[DirTree, str]]:
+        """
+        Wait up to `timeout_sec` for events and return the changed (tree, directory) pairs.
+        """
+        deadline: float = time.monotonic() + timeout_sec
+        while True:
+            # Wake up regularly, so a set `wake_event` is noticed quickly
+            readable, _, _ = select.select([self._fd], [], [], max(0.0, min(0.2, deadline - time.monotonic())))
+            if readable or time.monotonic() >= deadline or (wake_event is not None and wake_event.is_set()):
+                break
+        if not readable:
+            return []
+        changed: Dict[str, DirTree] = {}
+        while True:
+            try:
+                buffer: bytes = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset: int = 0
+            while offset < len(buffer):
+                wd, mask, _, name_len = _INOTIFY_EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _INOTIFY_EVENT_HEADER.size + name_len
+                if mask & _IN_Q_OVERFLOW:
+                    logging.warning("The inotify event queue overflowed, rescanning every directory.")
+                    return [(tree, dirpath) for tree in self._trees for dirpath in tree.dirs_under(tree.root)]
+                watched: Optional[Tuple[DirTree, str]] = self._dirs_by_wd.get(wd)
+                if mask & _IN_IGNORED:
+                    self._dirs_by_wd.pop(wd, None)
+                if watched is not None:
+                    tree, dirpath = watched
+                    changed[dirpath] = tree
+        return [(tree, dirpath) for dirpath, tree in changed.items()]
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+def create_watcher(trees: List[DirTree], use_inotify: bool = True, poll_interval_sec: float = DEFAULT_POLL_INTERVAL_SEC):
+    """
+    Create an inotify watcher where available, or a polling watcher otherwise.
+
+    The watcher becomes the `on_new_dir` hook of every tree, so new directories are watched
+    before they are listed.
+
+    :param trees: Directory trees to watch.
+    :param use_inotify: Whether to try inotify first (Linux only).
+    :param poll_interval_sec: Polling period of the polling watcher.
+    :return: A `InotifyWatcher` or a `PollingWatcher`.
+    """
+    watcher = None
+    if use_inotify and sys.platform.startswith('linux'):
+        try:
+            watcher = InotifyWatcher(trees)
+        except (OSError, AttributeError) as e:
+            logging.warning(f"inotify is not available, falling back to polling. Error: {e}")
+    if watcher is None:
+        watcher = PollingWatcher(trees, poll_interval_sec)
+    for tree in trees:
+        tree.on_new_dir = watcher.watch_dir
+    return watcher
@@ -0,0 +1,120 @@
+import os
+import json
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+
+from src.utils.scripts import assert_abs_paths_exist
+from src.utils.walker import DEFAULT_WALK_WORKERS
+from src.utils.quarantine import quarantine_root
+from src.utils.integrity import TOTAL_FILE_CNT, NEW_FILE_CNT, CHANGED_FILE_CNT, REMOVED_FILE_CNT, SAMPLED_FILE_CNT, HASHED_BYTES, MISMATCH_FILE_CNT
+from src.utils.integrity import DEFAULT_HASH_WORKERS, DEFAULT_SAMPLE_FRACTION, Mismatch, update_manifest
+from src.utils.metrics import RunMetrics, profile_run, write_metrics
+from src.config.loader import load_config
+from src.config.logging_config import FULL_FILE_LOG, DEFAULT_FILE_LOG_SAMPLE_EVERY
+from src.config.logging_config import setup_logging, clear_logging_handlers
+
+
+# Verifying reads the JPG and RAW directories from the configuration of the filter script
+_VERIFY_ARCHIVE_CONFIG_FILE = "config/filter_raw_by_jpg_config.yaml"
+
+def run_verify_archive(config: Dict[str, Any], metrics: RunMetrics) -> Dict[str, Tuple[List[Mismatch], Dict[str, int]]]:
+    """
+    Update the integrity manifests of the JPG and RAW directories configured by `config`, verifying a sample of unchanged files.
+
+    A directory is skipped when its manifest path ('jpg_manifest_db_abs_path' or 'raw_manifest_db_abs_path') is empty.
+
+    :param config: Loaded configuration of the filter script.
+    :param metrics: Run metrics receiving the 'verify_jpg' and 'verify_raw' phases.
+    :return: The mismatches and detailed information of each verified tree, by tree ('jpg' or 'raw').
+    """
+    # Extract configuration parameters
+    sample_fraction: float = config.get('verify_sample_fraction', DEFAULT_SAMPLE_FRACTION)
+    hash_workers: int = config.get('hash_workers', DEFAULT_HASH_WORKERS)
+    walk_workers: int = config.get('walk_workers', DEFAULT_WALK_WORKERS)
+    trees: List[Tuple[str, str, List[str], str]] = [
+        ('jpg', config['jpg_dir_abs_path'], config['jpg_exts'], config.get('jpg_manifest_db_abs_path') or ''),
+        ('raw', config['raw_dir_abs_path'], config['raw_exts'], config.get('raw_manifest_db_abs_path') or ''),
+    ]
+    trees = [tree for tree in trees if tree[3]]
+    if not trees:
+        raise ValueError("Set jpg_manifest_db_abs_path and/or raw_manifest_db_abs_path to verify the archive.")
+
+    # Check if the provided paths exist
+    assert_abs_paths_exist(
+        abs_paths=[dir_abs_path for _, dir_abs_path, _, _ in trees]
+    )
+
+    results: Dict[str, Tuple[List[Mismatch], Dict[str, int]]] = {}
+    for tree_name, dir_abs_path, exts, manifest_db_abs_path in trees:
+        logging.info(f"Verifying the {tree_name.upper()} directory against its manifest...")
+        with metrics.phase(f'verify_{tree_name}') as phase:
+            results[tree_name] = update_manifest(
+                root_abs_path=dir_abs_path,
+                exts=exts,
+                manifest_db_abs_path=manifest_db_abs_path,
+                sample_fraction=sample_fraction,
+                hash_workers=hash_workers,
+                walk_workers=walk_workers,
+                # Files quarantined by the filter script are no longer part of the RAW archive
+                skip_dirs={quarantine_root(os.path.abspath(dir_abs_path))} if tree_name == 'raw' else frozenset(),
+            )
+            phase.items = results[tree_name][1][TOTAL_FILE_CNT]
+    return results
+
+def _write_mismatch_report(report_abs_path: str, results: Dict[str, Tuple[List[Mismatch], Dict[str, int]]]) -> None:
+    report: Dict[str, List[Dict[str, str]]] = {
+        tree_name: [mismatch._asdict() for mismatch in mismatches] for tree_name, (mismatches, _) in results.items()
+    }
+    os.makedirs(os.path.dirname(report_abs_path), exist_ok=True)
+    with open(report_abs_path, 'w', encoding='utf-8') as report_file:
+        json.dump(report, report_file, indent=2)
+
+def verify_archive_main(config_file_path: str = _VERIFY_ARCHIVE_CONFIG_FILE, config_overrides: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Main function to verify the JPG and RAW directories against their integrity manifests.
+
+    :param config_file_path: Path to the YAML configuration file of the filter script.
+    :param config_overrides: Optional configuration keys overriding those of the file (e.g., from the command line).
+    """
+    # Load configuration from YAML file
+    config: Dict[str, Any] = load_config(config_file_path)
+    config.update(config_overrides or {})
+
+    # Configure logging
+    log_file_abs_path: str = config['log_file_abs_path']
+    setup_logging(
+        log_to_file=True,
+        log_file_abs_path=log_file_abs_path,
+        use_queue=config.get('async_logging', False),
+        file_log_verbosity=config.get('file_log_verbosity', FULL_FILE_LOG),
+        file_log_sample_every=config.get('file_log_sample_every', DEFAULT_FILE_LOG_SAMPLE_EVERY),
+    )
+
+    try:
+        metrics = RunMetrics('verify_archive')
+        with profile_run(config.get('profile_abs_path')):
+            results = run_verify_archive(config, metrics)
+        if config.get('mismatch_report_abs_path'):
+            _write_mismatch_report(config['mismatch_report_abs_path'], results)
+
+        # Print the summary of the operation
+        logging.info("==========================================================")
+        logging.info("Script completed successfully.")
+        logging.info("----------------------------------------------------------")
+        for tree_name, (_, detailed_info) in results.items():
+            logging.info(f"RST: {tree_name.upper()} files: {detailed_info[TOTAL_FILE_CNT]}, New: {detailed_info[NEW_FILE_CNT]}, Changed: {detailed_info[CHANGED_FILE_CNT]}, Removed: {detailed_info[REMOVED_FILE_CNT]}")
+            logging.info(f"RST: {tree_name.upper()} files sampled: {detailed_info[SAMPLED_FILE_CNT]}, Hashed bytes: {detailed_info[HASHED_BYTES]}, Mismatches: {detailed_info[MISMATCH_FILE_CNT]}")
+        logging.info("----------------------------------------------------------")
+        logging.info("Exiting the script.")
+        logging.info("==========================================================")
+
+        # Write the per-phase metrics report
+        write_metrics(metrics, config.get('metrics_json_abs_path'), config.get('metrics_prom_abs_path'))
+    finally:
+        # Clear logging handlers to prevent duplicate logs in future runs, even when the run fails
+        clear_logging_handlers()
+
+
+if __name__ == "__main__":
+    # Run the main function with the default config file path
+    verify_archive_main(config_file_path=_VERIFY_ARCHIVE_CONFIG_FILE)
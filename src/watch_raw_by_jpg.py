@@ -0,0 +1,100 @@
+import logging
+from typing import Dict, List, Any, Optional
+from http.server import ThreadingHTTPServer
+
+from src.utils.scripts import assert_abs_paths_exist
+from src.utils.walker import DEFAULT_WALK_WORKERS
+from src.utils.deleter import DEFAULT_DELETE_WORKERS, DEFAULT_DELETE_BATCH_SIZE
+from src.utils.watcher import DEFAULT_POLL_INTERVAL_SEC
+from src.utils.cull_daemon import DEFAULT_DEBOUNCE_SEC, DEFAULT_STATUS_HOST
+from src.utils.cull_daemon import RawCullDaemon, start_status_server
+from src.utils.name_matcher import NameMatcher
+from src.config.loader import load_config
+from src.config.logging_config import FULL_FILE_LOG, DEFAULT_FILE_LOG_SAMPLE_EVERY
+from src.config.logging_config import setup_logging, clear_logging_handlers
+
+
+_WATCH_RAW_BY_JPG_CONFIG_FILE = "config/watch_raw_by_jpg_config.yaml"
+
+def create_raw_cull_daemon(config: Dict[str, Any]) -> RawCullDaemon:
+    """
+    Create the watch daemon configured by `config` (not started).
+    """
+    # Extract configuration parameters
+    jpg_dir_abs_path: str = config['jpg_dir_abs_path']
+    raw_dir_abs_path: str = config['raw_dir_abs_path']
+    jpg_exts: List[str] = config['jpg_exts']
+    raw_exts: List[str] = config['raw_exts']
+    camera_prefixes: List[str] = config['camera_prefixes']
+
+    # Check if the provided paths exist
+    assert_abs_paths_exist(
+        abs_paths=[jpg_dir_abs_path, raw_dir_abs_path]
+    )
+
+    return RawCullDaemon(
+        jpg_dir_abs_path=jpg_dir_abs_path,
+        raw_dir_abs_path=raw_dir_abs_path,
+        camera_file_prefixs=camera_prefixes,
+        jpg_exts=jpg_exts,
+        raw_exts=raw_exts,
+        use_inotify=config.get('use_inotify', True),
+        poll_interval_sec=config.get('poll_interval_sec', DEFAULT_POLL_INTERVAL_SEC),
+        debounce_sec=config.get('debounce_sec', DEFAULT_DEBOUNCE_SEC),
+        cull_on_start=config.get('cull_on_start', True),
+        cull_new_raw_files=config.get('cull_new_raw_files', True),
+        walk_workers=config.get('walk_workers', DEFAULT_WALK_WORKERS),
+        delete_workers=config.get('delete_workers', DEFAULT_DELETE_WORKERS),
+        delete_batch_size=config.get('delete_batch_size', DEFAULT_DELETE_BATCH_SIZE),
+        matcher=NameMatcher(
+            case_fold=config.get('case_insensitive_names', False),
+            suffix_patterns=config.get('name_suffix_patterns') or [],
+        ),
+    )
+
+def watch_raw_by_jpg_main(config_file_path: str = _WATCH_RAW_BY_JPG_CONFIG_FILE) -> None:
+    """
+    Main function to keep culling RAW files as the JPG directory changes, until interrupted (Ctrl+C).
+    """
+    # Load configuration from YAML file
+    config: Dict[str, Any] = load_config(config_file_path)
+
+    # Configure logging
+    log_file_abs_path: str = config['log_file_abs_path']
+    setup_logging(
+        log_to_file=True,
+        log_file_abs_path=log_file_abs_path,
+        use_queue=config.get('async_logging', False),
+        file_log_verbosity=config.get('file_log_verbosity', FULL_FILE_LOG),
+        file_log_sample_every=config.get('file_log_sample_every', DEFAULT_FILE_LOG_SAMPLE_EVERY),
+    )
+
+    try:
+        daemon: RawCullDaemon = create_raw_cull_daemon(config)
+        status_port: Optional[int] = config.get('status_port')
+        server: Optional[ThreadingHTTPServer] = None
+        if status_port:
+            server = start_status_server(daemon, status_port, config.get('status_host', DEFAULT_STATUS_HOST))
+
+        try:
+            daemon.run()
+        except KeyboardInterrupt:
+            logging.info("Interrupted, stopping the daemon.")
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+
+        status: Dict[str, Any] = daemon.status()
+        logging.info("==========================================================")
+        logging.info(f"RST: Watch cycles: {status['cycle_cnt']}, Deleted RAW files: {status['deleted_raw_cnt']}, Failed to delete: {status['failed_delete_raw_cnt']}.")
+        logging.info("Exiting the script.")
+        logging.info("==========================================================")
+    finally:
+        # Clear logging handlers to prevent duplicate logs in future runs, even when the run fails
+        clear_logging_handlers()
+
+
+if __name__ == "__main__":
+    # Run the main function with the default config file path
+    watch_raw_by_jpg_main(config_file_path=_WATCH_RAW_BY_JPG_CONFIG_FILE)
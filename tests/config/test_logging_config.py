@@ -0,0 +1,55 @@
+import logging
+from pathlib import Path
+from typing import List
+
+from tests.base.test_base import TestScripts
+from src.config.logging_config import FULL_FILE_LOG, SAMPLED_FILE_LOG, SUMMARY_FILE_LOG
+from src.config.logging_config import get_file_logger, setup_logging, clear_logging_handlers
+
+
+class TestSetupLogging(TestScripts):
+    def _write_log(self, log_file: Path, file_log_verbosity: str, use_queue: bool) -> List[str]:
+        # Emit per-file lines, one per-file error and one summary line
+        TEST_FILE_LINE_CNT = 100
+        # Start from a bare root logger, basicConfig is a no-op otherwise
+        clear_logging_handlers()
+        setup_logging(
+            log_to_file=True,
+            log_file_abs_path=str(log_file.resolve()),
+            use_queue=use_queue,
+            file_log_verbosity=file_log_verbosity,
+            file_log_sample_every=10,
+            buffer_capacity=16,
+        )
+        try:
+            file_logger: logging.Logger = get_file_logger()
+            for i in range(TEST_FILE_LINE_CNT):
+                file_logger.info("Moved: %s", i)
+            file_logger.error("Failed to move %s", "broken.jpg")
+            logging.info("RST: Final counts: %s", TEST_FILE_LINE_CNT)
+        finally:
+            clear_logging_handlers()
+        return log_file.read_text().splitlines()
+
+    def test_setup_logging(self):
+        for use_queue in (False, True):
+            # TestCase 01: Full verbosity keeps every per-file line
+            lines: List[str] = self._write_log(self.data_root / f"full_{use_queue}.log", FULL_FILE_LOG, use_queue)
+            self.assertEqual(sum("Moved:" in line for line in lines), 100)
+
+            # TestCase 02: Sampled verbosity keeps one line out of ten
+            lines = self._write_log(self.data_root / f"sampled_{use_queue}.log", SAMPLED_FILE_LOG, use_queue)
+            self.assertEqual(sum("Moved:" in line for line in lines), 10)
+
+            # TestCase 03: Summary verbosity drops per-file lines only
+            lines = self._write_log(self.data_root / f"summary_{use_queue}.log", SUMMARY_FILE_LOG, use_queue)
+            self.assertEqual(sum("Moved:" in line for line in lines), 0)
+
+            # Errors and summary lines are always written, and in order
+            self.assertTrue(any("Failed to move broken.jpg" in line for line in lines))
+            self.assertTrue(lines[-1].endswith("RST: Final counts: 100"))
+
+        # TestCase 04: Unknown verbosity is rejected
+        with self.assertRaises(ValueError):
+            setup_logging(file_log_verbosity="verbose")
+        clear_logging_handlers()
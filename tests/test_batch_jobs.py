@@ -0,0 +1,67 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List
+
+from tests.base.test_base import TestScripts
+from src.batch_jobs import batch_jobs_main
+from src.utils.metrics import TRASH_OP
+
+
+class TestBatchJobsMain(TestScripts):
+
+    def test_batch_jobs_main(self):
+        # Initialize test parameters
+        TEST_LOG_FILE: Path = self.data_root / "batch_jobs.log"
+        TEST_SUMMARY_FILE: Path = self.data_root / "summary.json"
+        jobs: List[Dict[str, Any]] = []
+        kept_raw_paths: List[Path] = []
+        for photographer in ("alice", "bob"):
+            jpg_dir: Path = self.data_root / photographer / "jpg_files"
+            raw_dir: Path = self.data_root / photographer / "raw_files"
+            jpg_paths: List[Path] = self.create_dummy_files(random_depth=(1, 3), file_count=10, file_ext='.jpg', file_prefix='DSC_', base_path=jpg_dir)
+            kept_raw_paths += self.create_dummy_files(random_depth=(1, 3), file_count=10, if_repeated=True, file_names=[f"{path.stem}.nef" for path in jpg_paths], base_path=raw_dir)
+            self.create_dummy_files(random_depth=(1, 3), file_count=5, file_ext='.nef', file_prefix='DSC_', base_path=raw_dir)
+            jobs.append({'name': photographer, 'type': 'filter_raw_by_jpg', 'config': {'jpg_dir_abs_path': str(jpg_dir.resolve()), 'raw_dir_abs_path': str(raw_dir.resolve())}})
+        jobs.append({'name': 'alice_dedupe', 'type': 'dedupe_jpgs', 'config': {'jpg_dir_abs_path': str((self.data_root / "alice" / "jpg_files").resolve())}})
+        # Create .yaml config file (JSON is valid YAML)
+        config_file_abs_path: Path = self.data_root / "config.yaml"
+        config_file_abs_path.write_text(json.dumps({
+            'max_jobs': 3,
+            'per_device_jobs': 2,
+            'defaults': {'jpg_exts': ['.jpg'], 'raw_exts': ['.nef'], 'camera_prefixes': ['dsc']},
+            'jobs': jobs,
+            'summary_json_abs_path': str(TEST_SUMMARY_FILE.resolve()),
+            'log_file_abs_path': str(TEST_LOG_FILE.resolve()),
+        }), encoding='utf-8')
+
+        # TestCase01: Run the main function, every job runs and the summary covers them all
+        batch_jobs_main(config_file_path=str(config_file_abs_path.resolve()))
+        remaining_raw_paths: List[Path] = sorted(path.resolve() for path in self.data_root.rglob("*.nef"))
+        self.assertEqual(remaining_raw_paths, sorted(kept_raw_paths))
+        summary: Dict[str, Any] = json.loads(TEST_SUMMARY_FILE.read_text(encoding='utf-8'))
+        self.assertEqual((summary['job_cnt'], summary['failed_job_cnt']), (3, 0))
+        self.assertEqual([(job['name'], job['info'].get('deleted_raw_cnt')) for job in summary['jobs']], [('alice', 5), ('bob', 5), ('alice_dedupe', None)])
+        # Operation counts are not told apart between concurrent jobs, so only the batch reports them
+        self.assertEqual(summary['ops'][TRASH_OP], 10)
+        self.assertTrue(all(phase['ops'] == {} for job in summary['jobs'] for phase in job['metrics']['phases']))
+
+    def test_batch_jobs_main_invalid(self):
+        # TestCase01: An invalid job stops the batch before any job runs
+        TEST_RAW_DIR: Path = self.data_root / "raw_files"
+        raw_paths: List[Path] = self.create_dummy_files(random_depth=(1, 2), file_count=3, file_ext='.nef', base_path=TEST_RAW_DIR)
+        (self.data_root / "jpg_files").mkdir()
+        config_file_abs_path: Path = self.data_root / "config.yaml"
+        config_file_abs_path.write_text(json.dumps({
+            'defaults': {'jpg_exts': ['.jpg'], 'raw_exts': ['.nef'], 'camera_prefixes': ['dsc']},
+            'jobs': [
+                {'name': 'valid', 'type': 'filter_raw_by_jpg', 'config': {'jpg_dir_abs_path': str((self.data_root / "jpg_files").resolve()), 'raw_dir_abs_path': str(TEST_RAW_DIR.resolve())}},
+                {'name': 'typo', 'type': 'filter_raw_by_jpgs', 'config': {}},
+            ],
+            'log_file_abs_path': str((self.data_root / "batch_jobs.log").resolve()),
+        }), encoding='utf-8')
+        with self.assertRaises(ValueError):
+            batch_jobs_main(config_file_path=str(config_file_abs_path.resolve()))
+        self.assertTrue(all(path.exists() for path in raw_paths))
+        # The failed batch still clears its log handlers
+        self.assertListEqual(logging.getLogger().handlers, [])
@@ -0,0 +1,56 @@
+import sys
+import subprocess
+from pathlib import Path
+from typing import Dict, Set, Tuple
+
+from tests.base.test_base import TestScripts
+from src.__main__ import main
+
+
+# Generous budgets (microseconds of cumulative import time), meant to catch a heavy import
+# sneaking back into the start-up path rather than to benchmark the machine
+_HELP_IMPORT_BUDGET_US = 150_000
+_COMMAND_IMPORT_BUDGET_US = 250_000
+
+def _import_times(*args: str, runs: int = 3) -> Dict[str, Tuple[int, int]]:
+    """
+    Run Python with `-X importtime` and return the best (self, cumulative) microseconds per imported module over `runs` runs.
+    """
+    times: Dict[str, Tuple[int, int]] = {}
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-X', 'importtime', *args], capture_output=True, text=True, cwd=Path(__file__).resolve().parents[1])
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, module = line[len('import time:'):].split('|')
+            best: Tuple[int, int] = times.get(module.strip(), (int(self_us), int(cumulative_us)))
+            times[module.strip()] = (min(best[0], int(self_us)), min(best[1], int(cumulative_us)))
+    return times
+
+class TestCli(TestScripts):
+
+    def test_import_time_budget(self):
+        # TestCase01: The top-level help loads no subcommand and no heavy dependency
+        times: Dict[str, Tuple[int, int]] = _import_times('-m', 'src', '--help')
+        loaded: Set[str] = set(times)
+        self.assertFalse(loaded & {'yaml', 'send2trash', 'pprint', 'src.filter_raw_by_jpg', 'src.flatten_jpgs', 'src.batch_jobs'})
+        self.assertLess(sum(self_us for self_us, _ in times.values()), _HELP_IMPORT_BUDGET_US)
+
+        # TestCase02: Importing a subcommand does not load what only runs later (config parsing, trashing, queued logging, SQLite)
+        for module in ('src.filter_raw_by_jpg', 'src.flatten_jpgs', 'src.dedupe_jpgs', 'src.verify_archive'):
+            times = _import_times('-c', f"import {module}")
+            self.assertFalse(set(times) & {'yaml', 'send2trash', 'pprint', 'logging.handlers', 'sqlite3'}, module)
+            self.assertLess(times[module][1], _COMMAND_IMPORT_BUDGET_US, module)
+
+    def test_main_overrides(self):
+        # TestCase01: Command line options override the configuration file
+        TEST_JPG_DIR: Path = self.data_root / "jpg_files"
+        TEST_PROFILE_FILE: Path = self.data_root / "dedupe.prof"
+        self.create_dummy_files(random_depth=(1, 2), file_count=3, file_ext='.jpg', base_path=TEST_JPG_DIR)
+        config_file_abs_path: Path = self.data_root / "config.yaml"
+        config_file_abs_path.write_text(
+            f"jpg_dir_abs_path: {TEST_JPG_DIR.resolve()}\njpg_exts: .jpg\nhash_workers: 1\nlog_file_abs_path: {(self.data_root / 'dedupe.log').resolve()}\n",
+            encoding='utf-8',
+        )
+        self.assertEqual(main(['dedupe', '--config', str(config_file_abs_path), '--profile', str(TEST_PROFILE_FILE.resolve())]), 0)
+        self.assertTrue(TEST_PROFILE_FILE.exists())
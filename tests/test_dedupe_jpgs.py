@@ -0,0 +1,49 @@
+import os
+from pathlib import Path
+from typing import List
+
+from tests.base.test_base import TestScripts
+from src.dedupe_jpgs import dedupe_jpgs_main
+
+
+class TestDedupeJpgsMain(TestScripts):
+
+    def test_dedupe_jpgs_main(self):
+        # Initialize test parameters
+        TEST_JPG_CNT = 30
+        TEST_RANDOM_DEPTH = (1, 3)
+        TEST_JPG_EXTS = ['.jpg', '.jpeg']
+        TEST_JPG_DIR: Path = self.data_root / "jpg_files"
+        TEST_LOG_FILE: Path = self.data_root / "dedupe_jpgs.log"
+        # Create .yaml config file
+        config_file_abs_path: Path = self.data_root / "config.yaml"
+        config_content = {
+            'jpg_dir_abs_path': str(TEST_JPG_DIR.resolve()),
+            'jpg_exts': TEST_JPG_EXTS,
+            'hash_workers': 2,
+            'hardlink_duplicates': True,
+            'log_file_abs_path': str(TEST_LOG_FILE.resolve()),
+        }
+        with open(config_file_abs_path, 'w') as config_file:
+            for key, value in config_content.items():
+                if isinstance(value, list):
+                    value = ', '.join(value)
+                config_file.write(f"{key}: {value}\n")
+        # Create JPG files, and a copy of each in another category folder
+        jpg_paths: List[Path] = self.create_dummy_files(
+            random_depth=TEST_RANDOM_DEPTH,
+            file_count=TEST_JPG_CNT,
+            file_ext='.jpg',
+            file_prefix='DSC_',
+            base_path=TEST_JPG_DIR,
+        )
+        copy_dir: Path = TEST_JPG_DIR / "best"
+        copy_dir.mkdir()
+        for path in jpg_paths:
+            path.write_bytes(os.urandom(2048))
+            (copy_dir / path.name).write_bytes(path.read_bytes())
+
+        # TestCase01: Run the main function, every copy becomes a hardlink
+        dedupe_jpgs_main(config_file_path=str(config_file_abs_path.resolve()))
+        for path in jpg_paths:
+            self.assertTrue(os.path.samefile(path, copy_dir / path.name))
@@ -1,14 +1,21 @@
+import csv
+import gzip
+import json
 import random
+import threading
+from collections import Counter
 from pathlib import Path
-from typing import List
+from typing import List, Dict, Any
+from unittest import mock
 
 from tests.base.test_base import TestScripts
 from src.filter_raw_by_jpg import filter_raw_by_jpg_main
+from src.restore_quarantine import restore_quarantine_main
 
 
 class TestFilterRawByJpgMain(TestScripts):
 
-    def test_filter_raw_by_jpg_main(self):
+    def _run_filter_raw_by_jpg_main(self, extra_config: Dict[str, Any] = None, expect_culled: bool = True, with_sidecars: bool = False):
         # Initialize test parameters
         TEST_JPG_CNT = 100
         TEST_OTHER_RAW_CNT = 300
@@ -28,6 +35,7 @@ class TestFilterRawByJpgMain(TestScripts):
             'raw_exts': TEST_RAW_EXTS,
             'camera_prefixes': TEST_CAMERA_FILE_PREFIXS,
             'log_file_abs_path': str(TEST_LOG_FILE.resolve()),
+            **(extra_config or {}),
         }
         with open(config_file_abs_path, 'w') as config_file:
             for key, value in config_content.items():
@@ -62,17 +70,117 @@ class TestFilterRawByJpgMain(TestScripts):
             file_prefix=random.choice(TEST_CAMERA_FILE_PREFIXS),
             base_path=TEST_RAW_DIR,
         )
+        # Create one sidecar per RAW file, named after the RAW file with or without its extension
+        if with_sidecars:
+            for raw_path in corresponding_raw_paths + non_corresponding_raw_paths:
+                Path(f"{raw_path}.xmp" if random.random() < 0.5 else raw_path.with_suffix('.xmp')).touch()
         # Testcase01: Run the main function
         filter_raw_by_jpg_main(config_file_path=str(config_file_abs_path.resolve()))
-        remaining_raw_files: List[Path] = list(TEST_RAW_DIR.rglob(f"*"))
+        remaining_raw_files: List[Path] = [path for path in TEST_RAW_DIR.rglob(f"*") if '.quarantine' not in path.parts]
         remaining_raw_stems: List[str] = [path.stem for path in remaining_raw_files if path.suffix.lower() in TEST_RAW_EXTS]
-        self.assertEqual(set(remaining_raw_stems), set(jpg_names))
+        if expect_culled:
+            self.assertEqual(set(remaining_raw_stems), set(jpg_names))
+        else:
+            self.assertEqual(len(remaining_raw_stems), TEST_OTHER_RAW_CNT)
+        if with_sidecars:
+            remaining_sidecar_stems: List[str] = [path.name.partition('.')[0] for path in remaining_raw_files if path.suffix == '.xmp']
+            self.assertEqual(sorted(remaining_sidecar_stems), sorted(remaining_raw_stems))
+
+    def test_filter_raw_by_jpg_main(self):
+        self._run_filter_raw_by_jpg_main()
 
+    def test_filter_raw_by_jpg_main_pipelined(self):
+        self._run_filter_raw_by_jpg_main(extra_config={'pipelined': True})
+
+    def test_filter_raw_by_jpg_main_pipelined_jpg_scan_error(self):
+        # A failed JPG scan does not leave the background RAW scan thread behind
+        TEST_JPG_DIR: Path = self.data_root / "jpg_files"
+        TEST_RAW_DIR: Path = self.data_root / "raw_files"
+        TEST_LOG_FILE: Path = self.data_root / "filter_raw_by_jpg.log"
+        TEST_JPG_DIR.mkdir(parents=True, exist_ok=True)
+        self.create_dummy_files(random_depth=(1, 3), file_count=50, file_ext='.nef', file_prefix='CAM1_', base_path=TEST_RAW_DIR)
+        config_file_abs_path: Path = self.data_root / "config.yaml"
+        config_file_abs_path.write_text(
+            f"jpg_dir_abs_path: {TEST_JPG_DIR.resolve()}\n"
+            f"raw_dir_abs_path: {TEST_RAW_DIR.resolve()}\n"
+            "jpg_exts: .jpg\n"
+            "raw_exts: .nef\n"
+            "camera_prefixes: CAM1_\n"
+            "pipelined: True\n"
+            f"log_file_abs_path: {TEST_LOG_FILE.resolve()}\n"
+        )
+        with mock.patch('src.filter_raw_by_jpg.gather_camera_jpg_names', side_effect=OSError("JPG scan failed")):
+            with self.assertRaises(OSError):
+                filter_raw_by_jpg_main(config_file_path=str(config_file_abs_path.resolve()))
+        self.assertEqual([thread for thread in threading.enumerate() if thread.name.startswith("raw-scan")], [])
+        self.assertEqual(len(list(TEST_RAW_DIR.rglob("*.nef"))), 50)
 
+    def test_filter_raw_by_jpg_main_metrics(self):
+        TEST_METRICS_FILE: Path = self.data_root / "metrics.json"
+        self._run_filter_raw_by_jpg_main(extra_config={'metrics_json_abs_path': str(TEST_METRICS_FILE.resolve())})
+        report: Dict[str, Any] = json.loads(TEST_METRICS_FILE.read_text(encoding='utf-8'))
+        phases: Dict[str, Dict[str, Any]] = {phase['phase']: phase for phase in report['phases']}
+        self.assertEqual(list(phases), ['scan_jpg', 'scan_match_raw', 'delete_raw'])
+        self.assertEqual(phases['scan_jpg']['items'], 100)
+        self.assertEqual(phases['scan_match_raw']['items'], 300)
+        self.assertEqual(phases['delete_raw']['items'], 200)
 
+    def test_filter_raw_by_jpg_main_adaptive_io(self):
+        TEST_METRICS_FILE: Path = self.data_root / "metrics.json"
+        self._run_filter_raw_by_jpg_main(extra_config={'adaptive_io': True, 'io_max_workers': 4, 'metrics_json_abs_path': str(TEST_METRICS_FILE.resolve())})
+        report: Dict[str, Any] = json.loads(TEST_METRICS_FILE.read_text(encoding='utf-8'))
+        self.assertEqual(set(report['io_concurrency']), {'walk', 'delete'})
+        self.assertTrue(all(1 <= limit <= 4 for steps in report['io_concurrency'].values() for _, limit in steps))
 
+    def test_filter_raw_by_jpg_main_dry_run_report(self):
+        # The dry run deletes nothing, and the report lists every camera JPG and RAW file plus one row per folder
+        TEST_REPORT_FILE: Path = self.data_root / "pairing.csv.gz"
+        self._run_filter_raw_by_jpg_main(extra_config={'dry_run': True, 'pairing_report_abs_path': str(TEST_REPORT_FILE.resolve())}, expect_culled=False)
+        with gzip.open(TEST_REPORT_FILE, 'rt', encoding='utf-8', newline='') as report_file:
+            rows: List[Dict[str, str]] = list(csv.DictReader(report_file))
+        statuses = Counter((row['tree'], row['status']) for row in rows)
+        self.assertEqual(statuses[('jpg', 'paired')], 100)
+        self.assertEqual(statuses[('jpg', 'orphan')], 0)
+        self.assertEqual(statuses[('raw', 'paired')], 100)
+        self.assertEqual(statuses[('raw', 'orphan')], 200)
+        folder_rows: List[Dict[str, str]] = [row for row in rows if row['status'] == 'folder']
+        self.assertEqual(sum(int(row['orphan_cnt']) for row in folder_rows if row['tree'] == 'raw'), 200)
+        self.assertEqual(len({(row['tree'], row['folder']) for row in folder_rows}), len(folder_rows))
 
+    def test_filter_raw_by_jpg_main_sidecars(self):
+        # The sidecars are planned in the checkpoint journal with their RAW files
+        TEST_CHECKPOINT_FILE: Path = self.data_root / "checkpoint.jsonl"
+        self._run_filter_raw_by_jpg_main(extra_config={'sidecar_exts': json.dumps(['.xmp', '.pp3']), 'checkpoint_abs_path': str(TEST_CHECKPOINT_FILE.resolve())}, with_sidecars=True)
+        planned: List[Dict[str, Any]] = [record for record in map(json.loads, TEST_CHECKPOINT_FILE.read_text(encoding='utf-8').splitlines()) if record['op'] == 'plan']
+        self.assertEqual(sum(bool(record.get('sidecar')) for record in planned), 200)
 
+    def test_filter_raw_by_jpg_main_compact_jpg_names(self):
+        self._run_filter_raw_by_jpg_main(extra_config={'compact_jpg_names': True})
 
+    def test_filter_raw_by_jpg_main_exif(self):
+        # The dummy files have no capture key, so they are matched by name
+        TEST_EXIF_CACHE_FILE: Path = self.data_root / "exif_cache.db"
+        self._run_filter_raw_by_jpg_main(extra_config={'match_key': 'exif', 'exif_cache_db_abs_path': str(TEST_EXIF_CACHE_FILE.resolve())})
+        self.assertTrue(TEST_EXIF_CACHE_FILE.exists())
 
+    def test_filter_raw_by_jpg_main_quarantine(self):
+        self._run_filter_raw_by_jpg_main(extra_config={'delete_backend': 'quarantine'})
+        TEST_RAW_DIR: Path = self.data_root / "raw_files"
+        self.assertEqual(len(list((TEST_RAW_DIR / ".quarantine").rglob("*.*"))), 200 + 1)
+        # Restoring with the same configuration file brings every RAW file back
+        restore_quarantine_main(config_file_path=str((self.data_root / "config.yaml").resolve()))
+        self.assertEqual(len([path for path in TEST_RAW_DIR.rglob("*") if path.is_file()]), 300)
 
+    def test_filter_raw_by_jpg_main_mirror(self):
+        self._run_filter_raw_by_jpg_main(extra_config={'mirror_jpg_structure': True})
+        # Every kept RAW file sits in the folder of its JPG file
+        TEST_JPG_DIR: Path = (self.data_root / "jpg_files").resolve()
+        TEST_RAW_DIR: Path = (self.data_root / "raw_files").resolve()
+        jpg_dirs: Dict[str, Path] = {path.stem: path.parent.relative_to(TEST_JPG_DIR) for path in TEST_JPG_DIR.rglob("*.jp*g")}
+        raw_paths: List[Path] = [path for path in TEST_RAW_DIR.rglob("*") if path.is_file()]
+        self.assertEqual(len(raw_paths), len(jpg_dirs))
+        for raw_path in raw_paths:
+            self.assertEqual(raw_path.parent.relative_to(TEST_RAW_DIR), jpg_dirs[raw_path.stem])
+        # The checkpoint journal records no move, so resuming a mirrored run is refused
+        with self.assertRaises(ValueError):
+            filter_raw_by_jpg_main(config_file_path=str((self.data_root / "config.yaml").resolve()), config_overrides={'resume': True})
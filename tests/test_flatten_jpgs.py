@@ -1,9 +1,15 @@
 import random
+import logging
+import shutil
 from pathlib import Path
 from typing import List, Dict, Set
 
 from tests.base.test_base import TestScripts
-from src.flatten_jpgs import flatten_jpgs_main
+from src.flatten_jpgs import flatten_jpgs_main, _plan_flatten_moves
+from src.unflatten_jpgs import unflatten_jpgs_main
+from src.utils.checkpoint import DONE_OP
+from src.utils.checkpoint import CheckpointJournal, load_checkpoint, write_plan
+from src.utils.io_scheduler import MOVE_IO, get_io_limiter
 
 
 class TestFlattenJpgsMain(TestScripts):
@@ -68,3 +74,235 @@ class TestFlattenJpgsMain(TestScripts):
 
 
 
+
+    def test_flatten_jpgs_main_resume(self):
+        # Initialize test parameters
+        TEST_JPG_CNT = 50
+        TEST_MOVED_CNT = 20
+        TEST_RANDOM_DEPTH = (0, 3)
+        TEST_NUMBER_OF_DIGITS = 3
+        TEST_JPG_EXTS = ['.jpg', '.jpeg']
+        TEST_INPUT_JPG_DIR: Path = self.data_root / "input_jpg_files"
+        TEST_OUTPUT_JPG_DIR: Path = self.data_root / "output_jpg_files"
+        TEST_LOG_FILE: Path = self.data_root / "flatten_jpgs.log"
+        TEST_CHECKPOINT_FILE: Path = self.data_root / "flatten_jpgs.checkpoint.jsonl"
+
+        TEST_INPUT_JPG_DIR.mkdir(parents=True, exist_ok=True)
+        TEST_OUTPUT_JPG_DIR.mkdir(parents=True, exist_ok=True)
+        # Create .yaml config file
+        config_file_abs_path: Path = self.data_root / "config.yaml"
+        config_content = {
+            'input_jpg_dir_abs_path': str(TEST_INPUT_JPG_DIR.resolve()),
+            'output_jpg_dir_abs_path': str(TEST_OUTPUT_JPG_DIR.resolve()),
+            'jpg_exts': TEST_JPG_EXTS,
+            'number_of_digits': TEST_NUMBER_OF_DIGITS,
+            'log_file_abs_path': str(TEST_LOG_FILE.resolve()),
+            'checkpoint_abs_path': str(TEST_CHECKPOINT_FILE.resolve()),
+            'resume': True,
+        }
+        with open(config_file_abs_path, 'w') as config_file:
+            for key, value in config_content.items():
+                if isinstance(value, list):
+                    value = ', '.join(value)
+                config_file.write(f"{key}: {value}\n")
+        # Create JPG files
+        jpg_paths: List[Path] = self.create_dummy_files(
+            file_count=TEST_JPG_CNT,
+            random_depth=TEST_RANDOM_DEPTH,
+            file_ext=".jpg",
+            base_path=TEST_INPUT_JPG_DIR,
+        )
+
+        # Simulate an interrupted run: the whole plan is journaled, only part of it was moved
+        planned: List[Dict[str, str]] = [
+            {'src': str(path), 'dst': str(TEST_OUTPUT_JPG_DIR.resolve() / f"{i:0{TEST_NUMBER_OF_DIGITS}d}.jpg")}
+            for i, path in enumerate(jpg_paths, start=1)
+        ]
+        with CheckpointJournal(str(TEST_CHECKPOINT_FILE.resolve()), truncate=True) as journal:
+            write_plan(journal, planned, {'counters': {'': TEST_JPG_CNT}})
+            for item in planned[:TEST_MOVED_CNT]:
+                Path(item['src']).rename(item['dst'])
+                journal.append({'op': DONE_OP, 'src': item['src']})
+        # Moved, but its record was lost in the crash
+        Path(planned[TEST_MOVED_CNT]['src']).rename(planned[TEST_MOVED_CNT]['dst'])
+        # Added after the interrupted run started, must not be picked up without a rescan
+        late_paths: List[Path] = self.create_dummy_files(
+            file_count=1,
+            random_depth=(0, 0),
+            file_ext=".jpg",
+            base_path=TEST_INPUT_JPG_DIR,
+        )
+
+        # TestCase01: Resume the interrupted run
+        flatten_jpgs_main(config_file_path=str(config_file_abs_path.resolve()))
+
+        actual_names: Set[str] = set(path.name for path in TEST_OUTPUT_JPG_DIR.glob('*'))
+        self.assertSetEqual(actual_names, set(Path(item['dst']).name for item in planned))
+        self.assertTrue(late_paths[0].exists())
+        self.assertTrue(load_checkpoint(str(TEST_CHECKPOINT_FILE.resolve())).finished)
+
+    def test_flatten_jpgs_main_append(self):
+        # Initialize test parameters
+        TEST_NUMBER_OF_DIGITS = 2
+        TEST_INPUT_JPG_DIR: Path = self.data_root / "input_jpg_files"
+        TEST_OUTPUT_JPG_DIR: Path = self.data_root / "output_jpg_files"
+        TEST_LOG_FILE: Path = self.data_root / "flatten_jpgs.log"
+
+        TEST_OUTPUT_JPG_DIR.mkdir(parents=True, exist_ok=True)
+        # Create .yaml config files, with and without append mode
+        config_file_abs_paths: Dict[bool, Path] = {}
+        for append in (False, True):
+            config_file_abs_paths[append] = self.data_root / f"config_{append}.yaml"
+            config_content = {
+                'input_jpg_dir_abs_path': str(TEST_INPUT_JPG_DIR.resolve()),
+                'output_jpg_dir_abs_path': str(TEST_OUTPUT_JPG_DIR.resolve()),
+                'jpg_exts': ['.jpg', '.jpeg'],
+                'number_of_digits': TEST_NUMBER_OF_DIGITS,
+                'append': append,
+                'log_file_abs_path': str(TEST_LOG_FILE.resolve()),
+            }
+            with open(config_file_abs_paths[append], 'w') as config_file:
+                for key, value in config_content.items():
+                    if isinstance(value, list):
+                        value = ', '.join(value)
+                    config_file.write(f"{key}: {value}\n")
+        # The output directory already holds a flattened batch
+        for name in ("person-01.jpg", "person-02.jpg", "person-2024-05.jpg", "01.jpg", "notes.txt"):
+            (TEST_OUTPUT_JPG_DIR / name).touch()
+        for relpath in ("person/a.jpg", "person/b.jpg", "person/2024/c.jpg", "d.jpg", "scenery/e.jpg"):
+            (TEST_INPUT_JPG_DIR / relpath).parent.mkdir(parents=True, exist_ok=True)
+            (TEST_INPUT_JPG_DIR / relpath).touch()
+
+        # TestCase01: Without append mode, the files whose names are taken stay in the input directory
+        flatten_jpgs_main(config_file_path=str(config_file_abs_paths[False].resolve()))
+        remaining_names: Set[str] = set(path.name for path in TEST_INPUT_JPG_DIR.rglob("*.jpg"))
+        self.assertSetEqual(remaining_names, {"a.jpg", "b.jpg", "d.jpg"})
+        actual_names: Set[str] = set(path.name for path in TEST_OUTPUT_JPG_DIR.glob('*'))
+        self.assertSetEqual(actual_names, {
+            "person-01.jpg", "person-02.jpg", "person-2024-05.jpg", "01.jpg", "notes.txt",
+            "person-2024-01.jpg", "scenery-01.jpg",
+        })
+
+        # TestCase02: With append mode, the numbering continues from the output directory
+        flatten_jpgs_main(config_file_path=str(config_file_abs_paths[True].resolve()))
+        self.assertEqual(len(list(TEST_INPUT_JPG_DIR.rglob("*.jpg"))), 0)
+        actual_names = set(path.name for path in TEST_OUTPUT_JPG_DIR.glob('*'))
+        self.assertSetEqual(actual_names, {
+            "person-01.jpg", "person-02.jpg", "person-2024-05.jpg", "01.jpg", "notes.txt",
+            "person-2024-01.jpg", "scenery-01.jpg", "person-03.jpg", "person-04.jpg", "02.jpg",
+        })
+
+    def test_flatten_jpgs_main_streaming(self):
+        # Initialize test parameters
+        TEST_JPG_CNT = 120
+        TEST_INPUT_JPG_DIR: Path = self.data_root / "input_jpg_files"
+        TEST_OUTPUT_JPG_DIR: Path = self.data_root / "output_jpg_files"
+        TEST_JOURNAL_DIR: Path = self.data_root / "move_journals"
+        TEST_CHECKPOINT_FILE: Path = self.data_root / "flatten_jpgs.checkpoint.jsonl"
+        TEST_LOG_FILE: Path = self.data_root / "flatten_jpgs.log"
+
+        TEST_INPUT_JPG_DIR.mkdir(parents=True, exist_ok=True)
+        TEST_OUTPUT_JPG_DIR.mkdir(parents=True, exist_ok=True)
+        # Create .yaml config files, with and without a checkpoint journal
+        config_file_abs_paths: Dict[bool, Path] = {}
+        for with_checkpoint in (False, True):
+            config_file_abs_paths[with_checkpoint] = self.data_root / f"config_{with_checkpoint}.yaml"
+            config_content = {
+                'input_jpg_dir_abs_path': str(TEST_INPUT_JPG_DIR.resolve()),
+                'output_jpg_dir_abs_path': str(TEST_OUTPUT_JPG_DIR.resolve()),
+                'jpg_exts': ['.jpg', '.jpeg'],
+                'number_of_digits': 3,
+                'streaming': True,
+                'max_pending_moves': 2,
+                'move_journal_dir_abs_path': str(TEST_JOURNAL_DIR.resolve()),
+                'checkpoint_abs_path': str(TEST_CHECKPOINT_FILE.resolve()) if with_checkpoint else '""',
+                'adaptive_io': with_checkpoint,
+                'log_file_abs_path': str(TEST_LOG_FILE.resolve()),
+            }
+            with open(config_file_abs_paths[with_checkpoint], 'w') as config_file:
+                for key, value in config_content.items():
+                    if isinstance(value, list):
+                        value = ', '.join(value)
+                    config_file.write(f"{key}: {value}\n")
+        # Create JPG files
+        jpg_paths: List[Path] = self.create_dummy_files(
+            file_count=TEST_JPG_CNT,
+            random_depth=(0, 3),
+            file_ext=".jpg",
+            base_path=TEST_INPUT_JPG_DIR,
+        )
+        for path in jpg_paths:
+            path.write_bytes(path.name.encode())
+        planned_moves, _ = _plan_flatten_moves(str(TEST_INPUT_JPG_DIR.resolve()), str(TEST_OUTPUT_JPG_DIR.resolve()), ['.jpg', '.jpeg'], 3)
+
+        # TestCase01: A checkpoint journal needs the whole plan first, so it is refused, and the failed run still cleans up
+        with self.assertRaises(ValueError):
+            flatten_jpgs_main(config_file_path=str(config_file_abs_paths[True].resolve()))
+        self.assertIsNone(get_io_limiter(MOVE_IO))
+        self.assertListEqual(logging.getLogger().handlers, [])
+
+        # TestCase02: Every file gets the name the planned (non-streaming) run gives it
+        flatten_jpgs_main(config_file_path=str(config_file_abs_paths[False].resolve()))
+        self.assertEqual(len(list(TEST_OUTPUT_JPG_DIR.iterdir())), TEST_JPG_CNT)
+        for old_path, new_path in planned_moves:
+            self.assertEqual(Path(new_path).read_bytes(), Path(old_path).name.encode())
+
+        # TestCase03: The streamed run is reverted from its move journal
+        unflatten_jpgs_main(config_file_path=str(config_file_abs_paths[False].resolve()))
+        self.assertTrue(all(path.read_bytes() == path.name.encode() for path in jpg_paths))
+
+        # TestCase04: Names already taken in the output directory are skipped, never overwritten
+        taken_old_path, taken_new_path = planned_moves[0]
+        Path(taken_new_path).write_bytes(b"taken")
+        flatten_jpgs_main(config_file_path=str(config_file_abs_paths[False].resolve()))
+        self.assertEqual(Path(taken_new_path).read_bytes(), b"taken")
+        self.assertEqual([path.resolve() for path in TEST_INPUT_JPG_DIR.rglob("*.jpg")], [Path(taken_old_path)])
+
+    def test_unflatten_jpgs_main(self):
+        # Initialize test parameters
+        TEST_JPG_CNT = 60
+        TEST_INPUT_JPG_DIR: Path = self.data_root / "input_jpg_files"
+        TEST_OUTPUT_JPG_DIR: Path = self.data_root / "output_jpg_files"
+        TEST_JOURNAL_DIR: Path = self.data_root / "move_journals"
+        TEST_LOG_FILE: Path = self.data_root / "flatten_jpgs.log"
+
+        TEST_INPUT_JPG_DIR.mkdir(parents=True, exist_ok=True)
+        TEST_OUTPUT_JPG_DIR.mkdir(parents=True, exist_ok=True)
+        # Create .yaml config file
+        config_file_abs_path: Path = self.data_root / "config.yaml"
+        config_content = {
+            'input_jpg_dir_abs_path': str(TEST_INPUT_JPG_DIR.resolve()),
+            'output_jpg_dir_abs_path': str(TEST_OUTPUT_JPG_DIR.resolve()),
+            'jpg_exts': ['.jpg', '.jpeg'],
+            'number_of_digits': 3,
+            'move_journal_dir_abs_path': str(TEST_JOURNAL_DIR.resolve()),
+            'log_file_abs_path': str(TEST_LOG_FILE.resolve()),
+        }
+        with open(config_file_abs_path, 'w') as config_file:
+            for key, value in config_content.items():
+                if isinstance(value, list):
+                    value = ', '.join(value)
+                config_file.write(f"{key}: {value}\n")
+        # Create JPG files
+        jpg_paths: List[Path] = self.create_dummy_files(
+            file_count=TEST_JPG_CNT,
+            random_depth=(0, 3),
+            file_ext=".jpg",
+            base_path=TEST_INPUT_JPG_DIR,
+        )
+        for path in jpg_paths:
+            path.write_bytes(path.name.encode())
+
+        # TestCase01: Flatten, then unflatten from the move journal: every file is back in its folder
+        flatten_jpgs_main(config_file_path=str(config_file_abs_path.resolve()))
+        self.assertFalse(any(path.exists() for path in jpg_paths))
+        # The emptied folders are gone too, and must be recreated
+        shutil.rmtree(TEST_INPUT_JPG_DIR)
+        unflatten_jpgs_main(config_file_path=str(config_file_abs_path.resolve()))
+        self.assertTrue(all(path.read_bytes() == path.name.encode() for path in jpg_paths))
+        self.assertEqual(list(TEST_OUTPUT_JPG_DIR.iterdir()), [])
+
+        # TestCase02: Without move journal, unflattening fails and still clears its log handlers
+        with self.assertRaises(FileNotFoundError):
+            unflatten_jpgs_main(config_file_path=str(config_file_abs_path.resolve()), config_overrides={'move_journal_dir_abs_path': ''})
+        self.assertListEqual(logging.getLogger().handlers, [])
@@ -0,0 +1,57 @@
+import os
+import json
+from pathlib import Path
+from typing import List
+
+from tests.base.test_base import TestScripts
+from src.verify_archive import verify_archive_main
+
+
+class TestVerifyArchiveMain(TestScripts):
+
+    def test_verify_archive_main(self):
+        # Initialize test parameters
+        TEST_JPG_DIR: Path = self.data_root / "jpg_files"
+        TEST_RAW_DIR: Path = self.data_root / "raw_files"
+        TEST_LOG_FILE: Path = self.data_root / "verify_archive.log"
+        TEST_REPORT_FILE: Path = self.data_root / "mismatches.json"
+        # Create .yaml config file
+        config_file_abs_path: Path = self.data_root / "config.yaml"
+        config_content = {
+            'jpg_dir_abs_path': str(TEST_JPG_DIR.resolve()),
+            'raw_dir_abs_path': str(TEST_RAW_DIR.resolve()),
+            'jpg_exts': ['.jpg', '.jpeg'],
+            'raw_exts': ['.nef', '.cr2', '.dng'],
+            'jpg_manifest_db_abs_path': str((self.data_root / "jpg_manifest.db").resolve()),
+            'raw_manifest_db_abs_path': str((self.data_root / "raw_manifest.db").resolve()),
+            'verify_sample_fraction': 1,
+            'hash_workers': 2,
+            'mismatch_report_abs_path': str(TEST_REPORT_FILE.resolve()),
+            'log_file_abs_path': str(TEST_LOG_FILE.resolve()),
+        }
+        with open(config_file_abs_path, 'w') as config_file:
+            for key, value in config_content.items():
+                if isinstance(value, list):
+                    value = ', '.join(value)
+                config_file.write(f"{key}: {value}\n")
+        # Create JPG and RAW files, and a quarantined RAW file which is not part of the archive
+        jpg_paths: List[Path] = self.create_dummy_files(random_depth=(1, 3), file_count=10, file_ext='.jpg', file_prefix='DSC_', base_path=TEST_JPG_DIR)
+        raw_paths: List[Path] = self.create_dummy_files(random_depth=(1, 3), file_count=10, file_ext='.nef', file_prefix='DSC_', base_path=TEST_RAW_DIR)
+        quarantined_path: Path = TEST_RAW_DIR / ".quarantine" / "batch" / "DSC_0001.nef"
+        quarantined_path.parent.mkdir(parents=True)
+        for path in jpg_paths + raw_paths + [quarantined_path]:
+            path.write_bytes(os.urandom(1024))
+
+        # TestCase01: The first run records both trees
+        verify_archive_main(config_file_path=str(config_file_abs_path.resolve()))
+        self.assertEqual(json.loads(TEST_REPORT_FILE.read_text(encoding='utf-8')), {'jpg': [], 'raw': []})
+
+        # TestCase02: A RAW file corrupted in place is reported; the quarantine directory is not verified
+        stat_result = os.stat(raw_paths[0])
+        raw_paths[0].write_bytes(os.urandom(1024))
+        os.utime(raw_paths[0], ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+        quarantined_path.write_bytes(b"")
+        verify_archive_main(config_file_path=str(config_file_abs_path.resolve()))
+        report = json.loads(TEST_REPORT_FILE.read_text(encoding='utf-8'))
+        self.assertEqual(report['jpg'], [])
+        self.assertEqual(report['raw'], [{'relpath': os.path.relpath(raw_paths[0], TEST_RAW_DIR), 'kind': 'hash_mismatch'}])
@@ -0,0 +1,74 @@
+import time
+import threading
+from pathlib import Path
+from typing import Any, Dict, List
+
+from tests.base.test_base import TestScripts
+from src.utils.batch import SUCCEEDED_JOB, FAILED_JOB
+from src.utils.batch import JobSpec, BatchJob, load_batch_jobs, run_jobs
+
+
+class TestRunJobs(TestScripts):
+    def setUp(self):
+        super().setUp()
+        self.running_cnt: int = 0
+        self.max_running_cnt: int = 0
+        self.lock = threading.Lock()
+
+    def _sleepy_run(self, config: Dict[str, Any], metrics) -> int:
+        with self.lock:
+            self.running_cnt += 1
+            self.max_running_cnt = max(self.max_running_cnt, self.running_cnt)
+        time.sleep(0.05)
+        with self.lock:
+            self.running_cnt -= 1
+        if config.get('fail'):
+            raise RuntimeError("job failed")
+        return config['value']
+
+    def _job_specs(self) -> Dict[str, JobSpec]:
+        return {'sleepy': JobSpec(run=self._sleepy_run, required_keys=('dir_abs_path', 'value'), path_keys=('dir_abs_path',), summarize=lambda value: {'value': value})}
+
+    def test_load_batch_jobs(self):
+        TEST_DIR: Path = self.data_root / "dir"
+        TEST_DIR.mkdir()
+        TEST_JOB_CONFIG_FILE: Path = self.data_root / "job.yaml"
+        TEST_JOB_CONFIG_FILE.write_text("value: 2\nother: 3\n", encoding='utf-8')
+
+        # TestCase 01: Defaults, then the config file, then the inline config
+        jobs: List[BatchJob] = load_batch_jobs({
+            'defaults': {'dir_abs_path': str(TEST_DIR.resolve()), 'value': 1, 'other': 1},
+            'jobs': [
+                {'name': 'a', 'type': 'sleepy'},
+                {'name': 'b', 'type': 'sleepy', 'config_file': str(TEST_JOB_CONFIG_FILE), 'config': {'other': 4}},
+            ],
+        }, self._job_specs())
+        self.assertEqual([(job.name, job.config['value'], job.config['other']) for job in jobs], [('a', 1, 1), ('b', 2, 4)])
+
+        # TestCase 02: Every problem of every job is reported at once
+        with self.assertRaises(ValueError) as context:
+            load_batch_jobs({'jobs': [
+                {'name': 'a', 'type': 'unknown'},
+                {'name': 'b', 'type': 'sleepy', 'config': {'value': 1}},
+                {'name': 'b', 'type': 'sleepy', 'config': {'value': 1, 'dir_abs_path': str(self.data_root / "missing")}},
+            ]}, self._job_specs())
+        message: str = str(context.exception)
+        for expected in ("a: unknown job type", "b: missing config keys ['dir_abs_path']", "b: duplicate job name", "b: dir_abs_path does not exist"):
+            self.assertIn(expected, message)
+
+    def test_run_jobs(self):
+        TEST_DIR: Path = self.data_root / "dir"
+        TEST_DIR.mkdir()
+        jobs: List[BatchJob] = [BatchJob(f"job{index}", 'sleepy', {'dir_abs_path': str(TEST_DIR.resolve()), 'value': index, 'fail': index == 2}) for index in range(4)]
+
+        # TestCase 01: Jobs on the same disk never overlap beyond the per-device limit; a failed job does not stop the others
+        results = run_jobs(jobs, self._job_specs(), max_jobs=4, per_device_jobs=1)
+        self.assertEqual(self.max_running_cnt, 1)
+        self.assertEqual([result.status for result in results], [SUCCEEDED_JOB, SUCCEEDED_JOB, FAILED_JOB, SUCCEEDED_JOB])
+        self.assertEqual([result.info for result in results], [{'value': 0}, {'value': 1}, {}, {'value': 3}])
+        self.assertIn("job failed", results[2].error)
+
+        # TestCase 02: The shared pool bounds the number of jobs running at once
+        self.max_running_cnt = 0
+        run_jobs(jobs, self._job_specs(), max_jobs=2, per_device_jobs=4)
+        self.assertEqual(self.max_running_cnt, 2)
@@ -0,0 +1,43 @@
+from pathlib import Path
+from typing import List, Dict, Any
+
+from tests.base.test_base import TestScripts
+from src.utils.checkpoint import DONE_OP, FINISHED_OP
+from src.utils.checkpoint import CheckpointJournal, CheckpointState, read_journal, load_checkpoint, write_plan
+
+
+class TestCheckpointJournal(TestScripts):
+    def test_checkpoint_journal(self):
+        # Initialize test parameters
+        TEST_PLANNED_CNT = 100
+        TEST_DONE_CNT = 40
+        TEST_GROUP_COMMIT_SIZE = 16
+        journal_abs_path: str = str((self.data_root / "journal" / "checkpoint.jsonl").resolve())
+        planned: List[Dict[str, Any]] = [{'src': f"/src/{i}.jpg", 'dst': f"/dst/{i:03d}.jpg"} for i in range(TEST_PLANNED_CNT)]
+
+        # TestCase 01: A journal without a complete plan cannot be resumed
+        self.assertIsNone(load_checkpoint(journal_abs_path))
+
+        # TestCase 02: The plan and completed items are read back
+        with CheckpointJournal(journal_abs_path, truncate=True, group_commit_size=TEST_GROUP_COMMIT_SIZE) as journal:
+            write_plan(journal, planned, {'counters': {'': TEST_PLANNED_CNT}})
+            for item in planned[:TEST_DONE_CNT]:
+                journal.append({'op': DONE_OP, 'src': item['src']})
+        checkpoint_state: CheckpointState = load_checkpoint(journal_abs_path)
+        self.assertEqual([(item['src'], item['dst']) for item in checkpoint_state.planned], [(item['src'], item['dst']) for item in planned])
+        self.assertEqual(checkpoint_state.plan_info, {'counters': {'': TEST_PLANNED_CNT}})
+        self.assertSetEqual(checkpoint_state.done, set(item['src'] for item in planned[:TEST_DONE_CNT]))
+        self.assertFalse(checkpoint_state.finished)
+
+        # TestCase 03: A torn last record is ignored
+        with open(journal_abs_path, 'a', encoding='utf-8') as f:
+            f.write('{"op": "done", "src": "/src/99')
+        self.assertEqual(len(read_journal(journal_abs_path)), TEST_PLANNED_CNT + 1 + TEST_DONE_CNT)
+
+        # TestCase 04: Records appended after a torn record are kept
+        with CheckpointJournal(journal_abs_path) as journal:
+            journal.append({'op': FINISHED_OP})
+        checkpoint_state = load_checkpoint(journal_abs_path)
+        self.assertTrue(checkpoint_state.finished)
+        self.assertEqual(len(checkpoint_state.planned), TEST_PLANNED_CNT)
+        self.assertEqual(len(checkpoint_state.done), TEST_DONE_CNT)
@@ -0,0 +1,130 @@
+import os
+import json
+import errno
+import time
+import threading
+import urllib.request
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+from unittest import mock
+
+from tests.base.test_base import TestScripts
+from src.utils.cull_daemon import RawCullDaemon, start_status_server
+
+
+class TestRawCullDaemon(TestScripts):
+    def _wait_for(self, condition: Callable[[], bool], timeout_sec: float = 10.0) -> None:
+        deadline: float = time.monotonic() + timeout_sec
+        while not condition():
+            self.assertLess(time.monotonic(), deadline, "Timed out waiting for the daemon.")
+            time.sleep(0.05)
+
+    def _run_daemon(self, use_inotify: bool):
+        # Initialize test parameters
+        TEST_JPG_DIR: Path = (self.data_root / "jpg_files").resolve()
+        TEST_RAW_DIR: Path = (self.data_root / "raw_files").resolve()
+        for dirpath in (TEST_JPG_DIR / "person", TEST_JPG_DIR / "scenery", TEST_RAW_DIR / "card1"):
+            dirpath.mkdir(parents=True)
+        for name in ("DSC_0001", "DSC_0002", "DSC_0003"):
+            (TEST_JPG_DIR / "person" / f"{name}.jpg").touch()
+            (TEST_RAW_DIR / "card1" / f"{name}.nef").touch()
+        (TEST_RAW_DIR / "card1" / "DSC_0004.nef").touch()
+        deleted_paths: List[str] = []
+        def delete_func(abs_path: str) -> None:
+            os.remove(abs_path)
+            deleted_paths.append(abs_path)
+
+        daemon = RawCullDaemon(
+            str(TEST_JPG_DIR), str(TEST_RAW_DIR), ['DSC_'], ['.jpg'], ['.nef'],
+            use_inotify=use_inotify, poll_interval_sec=0.05, debounce_sec=0.2, delete_func=delete_func,
+        )
+        server = start_status_server(daemon, 0)
+        status_url: str = f"http://127.0.0.1:{server.server_address[1]}"
+        thread = threading.Thread(target=daemon.run)
+        thread.start()
+        try:
+            # TestCase 01: RAW files without JPG are culled at start
+            self.assertTrue(daemon.wait_until_ready(10))
+            self.assertEqual(deleted_paths, [str(TEST_RAW_DIR / "card1" / "DSC_0004.nef")])
+
+            # TestCase 02: A JPG moved to another folder keeps its RAW, a deleted JPG does not
+            os.rename(TEST_JPG_DIR / "person" / "DSC_0001.jpg", TEST_JPG_DIR / "scenery" / "DSC_0001.jpg")
+            os.remove(TEST_JPG_DIR / "person" / "DSC_0002.jpg")
+            self._wait_for(lambda: len(deleted_paths) == 2)
+            self.assertEqual(deleted_paths[1], str(TEST_RAW_DIR / "card1" / "DSC_0002.nef"))
+            self.assertTrue((TEST_RAW_DIR / "card1" / "DSC_0001.nef").exists())
+
+            # TestCase 03: The status server reports the inventory, and triggers a rescan of one subtree
+            self._wait_for(lambda: daemon.status()['raw_file_cnt'] == 2 and daemon.status()['pending_dir_cnt'] == 0)
+            with urllib.request.urlopen(f"{status_url}/status") as response:
+                status: Dict[str, Any] = json.loads(response.read())
+            self.assertEqual(status['jpg_name_cnt'], 2)
+            self.assertEqual(status['deleted_raw_cnt'], 2)
+            cycle_cnt: int = status['cycle_cnt']
+            request = urllib.request.Request(f"{status_url}/rescan?path={TEST_JPG_DIR / 'scenery'}", method='POST')
+            with urllib.request.urlopen(request) as response:
+                self.assertEqual(response.status, 202)
+            self._wait_for(lambda: daemon.status()['cycle_cnt'] > cycle_cnt)
+            self.assertEqual(daemon.status()['last_cycle']['rescanned_dir_cnt'], 1)
+        finally:
+            daemon.stop()
+            thread.join(10)
+            server.shutdown()
+            server.server_close()
+
+    def test_daemon_polling(self):
+        self._run_daemon(use_inotify=False)
+
+    def test_daemon_inotify(self):
+        self._run_daemon(use_inotify=True)
+
+    def test_daemon_unreadable_jpg_dir(self):
+        # Initialize test parameters
+        TEST_JPG_DIR: Path = (self.data_root / "jpg_files").resolve()
+        TEST_RAW_DIR: Path = (self.data_root / "raw_files").resolve()
+        TEST_UNREADABLE_DIR: Path = TEST_JPG_DIR / "person"
+        for dirpath in (TEST_UNREADABLE_DIR, TEST_RAW_DIR / "card1"):
+            dirpath.mkdir(parents=True)
+        for name in ("DSC_0001", "DSC_0002"):
+            (TEST_UNREADABLE_DIR / f"{name}.jpg").touch()
+            (TEST_RAW_DIR / "card1" / f"{name}.nef").touch()
+        deleted_paths: List[str] = []
+        def delete_func(abs_path: str) -> None:
+            os.remove(abs_path)
+            deleted_paths.append(abs_path)
+
+        # The JPG directory still exists, but listing and stat-ing it fail with EIO (e.g., a NAS hiccup)
+        real_scandir, real_stat = os.scandir, os.stat
+        def failing(real_func: Callable) -> Callable:
+            def func(path, *args, **kwargs):
+                if os.fspath(path) == str(TEST_UNREADABLE_DIR):
+                    raise OSError(errno.EIO, os.strerror(errno.EIO), os.fspath(path))
+                return real_func(path, *args, **kwargs)
+            return func
+
+        daemon = RawCullDaemon(
+            str(TEST_JPG_DIR), str(TEST_RAW_DIR), ['DSC_'], ['.jpg'], ['.nef'],
+            use_inotify=False, poll_interval_sec=0.05, debounce_sec=0.1, delete_func=delete_func,
+        )
+        thread = threading.Thread(target=daemon.run)
+        thread.start()
+        try:
+            self.assertTrue(daemon.wait_until_ready(10))
+            self.assertEqual(daemon.status()['jpg_name_cnt'], 2)
+
+            # TestCase 01: While the directory is unreadable, its JPG names are kept and no RAW file is deleted
+            with mock.patch('os.scandir', failing(real_scandir)), mock.patch('os.stat', failing(real_stat)):
+                cycle_cnt: int = daemon.status()['cycle_cnt']
+                self.assertTrue(daemon.request_rescan(str(TEST_UNREADABLE_DIR)))
+                self._wait_for(lambda: daemon.status()['cycle_cnt'] >= cycle_cnt + 2)
+                self.assertEqual(daemon.status()['jpg_name_cnt'], 2)
+                self.assertEqual(deleted_paths, [])
+
+            # TestCase 02: Once readable again, the directory is rescanned and nothing is lost
+            self._wait_for(lambda: daemon.status()['pending_dir_cnt'] == 0)
+            self.assertEqual(daemon.status()['jpg_name_cnt'], 2)
+            self.assertEqual(deleted_paths, [])
+            self.assertEqual(len(list((TEST_RAW_DIR / "card1").iterdir())), 2)
+        finally:
+            daemon.stop()
+            thread.join(10)
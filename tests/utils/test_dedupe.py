@@ -0,0 +1,48 @@
+import os
+from pathlib import Path
+from typing import Dict, List
+
+from tests.base.test_base import TestScripts
+from src.utils.dedupe import PARTIAL_HASH_BYTES
+from src.utils.dedupe import TOTAL_JPG_CNT, FULL_HASHED_JPG_CNT, DUPLICATE_GROUP_CNT, DUPLICATE_JPG_CNT, RECLAIMABLE_BYTES
+from src.utils.dedupe import find_duplicate_jpgs, hardlink_duplicates
+
+
+class TestFindDuplicateJpgs(TestScripts):
+    def _write(self, relpath: str, content: bytes) -> str:
+        path: Path = self.data_root / "jpg_files" / relpath
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        return str(path.resolve())
+
+    def test_find_duplicate_jpgs(self):
+        # Initialize test parameters
+        TEST_JPG_DIR: Path = self.data_root / "jpg_files"
+        small: bytes = os.urandom(1000)
+        large: bytes = os.urandom(3 * PARTIAL_HASH_BYTES)
+        # Same size, head and tail as `large`, different middle byte
+        large_variant: bytes = large[:len(large) // 2] + bytes([large[len(large) // 2] ^ 0xFF]) + large[len(large) // 2 + 1:]
+        small_copies: List[str] = [self._write(f"{category}/DSC_0001.jpg", small) for category in ("person", "scenery", "best")]
+        large_copies: List[str] = [self._write("person/DSC_0002.jpg", large), self._write("best/renamed.jpeg", large)]
+        self._write("scenery/DSC_0003.jpg", large_variant)
+        self._write("scenery/DSC_0004.jpg", os.urandom(1000))
+        self._write("scenery/DSC_0001.nef", small)
+
+        # TestCase 01: Only identical JPG files are grouped, whatever their names
+        for hash_workers in (1, 2):
+            groups, detailed_info = find_duplicate_jpgs(str(TEST_JPG_DIR.resolve()), ['.jpg', '.jpeg'], hash_workers=hash_workers)
+            self.assertEqual(groups, sorted([sorted(large_copies), sorted(small_copies)]))
+            self.assertEqual(detailed_info[TOTAL_JPG_CNT], 7)
+            self.assertEqual(detailed_info[FULL_HASHED_JPG_CNT], 3)
+            self.assertEqual(detailed_info[DUPLICATE_GROUP_CNT], 2)
+            self.assertEqual(detailed_info[DUPLICATE_JPG_CNT], 3)
+            self.assertEqual(detailed_info[RECLAIMABLE_BYTES], 2 * len(small) + len(large))
+
+        # TestCase 02: Hardlinking frees the reclaimable space, and hardlinks are no longer duplicates
+        linked_cnt, failed_cnt = hardlink_duplicates(groups)
+        self.assertEqual((linked_cnt, failed_cnt), (3, 0))
+        self.assertTrue(all(os.path.samefile(small_copies[0], path) for path in small_copies))
+        self.assertEqual(Path(large_copies[1]).read_bytes(), large)
+        groups, detailed_info = find_duplicate_jpgs(str(TEST_JPG_DIR.resolve()), ['.jpg', '.jpeg'], hash_workers=1)
+        self.assertEqual(groups, [])
+        self.assertEqual(detailed_info[RECLAIMABLE_BYTES], 0)
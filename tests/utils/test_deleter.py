@@ -0,0 +1,62 @@
+import os
+import threading
+from pathlib import Path
+from typing import List, Set
+
+from tests.base.test_base import TestScripts
+from src.utils.deleter import group_delete_batches, delete_files
+
+
+class TestDeleteFiles(TestScripts):
+    def test_delete_files(self):
+        # Initialize test parameters
+        TEST_FILE_CNT = 200
+        TEST_FAILED_CNT = 20
+        TEST_RANDOM_DEPTH = (1, 3)
+        TEST_BATCH_SIZE = 16
+        TEST_DELETE_WORKERS = 4
+
+        temp_paths: List[Path] = self.create_dummy_files(
+            random_depth=TEST_RANDOM_DEPTH,
+            file_count=TEST_FILE_CNT,
+            file_ext=".nef",
+            file_prefix="DSC_",
+        )
+        abs_paths: List[str] = [str(path) for path in temp_paths]
+        failing_paths: Set[str] = set(abs_paths[:TEST_FAILED_CNT])
+
+        # TestCase 01: Batches cover every path exactly once
+        batches: List[List[str]] = group_delete_batches(abs_paths, TEST_BATCH_SIZE)
+        self.assertEqual(sorted(path for batch in batches for path in batch), sorted(abs_paths))
+
+        # TestCase 02: Counts stay exact with concurrent deletion and failures
+        lock = threading.Lock()
+        deleted_paths: List[str] = []
+        def delete_func(abs_path: str) -> None:
+            if abs_path in failing_paths:
+                raise OSError("Simulated failure")
+            os.remove(abs_path)
+        def on_deleted(abs_path: str) -> None:
+            with lock:
+                deleted_paths.append(abs_path)
+        deleted_cnt, failed_cnt = delete_files(
+            abs_paths,
+            max_workers=TEST_DELETE_WORKERS,
+            batch_size=TEST_BATCH_SIZE,
+            delete_func=delete_func,
+            on_deleted=on_deleted,
+        )
+        self.assertEqual(deleted_cnt, TEST_FILE_CNT - TEST_FAILED_CNT)
+        self.assertEqual(failed_cnt, TEST_FAILED_CNT)
+        self.assertSetEqual(set(deleted_paths), set(abs_paths) - failing_paths)
+        self.assertSetEqual(set(str(path) for path in temp_paths if path.exists()), failing_paths)
+
+        # TestCase 03: A failing callback does not turn a deleted file into a failed one
+        def failing_on_deleted(abs_path: str) -> None:
+            raise OSError("Simulated journal failure")
+        remaining_paths: List[str] = sorted(failing_paths)
+        self.assertEqual(delete_files(remaining_paths, delete_func=os.remove, on_deleted=failing_on_deleted), (TEST_FAILED_CNT, 0))
+        self.assertFalse(any(os.path.exists(path) for path in remaining_paths))
+
+        # TestCase 04: Nothing to delete
+        self.assertEqual(delete_files([]), (0, 0))
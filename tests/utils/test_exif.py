@@ -0,0 +1,122 @@
+import os
+import struct
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from tests.base.test_base import TestScripts
+from src.utils.exif import EXIF_CACHE_HIT_CNT, EXIF_PARSED_CNT, KEYED_JPG_CNT, UNIQUE_CAPTURE_KEY_CNT
+from src.utils.exif import ExifKeyCache, read_capture_key, read_capture_keys
+from src.utils.exif import gather_camera_jpg_keys, decide_raw_files_by_capture_key
+
+
+def _tiff(byte_order: str, ifd0_tags: Dict[int, str], exif_tags: Dict[int, str]) -> bytes:
+    """
+    Build a minimal TIFF structure with ASCII tags in IFD0 and in an Exif IFD.
+    """
+    def ifd(tags: Dict[int, object], ifd_offset: int) -> bytes:
+        entries: bytes = b''
+        data: bytes = b''
+        data_offset: int = ifd_offset + 2 + 12 * len(tags) + 4
+        for tag, value in sorted(tags.items()):
+            if isinstance(value, int):
+                entries += struct.pack(byte_order + 'HHII', tag, 4, 1, value)
+                continue
+            raw: bytes = value.encode('ascii') + b'\0'
+            if len(raw) <= 4:
+                entries += struct.pack(byte_order + 'HHI', tag, 2, len(raw)) + raw.ljust(4, b'\0')
+            else:
+                entries += struct.pack(byte_order + 'HHII', tag, 2, len(raw), data_offset + len(data))
+                data += raw
+        return struct.pack(byte_order + 'H', len(tags)) + entries + b'\0\0\0\0' + data
+
+    header: bytes = (b'II' if byte_order == '<' else b'MM') + struct.pack(byte_order + 'HI', 42, 8)
+    # Size IFD0 once to know where the Exif IFD starts
+    exif_offset: int = 8 + len(ifd({**ifd0_tags, 0x8769: 0}, 8))
+    return header + ifd({**ifd0_tags, 0x8769: exif_offset}, 8) + ifd(exif_tags, exif_offset)
+
+def _jpeg(tiff: bytes) -> bytes:
+    app0: bytes = b'\xff\xe0' + struct.pack('>H', 16) + b'JFIF\0' + bytes(9)
+    app1: bytes = b'\xff\xe1' + struct.pack('>H', 2 + 6 + len(tiff)) + b'Exif\0\0' + tiff
+    return b'\xff\xd8' + app0 + app1 + b'\xff\xda' + os.urandom(1000) + b'\xff\xd9'
+
+def _capture_tags(serial: str, datetime_original: str, subsec: str) -> Tuple[Dict[int, str], Dict[int, str]]:
+    return {0x010F: 'NIKON CORPORATION', 0x0110: 'NIKON Z 6'}, {0x9003: datetime_original, 0x9291: subsec, 0xA431: serial}
+
+
+class TestReadCaptureKey(TestScripts):
+    def _write(self, relpath: str, content: bytes) -> str:
+        path: Path = self.data_root / relpath
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        return str(path.resolve())
+
+    def test_read_capture_key(self):
+        ifd0_tags, exif_tags = _capture_tags('3012345', '2024:05:01 10:11:12', '42')
+        expected_key: Tuple[str, str, str] = ('3012345', '2024:05:01 10:11:12', '42')
+
+        # TestCase 01: JPEG Exif segment and TIFF-based RAW headers, in both byte orders
+        self.assertEqual(read_capture_key(self._write("a.jpg", _jpeg(_tiff('>', ifd0_tags, exif_tags)))), expected_key)
+        self.assertEqual(read_capture_key(self._write("a.nef", _tiff('<', ifd0_tags, exif_tags) + os.urandom(5000))), expected_key)
+
+        # TestCase 02: Without a body serial, make and model stand in for it
+        del exif_tags[0xA431]
+        self.assertEqual(read_capture_key(self._write("b.cr2", _tiff('<', ifd0_tags, exif_tags))), ('NIKON CORPORATION NIKON Z 6', '2024:05:01 10:11:12', '42'))
+
+        # TestCase 03: Files without a capture time, and headers cut by the read limit, have no key
+        self.assertIsNone(read_capture_key(self._write("c.jpg", _jpeg(_tiff('<', ifd0_tags, {})))))
+        self.assertIsNone(read_capture_key(self._write("d.jpg", os.urandom(100))))
+        self.assertIsNone(read_capture_key(self._write("e.jpg", b'')))
+        self.assertIsNone(read_capture_key(self._write("f.nef", _tiff('<', ifd0_tags, exif_tags)), max_read_bytes=40))
+
+    def test_read_capture_keys_cache(self):
+        ifd0_tags, exif_tags = _capture_tags('3012345', '2024:05:01 10:11:12', '42')
+        paths: List[str] = [self._write(f"raw/DSC_000{index}.nef", _tiff('<', ifd0_tags, {**exif_tags, 0x9291: str(index)})) for index in range(3)]
+        cache = ExifKeyCache(str((self.data_root / "exif_cache.db").resolve()))
+
+        # TestCase 01: The first read parses every file, the second one only the changed file
+        keys, info = read_capture_keys(paths, cache, read_workers=2)
+        self.assertEqual([keys[path][2] for path in paths], ['0', '1', '2'])
+        self.assertEqual((info[EXIF_CACHE_HIT_CNT], info[EXIF_PARSED_CNT]), (0, 3))
+        Path(paths[0]).write_bytes(_tiff('<', ifd0_tags, {**exif_tags, 0x9291: '99'}))
+        keys, info = read_capture_keys(paths, cache, read_workers=2)
+        self.assertEqual(keys[paths[0]][2], '99')
+        self.assertEqual((info[EXIF_CACHE_HIT_CNT], info[EXIF_PARSED_CNT]), (2, 1))
+        cache.close()
+
+
+class TestDecideRawFilesByCaptureKey(TestScripts):
+    def test_decide_raw_files_by_capture_key(self):
+        TEST_JPG_DIR: Path = self.data_root / "jpg_files"
+        TEST_RAW_DIR: Path = self.data_root / "raw_files"
+        body_a: Tuple[Dict[int, str], Dict[int, str]] = _capture_tags('1111', '2024:05:01 10:11:12', '10')
+        body_b: Tuple[Dict[int, str], Dict[int, str]] = _capture_tags('2222', '2024:05:01 10:11:12', '10')
+        for path, content in (
+            # Exported under another name, from body A
+            (TEST_JPG_DIR / "best" / "portrait.jpg", _jpeg(_tiff('<', *body_a))),
+            # No Exif segment, matched by name only
+            (TEST_JPG_DIR / "best" / "DSC_0002.jpg", b'\xff\xd8\xff\xd9'),
+            (TEST_RAW_DIR / "a" / "DSC_0001.nef", _tiff('<', *body_a)),
+            # Same name and capture time as body A's file, from body B
+            (TEST_RAW_DIR / "b" / "DSC_0001.nef", _tiff('<', *body_b)),
+            (TEST_RAW_DIR / "b" / "DSC_0002.nef", _tiff('<', *_capture_tags('2222', '2024:05:02 08:00:00', '00'))),
+            (TEST_RAW_DIR / "b" / "DSC_0003.nef", os.urandom(100)),
+        ):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+        raw_files: List[Tuple[str, str]] = [(str(path.parent.resolve()), path.name) for path in sorted(TEST_RAW_DIR.rglob("*.nef"))]
+
+        jpg_keys, jpg_names, detailed_info = gather_camera_jpg_keys(str(TEST_JPG_DIR.resolve()), ['dsc'], ['.jpg'], walk_workers=2)
+        self.assertEqual(jpg_keys, {('1111', '2024:05:01 10:11:12', '10')})
+        self.assertEqual(set(jpg_names), {'DSC_0002'})
+        self.assertEqual((detailed_info[KEYED_JPG_CNT], detailed_info[UNIQUE_CAPTURE_KEY_CNT]), (1, 1))
+
+        # TestCase 01: Keys tell the two bodies apart; names still match files without a JPG capture key
+        kept_raw_cnt, doomed_raw_paths, unkeyed_raw_cnt = decide_raw_files_by_capture_key(raw_files, jpg_keys, jpg_names)
+        self.assertEqual(kept_raw_cnt, 2)
+        self.assertEqual(sorted(os.path.relpath(path, TEST_RAW_DIR.resolve()) for path in doomed_raw_paths), [os.path.join("b", "DSC_0001.nef"), os.path.join("b", "DSC_0003.nef")])
+        self.assertEqual(unkeyed_raw_cnt, 1)
+
+        # TestCase 02: Without the name fallback, only keys match and RAW files without a key are kept
+        kept_raw_cnt, doomed_raw_paths, _ = decide_raw_files_by_capture_key(raw_files, jpg_keys, jpg_names, fallback_to_name=False)
+        self.assertEqual(kept_raw_cnt, 2)
+        self.assertEqual(sorted(os.path.relpath(path, TEST_RAW_DIR.resolve()) for path in doomed_raw_paths), [os.path.join("b", "DSC_0001.nef"), os.path.join("b", "DSC_0002.nef")])
@@ -0,0 +1,86 @@
+import os
+import errno
+from pathlib import Path
+from unittest import mock
+from typing import List
+
+from tests.base.test_base import TestScripts
+from src.utils.integrity import TOTAL_FILE_CNT, NEW_FILE_CNT, CHANGED_FILE_CNT, REMOVED_FILE_CNT, SAMPLED_FILE_CNT, MISMATCH_FILE_CNT
+from src.utils.integrity import HASH_MISMATCH, SIZE_MISMATCH, UNLISTABLE_DIR, EMPTY_TREE, Mismatch, hash_file, update_manifest
+
+
+class TestIntegrity(TestScripts):
+
+    def test_update_manifest(self):
+        # Initialize test parameters
+        TEST_JPG_DIR: Path = (self.data_root / "jpg_files").resolve()
+        TEST_MANIFEST_FILE: str = str((self.data_root / "manifest.db").resolve())
+        jpg_paths: List[Path] = self.create_dummy_files(random_depth=(0, 3), file_count=20, file_ext='.jpg', file_prefix='DSC_', base_path=TEST_JPG_DIR)
+        for path in jpg_paths:
+            path.write_bytes(path.name.encode() * 100)
+        (TEST_JPG_DIR / "notes.txt").write_text("not a photo")
+        relpath = lambda path: os.path.relpath(path, TEST_JPG_DIR)
+
+        def _update(sample_fraction: float, hash_workers: int = 2):
+            return update_manifest(str(TEST_JPG_DIR), ['.jpg'], TEST_MANIFEST_FILE, sample_fraction=sample_fraction, hash_workers=hash_workers, walk_workers=2)
+
+        # TestCase 01: The first run records every file with a configured extension
+        mismatches, detailed_info = _update(sample_fraction=0.0)
+        self.assertEqual(mismatches, [])
+        self.assertEqual((detailed_info[TOTAL_FILE_CNT], detailed_info[NEW_FILE_CNT], detailed_info[SAMPLED_FILE_CNT]), (20, 20, 0))
+        self.assertEqual(hash_file(str(jpg_paths[0])), hash_file(str(jpg_paths[0])))
+
+        # TestCase 02: Edited files are rehashed, removed files forgotten, and bit rot and truncation are reported
+        stat_result = os.stat(jpg_paths[0])
+        jpg_paths[0].write_bytes(b"x" * stat_result.st_size)
+        os.utime(jpg_paths[0], ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+        stat_result = os.stat(jpg_paths[1])
+        jpg_paths[1].write_bytes(b"x")
+        os.utime(jpg_paths[1], ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+        jpg_paths[2].write_bytes(b"edited")
+        os.utime(jpg_paths[2], ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10**9))
+        jpg_paths[3].unlink()
+        mismatches, detailed_info = _update(sample_fraction=1.0, hash_workers=1)
+        self.assertEqual(mismatches, sorted([Mismatch(relpath(jpg_paths[0]), HASH_MISMATCH), Mismatch(relpath(jpg_paths[1]), SIZE_MISMATCH)]))
+        self.assertEqual((detailed_info[CHANGED_FILE_CNT], detailed_info[REMOVED_FILE_CNT], detailed_info[SAMPLED_FILE_CNT], detailed_info[MISMATCH_FILE_CNT]), (1, 1, 17, 2))
+
+        # TestCase 03: The sample rotates through the unchanged files, oldest verified first, and mismatches keep being reported
+        jpg_paths[0].unlink()
+        jpg_paths[1].unlink()
+        stat_result = os.stat(jpg_paths[4])
+        jpg_paths[4].write_bytes(b"y" * stat_result.st_size)
+        os.utime(jpg_paths[4], ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+        runs = [_update(sample_fraction=0.3) for _ in range(3)]
+        self.assertEqual([detailed_info[SAMPLED_FILE_CNT] for _, detailed_info in runs], [6, 6, 6])
+        self.assertEqual(runs[-1][0], [Mismatch(relpath(jpg_paths[4]), HASH_MISMATCH)])
+
+    def test_update_manifest_unlistable(self):
+        # Initialize test parameters
+        TEST_JPG_DIR: Path = (self.data_root / "jpg_files").resolve()
+        TEST_MANIFEST_FILE: str = str((self.data_root / "manifest.db").resolve())
+        for relpath in ("a/DSC_0001.jpg", "a/DSC_0002.jpg", "b/DSC_0003.jpg"):
+            (TEST_JPG_DIR / relpath).parent.mkdir(parents=True, exist_ok=True)
+            (TEST_JPG_DIR / relpath).write_bytes(relpath.encode())
+        _update = lambda: update_manifest(str(TEST_JPG_DIR), ['.jpg'], TEST_MANIFEST_FILE, sample_fraction=0.0, hash_workers=1, walk_workers=2)
+        self.assertEqual(_update()[1][NEW_FILE_CNT], 3)
+
+        # TestCase 01: A directory that cannot be listed is reported, and its files stay in the manifest
+        real_scandir = os.scandir
+        def scandir(path):
+            if os.fspath(path) == str(TEST_JPG_DIR / "a"):
+                raise OSError(errno.EIO, "Input/output error", path)
+            return real_scandir(path)
+        with mock.patch('os.scandir', side_effect=scandir):
+            mismatches, detailed_info = _update()
+        self.assertEqual(mismatches, [Mismatch("a", UNLISTABLE_DIR)])
+        self.assertEqual(detailed_info[REMOVED_FILE_CNT], 0)
+        self.assertEqual(_update()[1][NEW_FILE_CNT], 0)
+
+        # TestCase 02: An empty tree (e.g., an unmounted disk) keeps the whole manifest
+        for path in list(TEST_JPG_DIR.rglob("*.jpg")):
+            path.unlink()
+        mismatches, detailed_info = _update()
+        self.assertEqual(mismatches, [Mismatch(os.curdir, EMPTY_TREE)])
+        self.assertEqual(detailed_info[REMOVED_FILE_CNT], 0)
+        (TEST_JPG_DIR / "b" / "DSC_0004.jpg").write_bytes(b"new")
+        self.assertEqual(_update()[1][REMOVED_FILE_CNT], 3)
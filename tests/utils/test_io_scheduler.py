@@ -0,0 +1,76 @@
+import os
+import errno
+import time
+from pathlib import Path
+from typing import List, Set, Tuple
+
+from tests.base.test_base import TestScripts
+from src.utils.walker import scandir_walk
+from src.utils.deleter import delete_files
+from src.utils.mover import move_files
+from src.utils.io_scheduler import WALK_IO, DELETE_IO, MOVE_IO
+from src.utils.io_scheduler import AdaptiveLimiter, enable_adaptive_io, disable_adaptive_io, get_io_limiter, get_io_concurrency_history
+
+
+class TestIoScheduler(TestScripts):
+
+    def test_adaptive_limiter(self):
+        limiter = AdaptiveLimiter('test', min_limit=1, max_limit=4, window_ops=4)
+
+        def run_ops(cnt: int, latency_sec: float = 0.0, error_no: int = 0) -> None:
+            for _ in range(cnt):
+                try:
+                    with limiter.slot():
+                        time.sleep(latency_sec)
+                        if error_no:
+                            raise OSError(error_no, os.strerror(error_no))
+                except OSError:
+                    pass
+
+        # TestCase 01: Fast operations using the whole limit raise it by one per window
+        run_ops(4)
+        self.assertEqual(limiter.limit, 2)
+        # TestCase 02: A window not using the whole limit leaves it unchanged
+        run_ops(4)
+        self.assertEqual(limiter.limit, 2)
+        # TestCase 03: Latency growing beyond the tolerance halves the limit, never below the minimum
+        run_ops(4, latency_sec=0.02)
+        self.assertEqual(limiter.limit, 1)
+        run_ops(4, error_no=errno.EBUSY)
+        self.assertEqual(limiter.limit, 1)
+        # TestCase 04: Per-file errors are not saturation, the limit keeps growing
+        run_ops(4, error_no=errno.ENOENT)
+        self.assertEqual(limiter.limit, 2)
+        run_ops(2, error_no=errno.EACCES)
+        run_ops(2, error_no=errno.EIO)
+        self.assertEqual(limiter.limit, 1)
+        self.assertEqual([limit for _, limit in limiter.history], [1, 2, 1, 2, 1])
+        self.assertEqual(limiter.op_cnt, 24)
+        with self.assertRaises(ValueError):
+            AdaptiveLimiter('test', min_limit=4, max_limit=2)
+
+    def test_adaptive_io(self):
+        # Initialize test parameters
+        TEST_FILE_CNT = 200
+        temp_paths: List[Path] = self.create_dummy_files(random_depth=(0, 4), file_count=TEST_FILE_CNT, file_ext=".nef", base_path=self.data_root / "input")
+        TEST_OUTPUT_DIR: Path = (self.data_root / "output").resolve()
+        TEST_OUTPUT_DIR.mkdir()
+
+        enable_adaptive_io(min_workers=1, max_workers=4)
+        try:
+            # TestCase 01: Walks, moves and deletions go through their limiters and give the same results
+            walked_files: Set[str] = {entry.path for _, entries in scandir_walk(str((self.data_root / "input").resolve()), max_workers=1) for entry in entries}
+            self.assertSetEqual(walked_files, {str(path) for path in temp_paths})
+            moves: List[Tuple[str, str]] = [(str(path), str(TEST_OUTPUT_DIR / f"{i:03d}.nef")) for i, path in enumerate(temp_paths)]
+            self.assertEqual(move_files(moves), (TEST_FILE_CNT, 0))
+            self.assertEqual(delete_files([dst for _, dst in moves], delete_func=os.remove), (TEST_FILE_CNT, 0))
+            self.assertEqual(list(TEST_OUTPUT_DIR.iterdir()), [])
+            self.assertTrue(all(get_io_limiter(kind).op_cnt > 0 for kind in (WALK_IO, DELETE_IO, MOVE_IO)))
+
+            # TestCase 02: The concurrency history of every kind of operation is reported
+            history = get_io_concurrency_history()
+            self.assertEqual(set(history), {WALK_IO, DELETE_IO, MOVE_IO})
+            self.assertTrue(all(1 <= limit <= 4 for steps in history.values() for _, limit in steps))
+        finally:
+            disable_adaptive_io()
+        self.assertIsNone(get_io_limiter(WALK_IO))
@@ -0,0 +1,76 @@
+import os
+import random
+from pathlib import Path
+from typing import Set, List, Dict
+
+from tests.base.test_base import TestScripts
+from src.utils.scripts import TOTAL_JPG_CNT, TOTAL_CAMERA_JPG_CNT, UNIQUE_CAMERA_JPG_CNT
+from src.utils.scripts import gather_camera_jpg_names
+from src.utils.jpg_index import REUSED_DIR_CNT, RESCANNED_DIR_CNT
+from src.utils.jpg_index import gather_camera_jpg_names_indexed
+
+
+class TestGatherCameraJpgNamesIndexed(TestScripts):
+    def _age_dirs(self, root: Path) -> None:
+        # Move every directory mtime well into the past so the index trusts it
+        past: float = 1_000_000_000
+        for dirpath, _, _ in os.walk(root):
+            os.utime(dirpath, (past, past))
+
+    def test_gather_camera_jpg_names_indexed(self):
+        # Initialize test parameters
+        TEST_CAMERA_JPG_CNT = 50
+        TEST_OTHER_JPG_CNT = 50
+        TEST_RANDOM_DEPTH = (1, 4)
+        TEST_JPG_EXTS = ['.jpg', '.jpeg']
+        TEST_CAMERA_FILE_PREFIXS = ['dsc_', 'img_']
+        TEST_JPG_DIR: Path = self.data_root / "jpg_files"
+        TEST_INDEX_DB: str = str((self.data_root / "index" / "jpg_index.sqlite3").resolve())
+
+        # Create camera and non-camera JPG files
+        camera_paths: List[Path] = self.create_dummy_files(
+            random_depth=TEST_RANDOM_DEPTH,
+            file_count=TEST_CAMERA_JPG_CNT,
+            file_ext=random.choice(TEST_JPG_EXTS),
+            file_prefix="DSC_",
+            base_path=TEST_JPG_DIR,
+        )
+        self.create_dummy_files(
+            random_depth=TEST_RANDOM_DEPTH,
+            file_count=TEST_OTHER_JPG_CNT,
+            file_ext=random.choice(TEST_JPG_EXTS),
+            base_path=TEST_JPG_DIR,
+        )
+        self._age_dirs(TEST_JPG_DIR)
+        jpg_dir_abs_path: str = str(TEST_JPG_DIR.resolve())
+        expected_names, expected_info = gather_camera_jpg_names(jpg_dir_abs_path, TEST_CAMERA_FILE_PREFIXS, TEST_JPG_EXTS, if_logging=False)
+        dir_cnt: int = sum(1 for _ in os.walk(jpg_dir_abs_path))
+
+        # TestCase 01: A cold run rescans every directory and matches the plain walk
+        names, detailed_info = gather_camera_jpg_names_indexed(jpg_dir_abs_path, TEST_CAMERA_FILE_PREFIXS, TEST_JPG_EXTS, TEST_INDEX_DB, if_logging=False)
+        self.assertSetEqual(names, expected_names)
+        self.assertSetEqual(names, set(path.stem for path in camera_paths))
+        for key in (TOTAL_JPG_CNT, TOTAL_CAMERA_JPG_CNT, UNIQUE_CAMERA_JPG_CNT):
+            self.assertEqual(detailed_info[key], expected_info[key])
+        self.assertEqual(detailed_info[RESCANNED_DIR_CNT], dir_cnt)
+        self.assertEqual(detailed_info[REUSED_DIR_CNT], 0)
+
+        # TestCase 02: A warm run over an unchanged tree reuses every directory
+        names, detailed_info = gather_camera_jpg_names_indexed(jpg_dir_abs_path, TEST_CAMERA_FILE_PREFIXS, TEST_JPG_EXTS, TEST_INDEX_DB, if_logging=False)
+        self.assertSetEqual(names, expected_names)
+        self.assertEqual(detailed_info[TOTAL_JPG_CNT], expected_info[TOTAL_JPG_CNT])
+        self.assertEqual(detailed_info[REUSED_DIR_CNT], dir_cnt)
+        self.assertEqual(detailed_info[RESCANNED_DIR_CNT], 0)
+
+        # TestCase 03: Only the changed directory is rescanned
+        removed_path: Path = camera_paths[0]
+        removed_path.unlink()
+        names, detailed_info = gather_camera_jpg_names_indexed(jpg_dir_abs_path, TEST_CAMERA_FILE_PREFIXS, TEST_JPG_EXTS, TEST_INDEX_DB, if_logging=False)
+        self.assertSetEqual(names, expected_names - {removed_path.stem})
+        self.assertEqual(detailed_info[TOTAL_JPG_CNT], expected_info[TOTAL_JPG_CNT] - 1)
+        self.assertEqual(detailed_info[RESCANNED_DIR_CNT], 1)
+
+        # TestCase 04: Rebuilding the index rescans every directory
+        names, detailed_info = gather_camera_jpg_names_indexed(jpg_dir_abs_path, TEST_CAMERA_FILE_PREFIXS, TEST_JPG_EXTS, TEST_INDEX_DB, rebuild_index=True, if_logging=False)
+        self.assertSetEqual(names, expected_names - {removed_path.stem})
+        self.assertEqual(detailed_info[RESCANNED_DIR_CNT], dir_cnt)
@@ -0,0 +1,71 @@
+import os
+import json
+import pstats
+from pathlib import Path
+from typing import Any, Dict
+
+from tests.base.test_base import TestScripts
+from src.utils.metrics import SCANDIR_OP, STAT_OP
+from src.utils.metrics import RunMetrics, count_op, profile_run, write_metrics
+
+
+class TestRunMetrics(TestScripts):
+    def test_phases(self):
+        metrics = RunMetrics('test_run')
+
+        # TestCase 01: A phase records its items, times and the operations counted inside it only
+        count_op(STAT_OP, 7)
+        with metrics.phase('scan') as phase:
+            count_op(SCANDIR_OP, 3)
+            count_op(STAT_OP)
+            phase.items = 42
+        report: Dict[str, Any] = metrics.report()
+        self.assertEqual(report['run'], 'test_run')
+        self.assertEqual(len(report['phases']), 1)
+        scan_phase: Dict[str, Any] = report['phases'][0]
+        self.assertEqual(scan_phase['phase'], 'scan')
+        self.assertEqual(scan_phase['items'], 42)
+        self.assertEqual(scan_phase['ops'], {SCANDIR_OP: 3, STAT_OP: 1})
+        self.assertGreaterEqual(scan_phase['wall_sec'], 0.0)
+        self.assertGreaterEqual(report['total_wall_sec'], scan_phase['wall_sec'])
+
+        # TestCase 02: A phase interrupted by an exception is still recorded
+        with self.assertRaises(RuntimeError):
+            with metrics.phase('broken'):
+                raise RuntimeError("boom")
+        self.assertEqual([phase['phase'] for phase in metrics.report()['phases']], ['scan', 'broken'])
+
+    def test_write_metrics(self):
+        metrics = RunMetrics('test_run')
+        with metrics.phase('delete') as phase:
+            count_op(SCANDIR_OP, 2)
+            phase.items = 5
+        json_path: Path = self.data_root / "reports" / "metrics.json"
+        prom_path: Path = self.data_root / "reports" / "metrics.prom"
+
+        # TestCase 01: Both reports are written, and nothing else
+        write_metrics(metrics, str(json_path), str(prom_path))
+        self.assertEqual(sorted(os.listdir(json_path.parent)), ['metrics.json', 'metrics.prom'])
+        report: Dict[str, Any] = json.loads(json_path.read_text(encoding='utf-8'))
+        self.assertEqual(report['phases'][0]['items'], 5)
+        prom_text: str = prom_path.read_text(encoding='utf-8')
+        self.assertIn('# TYPE photo_archiver_phase_files gauge', prom_text)
+        self.assertIn('photo_archiver_phase_files{run="test_run",phase="delete"} 5', prom_text)
+        self.assertIn('photo_archiver_phase_operations{run="test_run",phase="delete",op="scandir"} 2', prom_text)
+
+        # TestCase 02: Empty paths skip the reports
+        write_metrics(metrics, "", None)
+
+    def test_profile_run(self):
+        profile_path: Path = self.data_root / "run.prof"
+
+        # TestCase 01: The raw statistics and the text summary are written
+        with profile_run(str(profile_path)):
+            sorted(range(10000), key=lambda i: -i)
+        self.assertGreater(pstats.Stats(str(profile_path)).total_calls, 0)
+        self.assertIn('cumulative', Path(f"{profile_path}.txt").read_text(encoding='utf-8'))
+
+        # TestCase 02: No path, no profiling
+        with profile_run(None):
+            pass
+        self.assertEqual(len(list(self.data_root.glob('*.prof'))), 1)
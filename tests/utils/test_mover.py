@@ -0,0 +1,111 @@
+import os
+from pathlib import Path
+from unittest import mock
+from typing import List, Tuple
+
+from tests.base.test_base import TestScripts
+from src.utils.mover import _copy_file, _move_across_devices, move_files, move_files_streaming
+
+
+class TestMoveFiles(TestScripts):
+    def test_move_files(self):
+        # Initialize test parameters
+        TEST_FILE_CNT = 50
+        TEST_RANDOM_DEPTH = (0, 3)
+        TEST_OUTPUT_DIR: Path = self.data_root / "output"
+        TEST_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+        temp_paths: List[Path] = self.create_dummy_files(
+            random_depth=TEST_RANDOM_DEPTH,
+            file_count=TEST_FILE_CNT,
+            file_ext=".jpg",
+            base_path=self.data_root / "input",
+        )
+        moves: List[Tuple[str, str]] = [(str(path), str(TEST_OUTPUT_DIR.resolve() / f"{i:03d}.jpg")) for i, path in enumerate(temp_paths)]
+
+        # TestCase 01: Every file is moved to its destination
+        moved: List[Tuple[str, str]] = []
+        moved_cnt, failed_cnt = move_files(moves, on_moved=lambda src, dst: moved.append((src, dst)))
+        self.assertEqual((moved_cnt, failed_cnt), (TEST_FILE_CNT, 0))
+        self.assertEqual(moved, moves)
+        self.assertTrue(all(not path.exists() for path in temp_paths))
+        self.assertEqual(len(list(TEST_OUTPUT_DIR.glob('*'))), TEST_FILE_CNT)
+
+        # TestCase 02: Missing sources are counted as failed
+        moved_cnt, failed_cnt = move_files(moves[:5])
+        self.assertEqual((moved_cnt, failed_cnt), (0, 5))
+
+        # TestCase 03: A failing callback does not turn a moved file into a failed one
+        def failing_on_moved(src_path: str, dst_path: str) -> None:
+            raise OSError("Simulated journal failure")
+        back_moves: List[Tuple[str, str]] = [(dst, src) for src, dst in moves[:5]]
+        self.assertEqual(move_files(back_moves, on_moved=failing_on_moved), (5, 0))
+        self.assertTrue(all(os.path.exists(dst) for _, dst in back_moves))
+
+    def test_move_files_streaming(self):
+        # Initialize test parameters
+        TEST_FILE_CNT = 60
+        TEST_MAX_PENDING = 3
+        TEST_OUTPUT_DIR: Path = self.data_root / "output"
+        TEST_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+        temp_paths: List[Path] = self.create_dummy_files(
+            random_depth=(0, 3),
+            file_count=TEST_FILE_CNT,
+            file_ext=".jpg",
+            base_path=self.data_root / "input",
+        )
+        moves: List[Tuple[str, str]] = [(str(path), str(TEST_OUTPUT_DIR.resolve() / f"{i:03d}.jpg")) for i, path in enumerate(temp_paths)]
+
+        # TestCase 01: Every file is moved, and the producer never runs further ahead of the moved files than the queue and the workers allow
+        moved: List[Tuple[str, str]] = []
+        max_ahead_cnt: int = 0
+        def produce():
+            nonlocal max_ahead_cnt
+            for produced_cnt, move in enumerate(moves):
+                max_ahead_cnt = max(max_ahead_cnt, produced_cnt - len(moved))
+                yield move
+        moved_cnt, failed_cnt = move_files_streaming(produce(), max_workers=2, on_moved=lambda src, dst: moved.append((src, dst)), max_pending=TEST_MAX_PENDING)
+        self.assertEqual((moved_cnt, failed_cnt), (TEST_FILE_CNT, 0))
+        self.assertEqual(sorted(moved), sorted(moves))
+        self.assertLessEqual(max_ahead_cnt, TEST_MAX_PENDING + 2)
+        self.assertTrue(all(not path.exists() for path in temp_paths))
+        self.assertEqual(len(list(TEST_OUTPUT_DIR.glob('*'))), TEST_FILE_CNT)
+
+        # TestCase 02: Missing sources are counted as failed
+        moved_cnt, failed_cnt = move_files_streaming(iter(moves[:5]), max_pending=TEST_MAX_PENDING)
+        self.assertEqual((moved_cnt, failed_cnt), (0, 5))
+
+    def test_move_across_devices(self):
+        # Initialize test parameters
+        TEST_CONTENT: bytes = os.urandom(3 * 1024 * 1024 + 17)
+        src_path: Path = self.data_root / "src.jpg"
+        dst_path: Path = self.data_root / "dst.jpg"
+        src_path.write_bytes(TEST_CONTENT)
+        os.utime(src_path, (1_000_000_000, 1_000_000_000))
+
+        # TestCase 01: Copies keep content and timestamps
+        copy_path: Path = self.data_root / "copy.jpg"
+        _copy_file(str(src_path), str(copy_path))
+        self.assertEqual(copy_path.read_bytes(), TEST_CONTENT)
+        self.assertEqual(int(copy_path.stat().st_mtime), 1_000_000_000)
+
+        # TestCase 02: A kernel copy primitive returning 0 right away falls back to a plain copy
+        fallback_path: Path = self.data_root / "fallback.jpg"
+        with mock.patch('os.copy_file_range', return_value=0), mock.patch('os.sendfile', return_value=0):
+            _move_across_devices(str(copy_path), str(fallback_path))
+        self.assertFalse(copy_path.exists())
+        self.assertEqual(fallback_path.read_bytes(), TEST_CONTENT)
+
+        # TestCase 03: A short kernel copy fails the move, keeping the source and removing the partial copy
+        sent_counts: List[int] = [1024, 0]
+        with mock.patch('os.copy_file_range', side_effect=lambda src_fd, dst_fd, count: sent_counts.pop(0)):
+            with self.assertRaises(OSError):
+                _move_across_devices(str(fallback_path), str(copy_path))
+        self.assertEqual(fallback_path.read_bytes(), TEST_CONTENT)
+        self.assertFalse(copy_path.exists())
+
+        # TestCase 04: The copy path removes the source
+        _move_across_devices(str(src_path), str(dst_path))
+        self.assertFalse(src_path.exists())
+        self.assertEqual(dst_path.read_bytes(), TEST_CONTENT)
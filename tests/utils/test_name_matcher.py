@@ -0,0 +1,56 @@
+import random
+import string
+from pathlib import Path
+from typing import List
+
+from tests.base.test_base import TestScripts
+from src.utils.scripts import gather_camera_jpg_names, decide_raw_files
+from src.utils.name_matcher import EXACT_NAME_MATCHER, NameMatcher, PrefixTrie
+
+
+class TestNameMatcher(TestScripts):
+
+    def test_prefix_trie(self):
+        # TestCase 01: The trie agrees with a case-insensitive tuple startswith, for many prefixes
+        prefixes: List[str] = ['DSC', 'dsc_', 'IMG', 'P', 'cam1_', 'CAM10_'] + [''.join(random.choices(string.ascii_letters, k=random.randint(2, 6))) for _ in range(40)]
+        trie = PrefixTrie(prefixes)
+        lowered_prefixes = tuple(prefix.lower() for prefix in prefixes)
+        names: List[str] = ['DSC_0001', 'dsc', 'ds', 'Img_1', 'p', '', 'cam1', 'CAM1_0001', 'cam10_2'] + [''.join(random.choices(string.ascii_letters, k=random.randint(0, 8))) for _ in range(500)]
+        for name in names:
+            self.assertEqual(trie.matches(name), name.lower().startswith(lowered_prefixes), name)
+        # TestCase 02: No prefix matches nothing
+        self.assertFalse(PrefixTrie([]).matches('DSC_0001'))
+
+    def test_name_matcher(self):
+        # TestCase 01: The default matcher keeps names unchanged
+        self.assertTrue(EXACT_NAME_MATCHER.is_identity)
+        self.assertEqual(EXACT_NAME_MATCHER.key('DSC_0001-Edit'), 'DSC_0001-Edit')
+
+        # TestCase 02: Suffixes are stripped in any order and number, case-insensitively, then the name is case-folded
+        matcher = NameMatcher(case_fold=True, suffix_patterns=['-edit', r' \(\d+\)', r'-\d+x\d+'])
+        self.assertFalse(matcher.is_identity)
+        self.assertEqual(matcher.key('DSC_0001'), 'dsc_0001')
+        self.assertEqual(matcher.key('DSC_0001-Edit'), 'dsc_0001')
+        self.assertEqual(matcher.key('DSC_0001 (2)'), 'dsc_0001')
+        self.assertEqual(matcher.key('DSC_0001-Edit (2)-1920x1080'), 'dsc_0001')
+        self.assertEqual(matcher.key('DSC_0001-Editing'), 'dsc_0001-editing')
+        # A name made only of suffixes is kept whole
+        self.assertEqual(matcher.key('-Edit'), '-edit')
+
+    def test_match_variant_names(self):
+        # Initialize test parameters
+        TEST_JPG_DIR: Path = self.data_root / "jpg_files"
+        TEST_JPG_DIR.mkdir()
+        for filename in ("DSC_0001-Edit.jpg", "DSC_0002 (2).JPG", "dsc_0003.jpg", "edit.jpg"):
+            (TEST_JPG_DIR / filename).touch()
+        raw_files = [("/raw", "DSC_0001.nef"), ("/raw", "DSC_0002.NEF"), ("/raw", "DSC_0003.NEF"), ("/raw", "DSC_0004.nef")]
+
+        # TestCase 01: Without rules, only exact names match (current behavior)
+        jpg_names, _ = gather_camera_jpg_names(str(TEST_JPG_DIR), ['dsc'], ['.jpg'], walk_workers=2)
+        self.assertEqual(decide_raw_files(raw_files, jpg_names), (0, [f"/raw/{filename}" for _, filename in raw_files]))
+
+        # TestCase 02: With case folding and suffix patterns, case variants and edited exports match
+        matcher = NameMatcher(case_fold=True, suffix_patterns=['-Edit', r' \(\d+\)'])
+        jpg_names, detailed_info = gather_camera_jpg_names(str(TEST_JPG_DIR), ['dsc'], ['.jpg'], walk_workers=2, matcher=matcher)
+        self.assertEqual(set(jpg_names), {'dsc_0001', 'dsc_0002', 'dsc_0003'})
+        self.assertEqual(decide_raw_files(raw_files, jpg_names, matcher), (3, ["/raw/DSC_0004.nef"]))
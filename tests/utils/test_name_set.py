@@ -0,0 +1,76 @@
+import tracemalloc
+from typing import List, Set
+
+from tests.base.test_base import TestScripts
+from src.utils.name_set import CompactNameSet
+
+
+class TestCompactNameSet(TestScripts):
+    def test_membership(self):
+        # Initialize test parameters
+        TEST_NAMES: List[str] = [
+            "DSC_0001", "DSC_0042", "DSC_9999", "IMG_0042", "Z9A_0001234", "Z9A_1234567890123",
+            "IMG_20240101_153000", "portrait", "DSC_0042",
+        ]
+        names = CompactNameSet(TEST_NAMES)
+        expected_names: Set[str] = set(TEST_NAMES)
+
+        # TestCase 01: Same members as a set of the same names
+        self.assertEqual(len(names), len(expected_names))
+        self.assertEqual(set(names), expected_names)
+        self.assertTrue(all(name in names for name in expected_names))
+
+        # TestCase 02: Counters must match exactly, zero padding and prefix included
+        for name in ("DSC_042", "DSC_00042", "dsc_0042", "DSC_0043", "IMG_0001", "Z9A_1234", "portraits", "", "4242"):
+            self.assertNotIn(name, names)
+
+        # TestCase 03: Names added after a lookup are found too
+        names.add("Z9A_0000001")
+        self.assertIn("Z9A_0000001", names)
+        self.assertIn("Z9A_0001234", names)
+        self.assertEqual(len(names), len(expected_names) + 1)
+
+    def test_memory(self):
+        # Initialize test parameters
+        def test_names():
+            yield from (f"{prefix}{i:04d}" for prefix in ("DSC_", "IMG_") for i in range(10000))
+            yield from (f"Z9A_{i:07d}" for i in range(0, 2000000, 10))
+
+        # TestCase 01: Encoded names take an order of magnitude less memory than a set of strings
+        tracemalloc.start()
+        plain_names: Set[str] = set(test_names())
+        set_bytes: int = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        tracemalloc.start()
+        compact_names = CompactNameSet(test_names())
+        len(compact_names)
+        compact_bytes: int = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        self.assertEqual(len(compact_names), len(plain_names))
+        self.assertLess(compact_bytes * 10, set_bytes)
+
+    def test_memory_sparse_keys(self):
+        # Date-stamped names: a handful of 6-digit counters per daily prefix (e.g., 'IMG_20240512_134501')
+        def test_names():
+            for month in range(1, 13):
+                for day in range(1, 29):
+                    for hour, minute in ((7, 5), (9, 15), (12, 30), (18, 45), (21, 0)):
+                        yield f"IMG_2024{month:02d}{day:02d}_{hour:02d}{minute:02d}01"
+        TEST_NAMES: List[str] = list(test_names())
+
+        # TestCase 01: Sparse keys stay in small arrays, far below a plain set of the same names
+        compact_names = CompactNameSet(TEST_NAMES)
+        tracemalloc.start()
+        plain_names: Set[str] = set(test_names())
+        set_bytes: int = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        self.assertEqual(set(compact_names), plain_names)
+        self.assertLess(compact_names.nbytes(), set_bytes)
+        self.assertLess(compact_names.nbytes(), 16 * len(TEST_NAMES))
+
+        # TestCase 02: A dense key still switches to its bitmap, and keeps every name
+        compact_names.update(f"DSC_{i:04d}" for i in range(0, 10000, 2))
+        self.assertEqual(len(compact_names), len(plain_names) + 5000)
+        self.assertIn("DSC_0042", compact_names)
+        self.assertNotIn("DSC_0043", compact_names)
+        self.assertLess(compact_names.nbytes(), 16 * len(TEST_NAMES) + 1250)
@@ -0,0 +1,61 @@
+import csv
+import gzip
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from tests.base.test_base import TestScripts
+from src.utils.scripts import iter_raw_files
+from src.utils.pairing_report import PAIRED_JPG_CNT, ORPHAN_JPG_CNT, PAIRED_RAW_CNT, ORPHAN_RAW_CNT, REPORT_ROW_CNT
+from src.utils.pairing_report import REPORT_COLUMNS, ReportWriter, PairingReport
+
+
+class TestPairingReport(TestScripts):
+
+    def test_report_writer(self):
+        TEST_REPORT_FILE: Path = self.data_root / "report.csv.gz"
+        # TestCase 01: Rows go through the bounded queue in small batches, and the file only appears once closed
+        writer = ReportWriter(str(TEST_REPORT_FILE), ('a', 'b'), batch_rows=3, max_pending_batches=1)
+        for i in range(10):
+            writer.write_row((i, f"name, {i}"))
+        self.assertFalse(TEST_REPORT_FILE.exists())
+        writer.close()
+        with gzip.open(TEST_REPORT_FILE, 'rt', encoding='utf-8', newline='') as report_file:
+            rows: List[List[str]] = list(csv.reader(report_file))
+        self.assertEqual(rows[0], ['a', 'b'])
+        self.assertEqual(rows[1:], [[str(i), f"name, {i}"] for i in range(10)])
+        self.assertEqual(writer.row_cnt, 10)
+
+    def test_pairing_report(self):
+        # Initialize test parameters
+        TEST_JPG_DIR: Path = (self.data_root / "jpg_files").resolve()
+        TEST_RAW_DIR: Path = (self.data_root / "raw_files").resolve()
+        TEST_REPORT_FILE: Path = self.data_root / "report.csv"
+        for relpath in ("a/DSC_0001.jpg", "a/DSC_0002.jpg", "b/DSC_0003.jpg", "b/edit.jpg"):
+            (TEST_JPG_DIR / relpath).parent.mkdir(parents=True, exist_ok=True)
+            (TEST_JPG_DIR / relpath).touch()
+        for relpath in ("x/DSC_0001.nef", "x/DSC_0004.nef", "y/DSC_0003.nef"):
+            (TEST_RAW_DIR / relpath).parent.mkdir(parents=True, exist_ok=True)
+            (TEST_RAW_DIR / relpath).touch()
+
+        # TestCase 01: RAW files pass through unchanged while being reported, then the JPG files are reported
+        report = PairingReport(str(TEST_REPORT_FILE), str(TEST_JPG_DIR), str(TEST_RAW_DIR))
+        raw_files: List[Tuple[str, str]] = list(iter_raw_files(str(TEST_RAW_DIR), ['.nef'], walk_workers=2))
+        self.assertEqual(list(report.tap_raw_files(iter(raw_files), {'DSC_0001', 'DSC_0002', 'DSC_0003'})), raw_files)
+        report.report_jpg_files(['DSC_'], ['.jpg'], walk_workers=2)
+        detailed_info: Dict[str, int] = report.close()
+        self.assertEqual(
+            (detailed_info[PAIRED_JPG_CNT], detailed_info[ORPHAN_JPG_CNT], detailed_info[PAIRED_RAW_CNT], detailed_info[ORPHAN_RAW_CNT], detailed_info[REPORT_ROW_CNT]),
+            (2, 1, 2, 1, 10),
+        )
+
+        # TestCase 02: Every file and folder has its row, with paths relative to its directory
+        with open(TEST_REPORT_FILE, encoding='utf-8', newline='') as report_file:
+            rows: List[Dict[str, str]] = list(csv.DictReader(report_file))
+        self.assertEqual(tuple(rows[0]), REPORT_COLUMNS)
+        statuses: Dict[Tuple[str, str], str] = {(row['folder'], row['name']): row['status'] for row in rows}
+        self.assertEqual(statuses[('a', 'DSC_0002.jpg')], 'orphan')
+        self.assertEqual(statuses[('b', 'DSC_0003.jpg')], 'paired')
+        self.assertEqual(statuses[('x', 'DSC_0004.nef')], 'orphan')
+        self.assertNotIn(('b', 'edit.jpg'), statuses)
+        folder_counts: Dict[Tuple[str, str], Tuple[str, str]] = {(row['tree'], row['folder']): (row['paired_cnt'], row['orphan_cnt']) for row in rows if row['status'] == 'folder'}
+        self.assertEqual(folder_counts, {('raw', 'x'): ('1', '1'), ('raw', 'y'): ('1', '0'), ('jpg', 'a'): ('1', '1'), ('jpg', 'b'): ('1', '0')})
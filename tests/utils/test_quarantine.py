@@ -0,0 +1,54 @@
+import os
+import json
+from pathlib import Path
+from typing import List
+
+from tests.base.test_base import TestScripts
+from src.utils.deleter import delete_files
+from src.config.logging_config import get_file_logger
+from src.utils.scripts import iter_raw_files
+from src.utils.quarantine import QUARANTINE_DIR_NAME, QUARANTINE_MANIFEST_NAME
+from src.utils.quarantine import RESTORED_RAW_CNT, FAILED_RESTORE_RAW_CNT, CONFLICT_RESTORE_RAW_CNT
+from src.utils.quarantine import QuarantineDeleter, list_quarantine_batches, restore_quarantine
+
+
+class TestQuarantine(TestScripts):
+
+    def test_quarantine_and_restore(self):
+        # Initialize test parameters
+        TEST_RAW_DIR: Path = (self.data_root / "raw_files").resolve()
+        raw_paths: List[Path] = self.create_dummy_files(random_depth=(0, 3), file_count=40, file_ext='.nef', file_prefix='DSC_', base_path=TEST_RAW_DIR)
+        for path in raw_paths:
+            path.write_bytes(path.name.encode())
+        doomed_paths: List[Path] = raw_paths[:30]
+
+        # TestCase 01: Deleted files keep their relative paths in a dated batch, listed in one manifest
+        deleter = QuarantineDeleter(str(TEST_RAW_DIR))
+        with self.assertLogs(get_file_logger(), level='INFO') as logs:
+            self.assertEqual(delete_files([str(path) for path in doomed_paths], max_workers=4, batch_size=4, delete_func=deleter), (30, 0))
+        self.assertTrue(all(line.endswith(", moved to quarantine.") for line in logs.output))
+        deleter.close()
+        batches: List[str] = list_quarantine_batches(str(TEST_RAW_DIR))
+        self.assertEqual(len(batches), 1)
+        batch_dir: Path = TEST_RAW_DIR / QUARANTINE_DIR_NAME / batches[0]
+        manifest = json.loads((batch_dir / QUARANTINE_MANIFEST_NAME).read_text(encoding='utf-8'))
+        self.assertEqual(manifest['files'], sorted(os.path.relpath(path, TEST_RAW_DIR) for path in doomed_paths))
+        self.assertTrue(all(not path.exists() and (batch_dir / path.relative_to(TEST_RAW_DIR)).exists() for path in doomed_paths))
+
+        # TestCase 02: RAW scans skip the quarantine directory
+        self.assertEqual(sorted(os.path.join(root, name) for root, name in iter_raw_files(str(TEST_RAW_DIR), ['.nef'], walk_workers=2)), sorted(str(path) for path in raw_paths[30:]))
+
+        # TestCase 03: Restoring replays the manifest, leaving files whose path is taken again
+        doomed_paths[0].write_bytes(b"new file")
+        detailed_info = restore_quarantine(str(TEST_RAW_DIR))
+        self.assertEqual((detailed_info[RESTORED_RAW_CNT], detailed_info[FAILED_RESTORE_RAW_CNT], detailed_info[CONFLICT_RESTORE_RAW_CNT]), (29, 0, 1))
+        self.assertTrue(all(path.read_bytes() == path.name.encode() for path in doomed_paths[1:]))
+        self.assertEqual(doomed_paths[0].read_bytes(), b"new file")
+
+        # TestCase 04: Once every file is back, the batch directory is removed
+        doomed_paths[0].unlink()
+        detailed_info = restore_quarantine(str(TEST_RAW_DIR), batches[0])
+        self.assertEqual(detailed_info[RESTORED_RAW_CNT], 1)
+        self.assertEqual(list_quarantine_batches(str(TEST_RAW_DIR)), [])
+        with self.assertRaises(FileNotFoundError):
+            restore_quarantine(str(TEST_RAW_DIR))
@@ -1,4 +1,5 @@
 import random
+import threading
 import uuid
 from typing import Set, List, Tuple, Dict
 from pathlib import Path
@@ -9,6 +10,9 @@ from src.utils.scripts import KEPT_RAW_CNT, DELETED_RAW_CNT, FAILED_DELETE_RAW_C
 from src.utils.scripts import assert_abs_paths_exist
 from src.utils.scripts import gather_camera_jpg_names
 from src.utils.scripts import filter_raw_files_by_jpg_names
+from src.utils.scripts import AMBIGUOUS_CAMERA_JPG_CNT
+from src.utils.scripts import gather_camera_jpg_dirs, iter_raw_files, plan_raw_mirror_moves, mirror_raw_files
+from src.utils.scripts import collect_raw_files
 
 
 class TestAssertAbsPathsExist(TestScripts):
@@ -169,7 +173,61 @@ class TestFilterRawFilesByJpgNames(TestScripts):
         self.assertEqual(set(remaining_raw_stems), set(jpg_names))
 
 
+class TestCollectRawFiles(TestScripts):
+    def test_collect_raw_files_stop_event(self):
+        # Initialize test parameters
+        TEST_RAW_DIR: Path = (self.data_root / "raw_files").resolve()
+        for folder in ("card1", "card2", "card3"):
+            (TEST_RAW_DIR / folder).mkdir(parents=True, exist_ok=True)
+            (TEST_RAW_DIR / folder / "DSC_0001.nef").touch()
+        stop_event: threading.Event = threading.Event()
+
+        # TestCase 01: An unset event collects every RAW file
+        self.assertEqual(len(collect_raw_files(str(TEST_RAW_DIR), ['.nef'], stop_event=stop_event)), 3)
 
+        # TestCase 02: The walk stops at the next directory once the event is set
+        raw_files = iter_raw_files(str(TEST_RAW_DIR), ['.nef'], walk_workers=1, stop_event=stop_event)
+        next(raw_files)
+        stop_event.set()
+        self.assertEqual(list(raw_files), [])
 
+        # TestCase 03: A set event collects nothing
+        self.assertEqual(collect_raw_files(str(TEST_RAW_DIR), ['.nef'], stop_event=stop_event), [])
 
 
+class TestMirrorRawFiles(TestScripts):
+    def test_mirror_raw_files(self):
+        # Initialize test parameters
+        TEST_JPG_DIR: Path = (self.data_root / "jpg_files").resolve()
+        TEST_RAW_DIR: Path = (self.data_root / "raw_files").resolve()
+        TEST_JPG_FILES: List[str] = ["person/DSC_0001.jpg", "person/kids/DSC_0002.jpg", "scenery/DSC_0003.jpg", "best/DSC_0003.jpg", "DSC_0004.jpg", "IMG_0005.jpg"]
+        TEST_RAW_FILES: List[str] = ["card1/DSC_0001.nef", "card1/DSC_0002.nef", "card2/DSC_0002.nef", "card1/DSC_0003.nef", "DSC_0004.nef", "card1/DSC_0006.nef"]
+        for relpath in TEST_JPG_FILES:
+            (TEST_JPG_DIR / relpath).parent.mkdir(parents=True, exist_ok=True)
+            (TEST_JPG_DIR / relpath).touch()
+        for relpath in TEST_RAW_FILES:
+            (TEST_RAW_DIR / relpath).parent.mkdir(parents=True, exist_ok=True)
+            (TEST_RAW_DIR / relpath).touch()
+
+        # TestCase 01: Every camera JPG name is mapped to its folder, the first one in sorted order when ambiguous
+        jpg_dirs, detailed_info = gather_camera_jpg_dirs(str(TEST_JPG_DIR), ['DSC_'], ['.jpg'])
+        self.assertEqual(jpg_dirs, {'DSC_0001': 'person', 'DSC_0002': 'person/kids', 'DSC_0003': 'best', 'DSC_0004': '.'})
+        self.assertEqual(detailed_info[TOTAL_JPG_CNT], 6)
+        self.assertEqual(detailed_info[UNIQUE_CAMERA_JPG_CNT], 4)
+        self.assertEqual(detailed_info[AMBIGUOUS_CAMERA_JPG_CNT], 1)
+
+        # TestCase 02: Kept RAW files are planned into the mirrored folders, unless in place or taken
+        kept_raw_cnt, moves, doomed_raw_paths, conflict_raw_cnt = plan_raw_mirror_moves(iter_raw_files(str(TEST_RAW_DIR), ['.nef']), jpg_dirs, str(TEST_RAW_DIR))
+        self.assertEqual(kept_raw_cnt, 5)
+        self.assertEqual(conflict_raw_cnt, 1)
+        self.assertEqual(doomed_raw_paths, [str(TEST_RAW_DIR / "card1" / "DSC_0006.nef")])
+        self.assertEqual(sorted(moves), [
+            (str(TEST_RAW_DIR / "card1" / "DSC_0001.nef"), str(TEST_RAW_DIR / "person" / "DSC_0001.nef")),
+            (str(TEST_RAW_DIR / "card1" / "DSC_0002.nef"), str(TEST_RAW_DIR / "person" / "kids" / "DSC_0002.nef")),
+            (str(TEST_RAW_DIR / "card1" / "DSC_0003.nef"), str(TEST_RAW_DIR / "best" / "DSC_0003.nef")),
+        ])
+
+        # TestCase 03: The moves create the folders they need
+        self.assertEqual(mirror_raw_files(moves), (3, 0))
+        self.assertTrue((TEST_RAW_DIR / "person" / "kids" / "DSC_0002.nef").exists())
+        self.assertTrue((TEST_RAW_DIR / "card2" / "DSC_0002.nef").exists())
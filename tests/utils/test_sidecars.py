@@ -0,0 +1,106 @@
+import os
+import random
+from pathlib import Path
+from typing import Dict, List
+
+from tests.base.test_base import TestScripts
+from src.utils.scripts import KEPT_RAW_CNT, DELETED_RAW_CNT, DELETED_SIDECAR_CNT, FAILED_DELETE_SIDECAR_CNT
+from src.utils.scripts import FAILED_DELETE_RAW_CNT
+from src.utils.scripts import delete_raw_files, filter_raw_files_by_jpg_names
+from src.utils.sidecars import SidecarIndex, sidecar_owner_paths
+
+
+class TestSidecarIndex(TestScripts):
+
+    def test_sidecar_index(self):
+        sidecars = SidecarIndex(['.xmp', '.PP3', '.dop'])
+        raw_filenames: List[str] = ['DSC_0001.NEF', 'DSC_0002.nef', 'DSC_0003.NEF', 'DSC_0003.CR2', 'DSC_0004.NEF']
+        other_filenames: List[str] = [
+            'DSC_0001.NEF.xmp', 'DSC_0001.xmp', 'dsc_0002.NEF.pp3', 'DSC_0002.NEF.dop',
+            'DSC_0003.xmp', 'DSC_0003.CR2.xmp', 'DSC_0005.xmp', 'DSC_0004.jpg', 'DSC_0004.NEF.txt',
+        ]
+        sidecars.add_directory('/raw', raw_filenames, raw_filenames + other_filenames)
+        # TestCase 01: Both sidecar forms are found, ignoring case; sidecars without RAW file and other files are not
+        self.assertEqual(sidecars.sidecar_cnt, 6)
+
+        # TestCase 02: Every sidecar follows its RAW file
+        doomed_paths, doomed_sidecar_paths = sidecars.expand(['/raw/DSC_0001.NEF', '/raw/DSC_0002.nef', '/raw/DSC_0004.NEF'])
+        self.assertEqual(doomed_paths, [
+            '/raw/DSC_0001.NEF', '/raw/DSC_0001.NEF.xmp', '/raw/DSC_0001.xmp',
+            '/raw/DSC_0002.nef', '/raw/dsc_0002.NEF.pp3', '/raw/DSC_0002.NEF.dop',
+            '/raw/DSC_0004.NEF',
+        ])
+        self.assertEqual(doomed_sidecar_paths, {'/raw/DSC_0001.NEF.xmp', '/raw/DSC_0001.xmp', '/raw/dsc_0002.NEF.pp3', '/raw/DSC_0002.NEF.dop'})
+
+        # TestCase 03: A sidecar shared by several RAW files is only deleted with the last of them
+        doomed_paths, doomed_sidecar_paths = sidecars.expand(['/raw/DSC_0003.NEF'])
+        self.assertEqual(doomed_paths, ['/raw/DSC_0003.NEF'])
+        doomed_paths, doomed_sidecar_paths = sidecars.expand(['/raw/DSC_0003.CR2', '/raw/DSC_0003.NEF'])
+        self.assertEqual(doomed_paths, ['/raw/DSC_0003.CR2', '/raw/DSC_0003.CR2.xmp', '/raw/DSC_0003.NEF', '/raw/DSC_0003.xmp'])
+
+        # TestCase 04: The owners of every sidecar are found again from the names alone
+        self.assertEqual(sidecar_owner_paths(doomed_paths, doomed_sidecar_paths), {
+            '/raw/DSC_0003.CR2.xmp': ['/raw/DSC_0003.CR2'],
+            '/raw/DSC_0003.xmp': ['/raw/DSC_0003.CR2', '/raw/DSC_0003.NEF'],
+        })
+        self.assertEqual(sidecar_owner_paths(['/raw/DSC_0003.xmp'], {'/raw/DSC_0003.xmp'}), {})
+
+    def test_delete_raw_files_failed_raw(self):
+        # A RAW file that fails to delete keeps its sidecars, shared or not
+        TEST_RAW_DIR: Path = (self.data_root / "raw_files").resolve()
+        TEST_RAW_DIR.mkdir(parents=True)
+        for name in ('DSC_0001.NEF', 'DSC_0001.NEF.xmp', 'DSC_0002.NEF', 'DSC_0002.CR2', 'DSC_0002.xmp', 'DSC_0003.NEF', 'DSC_0003.NEF.xmp'):
+            (TEST_RAW_DIR / name).touch()
+        sidecars = SidecarIndex(['.xmp'])
+        sidecars.add_directory(str(TEST_RAW_DIR), ['DSC_0001.NEF', 'DSC_0002.NEF', 'DSC_0002.CR2', 'DSC_0003.NEF'], [path.name for path in TEST_RAW_DIR.iterdir()])
+        doomed_paths, doomed_sidecar_paths = sidecars.expand([str(TEST_RAW_DIR / name) for name in ('DSC_0001.NEF', 'DSC_0002.NEF', 'DSC_0002.CR2', 'DSC_0003.NEF')])
+
+        def delete_func(abs_path: str) -> None:
+            if os.path.basename(abs_path) in ('DSC_0001.NEF', 'DSC_0002.CR2'):
+                raise PermissionError(abs_path)
+            os.remove(abs_path)
+
+        detailed_info: Dict[str, int] = delete_raw_files(doomed_paths, doomed_sidecar_paths, delete_workers=2, delete_func=delete_func)
+        self.assertEqual((detailed_info[DELETED_RAW_CNT], detailed_info[FAILED_DELETE_RAW_CNT]), (2, 2))
+        self.assertEqual((detailed_info[DELETED_SIDECAR_CNT], detailed_info[FAILED_DELETE_SIDECAR_CNT]), (1, 2))
+        self.assertEqual(sorted(path.name for path in TEST_RAW_DIR.iterdir()), ['DSC_0001.NEF', 'DSC_0001.NEF.xmp', 'DSC_0002.CR2', 'DSC_0002.xmp'])
+
+    def test_filter_raw_files_with_sidecars(self):
+        # Initialize test parameters
+        TEST_KEPT_RAW_CNT = 40
+        TEST_RAW_CNT = 120
+        TEST_RANDOM_DEPTH = (1, 4)
+        TEST_RAW_EXTS = ['.nef', '.cr2']
+        TEST_SIDECAR_EXTS = ['.xmp', '.pp3']
+        TEST_RAW_DIR: Path = self.data_root / "raw_files"
+
+        raw_paths: List[Path] = self.create_dummy_files(
+            random_depth=TEST_RANDOM_DEPTH,
+            file_count=TEST_RAW_CNT,
+            file_ext=random.choice(TEST_RAW_EXTS),
+            base_path=TEST_RAW_DIR,
+        )
+        # Every RAW file gets one sidecar of each form, and an unrelated file that must stay
+        for raw_path in raw_paths:
+            Path(f"{raw_path}{random.choice(TEST_SIDECAR_EXTS)}").touch()
+            raw_path.with_suffix('.xmp').touch()
+            raw_path.with_suffix('.txt').touch()
+        jpg_names: List[str] = [path.stem for path in raw_paths[:TEST_KEPT_RAW_CNT]]
+
+        # TestCase 01: Deleted RAW files take their sidecars with them, in the same walk
+        detailed_info: Dict[str, int] = filter_raw_files_by_jpg_names(
+            str(TEST_RAW_DIR.resolve()), raw_exts=TEST_RAW_EXTS, jpg_names=set(jpg_names),
+            delete_func=os.remove, sidecar_exts=TEST_SIDECAR_EXTS,
+        )
+        self.assertEqual(detailed_info[KEPT_RAW_CNT], TEST_KEPT_RAW_CNT)
+        self.assertEqual(detailed_info[DELETED_RAW_CNT], TEST_RAW_CNT - TEST_KEPT_RAW_CNT)
+        self.assertEqual(detailed_info[DELETED_SIDECAR_CNT], 2 * (TEST_RAW_CNT - TEST_KEPT_RAW_CNT))
+        self.assertEqual(detailed_info[FAILED_DELETE_SIDECAR_CNT], 0)
+        remaining_stems: List[str] = sorted(path.name.partition('.')[0] for path in TEST_RAW_DIR.rglob("*") if path.is_file() and path.suffix != '.txt')
+        self.assertEqual(remaining_stems, sorted(3 * jpg_names))
+        self.assertEqual(len(list(TEST_RAW_DIR.rglob("*.txt"))), TEST_RAW_CNT)
+
+        # TestCase 02: Without sidecar extensions, only RAW files are deleted
+        detailed_info = filter_raw_files_by_jpg_names(str(TEST_RAW_DIR.resolve()), raw_exts=TEST_RAW_EXTS, jpg_names=set(jpg_names[1:]), delete_func=os.remove)
+        self.assertEqual((detailed_info[DELETED_RAW_CNT], detailed_info[DELETED_SIDECAR_CNT]), (1, 0))
+        self.assertEqual(len(list(TEST_RAW_DIR.rglob(f"{jpg_names[0]}.*"))), 3)
@@ -0,0 +1,48 @@
+import os
+from pathlib import Path
+from typing import Dict, List, Set
+
+from tests.base.test_base import TestScripts
+from src.utils.walker import WALKED_DIR_CNT, WALK_DIRS_PER_SEC
+from src.utils.walker import scandir_walk
+
+
+class TestScandirWalk(TestScripts):
+    def test_scandir_walk(self):
+        # Initialize test parameters
+        TEST_FILE_CNT = 200
+        TEST_RANDOM_DEPTH = (0, 5)
+        TEST_WALK_WORKERS = 4
+
+        # Create files with different depths
+        temp_paths: List[Path] = self.create_dummy_files(
+            random_depth=TEST_RANDOM_DEPTH,
+            file_count=TEST_FILE_CNT,
+            file_ext=".jpg",
+        )
+
+        # Build the expected result with os.walk
+        root_abs_path: str = str(self.data_root.resolve())
+        expected_files: Set[str] = set()
+        expected_dir_cnt: int = 0
+        for dirpath, _, filenames in os.walk(root_abs_path):
+            expected_dir_cnt += 1
+            expected_files.update(os.path.join(dirpath, filename) for filename in filenames)
+
+        # TestCase 01: The parallel walk reports the same files as os.walk
+        stats: Dict[str, float] = {}
+        walked_files: Set[str] = set()
+        for dirpath, entries in scandir_walk(root_abs_path, max_workers=TEST_WALK_WORKERS, stats=stats):
+            for entry in entries:
+                self.assertEqual(os.path.dirname(entry.path), dirpath)
+                walked_files.add(entry.path)
+        self.assertSetEqual(walked_files, expected_files)
+        self.assertSetEqual(walked_files, set(str(path) for path in temp_paths))
+
+        # TestCase 02: Walk statistics are reported
+        self.assertEqual(stats[WALKED_DIR_CNT], expected_dir_cnt)
+        self.assertGreaterEqual(stats[WALK_DIRS_PER_SEC], 0)
+
+        # TestCase 03: A missing root yields nothing, like os.walk
+        missing_root: str = str((self.data_root / "missing").resolve())
+        self.assertEqual(list(scandir_walk(missing_root)), [])
@@ -0,0 +1,58 @@
+import os
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from tests.base.test_base import TestScripts
+from src.utils.watcher import POLLING_WATCHER, DirTree, PollingWatcher, create_watcher
+
+
+class TestDirTree(TestScripts):
+    def test_rescan(self):
+        # Initialize test parameters
+        TEST_ROOT: Path = (self.data_root / "jpg_files").resolve()
+        (TEST_ROOT / "person").mkdir(parents=True)
+        (TEST_ROOT / "person" / "DSC_0001.jpg").touch()
+        (TEST_ROOT / "person" / "notes.txt").touch()
+        tree = DirTree(str(TEST_ROOT), lambda filename: filename.endswith('.jpg'))
+
+        # TestCase 01: The initial scan reports the accepted files only
+        self.assertEqual(tree.scan(), [(str(TEST_ROOT / "person"), "DSC_0001.jpg")])
+        self.assertEqual(len(tree), 2)
+
+        # TestCase 02: Rescanning a directory reports its added files and the files of new subdirectories
+        (TEST_ROOT / "person" / "DSC_0002.jpg").touch()
+        (TEST_ROOT / "person" / "best" / "deep").mkdir(parents=True)
+        (TEST_ROOT / "person" / "best" / "deep" / "DSC_0003.jpg").touch()
+        changes = tree.rescan(str(TEST_ROOT / "person"))
+        self.assertEqual(sorted(changes.added), [(str(TEST_ROOT / "person"), "DSC_0002.jpg"), (str(TEST_ROOT / "person" / "best" / "deep"), "DSC_0003.jpg")])
+        self.assertEqual(changes.removed, [])
+
+        # TestCase 03: A removed directory takes all its files with it
+        os.remove(TEST_ROOT / "person" / "best" / "deep" / "DSC_0003.jpg")
+        for dirpath in (TEST_ROOT / "person" / "best" / "deep", TEST_ROOT / "person" / "best"):
+            os.rmdir(dirpath)
+        changes = tree.rescan(str(TEST_ROOT / "person"))
+        self.assertEqual(changes.removed, [(str(TEST_ROOT / "person" / "best" / "deep"), "DSC_0003.jpg")])
+        self.assertEqual(tree.dirs_under(str(TEST_ROOT)), [str(TEST_ROOT), str(TEST_ROOT / "person")])
+
+    def test_watchers(self):
+        # Initialize test parameters
+        TEST_ROOT: Path = (self.data_root / "jpg_files").resolve()
+        (TEST_ROOT / "person").mkdir(parents=True)
+
+        for use_inotify in (False, True):
+            tree = DirTree(str(TEST_ROOT), lambda filename: filename.endswith('.jpg'))
+            watcher = create_watcher([tree], use_inotify=use_inotify, poll_interval_sec=0.05)
+            tree.scan()
+            try:
+                # TestCase 01: A file created in a directory marks that directory as changed
+                (TEST_ROOT / "person" / f"DSC_{int(use_inotify)}.jpg").touch()
+                changed: List[Tuple[DirTree, str]] = []
+                deadline: float = time.monotonic() + 5
+                while not changed and time.monotonic() < deadline:
+                    changed = watcher.wait_for_changes(0.1)
+                self.assertIn((tree, str(TEST_ROOT / "person")), changed)
+            finally:
+                watcher.close()
+        self.assertEqual(PollingWatcher([tree]).kind, POLLING_WATCHER)